@@ -0,0 +1,80 @@
+"""
+Benchmark: proxy forwarding engines (recv_into copy vs os.splice).
+
+Streams a payload through one Forwarder between two socket pairs, the way
+the proxy relays the backend -> client stream, and reports throughput and
+CPU time per MB for each engine.
+
+    python benchmarks/bench_proxy_forwarding.py [--megabytes N]
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from server.fault_tolerance.forwarding import SPLICE_AVAILABLE, Forwarder
+
+
+def _sink(sock: socket.socket, total: int) -> None:
+    received = 0
+    while received < total:
+        chunk = sock.recv(1 << 16)
+        if not chunk:
+            return
+        received += len(chunk)
+
+
+def bench(label: str, use_splice: bool, megabytes: int) -> None:
+    total = megabytes << 20
+    src_w, src_r = socket.socketpair()
+    dst_w, dst_r = socket.socketpair()
+    forwarder = Forwarder(use_splice=use_splice)
+    chunk = os.urandom(1 << 16)
+
+    def produce():
+        for _ in range(total // len(chunk)):
+            src_w.sendall(chunk)
+        src_w.shutdown(socket.SHUT_WR)
+
+    producer = threading.Thread(target=produce)
+    sink = threading.Thread(target=_sink, args=(dst_r, total))
+    producer.start()
+    sink.start()
+    src_r.setblocking(False)
+    dst_w.setblocking(False)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    while True:
+        try:
+            if forwarder.forward(src_r, dst_w) == 0:
+                break
+        except BlockingIOError:
+            time.sleep(0)
+    cpu = time.thread_time() - cpu
+    wall = time.perf_counter() - wall
+    producer.join()
+    sink.join()
+    forwarder.close()
+    for sock in (src_w, src_r, dst_w, dst_r):
+        sock.close()
+    print(f"  {label:<10} {megabytes / wall:9.1f} MB/s  {cpu / megabytes * 1e3:7.2f} ms CPU/MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=int, default=256)
+    args = parser.parse_args()
+
+    print(f"Forwarding {args.megabytes} MB (forwarding thread only):")
+    bench("recv_into", False, args.megabytes)
+    if SPLICE_AVAILABLE:
+        bench("splice", True, args.megabytes)
+    else:
+        print("  splice     not available on this platform")
+
+
+if __name__ == "__main__":
+    main()
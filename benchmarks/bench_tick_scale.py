@@ -0,0 +1,71 @@
+"""
+Benchmark: simulation tick time vs. map size and player count.
+
+Runs one match per (map size, players) pair on a GameService: every tick
+each player queues a random move and, now and then, a bomb, then the game
+ticks (applying the queued inputs first, publishing a snapshot last). Players get unlimited lives so the match never ends while measured.
+Reports mean / p95 / max tick time against the tick budget.
+
+    python benchmarks/bench_tick_scale.py [--ticks N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from common.constants import SIM_TICK_RATE
+from common.stats import percentile
+from server.services.game_service import GameService
+
+MATCHES = [
+    (15, 13, 4),
+    (51, 51, 16),
+    (101, 101, 32),
+    (101, 101, 64),
+    (151, 151, 64),
+]
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+BOMB_CHANCE = 0.05
+
+
+def bench(width: int, height: int, players: int, ticks: int) -> None:
+    random.seed(width * 1000 + players)
+    game = GameService(width, height, players)
+    for pid in range(players):
+        game.add_player(pid, f"P{pid}")
+    game.start_game()
+    for player in game.state.players.values():
+        player.lives = 10 ** 9
+    durations = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        for pid in range(players):
+            game.submit_input(pid, "move", random.choice(DIRECTIONS))
+            if random.random() < BOMB_CHANCE:
+                game.submit_input(pid, "bomb")
+        game.tick()
+        durations.append(time.perf_counter() - started)
+    durations.sort()
+    budget = 1.0 / SIM_TICK_RATE
+    mean = sum(durations) / len(durations)
+    worst = durations[-1]
+    print(f"  {width:>3}x{height:<3} {players:>3} players  mean {mean * 1e3:7.3f} ms  "
+          f"p95 {percentile(durations, 95) * 1e3:7.3f} ms  max {worst * 1e3:7.3f} ms  "
+          f"({worst / budget * 100:5.1f}% of budget)  bombs={len(game.state.bombs)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{args.ticks} ticks per match, budget {1e3 / SIM_TICK_RATE:.0f} ms per tick:")
+    for width, height, players in MATCHES:
+        bench(width, height, players, args.ticks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: JSON vs binary state frames.
+
+Builds a realistic playing state (4 players, spectators, bombs, explosions,
+a full chat history) and reports bytes/frame plus encode and decode time per
+frame for both wire protocols.
+
+    python benchmarks/bench_wire_protocol.py [--frames N] [--spectators N]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from common.binary_protocol import encode_state, decode_state, encode_chat, FrameDecoder
+from server.services.game_service import GameService
+
+
+def build_state(spectators: int) -> dict:
+    """A mid-game state as produced by GameService.get_state()"""
+    random.seed(1)
+    service = GameService()
+    for pid, name in enumerate(("Joel", "Gino", "Magnini", "Omicini")):
+        service.add_player(pid, name)
+    for i in range(spectators):
+        service.add_spectator(f"Spec{i}")
+    service.start_game()
+    for pid in range(4):
+        service.place_bomb(pid)
+    for _ in range(22):
+        service.tick()
+    for pid in range(4):
+        service.place_bomb(pid)
+    for i in range(60):
+        service.add_chat_message(i % 4, f"message number {i}")
+    return service.get_state()
+
+
+def bench(label: str, fn, frames: int) -> float:
+    seconds = timeit.timeit(fn, number=frames)
+    micros = seconds / frames * 1e6
+    print(f"  {label:<22} {micros:9.1f} us/frame")
+    return micros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--spectators", type=int, default=10)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = build_state(args.spectators)
+    json_frame = (json.dumps(state) + "\n").encode()
+    binary_frame = encode_state(state)
+    chat_frame = encode_chat(state["chat_messages"])
+    body = FrameDecoder().feed(binary_frame)[0][1]
+
+    print(f"State: {len(state['players'])} players, {len(state['spectators'])} spectators, "
+          f"{len(state.get('bombs', []))} bombs, {len(state.get('explosions', []))} explosions, "
+          f"{len(state['chat_messages'])} chat messages")
+    print("Bytes/frame:")
+    print(f"  {'json':<22} {len(json_frame):9d}")
+    print(f"  {'binary (state)':<22} {len(binary_frame):9d}")
+    print(f"  {'binary (chat, on change)':<22} {len(chat_frame):9d}")
+    print("Encode:")
+    bench("json", lambda: (json.dumps(state) + "\n").encode(), args.frames)
+    bench("binary", lambda: encode_state(state), args.frames)
+    print("Decode:")
+    bench("json", lambda: json.loads(json_frame), args.frames)
+    bench("binary", lambda: decode_state(body), args.frames)
+
+
+if __name__ == "__main__":
+    main()
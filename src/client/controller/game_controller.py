@@ -8,6 +8,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from common.constants import MAX_MESSAGE_LENGTH
 
+_MOVE_KEYS = {
+    pygame.K_UP: "UP",
+    pygame.K_DOWN: "DOWN",
+    pygame.K_LEFT: "LEFT",
+    pygame.K_RIGHT: "RIGHT",
+}
+
 class GameController:
     """Handles user input and translates it into commands"""
     def __init__(self, network_manager):
@@ -72,7 +79,7 @@ class GameController:
         """Handles input in lobby"""
         if game_state.is_spectator:
             if event.key == pygame.K_j:
-                if game_state.connected_players_count() < 4:
+                if game_state.connected_players_count() < game_state.get_max_players():
                     self.network.send_command("JOIN_GAME")
         else:
             if event.key == pygame.K_RETURN and game_state.is_host():
@@ -85,14 +92,10 @@ class GameController:
             return
         if game_state.get_game_state() != "playing":
             return
-        if event.key == pygame.K_UP:
-            self.network.send_command("UP")
-        elif event.key == pygame.K_DOWN:
-            self.network.send_command("DOWN")
-        elif event.key == pygame.K_LEFT:
-            self.network.send_command("LEFT")
-        elif event.key == pygame.K_RIGHT:
-            self.network.send_command("RIGHT")
+        direction = _MOVE_KEYS.get(event.key)
+        if direction:
+            seq = game_state.predict_move(direction)
+            self.network.send_command(f"{direction}:{seq}")
         elif event.key == pygame.K_SPACE:
             self.network.send_command("BOMB")
 
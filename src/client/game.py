@@ -10,6 +10,7 @@ import socket
 import sys
 import os
 import time
+from typing import Optional
 
 current_file = os.path.abspath(__file__)
 client_dir = os.path.dirname(current_file)
@@ -25,7 +26,7 @@ from client.view.game_view import GameView
 from client.view.victory_view import VictoryView
 from client.controller.game_controller import GameController
 from client.network.client_network import NetworkManager
-from common.constants import TILE_SIZE, MAP_WIDTH, MAP_HEIGHT
+from common.constants import TILE_SIZE, MAP_WIDTH, MAP_HEIGHT, CLIENT_FPS
 
 # Sentinel raised by NetworkManager callbacks when connection is lost
 class ConnectionLost(Exception):
@@ -35,7 +36,8 @@ class ConnectionLost(Exception):
 class BombermanClient:
     """Main client class - Orchestrates Model, View, Controller"""
 
-    def __init__(self, sock: socket.socket):
+    def __init__(self, sock: socket.socket, binary: bool = False, fps: int = CLIENT_FPS):
+        """`fps` is the render rate; states are interpolated in between, whatever their rate"""
         pygame.init()
         self.map_width_px = MAP_WIDTH * TILE_SIZE
         self.map_height_px = MAP_HEIGHT * TILE_SIZE
@@ -43,8 +45,10 @@ class BombermanClient:
         self.screen = pygame.display.set_mode((self.map_width_px + self.sidebar_width, self.map_height_px))
         pygame.display.set_caption("Bomberman")
         self.clock = pygame.time.Clock()
+        self.fps = max(1, fps)
         self.model = GameState()
-        self.network = NetworkManager(sock)
+        self.binary = binary
+        self.network = NetworkManager(sock, binary=binary)
         self.controller = GameController(self.network)
         self.views = {
             "connecting": ConnectingView(self.screen),
@@ -53,7 +57,9 @@ class BombermanClient:
             "victory":    VictoryView(self.screen),
         }
         self._connection_lost = False
+        self._last_screen = None
         self._setup_network_callbacks()
+        self.network.send_hello()
         self.network.start_receiving()
 
     # ------------------------------------------------------------------
@@ -65,9 +71,14 @@ class BombermanClient:
         self.network.on_join_success  = self._on_join_success
         self.network.on_conversion    = self._on_conversion
         self.network.on_disconnected  = self._on_disconnected   # NEW
+        self.network.on_room_list     = self._on_room_list
 
     def _on_state_received(self, state: dict) -> None:
+        was_waiting = self.model.needs_keyframe
         self.model.update(state)
+        if self.model.needs_keyframe and not was_waiting:
+            # Delta against a frame we never saw: ask for a full keyframe
+            self.network.send_command("RESYNC")
 
     def _on_join_success(self, player_id: int, is_spectator: bool, name: str, reconnected: bool = False) -> None:
         if reconnected:
@@ -86,6 +97,13 @@ class BombermanClient:
         self.model.is_spectator = is_spectator
         print(f"[CLIENT] Converted to Player {new_player_id}")
 
+    def _on_room_list(self, rooms: list, error: Optional[str]) -> None:
+        if error:
+            print(f"[CLIENT] Room request failed: {error}")
+            return
+        self.model.rooms = rooms
+        print(f"[CLIENT] {len(rooms)} room(s) available")
+
     def _on_disconnected(self) -> None:
         """Called by NetworkManager when the socket closes unexpectedly."""
         if not self._connection_lost:
@@ -110,7 +128,7 @@ class BombermanClient:
         except Exception:
             pass
 
-        self.network = NetworkManager(new_sock)
+        self.network = NetworkManager(new_sock, binary=self.binary)
         self.network.session_id = old_session_id   # carry over
         self.controller = GameController(self.network)
         self._connection_lost = False
@@ -120,6 +138,8 @@ class BombermanClient:
         # primary handles it as the very first message on this connection.
         if old_session_id:
             self.network.send_reconnect()
+        else:
+            self.network.send_hello()
 
         self.network.start_receiving()
         print("[CLIENT] Reconnected OK")
@@ -144,7 +164,9 @@ class BombermanClient:
         """
         running = True
         while running:
-            self.clock.tick(30)
+            self.clock.tick(self.fps)
+            # Input handling and drawing below all see the same received state
+            self.model.begin_frame()
 
             for event in pygame.event.get():
                 if not self.controller.handle_event(event, self.model):
@@ -171,6 +193,10 @@ class BombermanClient:
         screen = self.model.current_screen
         view = self.views.get(screen)
         if view:
+            if screen != self._last_screen:
+                # Views that update only dirty areas repaint fully after another view drew
+                view.invalidate()
+                self._last_screen = screen
             if screen in ["lobby", "game", "victory"]:
                 view.render(self.model,
                             chat_input=self.controller.get_chat_input(),
@@ -180,6 +206,7 @@ class BombermanClient:
 
     def _render_reconnecting(self) -> None:
         """Draw a simple 'Reconnecting...' overlay on the current frame."""
+        self._last_screen = None
         # Dim the screen
         overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 160))
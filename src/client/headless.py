@@ -0,0 +1,180 @@
+"""
+Headless Bomberman client: the pygame client's protocol without a window.
+
+HeadlessClient owns a NetworkManager and a GameState and plays with random
+inputs. It never starts a receive thread: its owner calls connect(), tick()
+and receive() (client.swarm runs many clients on one selector loop per
+thread). Like the pygame client it reconnects with its session after a
+proxy failover. Each client records its join latency, the time between
+state frames, bytes received and how long every failover left it without
+a state. Behind the proxy a backend failover does not drop the client's
+socket, so a gap also starts when the proxy forwards a `reconnected`
+join_success, or when no state arrives for STATE_SILENCE seconds.
+"""
+import random
+import sys
+import os
+import time
+from typing import List, Optional
+
+current_file = os.path.abspath(__file__)
+client_dir = os.path.dirname(current_file)
+src_dir = os.path.dirname(client_dir)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from client.model.game_state import GameState
+from client.network.client_network import NetworkManager, try_connect
+from common.constants import BROADCAST_RATE
+
+# Seconds between reconnection attempts while the proxy is down
+RECONNECT_DELAY = 2.0
+# Seconds between two inputs of an active bot
+INPUT_INTERVAL = 0.15
+BOMB_PROBABILITY = 0.1
+# Seconds without a state after which the stream counts as interrupted
+STATE_SILENCE = 3.0 / BROADCAST_RATE
+_DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+# First line of a JSON-protocol connection. Any non-handshake line makes the
+# server admit the client at once instead of after its handshake timeout,
+# and a keyframe is what a fresh client needs anyway.
+_JSON_HELLO = "RESYNC"
+
+
+class HeadlessClient:
+    """One synthetic player (or passive observer) and its connection metrics"""
+    def __init__(self, host: str, port: int, binary: bool = False, passive: bool = False,
+                 seed: Optional[int] = None, start_at: float = 0.0):
+        """`passive` clients never send inputs; the first connection attempt waits for `start_at` (monotonic)"""
+        self.host = host
+        self.port = port
+        self.binary = binary
+        self.passive = passive
+        self.model = GameState()
+        self.network: Optional[NetworkManager] = None
+        self.session_id: Optional[str] = None
+        self.random = random.Random(seed)
+        self.join_latency: Optional[float] = None       # seconds from connect to join_success
+        self.arrivals: List[float] = []                 # seconds between consecutive states
+        self.failover_gaps: List[float] = []            # seconds from an interruption to the next state
+        self.states = 0
+        self.connections = 0
+        self._closed_bytes = 0                          # received on connections already dropped
+        self._closed_stale = 0
+        self._connect_started = 0.0
+        self._last_state_at: Optional[float] = None
+        self._lost_at: Optional[float] = None
+        self._next_connect = start_at
+        self._next_input = 0.0
+
+    @property
+    def bytes_received(self) -> int:
+        return self._closed_bytes + (self.network.bytes_received if self.network else 0)
+
+    @property
+    def stale_frames(self) -> int:
+        return self._closed_stale + (self.network.stale_frames if self.network else 0)
+
+    def connect_due(self, now: float) -> bool:
+        return self.network is None and now >= self._next_connect
+
+    def connect(self) -> bool:
+        """Opens a connection: RECONNECT with the known session, else a fresh join"""
+        now = time.monotonic()
+        sock = try_connect(self.host, self.port)
+        if sock is None:
+            self._next_connect = now + RECONNECT_DELAY
+            return False
+        network = NetworkManager(sock, binary=self.binary)
+        network.session_id = self.session_id
+        network.on_state_update = self._on_state
+        network.on_join_success = self._on_join_success
+        network.on_conversion = self._on_conversion
+        network.on_disconnected = self._on_disconnected
+        self.network = network
+        self.connections += 1
+        self._connect_started = now
+        if self.session_id:
+            network.send_reconnect()
+        elif self.binary:
+            network.send_hello()
+        else:
+            network.send_command(_JSON_HELLO)
+        return True
+
+    def receive(self) -> bool:
+        """Reads what the socket has; False once the connection is gone (see drop_connection)"""
+        return self.network is not None and self.network.receive_once()
+
+    def drop_connection(self) -> None:
+        """Closes the current connection; the next connect_due() check schedules a reconnect"""
+        if self.network is None:
+            return
+        if self._lost_at is None and self.join_latency is not None:
+            self._lost_at = time.monotonic()
+        self._closed_bytes += self.network.bytes_received
+        self._closed_stale += self.network.stale_frames
+        self.network.stop()
+        self.network = None
+        self._last_state_at = None
+        self._next_connect = time.monotonic()
+
+    def tick(self, now: float) -> None:
+        """Detects a silent stream and sends the next scripted input when one is due"""
+        if (self._lost_at is None and self._last_state_at is not None
+                and now - self._last_state_at > STATE_SILENCE):
+            self._lost_at = self._last_state_at
+        if self.network is None or self.passive or self.model.player_id is None or now < self._next_input:
+            return
+        if self.model.is_spectator:
+            return
+        self._next_input = now + INPUT_INTERVAL
+        game_state = self.model.get_game_state()
+        if game_state == "lobby":
+            if self.model.is_host() and self.model.can_start_game():
+                self.network.send_command("START_GAME")
+        elif game_state == "playing":
+            if self.random.random() < BOMB_PROBABILITY:
+                self.network.send_command("BOMB")
+            else:
+                direction = self.random.choice(_DIRECTIONS)
+                seq = self.model.predict_move(direction)
+                self.network.send_command(f"{direction}:{seq}")
+        elif game_state == "victory" and self.model.is_host():
+            self.network.send_command("PLAY_AGAIN")
+
+    def _on_state(self, state: dict) -> None:
+        now = time.monotonic()
+        self.states += 1
+        if self._lost_at is not None:
+            self.failover_gaps.append(now - self._lost_at)
+            self._lost_at = None
+        elif self._last_state_at is not None:
+            self.arrivals.append(now - self._last_state_at)
+        self._last_state_at = now
+        was_waiting = self.model.needs_keyframe
+        self.model.update(state)
+        if self.model.needs_keyframe and not was_waiting:
+            self.network.send_command("RESYNC")
+
+    def _on_join_success(self, player_id: int, is_spectator: bool, name: str, reconnected: bool = False) -> None:
+        now = time.monotonic()
+        if self.join_latency is None:
+            self.join_latency = now - self._connect_started
+        elif reconnected and self._lost_at is None:
+            # The proxy moved us to a new backend: the gap began after the last state
+            self._lost_at = self._last_state_at if self._last_state_at is not None else now
+        self.session_id = self.network.session_id
+        if reconnected:
+            self.model.player_id = player_id
+            self.model.is_spectator = is_spectator
+        else:
+            self.model.set_player_info(player_id, is_spectator, name)
+
+    def _on_conversion(self, new_player_id: int, is_spectator: bool) -> None:
+        self.model.player_id = new_player_id
+        self.model.is_spectator = is_spectator
+
+    def _on_disconnected(self) -> None:
+        if self._lost_at is None and self.join_latency is not None:
+            self._lost_at = time.monotonic()
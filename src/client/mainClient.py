@@ -7,7 +7,6 @@ client reconnects and the game resumes -- no window flicker, no data loss.
 """
 import sys
 import os
-import socket
 import time
 
 current_file = os.path.abspath(__file__)
@@ -17,38 +16,33 @@ if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
 from client.game import BombermanClient
-from common.constants import DEFAULT_HOST, DEFAULT_PORT
+from client.network.client_network import try_connect
+from common.constants import DEFAULT_HOST, DEFAULT_PORT, CLIENT_FPS
 
 # Seconds between reconnection attempts
 RECONNECT_DELAY = 2.0
 
 
-def try_connect(host: str, port: int, timeout: float = 3.0):
-    """Try to open a TCP connection. Returns socket on success, None on failure."""
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        sock.connect((host, port))
-        sock.settimeout(None)
-        return sock
-    except (ConnectionRefusedError, socket.timeout, OSError):
-        try:
-            sock.close()
-        except Exception:
-            pass
-        return None
-
-
 def main():
     host = DEFAULT_HOST
     port = DEFAULT_PORT
-    if len(sys.argv) > 1:
-        host = sys.argv[1]
-    if len(sys.argv) > 2:
+    # Usage: mainClient.py [host] [port] [--binary] [--fps=N]
+    binary = "--binary" in sys.argv[1:]
+    fps = CLIENT_FPS
+    for arg in sys.argv[1:]:
+        if arg.startswith("--fps="):
+            try:
+                fps = int(arg[6:])
+            except ValueError:
+                print(f"Invalid frame rate: {arg[6:]}, using default {CLIENT_FPS}")
+    argv = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if len(argv) > 0:
+        host = argv[0]
+    if len(argv) > 1:
         try:
-            port = int(sys.argv[2])
+            port = int(argv[1])
         except ValueError:
-            print(f"Invalid port: {sys.argv[2]}, using default {DEFAULT_PORT}")
+            print(f"Invalid port: {argv[1]}, using default {DEFAULT_PORT}")
 
     # ------------------------------------------------------------------
     # Initial connection (retry until server is up)
@@ -73,7 +67,7 @@ def main():
     # Create game -- pygame window opens here, stays open for the
     # entire session including reconnections
     # ------------------------------------------------------------------
-    game = BombermanClient(sock)
+    game = BombermanClient(sock, binary=binary, fps=fps)
 
     try:
         while True:
@@ -0,0 +1,62 @@
+"""
+Immutable per-update view of the server state for the render loop.
+
+The network thread builds a ModelFrame for every state it receives and
+publishes it with a single reference assignment; the render loop pins the
+latest one at the start of each frame (GameState.begin_frame). Neither side
+takes a lock, and everything drawn in one frame comes from the same state.
+Players, bombs and explosions are converted to tuples once per update here
+instead of being looked up key by key in every draw call.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+class PlayerView(NamedTuple):
+    pid: int
+    x: float
+    y: float
+    name: str
+    alive: bool
+    lives: int
+    disconnected: bool
+
+
+class BombView(NamedTuple):
+    x: int
+    y: int
+    timer: int
+    owner: int
+
+
+class ExplosionView(NamedTuple):
+    positions: Tuple[Tuple[int, int], ...]
+    timer: int
+
+
+@dataclass(frozen=True)
+class ModelFrame:
+    """One received state plus its typed entities"""
+    state: Optional[Dict[str, Any]]
+    players: Tuple[PlayerView, ...] = ()
+    bombs: Tuple[BombView, ...] = ()
+    explosions: Tuple[ExplosionView, ...] = ()
+    received_at: float = 0.0
+
+    @classmethod
+    def build(cls, state: Optional[Dict[str, Any]], received_at: float = 0.0) -> "ModelFrame":
+        if not state:
+            return cls(state, received_at=received_at)
+        players = tuple(
+            PlayerView(int(pid), p.get("x", 0), p.get("y", 0), p.get("name", f"Player {pid}"),
+                       bool(p.get("alive", False)), p.get("lives", 0), bool(p.get("disconnected", False)))
+            for pid, p in state.get("players", {}).items()
+        )
+        bombs = tuple(BombView(b["x"], b["y"], b.get("timer", 0), b.get("owner", -1))
+                      for b in state.get("bombs", []))
+        explosions = tuple(ExplosionView(tuple((x, y) for x, y in e["positions"]), e.get("timer", 0))
+                           for e in state.get("explosions", []))
+        return cls(state, players, bombs, explosions, received_at)
+
+
+EMPTY_FRAME = ModelFrame(None)
@@ -1,22 +1,75 @@
 """
 Model for game state on the client side
 """
-from typing import Optional, Dict, Any
+import sys
+import os
+import time
+from typing import Optional, Dict, Any, List, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from common.state_delta import apply_delta
+from common.constants import MAX_PLAYERS
+from client.model.prediction import MovePredictor
+from client.model.interpolation import SnapshotBuffer
+from client.model.frame import ModelFrame, PlayerView, BombView, ExplosionView, EMPTY_FRAME
 
 class GameState:
-    """Represents the complete game state"""
+    """
+    Represents the complete game state.
+
+    The receive thread publishes each update as a new ModelFrame (one
+    reference swap); the render loop calls begin_frame() once per frame and
+    every getter then reads that pinned frame until the next call. Without
+    begin_frame() the getters read the latest published frame.
+    """
     def __init__(self):
-        self.state: Optional[Dict[str, Any]] = None
+        self._published: ModelFrame = EMPTY_FRAME
+        self._pinned: Optional[ModelFrame] = None
         self.player_id: Optional[int] = None
         self.is_spectator: bool = False
         self.player_name: str = ""
         self.current_screen: str = "connecting"
+        self.needs_keyframe: bool = False
+        self.rooms: list = []
+        self.prediction = MovePredictor()
+        self.snapshots = SnapshotBuffer()
+
+    @property
+    def state(self) -> Optional[Dict[str, Any]]:
+        """Raw state dict of the current frame"""
+        return self.frame.state
+
+    @state.setter
+    def state(self, value: Optional[Dict[str, Any]]) -> None:
+        self._published = ModelFrame.build(value, time.monotonic())
+
+    @property
+    def frame(self) -> ModelFrame:
+        """The frame pinned by begin_frame(), else the latest published one"""
+        return self._pinned or self._published
+
+    def begin_frame(self) -> ModelFrame:
+        """Pins the latest published state for everything drawn in this render frame"""
+        self._pinned = self._published
+        return self._pinned
 
     def update(self, new_state: Dict[str, Any]) -> None:
-        """Updates state with data from server"""
-        self.state = new_state
-        if self.state:
-            game_state = self.state.get("game_state")
+        """Updates state with data from server (full frame or delta); receive thread"""
+        latest = self._published.state
+        if "delta" in new_state:
+            if latest is None or new_state.get("base_seq") != latest.get("frame_seq"):
+                self.needs_keyframe = True
+                return
+            patched = apply_delta(latest, new_state["delta"])
+            patched["frame_seq"] = new_state.get("frame_seq")
+            new_state = patched
+        self.needs_keyframe = False
+        now = time.monotonic()
+        self.prediction.reconcile(new_state, self.player_id)
+        self.snapshots.push(new_state, now)
+        self._published = ModelFrame.build(new_state, now)
+        if new_state:
+            game_state = new_state.get("game_state")
             if game_state == "lobby":
                 self.current_screen = "lobby"
             elif game_state == "playing":
@@ -36,8 +89,49 @@ class GameState:
         return self.state.get("game_state") if self.state else "lobby"
 
     def get_players(self) -> Dict:
-        """Returns players"""
-        return self.state.get("players", {}) if self.state else {}
+        """Returns players (the local player at its predicted position)"""
+        players = self.state.get("players", {}) if self.state else {}
+        position = self.prediction.position
+        key = str(self.player_id)
+        if position and key in players:
+            players = dict(players)
+            players[key] = dict(players[key], x=position[0], y=position[1])
+        return players
+
+    def get_player_views(self) -> Tuple[PlayerView, ...]:
+        """Players of the current frame as typed records (server positions)"""
+        return self.frame.players
+
+    def get_bomb_views(self) -> Tuple[BombView, ...]:
+        return self.frame.bombs
+
+    def get_explosion_views(self) -> Tuple[ExplosionView, ...]:
+        return self.frame.explosions
+
+    def get_render_players(self, now: float) -> List[PlayerView]:
+        """Players to draw at `now`: the local one predicted, the others interpolated"""
+        positions = self.snapshots.positions(now)
+        predicted = self.prediction.position
+        local = self.player_id if not self.is_spectator else None
+        rendered = []
+        for player in self.frame.players:
+            if player.pid == local:
+                if predicted:
+                    player = player._replace(x=predicted[0], y=predicted[1])
+            else:
+                position = positions.get(str(player.pid))
+                if position:
+                    player = player._replace(x=position[0], y=position[1])
+            rendered.append(player)
+        return rendered
+
+    def bomb_age(self, bomb: BombView, now: float) -> float:
+        """Seconds the bomb has been on the map, as seen by this client"""
+        return self.snapshots.bomb_age(bomb.x, bomb.y, now)
+
+    def predict_move(self, direction: str) -> int:
+        """Moves the local player ahead of the server; returns the move's sequence number"""
+        return self.prediction.predict(self.state, self.player_id, direction)
 
     def get_spectators(self) -> Dict:
         """Returns spectators"""
@@ -59,6 +153,10 @@ class GameState:
         """Returns game map"""
         return self.state.get("map", []) if self.state else []
 
+    def get_max_players(self) -> int:
+        """Returns the player cap of the current room"""
+        return self.state.get("max_players", MAX_PLAYERS) if self.state else MAX_PLAYERS
+
     def get_bombs(self) -> list:
         """Returns active bombs"""
         return self.state.get("bombs", []) if self.state else []
@@ -0,0 +1,93 @@
+"""
+Snapshot buffer for smooth rendering of other players.
+
+States arrive at the broadcast rate (10 Hz) while the client draws at its
+own frame rate. Each state's player positions are stored with the time it
+was received, and frames draw the other players `delay()` seconds in the
+past, interpolated between the two snapshots around that instant. The delay
+follows the measured arrival interval plus twice its jitter (smoothed as in
+RFC 3550), so there is almost always a newer snapshot to move towards
+without adding more lag than the network needs.
+
+Bombs get the time they were first seen, so their pulse animates with
+wall-clock time instead of with frames or stale timers.
+"""
+from collections import deque
+from typing import Dict, Optional, Tuple
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from common.constants import BROADCAST_RATE, INTERP_MIN_DELAY, INTERP_MAX_DELAY
+
+SNAPSHOT_BUFFER_SIZE = 32
+# Moves longer than this between two snapshots (respawn) are not interpolated
+MAX_INTERP_TILES = 2
+_INTERVAL_GAIN = 1 / 8
+_JITTER_GAIN = 1 / 16
+
+
+class SnapshotBuffer:
+    """Timestamped player positions of the latest states, plus when each bomb appeared"""
+    def __init__(self, size: int = SNAPSHOT_BUFFER_SIZE,
+                 min_delay: float = INTERP_MIN_DELAY, max_delay: float = INTERP_MAX_DELAY):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._snapshots: deque = deque(maxlen=size)     # (received_at, {pid: (x, y)})
+        self._bombs_seen: Dict[Tuple[int, int], float] = {}
+        self.interval = 1.0 / BROADCAST_RATE            # smoothed time between states
+        self.jitter = 0.0                               # smoothed deviation from it
+
+    def push(self, state: Optional[dict], now: float) -> None:
+        """Records a state received at `now` (monotonic seconds)"""
+        if not state or state.get("game_state") != "playing":
+            self.clear()
+            return
+        if self._snapshots:
+            gap = now - self._snapshots[-1][0]
+            self.jitter += (abs(gap - self.interval) - self.jitter) * _JITTER_GAIN
+            self.interval += (gap - self.interval) * _INTERVAL_GAIN
+        positions = {str(pid): (p["x"], p["y"]) for pid, p in state.get("players", {}).items()
+                     if p.get("alive") and not p.get("disconnected")}
+        self._snapshots.append((now, positions))
+        seen = self._bombs_seen
+        self._bombs_seen = {(b["x"], b["y"]): seen.get((b["x"], b["y"]), now) for b in state.get("bombs", [])}
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+        self._bombs_seen = {}
+
+    def delay(self) -> float:
+        """How far in the past frames are drawn"""
+        return min(self.max_delay, max(self.min_delay, self.interval + 2 * self.jitter))
+
+    def positions(self, now: float) -> Dict[str, Tuple[float, float]]:
+        """Player positions (fractional tiles) at `now - delay()`"""
+        snapshots = list(self._snapshots)
+        if not snapshots:
+            return {}
+        render_at = now - self.delay()
+        older = newer = None
+        for snapshot in snapshots:
+            if snapshot[0] <= render_at:
+                older = snapshot
+            else:
+                newer = snapshot
+                break
+        if older is None:
+            return dict(snapshots[0][1])
+        if newer is None:
+            return dict(older[1])
+        t = (render_at - older[0]) / (newer[0] - older[0])
+        result = {}
+        for pid, (x1, y1) in newer[1].items():
+            x0, y0 = older[1].get(pid, (x1, y1))
+            if abs(x1 - x0) + abs(y1 - y0) > MAX_INTERP_TILES:
+                result[pid] = (x1, y1)
+            else:
+                result[pid] = (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+        return result
+
+    def bomb_age(self, x: int, y: int, now: float) -> float:
+        """Seconds since the bomb at (x, y) first appeared in a state"""
+        return now - self._bombs_seen.get((x, y), now)
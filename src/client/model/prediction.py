@@ -0,0 +1,91 @@
+"""
+Client-side prediction of the local player's movement.
+
+Every move the player sends gets a sequence number ("UP:17") and is applied
+to a predicted position immediately, with the same rules the server uses
+(common.movement.step). The server echoes the last sequence number it
+applied in the player's "input_seq"; on each state update the predictor
+drops the acknowledged moves and replays the remaining ones on top of the
+authoritative position, so a refused or conflicting move snaps back within
+one broadcast.
+"""
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from common.movement import step
+
+# Unacknowledged moves kept for replay; older ones are forgotten
+MAX_PENDING_MOVES = 64
+
+
+class MovePredictor:
+    """Predicted position of the local player, reconciled with every server state"""
+    def __init__(self):
+        self.last_seq = 0
+        self.pending: deque = deque(maxlen=MAX_PENDING_MOVES)     # (seq, direction) not yet applied by the server
+        self.position: Optional[Tuple[int, int]] = None          # None: draw the server position
+        self._lock = threading.Lock()       # predict() runs on the render loop, reconcile() on the receive thread
+
+    def predict(self, state: Optional[Dict[str, Any]], player_id: Optional[int], direction: str) -> int:
+        """Applies a move locally; returns the sequence number to send with it"""
+        with self._lock:
+            return self._predict(state, player_id, direction)
+
+    def _predict(self, state: Optional[Dict[str, Any]], player_id: Optional[int], direction: str) -> int:
+        self.last_seq += 1
+        player = _local_player(state, player_id)
+        if player is None or "input_seq" not in player:
+            # Nothing to predict on, or a server that does not acknowledge moves
+            return self.last_seq
+        self.pending.append((self.last_seq, direction))
+        start = self.position or (player["x"], player["y"])
+        self.position = _step(state, player_id, start, direction) or start
+        return self.last_seq
+
+    def reconcile(self, state: Optional[Dict[str, Any]], player_id: Optional[int]) -> None:
+        """Rebases the pending moves on a new authoritative state"""
+        with self._lock:
+            self._reconcile(state, player_id)
+
+    def _reconcile(self, state: Optional[Dict[str, Any]], player_id: Optional[int]) -> None:
+        player = _local_player(state, player_id)
+        if player is None or "input_seq" not in player:
+            self.pending.clear()
+            self.position = None
+            return
+        acked = player["input_seq"]
+        # After a restart the server may be ahead of our counter: never reuse its numbers
+        self.last_seq = max(self.last_seq, acked)
+        while self.pending and self.pending[0][0] <= acked:
+            self.pending.popleft()
+        if not self.pending:
+            self.position = None
+            return
+        position = (player["x"], player["y"])
+        for _, direction in self.pending:
+            position = _step(state, player_id, position, direction) or position
+        self.position = position
+
+
+def _local_player(state: Optional[Dict[str, Any]], player_id: Optional[int]) -> Optional[dict]:
+    """The local player's entry while a match is being played and it is alive"""
+    if not state or player_id is None or state.get("game_state") != "playing":
+        return None
+    player = state.get("players", {}).get(str(player_id))
+    if not player or not player.get("alive") or player.get("disconnected"):
+        return None
+    return player
+
+
+def _step(state: Dict[str, Any], player_id: int, position: Tuple[int, int], direction: str) -> Optional[Tuple[int, int]]:
+    game_map = state.get("map") or []
+    if not game_map:
+        return None
+    others = {(p["x"], p["y"]) for pid, p in state.get("players", {}).items()
+              if pid != str(player_id) and p.get("alive") and not p.get("disconnected")}
+    return step(game_map, len(game_map[0]), len(game_map), position[0], position[1], direction,
+                lambda x, y: (x, y) in others)
@@ -4,27 +4,154 @@ Network communication management for the client
 import socket
 import threading
 import json
-from typing import Callable, Optional
+import struct
+import sys
+import os
+from typing import Callable, List, Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-MAX_FRAME_BUFFER_BYTES = 64 * 1024
+from common.binary_protocol import (
+    PROTOCOL_LINE, FRAME_TEXT, FRAME_STATE, FRAME_CHAT, FrameDecoder, decode_state,
+)
+
+# Longest frame accepted before the stream is treated as broken
+MAX_FRAME_BYTES = 4 * 1024 * 1024
+RECV_CHUNK_BYTES = 64 * 1024
+
+# Broadcast state frames start with one of these (the server writes the key first);
+# every other JSON message (join_success, rooms, ...) is a control message
+_KEYFRAME_PREFIX = b'{"game_state"'
+_DELTA_PREFIX = b'{"delta"'
+
+
+class FrameTooLarge(ValueError):
+    pass
+
+
+class LineReader:
+    """
+    Incremental splitter for the newline-delimited JSON stream.
+
+    Bytes are received with recv_into straight into the free tail of one
+    bytearray, and each search for b"\n" starts where the previous one
+    stopped, so a frame spanning many chunks costs linear time. Lines are
+    only decoded once complete, so a multibyte character split between two
+    recv() calls is never broken.
+    """
+    def __init__(self, max_frame: int = MAX_FRAME_BYTES, chunk: int = RECV_CHUNK_BYTES):
+        self.max_frame = max_frame
+        self.chunk = chunk
+        self._buffer = bytearray(2 * chunk)
+        self._start = 0     # first byte not yet returned
+        self._end = 0       # end of received data
+        self._scan = 0      # no newline in [_start, _scan)
+
+    def recv_from(self, sock: socket.socket) -> int:
+        """One recv_into from `sock`; returns the byte count (0: connection closed)"""
+        self._reserve(self.chunk)
+        received = sock.recv_into(memoryview(self._buffer)[self._end:])
+        self._end += received
+        return received
+
+    def lines(self) -> List[bytes]:
+        """Complete lines received so far, without their newline"""
+        lines = []
+        buffer = self._buffer
+        while True:
+            newline = buffer.find(b"\n", self._scan, self._end)
+            if newline < 0:
+                self._scan = self._end
+                break
+            if newline - self._start > self.max_frame:
+                raise FrameTooLarge(f"frame of {newline - self._start} bytes")
+            lines.append(bytes(buffer[self._start:newline]))
+            self._start = self._scan = newline + 1
+        if self._end - self._start > self.max_frame:
+            raise FrameTooLarge(f"{self._end - self._start} bytes without a newline")
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0
+        return lines
+
+    def _reserve(self, size: int) -> None:
+        """Makes room for `size` more bytes: drops consumed bytes, then grows"""
+        if len(self._buffer) - self._end >= size:
+            return
+        if self._start:
+            pending = self._end - self._start
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._scan -= self._start
+            self._start, self._end = 0, pending
+        if len(self._buffer) - self._end < size:
+            self._buffer.extend(bytes(max(size, len(self._buffer))))
+
+
+def latest_state_only(lines: List[bytes]) -> List[bytes]:
+    """
+    Drops state frames made stale by a later keyframe in the same batch.
+    Control messages are kept in order, and so are deltas after the last
+    keyframe (each one builds on the previous frame).
+    """
+    last_keyframe = -1
+    for i, line in enumerate(lines):
+        if line.startswith(_KEYFRAME_PREFIX):
+            last_keyframe = i
+    if last_keyframe <= 0:
+        return lines
+    return [line for i, line in enumerate(lines)
+            if i >= last_keyframe or not line.startswith((_KEYFRAME_PREFIX, _DELTA_PREFIX))]
+
+
+def try_connect(host: str, port: int, timeout: float = 3.0):
+    """Try to open a TCP connection. Returns socket on success, None on failure."""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect((host, port))
+        sock.settimeout(None)
+        return sock
+    except (ConnectionRefusedError, socket.timeout, OSError):
+        try:
+            sock.close()
+        except Exception:
+            pass
+        return None
 
 
 class NetworkManager:
     """Manages TCP connection with the server"""
-    def __init__(self, sock: socket.socket):
+    def __init__(self, sock: socket.socket, binary: bool = False, max_frame_bytes: int = MAX_FRAME_BYTES):
+        """
+        `binary` asks the server for the binary frame protocol at join time;
+        `max_frame_bytes` bounds one server message (JSON line or binary frame).
+        """
         self.sock = sock
+        self.binary = binary
+        self.max_frame_bytes = max_frame_bytes
+        self.stale_frames = 0                   # state frames skipped because a newer one was queued
+        self.bytes_received = 0
         self.running = True
         self.on_state_update: Optional[Callable] = None
         self.on_join_success: Optional[Callable] = None
         self.on_conversion: Optional[Callable] = None
         self.on_disconnected: Optional[Callable] = None
+        self.on_room_list: Optional[Callable] = None
         self.session_id: Optional[str] = None   # saved on first join_success
+        self.room_id: int = 0                   # room of the last join_success
+        self._chat_messages: list = []          # binary protocol: chat arrives out of band
+        self._reader = LineReader(max_frame_bytes)
+        self._decoder = FrameDecoder(max_body=max_frame_bytes)
+        self._chunk = bytearray(RECV_CHUNK_BYTES)
 
     def start_receiving(self) -> None:
         """Starts the receiving thread"""
         thread = threading.Thread(target=self._receive_loop, daemon=True)
         thread.start()
 
+    def send_hello(self) -> None:
+        """First message of a fresh connection: negotiates the binary protocol"""
+        if self.binary:
+            self.send_command(PROTOCOL_LINE)
+
     def send_reconnect(self) -> bool:
         """
         Send RECONNECT:<session_id> to the server.
@@ -36,6 +163,8 @@ class NetworkManager:
             return False
         try:
             msg = f"RECONNECT:{self.session_id}\n"
+            if self.binary:
+                msg += PROTOCOL_LINE + "\n"
             self.sock.sendall(msg.encode("utf-8"))
             print(f"[NETWORK] Sent RECONNECT:{self.session_id}")
             return True
@@ -44,44 +173,95 @@ class NetworkManager:
             return False
 
     def send_command(self, command: str) -> None:
-        """Sends a command to the server"""
+        """Sends a command to the server as one newline-terminated line"""
+        line = command.replace("\r", " ").replace("\n", " ").strip()
         try:
-            self.sock.sendall(command.encode('utf-8'))
+            self.sock.sendall((line + "\n").encode('utf-8'))
         except (OSError, ConnectionError, BrokenPipeError) as e:
             print(f"[NETWORK] Error sending command: {e}")
 
     def _receive_loop(self) -> None:
         """Message receiving loop from server"""
-        buffer = ""
-        while self.running:
-            try:
-                data = self.sock.recv(8192).decode()
-                if not data:
-                    print("[NETWORK] Connection closed by server")
-                    self._notify_disconnected()
-                    break
-                buffer += data
-                if len(buffer) > MAX_FRAME_BUFFER_BYTES:
-                    print(
-                        f"[NETWORK] Frame buffer exceeded "
-                        f"{MAX_FRAME_BUFFER_BYTES} bytes without a newline; "
-                        f"closing connection."
-                    )
-                    self._notify_disconnected()
-                    break
-
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    if not line.strip():
-                        continue
-                    self._handle_message(line)
-            except (OSError, ConnectionError, ConnectionResetError, BrokenPipeError) as e:
-                print(f"[NETWORK] Error receiving state: {e}")
+        while self.running and self.receive_once():
+            pass
+
+    def receive_once(self) -> bool:
+        """
+        One recv() from the socket, then every complete message it finished.
+        Returns False once the connection is closed or broken. The receive
+        thread calls it in a loop; client.headless drives many connections
+        from one selector loop instead.
+        """
+        if self.binary:
+            return self._receive_frames()
+        try:
+            received = self._reader.recv_from(self.sock)
+            if not received:
+                print("[NETWORK] Connection closed by server")
                 self._notify_disconnected()
-                break
+                return False
+            self.bytes_received += received
+            lines = self._reader.lines()
+        except (OSError, ConnectionError, ConnectionResetError, BrokenPipeError) as e:
+            print(f"[NETWORK] Error receiving state: {e}")
+            self._notify_disconnected()
+            return False
+        except FrameTooLarge as e:
+            print(f"[NETWORK] Frame exceeds {self.max_frame_bytes} bytes ({e}); closing connection.")
+            self._notify_disconnected()
+            return False
+        # Fell behind: only the newest keyframe of the batch is worth decoding
+        latest = latest_state_only(lines)
+        self.stale_frames += len(lines) - len(latest)
+        for line in latest:
+            try:
+                message = line.decode("utf-8")
             except UnicodeDecodeError as e:
                 print(f"[NETWORK] Decode error: {e}")
                 continue
+            if message.strip():
+                self._handle_message(message)
+        return True
+
+    def _receive_frames(self) -> bool:
+        """receive_once() for the binary protocol"""
+        try:
+            received = self.sock.recv_into(self._chunk)
+            if not received:
+                print("[NETWORK] Connection closed by server")
+                self._notify_disconnected()
+                return False
+            self.bytes_received += received
+            frames = self._decoder.feed(memoryview(self._chunk)[:received])
+        except (OSError, ConnectionError, ConnectionResetError, BrokenPipeError) as e:
+            print(f"[NETWORK] Error receiving state: {e}")
+            self._notify_disconnected()
+            return False
+        # STATE frames are always complete states: decode only the last one of the batch
+        last_state = max((i for i, (frame_type, _) in enumerate(frames) if frame_type == FRAME_STATE),
+                         default=-1)
+        for i, (frame_type, body) in enumerate(frames):
+            if frame_type == FRAME_STATE and i != last_state:
+                self.stale_frames += 1
+                continue
+            self._handle_frame(frame_type, body)
+        return True
+
+    def _handle_frame(self, frame_type: int, body: bytes) -> None:
+        """Handles one binary-protocol frame"""
+        try:
+            if frame_type == FRAME_TEXT:
+                message = body.decode("utf-8")
+                if message.strip():
+                    self._handle_message(message)
+            elif frame_type == FRAME_CHAT:
+                self._chat_messages = json.loads(body)
+            elif frame_type == FRAME_STATE and self.on_state_update:
+                state = decode_state(body)
+                state["chat_messages"] = self._chat_messages
+                self.on_state_update(state)
+        except (struct.error, ValueError, IndexError) as e:
+            print(f"[NETWORK] Bad frame (type {frame_type}): {e}")
 
     def _notify_disconnected(self) -> None:
         """Call on_disconnected callback if set and still running."""
@@ -95,10 +275,15 @@ class NetworkManager:
         """Handles a message received from the server"""
         try:
             response = json.loads(message)
+            if "ping" in response:
+                # Server latency probe: answer at once, from this thread
+                self.send_command(f"PONG:{response['ping']}")
+                return
             if "join_success" in response and response["join_success"]:
                 # Save session_id for future reconnections
                 if "session_id" in response:
                     self.session_id = response["session_id"]
+                self.room_id = response.get("room_id", self.room_id)
                 if self.on_join_success:
                     self.on_join_success(
                         response["player_id"],
@@ -114,6 +299,10 @@ class NetworkManager:
                         response.get("is_spectator", False)
                     )
                 return
+            if "rooms" in response or "room_error" in response:
+                if self.on_room_list:
+                    self.on_room_list(response.get("rooms", []), response.get("room_error"))
+                return
             if self.on_state_update:
                 self.on_state_update(response)
         except json.JSONDecodeError as e:
@@ -0,0 +1,155 @@
+"""
+Bot swarm load generator (entry point `bomberman-swarm`).
+
+Launches N headless clients against the proxy (or a server) from one
+process: the bots are split over a few threads, and each thread serves its
+share from one selector loop. At the end, and every --report-every seconds,
+it prints join latency, state-frame inter-arrival times and jitter, bytes
+received and the gaps left by proxy/server failovers.
+
+    bomberman-swarm --players 4 --spectators 16 --duration 60
+"""
+import argparse
+import selectors
+import statistics
+import sys
+import os
+import threading
+import time
+from typing import List
+
+current_file = os.path.abspath(__file__)
+client_dir = os.path.dirname(current_file)
+src_dir = os.path.dirname(client_dir)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from client.headless import HeadlessClient
+from common.constants import DEFAULT_HOST, DEFAULT_PORT
+from common.stats import percentile
+
+# Longest wait for socket activity before inputs and reconnects are checked again
+SELECT_TIMEOUT = 0.02
+DEFAULT_THREADS = 4
+
+
+def run_shard(bots: List[HeadlessClient], stop: threading.Event) -> None:
+    """Drives `bots` from the calling thread until `stop` is set"""
+    selector = selectors.DefaultSelector()
+    try:
+        while not stop.is_set():
+            now = time.monotonic()
+            for bot in bots:
+                if bot.connect_due(now) and bot.connect():
+                    selector.register(bot.network.sock, selectors.EVENT_READ, bot)
+                bot.tick(now)
+            if not selector.get_map():
+                stop.wait(SELECT_TIMEOUT)
+                continue
+            for key, _ in selector.select(SELECT_TIMEOUT):
+                bot = key.data
+                if not bot.receive():
+                    selector.unregister(key.fileobj)
+                    bot.drop_connection()
+    finally:
+        for bot in bots:
+            if bot.network is not None:
+                selector.unregister(bot.network.sock)
+                bot.drop_connection()
+        selector.close()
+
+
+def summarize(bots: List[HeadlessClient], elapsed: float) -> dict:
+    """Aggregate metrics of all bots"""
+    joins = sorted(bot.join_latency for bot in bots if bot.join_latency is not None)
+    arrivals = sorted(gap for bot in bots for gap in bot.arrivals)
+    gaps = sorted(gap for bot in bots for gap in bot.failover_gaps)
+    total_bytes = sum(bot.bytes_received for bot in bots)
+    elapsed = max(elapsed, 1e-9)
+    return {
+        "bots": len(bots),
+        "joined": len(joins),
+        "elapsed": elapsed,
+        "states": sum(bot.states for bot in bots),
+        "stale": sum(bot.stale_frames for bot in bots),
+        "bytes": total_bytes,
+        "kb_per_s": total_bytes / 1024.0 / elapsed,
+        "join_p50_ms": percentile(joins, 50) * 1000.0,
+        "join_p95_ms": percentile(joins, 95) * 1000.0,
+        "join_max_ms": (joins[-1] if joins else 0.0) * 1000.0,
+        "interval_mean_ms": (statistics.fmean(arrivals) if arrivals else 0.0) * 1000.0,
+        "interval_p95_ms": percentile(arrivals, 95) * 1000.0,
+        "interval_max_ms": (arrivals[-1] if arrivals else 0.0) * 1000.0,
+        "jitter_ms": (statistics.pstdev(arrivals) if arrivals else 0.0) * 1000.0,
+        "failovers": len(gaps),
+        "gap_p50_ms": percentile(gaps, 50) * 1000.0,
+        "gap_max_ms": (gaps[-1] if gaps else 0.0) * 1000.0,
+    }
+
+
+def format_summary(stats: dict) -> str:
+    return (
+        f"[SWARM] {stats['elapsed']:.1f}s  joined={stats['joined']}/{stats['bots']}  "
+        f"states={stats['states']} (stale={stats['stale']})  "
+        f"{stats['bytes'] / 1024.0:.1f} KB ({stats['kb_per_s']:.1f} KB/s)\n"
+        f"[SWARM] join latency p50={stats['join_p50_ms']:.1f}ms p95={stats['join_p95_ms']:.1f}ms "
+        f"max={stats['join_max_ms']:.1f}ms\n"
+        f"[SWARM] state interval mean={stats['interval_mean_ms']:.1f}ms p95={stats['interval_p95_ms']:.1f}ms "
+        f"max={stats['interval_max_ms']:.1f}ms jitter={stats['jitter_ms']:.1f}ms\n"
+        f"[SWARM] failovers={stats['failovers']} gap p50={stats['gap_p50_ms']:.0f}ms "
+        f"max={stats['gap_max_ms']:.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless bot swarm for Bomberman load tests")
+    parser.add_argument("host", nargs="?", default=DEFAULT_HOST)
+    parser.add_argument("port", nargs="?", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--players", type=int, default=4, help="Bots sending random inputs (default: 4)")
+    parser.add_argument("--spectators", type=int, default=0,
+                        help="Passive bots that only receive states, connected after the players")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS,
+                        help=f"Threads the bots are spread over (default: {DEFAULT_THREADS})")
+    parser.add_argument("--binary", action="store_true", help="Use the binary frame protocol")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which the bots join")
+    parser.add_argument("--duration", type=float, default=0.0, help="Seconds to run (default: until Ctrl+C)")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between interim reports")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible inputs")
+    args = parser.parse_args()
+
+    total = args.players + args.spectators
+    if total <= 0:
+        parser.error("nothing to launch")
+    start = time.monotonic()
+    bots = [
+        HeadlessClient(args.host, args.port, binary=args.binary, passive=i >= args.players,
+                       seed=None if args.seed is None else args.seed + i,
+                       start_at=start + args.ramp * i / total)
+        for i in range(total)
+    ]
+    threads_count = max(1, min(args.threads, total))
+    stop = threading.Event()
+    threads = [threading.Thread(target=run_shard, args=(bots[i::threads_count], stop), daemon=True)
+               for i in range(threads_count)]
+    print(f"[SWARM] {args.players} player(s) + {args.spectators} spectator(s) -> "
+          f"{args.host}:{args.port} on {threads_count} thread(s)")
+    for thread in threads:
+        thread.start()
+
+    try:
+        next_report = start + args.report_every
+        while not args.duration or time.monotonic() - start < args.duration:
+            time.sleep(0.2)
+            if args.report_every > 0 and time.monotonic() >= next_report:
+                next_report += args.report_every
+                print(format_summary(summarize(bots, time.monotonic() - start)))
+    except KeyboardInterrupt:
+        print("\n[SWARM] Stopped by user.")
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=5.0)
+    print(format_summary(summarize(bots, time.monotonic() - start)))
+
+
+if __name__ == "__main__":
+    main()
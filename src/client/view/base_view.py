@@ -4,10 +4,18 @@ Base view with common rendering utilities
 import pygame
 import sys
 import os
+import time
 from typing import Union
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from common.constants import UI_COLORS
+from .text_utils import ChatRenderCache
+
+# animation_timer counts 1/30 s steps whatever the frame rate, so animations keep their speed
+ANIMATION_STEPS_PER_SECOND = 30
+CURSOR_BLINK_STEPS = 15
+# Rendered text surfaces kept by render_text() before the cache is reset
+GLYPH_CACHE_SIZE = 512
 
 class BaseView:
     """Base class for all views with common rendering methods"""
@@ -18,11 +26,31 @@ class BaseView:
         self.small_font = pygame.font.SysFont("Arial", 16)
         self.title_font = pygame.font.SysFont("Arial", 36, bold=True)
         self.big_font = pygame.font.SysFont("Arial", 48, bold=True)
-        self.animation_timer = 0
+        self.animation_timer = 0.0
+        self.cursor_visible = True
+        self._animation_start = time.monotonic()
+        self._glyphs: dict = {}
+        self.chat_cache = ChatRenderCache()
+        self._needs_full_redraw = True
 
     def update_animation(self) -> None:
-        """Updates animation timer"""
-        self.animation_timer += 1
+        """Updates animation timer and chat cursor blink from the wall clock"""
+        self.animation_timer = (time.monotonic() - self._animation_start) * ANIMATION_STEPS_PER_SECOND
+        self.cursor_visible = int(self.animation_timer // CURSOR_BLINK_STEPS) % 2 == 0
+
+    def invalidate(self) -> None:
+        """The screen was drawn by someone else: the next frame must repaint everything"""
+        self._needs_full_redraw = True
+
+    def render_text(self, text: str, font: pygame.font.Font, color: tuple) -> pygame.Surface:
+        """font.render(text, True, color), cached across frames"""
+        key = (text, id(font), color)
+        surface = self._glyphs.get(key)
+        if surface is None:
+            if len(self._glyphs) >= GLYPH_CACHE_SIZE:
+                self._glyphs.clear()
+            surface = self._glyphs[key] = font.render(text, True, color)
+        return surface
 
     @staticmethod
     def draw_gradient_rect(surface: pygame.Surface, color1: tuple, color2: tuple, rect: Union[tuple, pygame.Rect], vertical: bool = True) -> None:
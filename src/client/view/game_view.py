@@ -5,11 +5,17 @@ import pygame
 import math
 import sys
 import os
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from .base_view import BaseView
-from .text_utils import wrap_text
-from common.constants import (TILE_SIZE, TILE_EMPTY, TILE_WALL, TILE_BLOCK, PLAYER_COLORS, MAP_WIDTH, MAP_HEIGHT)
+from common.binary_protocol import chat_version
+from common.constants import (TILE_SIZE, TILE_EMPTY, TILE_WALL, TILE_BLOCK, PLAYER_COLORS, MAP_WIDTH, MAP_HEIGHT,
+                              BOMB_TIMER_TICKS, SIM_TICK_RATE)
+
+# Bomb pulse in radians per second, speeding up towards the end of the fuse
+BOMB_PULSE_SPEED = 3.0
+BOMB_FUSE_SECONDS = BOMB_TIMER_TICKS / SIM_TICK_RATE
 
 class GameView(BaseView):
     """Game screen"""
@@ -17,100 +23,185 @@ class GameView(BaseView):
         super().__init__(screen)
         self.map_width_px = MAP_WIDTH * TILE_SIZE
         self.map_height_px = MAP_HEIGHT * TILE_SIZE
+        self.tile = TILE_SIZE
         self.sidebar_width = sidebar_width
-        self.cursor_visible = True
-        self.cursor_timer = 0
+        self._map_layer = None          # static tiles, redrawn only where the map changed
+        self._map_size = None
+        self._map_rows: list = []
+        self._map_source = None
+        self._tile_sprites: dict = {}
+        self._sprite_rects: list = []   # bombs/explosions/players drawn last frame
+        self._sidebar_drawn = None
+        self._spectator_badge = None
 
     def render(self, game_state, chat_input: str = "", chat_active: bool = False) -> None:
-        """Renders ongoing game"""
-        self.screen.fill(self.colors['bg_dark'])
+        """Renders ongoing game, pushing only the changed screen areas to the display"""
         self.update_animation()
-        self.cursor_timer += 1
-        if self.cursor_timer >= 15:
-            self.cursor_visible = not self.cursor_visible
-            self.cursor_timer = 0
-        self._draw_game_area(game_state)
-        self._draw_sidebar(game_state, chat_input, chat_active)
-        pygame.display.flip()
-
-    def _draw_game_area(self, game_state) -> None:
-        """Draws game area"""
-        shadow_rect = pygame.Rect(5, 5, self.map_width_px, self.map_height_px)
-        pygame.draw.rect(self.screen, (5, 5, 10), shadow_rect)
-        pygame.draw.rect(self.screen, (20, 20, 25), (0, 0, self.map_width_px, self.map_height_px))
-        self._draw_map(game_state.get_map())
-        self._draw_bombs(game_state.get_bombs())
-        self._draw_explosions(game_state.get_explosions())
-        self._draw_players(game_state)
+        full = self._needs_full_redraw
+        if full:
+            self.screen.fill(self.colors['bg_dark'])
+        dirty = self._draw_game_area(game_state, full)
+        dirty += self._draw_sidebar(game_state, chat_input, chat_active, full)
+        if full:
+            pygame.display.flip()
+            self._needs_full_redraw = False
+        elif dirty:
+            pygame.display.update(dirty)
+
+    def _draw_game_area(self, game_state, full: bool) -> list:
+        """Draws game area: static map layer, then bombs, explosions and players; returns dirty rects"""
+        game_map = game_state.get_map()
+        if game_map:
+            # Maps larger than the default are scaled down to fit the same area
+            self.tile = max(1, min(TILE_SIZE, self.map_width_px // len(game_map[0]),
+                                   self.map_height_px // len(game_map)))
+        changed = self._update_map_layer(game_map)
+        if changed is None or full:
+            self.screen.blit(self._map_layer, (0, 0))
+            dirty = [self._map_layer.get_rect()]
+        else:
+            # Erase last frame's sprites and repaint changed tiles from the layer
+            dirty = changed + self._sprite_rects
+            for rect in dirty:
+                self.screen.blit(self._map_layer, rect, rect)
+        now = time.monotonic()
+        sprites = self._draw_bombs(game_state, now)
+        sprites += self._draw_explosions(game_state.get_explosion_views())
+        sprites += self._draw_players(game_state, now)
         if game_state.is_spectator:
-            self._draw_spectator_indicator()
+            sprites.append(self._draw_spectator_indicator())
+        self._sprite_rects = sprites
+        return dirty + sprites
 
-    def _draw_map(self, game_map: list) -> None:
-        """Draws the map"""
+    def _update_map_layer(self, game_map: list):
+        """
+        Brings the pre-rendered map surface up to date with `game_map`.
+        Returns the rects of the tiles that changed, or None if the layer was rebuilt.
+        """
+        size = (len(game_map[0]) if game_map else 0, len(game_map), self.tile)
+        if self._map_layer is None or size != self._map_size:
+            self._map_size = size
+            self._tile_sprites = self._make_tile_sprites(self.tile)
+            self._map_layer = pygame.Surface((self.map_width_px, self.map_height_px)).convert()
+            self._map_layer.fill((20, 20, 25))
+            self._map_rows = [list(row) for row in game_map]
+            for y, row in enumerate(self._map_rows):
+                for x, tile in enumerate(row):
+                    self._blit_tile(x, y, tile)
+            self._map_source = game_map
+            return None
+        changed = []
+        if game_map is self._map_source:
+            return changed
         for y, row in enumerate(game_map):
+            old = self._map_rows[y]
+            if old == row:
+                continue
             for x, tile in enumerate(row):
-                rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                if tile == TILE_EMPTY:
-                    color = (30, 30, 35) if (x + y) % 2 == 0 else (35, 35, 40)
-                    pygame.draw.rect(self.screen, color, rect)
-                elif tile == TILE_WALL:
-                    self.draw_gradient_rect(self.screen, (80, 80, 90), (100, 100, 110), rect)
-                    pygame.draw.rect(self.screen, (120, 120, 130), rect, 2)
-                elif tile == TILE_BLOCK:
-                    self.draw_gradient_rect(self.screen, (150, 75, 0), (180, 95, 20), rect)
-                    pygame.draw.rect(self.screen, (200, 115, 40), rect, 2)
-                    pygame.draw.line(self.screen, (130, 65, 0), (rect.x + 5, rect.y + 5), (rect.x + 15, rect.y + 15), 2)
-
-    def _draw_bombs(self, bombs: list) -> None:
-        """Draws bombs"""
-        for bomb in bombs:
-            if bomb.get("timer", 0) > 0:
-                bomb_x = bomb["x"] * TILE_SIZE + TILE_SIZE // 2
-                bomb_y = bomb["y"] * TILE_SIZE + TILE_SIZE // 2
-                pulse = abs(math.sin(self.animation_timer * 0.1)) * 3
-                radius = 12 + pulse
-                pygame.draw.circle(self.screen, (20, 0, 0), (bomb_x + 2, bomb_y + 2), radius)
-                pygame.draw.circle(self.screen, (60, 0, 0), (bomb_x, bomb_y), radius)
+                if old[x] != tile:
+                    changed.append(self._blit_tile(x, y, tile))
+            self._map_rows[y] = list(row)
+        self._map_source = game_map
+        return changed
+
+    def _blit_tile(self, x: int, y: int, tile: int) -> pygame.Rect:
+        rect = pygame.Rect(x * self.tile, y * self.tile, self.tile, self.tile)
+        if tile == TILE_EMPTY:
+            sprite = self._tile_sprites["even" if (x + y) % 2 == 0 else "odd"]
+        else:
+            sprite = self._tile_sprites.get(tile)
+        if sprite is None:
+            self._map_layer.fill((20, 20, 25), rect)
+        else:
+            self._map_layer.blit(sprite, rect)
+        return rect
+
+    def _make_tile_sprites(self, tile: int) -> dict:
+        """One pre-drawn surface per tile look (gradients are drawn once, not per frame)"""
+        rect = pygame.Rect(0, 0, tile, tile)
+        sprites = {}
+        for key, color in (("even", (30, 30, 35)), ("odd", (35, 35, 40))):
+            sprites[key] = pygame.Surface((tile, tile)).convert()
+            sprites[key].fill(color)
+        wall = pygame.Surface((tile, tile)).convert()
+        self.draw_gradient_rect(wall, (80, 80, 90), (100, 100, 110), rect)
+        pygame.draw.rect(wall, (120, 120, 130), rect, 2)
+        sprites[TILE_WALL] = wall
+        block = pygame.Surface((tile, tile)).convert()
+        self.draw_gradient_rect(block, (150, 75, 0), (180, 95, 20), rect)
+        pygame.draw.rect(block, (200, 115, 40), rect, 2)
+        pygame.draw.line(block, (130, 65, 0), (tile // 6, tile // 6), (tile // 2, tile // 2), 2)
+        sprites[TILE_BLOCK] = block
+        return sprites
+
+    def _draw_bombs(self, game_state, now: float) -> list:
+        """Draws bombs; returns the areas drawn"""
+        rects = []
+        for bomb in game_state.get_bomb_views():
+            if bomb.timer > 0:
+                bomb_x = bomb.x * self.tile + self.tile // 2
+                bomb_y = bomb.y * self.tile + self.tile // 2
+                age = game_state.bomb_age(bomb, now)
+                phase = age * BOMB_PULSE_SPEED * (1 + age / BOMB_FUSE_SECONDS)
+                pulse = abs(math.sin(phase)) * self.tile / 10
+                radius = self.tile * 3 / 8 + pulse
+                area = pygame.draw.circle(self.screen, (20, 0, 0), (bomb_x + 2, bomb_y + 2), radius)
+                area.union_ip(pygame.draw.circle(self.screen, (60, 0, 0), (bomb_x, bomb_y), radius))
                 pygame.draw.circle(self.screen, (255, 0, 0), (bomb_x, bomb_y), radius, 3)
-                pygame.draw.circle(self.screen, (255, 100, 100), (bomb_x - 4, bomb_y - 4), 4)
+                area.union_ip(pygame.draw.circle(self.screen, (255, 100, 100), (bomb_x - 4, bomb_y - 4), 4))
+                rects.append(area)
+        return rects
 
-    def _draw_explosions(self, explosions: list) -> None:
-        """Draws explosions"""
+    def _draw_explosions(self, explosions) -> list:
+        """Draws explosions; returns the areas drawn"""
+        rects = []
         for explosion in explosions:
-            for ex, ey in explosion["positions"]:
-                rect = pygame.Rect(ex * TILE_SIZE, ey * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            for ex, ey in explosion.positions:
+                rect = pygame.Rect(ex * self.tile, ey * self.tile, self.tile, self.tile)
                 for i in range(3):
-                    flame_rect = rect.inflate(-i*8, -i*8)
+                    flame_rect = rect.inflate(-i*self.tile//4, -i*self.tile//4)
                     color = (255, 200 - i*50, 0)
                     pygame.draw.rect(self.screen, color, flame_rect)
+                rects.append(rect)
+        return rects
 
-    def _draw_players(self, game_state) -> None:
-        """Draws players"""
-        for pid, pdata in game_state.get_players().items():
-            if pdata["alive"] and not pdata.get("disconnected", False):
-                player_x = pdata["x"] * TILE_SIZE
-                player_y = pdata["y"] * TILE_SIZE
-                shadow_rect = pygame.Rect(player_x + 3, player_y + 3, TILE_SIZE - 2, TILE_SIZE - 2)
+    def _draw_players(self, game_state, now: float) -> list:
+        """Draws players (others interpolated between the last states); returns the areas drawn"""
+        rects = []
+        for player in game_state.get_render_players(now):
+            if player.alive and not player.disconnected:
+                pid = player.pid
+                player_x = round(player.x * self.tile)
+                player_y = round(player.y * self.tile)
+                shadow_rect = pygame.Rect(player_x + 3, player_y + 3, self.tile - 2, self.tile - 2)
                 pygame.draw.ellipse(self.screen, (10, 10, 15), shadow_rect)
-                color = PLAYER_COLORS[int(pid) % len(PLAYER_COLORS)]
-                player_rect = pygame.Rect(player_x + 2, player_y + 2, TILE_SIZE - 4, TILE_SIZE - 4)
+                color = PLAYER_COLORS[pid % len(PLAYER_COLORS)]
+                player_rect = pygame.Rect(player_x + 2, player_y + 2, self.tile - 4, self.tile - 4)
                 pygame.draw.rect(self.screen, color, player_rect, border_radius=8)
                 pygame.draw.rect(self.screen, (255, 255, 255), player_rect, 2, border_radius=8)
-                num_text = self.small_font.render(str(pid), True, (0, 0, 0))
+                num_text = self.render_text(str(pid), self.small_font, (0, 0, 0))
                 num_rect = num_text.get_rect(center=player_rect.center)
                 self.screen.blit(num_text, num_rect)
+                rects.append(pygame.Rect(player_x, player_y, self.tile + 1, self.tile + 1).union(num_rect))
+        return rects
 
-    def _draw_spectator_indicator(self) -> None:
+    def _draw_spectator_indicator(self) -> pygame.Rect:
         """Draws spectator indicator"""
-        spec_surf = pygame.Surface((200, 30))
-        spec_surf.set_alpha(200)
-        spec_surf.fill((0, 0, 0))
-        self.screen.blit(spec_surf, (10, 10))
-        spec_text = self.font.render("SPECTATOR MODE", True, self.colors['warning'])
+        if self._spectator_badge is None:
+            self._spectator_badge = pygame.Surface((200, 30))
+            self._spectator_badge.set_alpha(200)
+            self._spectator_badge.fill((0, 0, 0))
+        area = self.screen.blit(self._spectator_badge, (10, 10))
+        spec_text = self.render_text("SPECTATOR MODE", self.font, self.colors['warning'])
         self.screen.blit(spec_text, (20, 15))
+        return area
 
-    def _draw_sidebar(self, game_state, chat_input: str, chat_active: bool) -> None:
-        """Draws sidebar"""
+    def _draw_sidebar(self, game_state, chat_input: str, chat_active: bool, full: bool) -> list:
+        """Draws sidebar when anything it shows changed; returns dirty rects"""
+        key = self._sidebar_key(game_state, chat_input, chat_active)
+        if key == self._sidebar_drawn and not full:
+            return []
+        self._sidebar_drawn = key
         sidebar_x = self.map_width_px
         sidebar_rect = pygame.Rect(sidebar_x, 0, self.sidebar_width, self.map_height_px)
         self.draw_gradient_rect(self.screen, self.colors['bg_medium'], self.colors['bg_dark'], sidebar_rect)
@@ -118,16 +209,30 @@ class GameView(BaseView):
         self._draw_players_panel(game_state, sidebar_x, 10)
         self._draw_spectators_counter(game_state, sidebar_x, 180)
         self._draw_chat_panel(game_state, sidebar_x, 220, chat_input, chat_active)
+        return [sidebar_rect.inflate(2, 0)]
+
+    def _sidebar_key(self, game_state, chat_input: str, chat_active: bool) -> tuple:
+        """Everything the sidebar shows, cheap to compare between frames"""
+        players = tuple((p.pid, p.name, p.alive, p.disconnected, p.lives) for p in game_state.get_player_views())
+        return (players, len(game_state.get_spectators()), chat_version(game_state.get_chat_messages()),
+                game_state.player_id, game_state.is_spectator, game_state.get_max_players(),
+                chat_input, chat_active, chat_active and self.cursor_visible)
 
     def _draw_players_panel(self, game_state, x: int, y: int) -> None:
         """Draws players panel"""
         panel = pygame.Rect(x + 10, y, self.sidebar_width - 20, 160)
         self.draw_rounded_rect(self.screen, self.colors['bg_light'], panel)
         pygame.draw.rect(self.screen, self.colors['border'], panel, 2, border_radius=8)
-        title = self.font.render("Players", True, self.colors['text_primary'])
+        title = self.render_text("Players", self.font, self.colors['text_primary'])
         self.screen.blit(title, (x + 20, y + 5))
         slot_y = y + 30
-        for slot_id in range(4):
+        slots = list(range(game_state.get_max_players()))
+        if len(slots) > 4:
+            # Large rooms: players still in the game first
+            alive = sorted(int(pid) for pid, p in game_state.get_players().items()
+                           if p["alive"] and not p.get("disconnected", False))
+            slots = alive + [i for i in slots if i not in alive]
+        for slot_id in slots:
             if slot_y > y + 150:
                 break
             self._draw_player_slot(game_state, slot_id, x, slot_y)
@@ -155,9 +260,9 @@ class GameView(BaseView):
                 break
         pygame.draw.circle(self.screen, status_color, (x + 25, y + 8), 6)
         player_text = player_name[:15] + "..." if len(player_name) > 15 else player_name
-        player_surf = self.small_font.render(player_text, True, self.colors['text_primary'])
+        player_surf = self.render_text(player_text, self.small_font, self.colors['text_primary'])
         self.screen.blit(player_surf, (x + 35, y))
-        status_surf = self.small_font.render(status_text, True, status_color)
+        status_surf = self.render_text(status_text, self.small_font, status_color)
         self.screen.blit(status_surf, (x + 35, y + 12))
 
     def _draw_spectators_counter(self, game_state, x: int, y: int) -> None:
@@ -167,7 +272,7 @@ class GameView(BaseView):
             spec_count = len(spectators)
             spec_rect = pygame.Rect(x + 10, y, self.sidebar_width - 20, 25)
             pygame.draw.rect(self.screen, self.colors['bg_light'], spec_rect, border_radius=5)
-            text = self.small_font.render(f"👁 {spec_count} Spectators", True, self.colors['info'])
+            text = self.render_text(f"👁 {spec_count} Spectators", self.small_font, self.colors['info'])
             self.screen.blit(text, (x + 20, y + 5))
 
     def _draw_chat_panel(self, game_state, x: int, y: int, chat_input: str, chat_active: bool) -> None:
@@ -178,7 +283,7 @@ class GameView(BaseView):
         pygame.draw.rect(self.screen, self.colors['border'], panel, 2, border_radius=8)
         header = pygame.Rect(x + 10, y, self.sidebar_width - 20, 25)
         self.draw_gradient_rect(self.screen, self.colors['bg_medium'], self.colors['bg_light'], header)
-        title = self.small_font.render("💬 Chat", True, self.colors['text_primary'])
+        title = self.render_text("💬 Chat", self.small_font, self.colors['text_primary'])
         self.screen.blit(title, (x + 20, y + 5))
         msg_y = y + 30
         msg_area_height = self.map_height_px - y - 65
@@ -187,17 +292,16 @@ class GameView(BaseView):
         total_height = 0
         for msg in reversed(messages):
             color, text = self._format_chat_message(game_state, msg)
-            lines = wrap_text(text, 18)
+            lines = self.chat_cache.lines(text, 18, self.small_font, color)
             msg_height = len(lines) * 16 + 4
             if total_height + msg_height > msg_area_height:
                 break
-            visible_messages.insert(0, (color, lines))
+            visible_messages.insert(0, lines)
             total_height += msg_height
-        for color, lines in visible_messages:
-            for line in lines:
+        for lines in visible_messages:
+            for msg_surf in lines:
                 if msg_y > self.map_height_px - 50:
                     break
-                msg_surf = self.small_font.render(line, True, color)
                 self.screen.blit(msg_surf, (x + 15, msg_y))
                 msg_y += 16
             msg_y += 4
@@ -231,7 +335,7 @@ class GameView(BaseView):
                 pygame.draw.line(self.screen, self.colors['success'], (cursor_x, input_y + 2), (cursor_x, input_y + 17), 2)
         else:
             pygame.draw.rect(self.screen, self.colors['bg_medium'], input_rect, border_radius=5)
-            hint = self.small_font.render("T: Chat", True, self.colors['text_disabled'])
+            hint = self.render_text("T: Chat", self.small_font, self.colors['text_disabled'])
             self.screen.blit(hint, (x + 18, input_y + 2))
 
     @staticmethod
@@ -8,24 +8,17 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from .base_view import BaseView
-from .text_utils import wrap_text
 from common.constants import PLAYER_COLORS
 
+# Player rows that fit in the lobby panel
+LOBBY_SLOT_ROWS = 4
+
 class LobbyView(BaseView):
     """Lobby screen"""
-    def __init__(self, screen: pygame.Surface):
-        super().__init__(screen)
-        self.cursor_visible = True
-        self.cursor_timer = 0
-
     def render(self, game_state, chat_input: str = "", chat_active: bool = False) -> None:
         """Renders lobby"""
         self.draw_background_gradient()
         self.update_animation()
-        self.cursor_timer += 1
-        if self.cursor_timer >= 15:
-            self.cursor_visible = not self.cursor_visible
-            self.cursor_timer = 0
         self._draw_header(game_state)
         self._draw_players_panel(game_state)
         self._draw_chat_panel(game_state, chat_input, chat_active)
@@ -45,29 +38,29 @@ class LobbyView(BaseView):
         self.draw_gradient_rect(self.screen, self.colors['bg_medium'], self.colors['bg_light'], panel)
         pygame.draw.rect(self.screen, self.colors['border_light'], panel, 3, border_radius=10)
         pygame.draw.circle(self.screen, self.colors['success'], (55, 120), 8)
-        title = self.font.render("Players", True, self.colors['text_primary'])
+        max_players = game_state.get_max_players()
+        connected = {int(pid): pdata for pid, pdata in game_state.get_players().items()
+                     if not pdata.get("disconnected", False)}
+        heading = "Players" if max_players <= LOBBY_SLOT_ROWS else f"Players {len(connected)}/{max_players}"
+        title = self.font.render(heading, True, self.colors['text_primary'])
         self.screen.blit(title, (70, 110))
+        # Large rooms: seated players first, as many rows as the panel holds
+        slots = list(range(max_players))
+        if max_players > LOBBY_SLOT_ROWS:
+            slots = sorted(connected) + [i for i in slots if i not in connected]
         y_offset = 140
-        connected_count = 0
         current_host = game_state.get_current_host()
-        for i in range(4):
-            player_found = False
-            for pid, pdata in game_state.get_players().items():
-                if int(pid) == i:
-                    if pdata.get("disconnected", False):
-                        break
-                    player_found = True
-                    connected_count += 1
-                    player_name = pdata.get("name", f"Player {pid}")
-                    player_text = player_name
-                    if int(pid) == game_state.player_id and not game_state.is_spectator:
-                        player_text += " (You)"
-                    if int(pid) == current_host:
-                        player_text += " [HOST]"
-                    self._draw_player_slot(i, player_text, current_host, y_offset)
-                    break
-            if not player_found:
+        for i in slots[:LOBBY_SLOT_ROWS]:
+            pdata = connected.get(i)
+            if pdata is None:
                 self._draw_empty_slot(y_offset)
+            else:
+                player_text = pdata.get("name", f"Player {i}")
+                if i == game_state.player_id and not game_state.is_spectator:
+                    player_text += " (You)"
+                if i == current_host:
+                    player_text += " [HOST]"
+                self._draw_player_slot(i, player_text, current_host, y_offset)
             y_offset += 30
 
     def _draw_player_slot(self, pid: int, text: str, current_host: int, y: int) -> None:
@@ -75,7 +68,7 @@ class LobbyView(BaseView):
         label = self.font.render(text, True, (255, 255, 255))
         slot_width = max(label.get_width() + 20, 200)
         slot_rect = pygame.Rect(50, y - 5, slot_width, 25)
-        color = PLAYER_COLORS[pid]
+        color = PLAYER_COLORS[pid % len(PLAYER_COLORS)]
         pygame.draw.rect(self.screen, color, slot_rect, border_radius=5)
         pygame.draw.rect(self.screen, self.colors['border_light'], slot_rect, 2, border_radius=5)
         text_rect = label.get_rect(center=slot_rect.center)
@@ -131,7 +124,7 @@ class LobbyView(BaseView):
                 color = PLAYER_COLORS[pid % len(PLAYER_COLORS)]
                 sender_name = self._get_player_name(game_state, pid)
                 text = f"{sender_name}: {msg['message']}"
-            lines = wrap_text(text, 24)
+            lines = self.chat_cache.lines(text, 24, self.small_font, self.colors['text_secondary'])
             msg_height = len(lines) * 18 + 2
             if total_height + msg_height > (max_y - start_y):
                 break
@@ -140,15 +133,13 @@ class LobbyView(BaseView):
         for icon, color, lines in visible_messages:
             if msg_y + 18 > max_y:
                 break
-            icon_surf = self.small_font.render(icon, True, color)
+            icon_surf = self.render_text(icon, self.small_font, color)
             self.screen.blit(icon_surf, (395, msg_y))
-            first_line = self.small_font.render(lines[0], True, self.colors['text_secondary'])
-            self.screen.blit(first_line, (415, msg_y))
+            self.screen.blit(lines[0], (415, msg_y))
             msg_y += 18
-            for line in lines[1:]:
+            for line_surf in lines[1:]:
                 if msg_y + 18 > max_y:
                     break
-                line_surf = self.small_font.render(line, True, self.colors['text_secondary'])
                 self.screen.blit(line_surf, (415, msg_y))
                 msg_y += 18
             msg_y += 2
@@ -188,7 +179,7 @@ class LobbyView(BaseView):
         pygame.draw.rect(self.screen, self.colors['border'], panel, 2, border_radius=20)
         connected_count = game_state.connected_players_count()
         if game_state.is_spectator:
-            self._draw_spectator_actions(connected_count)
+            self._draw_spectator_actions(connected_count < game_state.get_max_players())
         elif connected_count < 2:
             self._draw_waiting_message()
         elif game_state.is_host():
@@ -196,9 +187,9 @@ class LobbyView(BaseView):
         else:
             self._draw_non_host_actions()
 
-    def _draw_spectator_actions(self, connected_count: int) -> None:
+    def _draw_spectator_actions(self, can_join: bool) -> None:
         """Actions for spectators"""
-        if connected_count < 4:
+        if can_join:
             join_rect = pygame.Rect(240, 380, 160, 25)
             self.draw_gradient_rect(self.screen, (0, 150, 0), (0, 200, 0), join_rect)
             pygame.draw.rect(self.screen, (0, 255, 0), join_rect, 2, border_radius=12)
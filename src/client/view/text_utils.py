@@ -2,8 +2,12 @@
 Text handling utilities for views
 """
 import pygame
+from collections import OrderedDict
 from typing import List, Tuple
 
+# Wrapped chat messages kept rendered; the server history holds 100 messages
+CHAT_CACHE_SIZE = 256
+
 def wrap_text(text: str, max_chars: int) -> List[str]:
     """
     Splits text into lines that don't exceed max_chars characters,
@@ -81,4 +85,32 @@ def truncate_text(text: str, max_chars: int, suffix: str = "...") -> str:
     """
     if len(text) <= max_chars:
         return text
-    return text[:max_chars - len(suffix)] + suffix
\ No newline at end of file
+    return text[:max_chars - len(suffix)] + suffix
+
+class ChatRenderCache:
+    """
+    Wrapped and rendered lines of chat messages, reused across frames.
+
+    The full chat history is resent with every state, so each message is
+    wrapped and rendered once per (text, width, font, color) and then only
+    blitted. Least recently drawn entries are evicted first.
+    """
+    def __init__(self, size: int = CHAT_CACHE_SIZE):
+        self.size = size
+        self._entries: OrderedDict = OrderedDict()
+
+    def lines(self, text: str, max_chars: int, font: pygame.font.Font, color: tuple) -> List[pygame.Surface]:
+        """One rendered surface per wrapped line of `text`"""
+        key = (text, max_chars, id(font), color)
+        surfaces = self._entries.get(key)
+        if surfaces is None:
+            surfaces = [font.render(line, True, color) for line in wrap_text(text, max_chars)]
+            self._entries[key] = surfaces
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return surfaces
+
+    def __len__(self) -> int:
+        return len(self._entries)
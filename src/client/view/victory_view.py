@@ -8,24 +8,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from .base_view import BaseView
-from .text_utils import wrap_text
 from common.constants import PLAYER_COLORS
 
 class VictoryView(BaseView):
     """Victory screen"""
-    def __init__(self, screen: pygame.Surface):
-        super().__init__(screen)
-        self.cursor_visible = True
-        self.cursor_timer = 0
-
     def render(self, game_state, chat_input: str = "", chat_active: bool = False) -> None:
         """Renders victory screen"""
         self._draw_animated_background()
         self.update_animation()
-        self.cursor_timer += 1
-        if self.cursor_timer >= 15:
-            self.cursor_visible = not self.cursor_visible
-            self.cursor_timer = 0
         self._draw_victory_box(game_state)
         self._draw_controls(game_state)
         self._draw_chat_section(game_state, chat_input, chat_active)
@@ -134,18 +124,17 @@ class VictoryView(BaseView):
         total_height = 0
         for msg in reversed(messages):
             color, text = self._format_message(game_state, msg)
-            lines = wrap_text(text, 65)
+            lines = self.chat_cache.lines(text, 65, self.small_font, color)
             msg_height = len(lines) * 18 + 3
             if total_height + msg_height > msg_area_height:
                 break
-            visible_messages.insert(0, (color, lines))
+            visible_messages.insert(0, lines)
             total_height += msg_height
         msg_y = msg_start_y
-        for color, lines in visible_messages:
-            for line in lines:
+        for lines in visible_messages:
+            for msg_surf in lines:
                 if msg_y + 18 > max_y:
                     break
-                msg_surf = self.small_font.render(line, True, color)
                 self.screen.blit(msg_surf, (45, msg_y))
                 msg_y += 18
             msg_y += 3
@@ -0,0 +1,266 @@
+# src/common/binary_protocol.py
+"""
+Compact binary wire format for server -> client frames (opt-in).
+
+A client asks for it by sending PROTOCOL_LINE as (part of) its first
+message. From then on every server message on that connection is a frame:
+
+    header  : magic (B) | version (B) | type (B) | body length (I)
+    TEXT    : a message of the JSON protocol (join_success, PONG, ...)
+    STATE   : game state, map as a 2-bit-per-tile bitfield, players,
+              spectators, bombs and explosions as fixed-width structs
+    CHAT    : full chat history as JSON, sent only when it changes
+
+`decode_state` returns the same dict shape as the JSON protocol (minus
+chat_messages, which the receiver merges back in), so the client model does
+not care which protocol is in use.
+"""
+import json
+import struct
+from typing import Any, Dict, List, Tuple
+
+PROTOCOL_LINE = "PROTO:BIN1"
+
+MAGIC = 0xB7
+VERSION = 3
+
+FRAME_TEXT = 0
+FRAME_STATE = 1
+FRAME_CHAT = 2
+_FRAME_TYPES = (FRAME_TEXT, FRAME_STATE, FRAME_CHAT)
+
+# Longest body a decoder accepts before treating the stream as corrupt
+MAX_FRAME_BODY = 1 << 20
+
+_HEADER = struct.Struct("!BBBI")
+_STATE_HEAD = struct.Struct("!BBhhHHH")     # game_state, flags, host, winner, victory_timer, players, spectators
+_PLAYER = struct.Struct("!BhhBBI16s")       # id, x, y, lives, flags, input seq, name
+_SPECTATOR = struct.Struct("!H16s")         # id, name
+MAP_HEADER = struct.Struct("!BB")           # width, height: prefix of every packed map
+_COUNT = struct.Struct("!H")
+_BOMB = struct.Struct("!BBHb")              # x, y, timer, owner
+_EXPLOSION = struct.Struct("!HB")           # timer, positions
+_POSITION = struct.Struct("!BB")            # x, y
+
+_GAME_STATES = ("lobby", "playing", "victory")
+
+# _STATE_HEAD flags
+_HAS_LOBBY = 0x01
+_CAN_START = 0x02
+_CAN_SPECTATOR_JOIN = 0x04
+_HAS_BOARD = 0x08       # map + bombs + explosions (playing)
+_HAS_VICTORY = 0x10     # winner_id + victory_timer
+
+# _PLAYER flags
+_ALIVE = 0x01
+_DISCONNECTED = 0x02
+
+_NAME_BYTES = 16
+_TILE_BITS = 2
+_TILES_PER_BYTE = 8 // _TILE_BITS
+
+
+def _frame(frame_type: int, body: bytes) -> bytes:
+    return _HEADER.pack(MAGIC, VERSION, frame_type, len(body)) + body
+
+
+def _pack_name(name: str) -> bytes:
+    return (name or "").encode("utf-8")[:_NAME_BYTES].decode("utf-8", "ignore").encode("utf-8")
+
+
+def _unpack_name(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8", "replace")
+
+
+def pack_map(game_map: List[List[int]]) -> bytes:
+    """Packs a tile grid row-major, 4 tiles per byte, first tile in the high bits"""
+    height = len(game_map)
+    width = len(game_map[0]) if height else 0
+    packed = bytearray((width * height + _TILES_PER_BYTE - 1) // _TILES_PER_BYTE)
+    i = 0
+    for row in game_map:
+        for tile in row:
+            if not 0 <= tile < (1 << _TILE_BITS):
+                raise ValueError(f"tile {tile} does not fit in {_TILE_BITS} bits")
+            shift = 6 - (i % _TILES_PER_BYTE) * _TILE_BITS
+            packed[i // _TILES_PER_BYTE] |= tile << shift
+            i += 1
+    return MAP_HEADER.pack(width, height) + bytes(packed)
+
+
+def unpack_map(data: bytes, offset: int = 0) -> Tuple[List[List[int]], int]:
+    """Inverse of pack_map; returns (grid, offset after the map)"""
+    width, height = MAP_HEADER.unpack_from(data, offset)
+    offset += MAP_HEADER.size
+    size = (width * height + _TILES_PER_BYTE - 1) // _TILES_PER_BYTE
+    packed = data[offset:offset + size]
+    grid = []
+    i = 0
+    for _ in range(height):
+        row = []
+        for _ in range(width):
+            shift = 6 - (i % _TILES_PER_BYTE) * _TILE_BITS
+            row.append((packed[i // _TILES_PER_BYTE] >> shift) & 0x3)
+            i += 1
+        grid.append(row)
+    return grid, offset + size
+
+
+def encode_text(data: bytes) -> bytes:
+    """Wraps one JSON-protocol message (trailing newline optional)"""
+    return _frame(FRAME_TEXT, bytes(data).rstrip(b"\n"))
+
+
+def encode_chat(messages: list) -> bytes:
+    return _frame(FRAME_CHAT, json.dumps(messages).encode("utf-8"))
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """Encodes a get_state() dict (int or str keys); chat_messages is left out"""
+    flags = 0
+    if "can_start" in state or "can_spectator_join" in state:
+        flags |= _HAS_LOBBY
+        if state.get("can_start"):
+            flags |= _CAN_START
+        if state.get("can_spectator_join"):
+            flags |= _CAN_SPECTATOR_JOIN
+    if "map" in state:
+        flags |= _HAS_BOARD
+    if "winner_id" in state:
+        flags |= _HAS_VICTORY
+    winner = state.get("winner_id")
+    players = state.get("players", {})
+    spectators = state.get("spectators", {})
+    parts = [_STATE_HEAD.pack(
+        _GAME_STATES.index(state.get("game_state", "lobby")),
+        flags,
+        state.get("current_host_id", 0),
+        -1 if winner is None else winner,
+        state.get("victory_timer", 0),
+        len(players),
+        len(spectators),
+    )]
+    for pid, p in players.items():
+        pflags = (_ALIVE if p.get("alive") else 0) | (_DISCONNECTED if p.get("disconnected") else 0)
+        parts.append(_PLAYER.pack(int(pid), p["x"], p["y"], p.get("lives", 0), pflags,
+                                  p.get("input_seq", 0), _pack_name(p.get("name", ""))))
+    for sid, s in spectators.items():
+        parts.append(_SPECTATOR.pack(int(sid), _pack_name(s.get("name", ""))))
+    if flags & _HAS_BOARD:
+        parts.append(pack_map(state["map"]))
+        bombs = state.get("bombs", [])
+        parts.append(_COUNT.pack(len(bombs)))
+        parts.extend(_BOMB.pack(b["x"], b["y"], b["timer"], b["owner"]) for b in bombs)
+        explosions = state.get("explosions", [])
+        parts.append(_COUNT.pack(len(explosions)))
+        for e in explosions:
+            parts.append(_EXPLOSION.pack(e["timer"], len(e["positions"])))
+            parts.extend(_POSITION.pack(x, y) for x, y in e["positions"])
+    return _frame(FRAME_STATE, b"".join(parts))
+
+
+def decode_state(body: bytes) -> Dict[str, Any]:
+    """Decodes a STATE body into the JSON-protocol dict shape (str keys)"""
+    (game_state, flags, host, winner, victory_timer,
+     n_players, n_spectators) = _STATE_HEAD.unpack_from(body, 0)
+    offset = _STATE_HEAD.size
+    players = {}
+    for _ in range(n_players):
+        pid, x, y, lives, pflags, input_seq, name = _PLAYER.unpack_from(body, offset)
+        offset += _PLAYER.size
+        players[str(pid)] = {
+            "x": x, "y": y, "name": _unpack_name(name), "lives": lives,
+            "alive": bool(pflags & _ALIVE), "disconnected": bool(pflags & _DISCONNECTED),
+            "input_seq": input_seq,
+        }
+    spectators = {}
+    for _ in range(n_spectators):
+        sid, name = _SPECTATOR.unpack_from(body, offset)
+        offset += _SPECTATOR.size
+        spectators[str(sid)] = {"name": _unpack_name(name), "connected": True}
+    state: Dict[str, Any] = {
+        "game_state": _GAME_STATES[game_state],
+        "players": players,
+        "spectators": spectators,
+        "current_host_id": host,
+    }
+    if flags & _HAS_LOBBY:
+        state["can_start"] = bool(flags & _CAN_START)
+        state["can_spectator_join"] = bool(flags & _CAN_SPECTATOR_JOIN)
+    if flags & _HAS_BOARD:
+        state["map"], offset = unpack_map(body, offset)
+        (n_bombs,) = _COUNT.unpack_from(body, offset)
+        offset += _COUNT.size
+        bombs = []
+        for _ in range(n_bombs):
+            x, y, timer, owner = _BOMB.unpack_from(body, offset)
+            offset += _BOMB.size
+            bombs.append({"x": x, "y": y, "timer": timer, "owner": owner})
+        (n_explosions,) = _COUNT.unpack_from(body, offset)
+        offset += _COUNT.size
+        explosions = []
+        for _ in range(n_explosions):
+            timer, n_positions = _EXPLOSION.unpack_from(body, offset)
+            offset += _EXPLOSION.size
+            positions = []
+            for _ in range(n_positions):
+                positions.append(list(_POSITION.unpack_from(body, offset)))
+                offset += _POSITION.size
+            explosions.append({"positions": positions, "timer": timer})
+        state["bombs"] = bombs
+        state["explosions"] = explosions
+    if flags & _HAS_VICTORY:
+        state["winner_id"] = None if winner < 0 else winner
+        state["victory_timer"] = victory_timer
+    return state
+
+
+class FrameDecoder:
+    """
+    Incremental frame splitter for a byte stream.
+
+    If the stream gets corrupted (e.g. a frame cut short when the proxy
+    switched backends) the decoder skips ahead to the next plausible header.
+    """
+    def __init__(self, max_body: int = MAX_FRAME_BODY):
+        self.max_body = max_body
+        self.resyncs = 0
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Tuple[int, bytes]]:
+        """Appends received bytes; returns the complete (type, body) frames"""
+        self._buffer += data
+        frames = []
+        while len(self._buffer) >= _HEADER.size:
+            magic, version, frame_type, length = _HEADER.unpack_from(self._buffer, 0)
+            if (magic != MAGIC or version != VERSION or frame_type not in _FRAME_TYPES
+                    or length > self.max_body):
+                self._skip_to_next_header()
+                continue
+            end = _HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            frames.append((frame_type, bytes(self._buffer[_HEADER.size:end])))
+            del self._buffer[:end]
+        return frames
+
+    def _skip_to_next_header(self) -> None:
+        self.resyncs += 1
+        nxt = self._buffer.find(bytes((MAGIC, VERSION)), 1)
+        if nxt < 0:
+            # Keep a trailing magic byte: it may start the next header
+            keep = 1 if self._buffer and self._buffer[-1] == MAGIC else 0
+            del self._buffer[:len(self._buffer) - keep]
+        else:
+            del self._buffer[:nxt]
+
+    def pending(self) -> int:
+        """Bytes buffered waiting for the rest of a frame"""
+        return len(self._buffer)
+
+
+def chat_version(messages: list) -> tuple:
+    """Cheap change marker for a chat history (length + newest timestamp)"""
+    if not messages:
+        return (0, None)
+    return len(messages), messages[-1].get("timestamp")
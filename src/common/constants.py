@@ -7,6 +7,9 @@ Costanti condivise tra client e server.
 TILE_SIZE  = 32
 MAP_WIDTH  = 15
 MAP_HEIGHT = 13
+# Limiti per le mappe configurabili per partita (lati dispari: muri sui bordi e a scacchiera)
+MIN_MAP_SIZE = 7
+MAX_MAP_SIZE = 255   # le coordinate viaggiano su un byte nel protocollo binario
 
 # Tipi di tile
 TILE_EMPTY = 0
@@ -57,11 +60,51 @@ EXPLOSION_TTL_TICKS = 5
 EXPLOSION_RANGE     = 2
 PLAYER_LIVES        = 3
 
+# ── Game loop ────────────────────────────────────────────────────────────────
+# I timer di gioco (bombe, esplosioni, vittoria, rigenerazione blocchi) sono espressi in
+# tick a SIM_TICK_RATE e riscalati sul tick rate effettivo: durano sempre lo stesso tempo reale
+SIM_TICK_RATE      = 10    # tick di simulazione al secondo
+BROADCAST_RATE     = 10    # invii di stato ai client al secondo (<= SIM_TICK_RATE)
+MAX_CATCH_UP_TICKS = 5     # tick recuperati al massimo in un solo passo
+TICK_STATS_WINDOW  = 1000  # durate di tick conservate per i percentili
+MAINTENANCE_INTERVAL = 5.0 # secondi tra pulizia delle stanze/mapping e log delle statistiche
+
+# ── Client ───────────────────────────────────────────────────────────────────
+CLIENT_FPS = 60    # frame disegnati al secondo, indipendenti dalla frequenza dei frame di stato
+# Interpolazione: gli altri giocatori sono disegnati con un ritardo adattivo
+# (intervallo medio tra i frame di stato + jitter misurato), entro questi limiti in secondi
+INTERP_MIN_DELAY = 0.05
+INTERP_MAX_DELAY = 0.5
+
 # ── Network ──────────────────────────────────────────────────────────────────
-MAX_PLAYERS  = 4
+MAX_PLAYERS  = 4     # giocatori per partita di default
+MAX_PLAYERS_LIMIT = 64    # massimo configurabile per partita
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 5555   # PROXY_FRONTEND_PORT  ← client usa questa
 
+# Broadcast a delta: ogni N frame viene comunque inviato un keyframe completo
+DELTA_KEYFRAME_INTERVAL = 50
+
+# Frame di stato in coda per connessione prima di scartare il backlog
+BROADCAST_MAX_QUEUE_FRAMES = 8
+
+# Comandi client -> server: una riga terminata da "\n"; righe più lunghe vengono scartate
+MAX_COMMAND_BYTES = 1024
+
+# Ping del server a ogni connessione per misurare RTT, jitter e attesa in coda (secondi);
+# ogni LATENCY_REPORT_INTERVAL secondi il server stampa la tabella per client (0 = mai)
+PING_INTERVAL           = 1.0
+LATENCY_REPORT_INTERVAL = 30.0
+
+# Stanze (partite indipendenti) ospitate da un singolo processo server
+DEFAULT_ROOM_ID = 0
+MAX_ROOMS       = 16
+
+# Proxy: buffer per direzione, attesa massima di un peer lento, byte ispezionati per la sessione
+PROXY_BUFFER_SIZE        = 65536
+PROXY_SEND_TIMEOUT       = 5.0
+PROXY_SESSION_SCAN_BYTES = 65536
+
 #──────────────────────────────────────
 #
 #   5555  PROXY_FRONTEND_PORT    ← client connect here
@@ -87,6 +130,11 @@ BACKUP_STATE_PORT      = _PORTS["backup_state"]        # 5557
 BACKUP_GAME_PORT       = _PORTS["backup_game"]         # 5558
 PRIMARY_HEARTBEAT_PORT = _PORTS["primary_heartbeat"]   # 5565
 
+# Replica incrementale: ogni N record il primary invia un checkpoint completo
+REPLICATION_CHECKPOINT_INTERVAL = 50
+# Latenze di replica conservate per i percentili (metriche primary e backup)
+REPLICATION_STATS_WINDOW        = 1000
+
 # ── Chat ─────────────────────────────────────────────────────────────────────
 MAX_MESSAGE_LENGTH = 150
 MAX_CHAT_MESSAGES  = 100
\ No newline at end of file
@@ -0,0 +1,34 @@
+# src/common/movement.py
+"""
+Movement rules shared by the server simulation and client-side prediction.
+
+`server.core.move_player` and the client's MovePredictor both step through
+`step`, so a predicted move is accepted or refused exactly as the server
+will decide it (given the same map and player positions).
+"""
+from typing import Callable, Optional, Tuple
+
+from common.constants import TILE_EMPTY
+
+# Costanti per direzioni
+DIRECTIONS = {
+    "UP": (0, -1),
+    "DOWN": (0, 1),
+    "LEFT": (-1, 0),
+    "RIGHT": (1, 0)
+}
+
+
+def can_enter(game_map, width: int, height: int, x: int, y: int) -> bool:
+    """True if (x, y) is inside the map and an empty tile (list rows or array)"""
+    return 0 <= x < width and 0 <= y < height and game_map[y][x] == TILE_EMPTY
+
+
+def step(game_map, width: int, height: int, x: int, y: int, direction: str,
+         occupied: Callable[[int, int], bool]) -> Optional[Tuple[int, int]]:
+    """Position after moving one tile in `direction`, or None if the move is refused"""
+    dx, dy = DIRECTIONS.get(direction, (0, 0))
+    nx, ny = x + dx, y + dy
+    if can_enter(game_map, width, height, nx, ny) and not occupied(nx, ny):
+        return nx, ny
+    return None
@@ -0,0 +1,174 @@
+# src/common/state_delta.py
+"""
+Delta encoding of the broadcast state shared by server and client.
+
+The server diffs two consecutive broadcast dicts with `diff_state` and ships
+only what changed; the client rebuilds the full dict with `apply_delta`.
+Both sides work on the JSON shape of the state (string keys, lists instead
+of tuples), so `normalize_state` is used on the server to get that shape
+without a JSON round trip.
+
+Bomb and explosion timers are not tracked by deltas: entries are matched by
+position and only additions/removals are sent. The client only uses them to
+decide what to draw.
+"""
+from typing import Any, Dict, List, Optional
+
+from common.constants import MAX_CHAT_MESSAGES
+
+# Keys with a dedicated diff strategy; everything else is compared as a whole.
+_MAP_KEY = "map"
+_PLAYERS_KEY = "players"
+_BOMBS_KEY = "bombs"
+_EXPLOSIONS_KEY = "explosions"
+_CHAT_KEY = "chat_messages"
+_SPECIAL_KEYS = (_MAP_KEY, _PLAYERS_KEY, _BOMBS_KEY, _EXPLOSIONS_KEY, _CHAT_KEY)
+
+
+def normalize_state(state: Any) -> Any:
+    """Deep-copies a state dict into its JSON shape (str keys, lists for tuples)"""
+    if isinstance(state, dict):
+        return {str(k): normalize_state(v) for k, v in state.items()}
+    if isinstance(state, (list, tuple)):
+        return [normalize_state(v) for v in state]
+    return state
+
+
+def _bomb_key(bomb: dict) -> tuple:
+    return bomb["x"], bomb["y"]
+
+
+def _explosion_key(explosion: dict) -> tuple:
+    return tuple(explosion["positions"][0]) if explosion["positions"] else ()
+
+
+def _diff_keyed(prev: list, curr: list, key) -> tuple:
+    """Returns (added entries, removed keys) between two keyed lists"""
+    prev_keys = {key(e) for e in prev}
+    curr_keys = {key(e) for e in curr}
+    added = [e for e in curr if key(e) not in prev_keys]
+    removed = [list(k) for k in prev_keys - curr_keys]
+    return added, removed
+
+
+def diff_map(prev: list, curr: list) -> Optional[List[List[int]]]:
+    """Returns changed tiles as [x, y, tile], or None if the shapes differ"""
+    if len(prev) != len(curr) or any(len(a) != len(b) for a, b in zip(prev, curr)):
+        return None
+    tiles = []
+    for y, (old_row, new_row) in enumerate(zip(prev, curr)):
+        if old_row == new_row:
+            continue
+        for x, (old, new) in enumerate(zip(old_row, new_row)):
+            if old != new:
+                tiles.append([x, y, new])
+    return tiles
+
+
+def diff_chat(prev: list, curr: list) -> Optional[list]:
+    """Returns messages appended since `prev`, or None if history was rewritten"""
+    if not prev:
+        return list(curr)
+    last = prev[-1]
+    for i in range(len(curr) - 1, -1, -1):
+        if curr[i] == last:
+            return curr[i + 1:]
+    return None
+
+
+def diff_state(prev: Dict[str, Any], curr: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Computes the delta that turns `prev` into `curr`.
+
+    Both arguments must be normalized (see `normalize_state`).
+    Only non-empty sections are included in the returned dict.
+    """
+    delta: Dict[str, Any] = {}
+    changed = {}
+    for key, value in curr.items():
+        if key in _SPECIAL_KEYS and key in prev:
+            continue
+        if key not in prev or prev[key] != value:
+            changed[key] = value
+    removed = [key for key in prev if key not in curr]
+
+    if _MAP_KEY in prev and _MAP_KEY in curr:
+        tiles = diff_map(prev[_MAP_KEY], curr[_MAP_KEY])
+        if tiles is None:
+            changed[_MAP_KEY] = curr[_MAP_KEY]
+        elif tiles:
+            delta["tiles"] = tiles
+
+    if _PLAYERS_KEY in prev and _PLAYERS_KEY in curr:
+        old_players, new_players = prev[_PLAYERS_KEY], curr[_PLAYERS_KEY]
+        players = {pid: p for pid, p in new_players.items() if old_players.get(pid) != p}
+        gone = [pid for pid in old_players if pid not in new_players]
+        if players:
+            delta["players"] = players
+        if gone:
+            delta["players_removed"] = gone
+
+    for key, keyfn in ((_BOMBS_KEY, _bomb_key), (_EXPLOSIONS_KEY, _explosion_key)):
+        if key in prev and key in curr:
+            added, gone = _diff_keyed(prev[key], curr[key], keyfn)
+            if added:
+                delta[f"{key}_added"] = added
+            if gone:
+                delta[f"{key}_removed"] = gone
+
+    if _CHAT_KEY in prev and _CHAT_KEY in curr:
+        new_messages = diff_chat(prev[_CHAT_KEY], curr[_CHAT_KEY])
+        if new_messages is None:
+            changed[_CHAT_KEY] = curr[_CHAT_KEY]
+        elif new_messages:
+            delta["chat"] = new_messages
+
+    if changed:
+        delta["set"] = changed
+    if removed:
+        delta["unset"] = removed
+    return delta
+
+
+def apply_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns a new state dict with `delta` applied on top of `base`.
+
+    `base` is never mutated: touched containers are copied, untouched ones
+    are shared with the new dict.
+    """
+    state = dict(base)
+    for key in delta.get("unset", ()):
+        state.pop(key, None)
+    state.update(delta.get("set", {}))
+
+    tiles = delta.get("tiles")
+    if tiles:
+        game_map = list(state.get(_MAP_KEY, []))
+        copied_rows = set()
+        for x, y, tile in tiles:
+            if y not in copied_rows:
+                game_map[y] = list(game_map[y])
+                copied_rows.add(y)
+            game_map[y][x] = tile
+        state[_MAP_KEY] = game_map
+
+    if "players" in delta or "players_removed" in delta:
+        players = dict(state.get(_PLAYERS_KEY, {}))
+        for pid in delta.get("players_removed", ()):
+            players.pop(pid, None)
+        players.update(delta.get("players", {}))
+        state[_PLAYERS_KEY] = players
+
+    for key, keyfn in ((_BOMBS_KEY, _bomb_key), (_EXPLOSIONS_KEY, _explosion_key)):
+        added = delta.get(f"{key}_added", [])
+        gone = {tuple(k) for k in delta.get(f"{key}_removed", ())}
+        if added or gone:
+            entries = [e for e in state.get(key, []) if keyfn(e) not in gone]
+            state[key] = entries + list(added)
+
+    new_messages = delta.get("chat")
+    if new_messages:
+        messages = list(state.get(_CHAT_KEY, [])) + list(new_messages)
+        state[_CHAT_KEY] = messages[-MAX_CHAT_MESSAGES:]
+    return state
@@ -0,0 +1,13 @@
+# src/common/stats.py
+"""
+Small statistics helpers shared by the server metrics and the bot swarm.
+"""
+import math
+
+
+def percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
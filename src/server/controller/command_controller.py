@@ -1,6 +1,7 @@
 """
 Controller to handle commands received from clients
 """
+import re
 import sys
 import os
 
@@ -19,6 +20,10 @@ except ImportError:
     from server.services.game_service import GameService
     from server.models import GAME_STATE_LOBBY, GAME_STATE_PLAYING, GAME_STATE_VICTORY
 
+MAX_ROOM_NAME_LENGTH = 24
+# Optional match settings at the end of CREATE_ROOM, e.g. "Arena:101x101:64"
+_ROOM_SETTINGS = re.compile(r":(\d+)x(\d+)(?::(\d+))?\s*$")
+
 class CommandController:
     """Controller that translates client commands into game actions"""
     def __init__(self, game_service: GameService, player_slots=None):
@@ -43,17 +48,54 @@ class CommandController:
             return {}
         if command == "PING":
             return {"type": "pong"}
+        if command == "RESYNC":
+            return {"type": "resync"}
+        if command.startswith("PONG:"):
+            try:
+                return {"type": "ping_reply", "ping": int(command[5:])}
+            except ValueError:
+                return {}
+        room_request = self._parse_room_command(command)
+        if room_request:
+            return room_request
         command_upper = command.upper()
         if is_spectator:
             return self._handle_spectator_command(command, command_upper, user_id, player_name)
         return self._handle_player_command(command, command_upper, user_id, player_name)
 
+    @staticmethod
+    def _parse_room_command(command: str) -> dict:
+        """Lobby-level room commands, executed by the server rather than the room's game"""
+        if command == "ROOMS":
+            return {"type": "list_rooms"}
+        if command.startswith("CREATE_ROOM:"):
+            return CommandController._parse_create_room(command[12:])
+        if command.startswith("JOIN_ROOM:"):
+            try:
+                return {"type": "join_room", "room_id": int(command[10:])}
+            except ValueError:
+                return {}
+        return {}
+
+    @staticmethod
+    def _parse_create_room(args: str) -> dict:
+        """CREATE_ROOM:<name>[:<width>x<height>[:<max players>]]"""
+        request = {"type": "create_room"}
+        match = _ROOM_SETTINGS.search(args)
+        if match:
+            args = args[:match.start()]
+            request["map_width"], request["map_height"] = int(match.group(1)), int(match.group(2))
+            if match.group(3):
+                request["max_players"] = int(match.group(3))
+        request["name"] = args.strip()[:MAX_ROOM_NAME_LENGTH]
+        return request
+
     def _handle_spectator_command(self, command: str, command_upper: str, user_id: int, player_name: str) -> dict:
         """Handles spectator commands"""
         if command.startswith("CHAT:"):
             chat_message = command[5:]
             if chat_message.strip():
-                self.game.add_chat_message(user_id, chat_message)
+                self.game.submit_input(user_id, "chat", chat_message)
             return {}
         if command_upper == "JOIN_GAME":
             if self.game.state.game_state == GAME_STATE_LOBBY:
@@ -61,7 +103,7 @@ class CommandController:
                 new_pid = self.game.convert_spectator_to_player(user_id, spec_name)
                 if new_pid >= 0:
                     print(f"[CONVERT] Spectator {user_id} -> Player {new_pid}")
-                    if self.player_slots is not None and 0 <= new_pid < 4:
+                    if self.player_slots is not None and 0 <= new_pid < len(self.player_slots):
                         self.player_slots[new_pid] = True
                         print(f"[CONVERT] Allocated player slot {new_pid}")
                     return {
@@ -77,25 +119,26 @@ class CommandController:
         return {}
 
     def _handle_player_command(self, command: str, command_upper: str, user_id: int, player_name: str) -> dict:
-        """Handles player commands"""
-        if command_upper in ("UP", "DOWN", "LEFT", "RIGHT"):
-            self.game.move_player(user_id, command_upper)
+        """Handles player commands: queued, applied by the game loop at the next tick"""
+        direction, _, input_seq = command_upper.partition(":")
+        if direction in ("UP", "DOWN", "LEFT", "RIGHT"):
+            # "UP" or "UP:<seq>" from clients that predict their own movement
+            if not input_seq:
+                self.game.submit_input(user_id, "move", direction)
+            elif input_seq.isdigit():
+                self.game.submit_input(user_id, "move", direction, int(input_seq))
             return {}
         if command_upper == "BOMB":
-            self.game.place_bomb(user_id)
+            self.game.submit_input(user_id, "bomb")
             return {}
         if command_upper == "START_GAME":
-            if (self.game.state.game_state == GAME_STATE_LOBBY and
-                    user_id == self.game.get_current_host()):
-                if self.game.start_game():
-                    print(f"[GAME] Player {user_id} ({player_name}) started the game")
+            self.game.submit_input(user_id, "start", player_name)
             return {}
         if command_upper == "PLAY_AGAIN":
-            if self.game.state.game_state == GAME_STATE_VICTORY:
-                self.game.return_to_lobby()
+            self.game.submit_input(user_id, "play_again")
             return {}
         if command.startswith("CHAT:"):
             chat_message = command[5:]
             if chat_message.strip():
-                self.game.add_chat_message(user_id, chat_message)
-        return {}
\ No newline at end of file
+                self.game.submit_input(user_id, "chat", chat_message)
+        return {}
@@ -1,34 +1,104 @@
 import random
-from typing import Tuple, Optional, Set
+from collections import deque
+from functools import lru_cache
+from typing import List, Tuple, Optional, Set
 from .models import (
     State, Player, Bomb, Explosion,
     MAP_WIDTH, MAP_HEIGHT, TILE_EMPTY, TILE_WALL, TILE_BLOCK,
     GAME_STATE_PLAYING, GAME_STATE_VICTORY, GAME_STATE_LOBBY,
     BOMB_TIMER_TICKS, EXPLOSION_RANGE, EXPLOSION_TTL_TICKS,
-    BLOCK_REGEN_MIN_TIME, MAX_BLOCKS_ON_MAP,
-    MAX_MESSAGE_LENGTH, MAX_CHAT_MESSAGES
+    BLOCK_REGEN_MIN_TIME, MAX_BLOCKS_ON_MAP, VICTORY_TICKS,
+    MAX_MESSAGE_LENGTH, MAX_CHAT_MESSAGES, MAX_PLAYERS
 )
-
-# Costanti per direzioni
-DIRECTIONS = {
-    "UP": (0, -1),
-    "DOWN": (0, 1),
-    "LEFT": (-1, 0),
-    "RIGHT": (1, 0)
-}
+from common.constants import MIN_MAP_SIZE, MAX_MAP_SIZE, MAX_PLAYERS_LIMIT, SIM_TICK_RATE
+from common.movement import can_enter, step
+from .occupancy import OccupancyGrid
+from .detonation import DetonationQueue
+from . import tilemap
 
 # Direzioni cardinali per esplosioni
 CARDINAL_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
 
 
-def get_safe_zones() -> Set[Tuple[int, int]]:
+def scaled_ticks(s: State, ticks: int) -> int:
+    """A duration of `ticks` at SIM_TICK_RATE, in ticks at the state's own tick rate"""
+    return max(1, round(ticks * s.tick_rate / SIM_TICK_RATE))
+
+
+def detonations(s: State) -> DetonationQueue:
+    """Returns the timer queue of the state, (re)building it if it is missing or stale"""
+    queue = s.detonations
+    if queue is None or not queue.in_sync(s):
+        queue = s.detonations = DetonationQueue.build(s)
+    return queue
+
+
+def sync_timers(s: State) -> None:
+    """Writes the remaining ticks back into bomb/explosion timers before the state is exported"""
+    queue = detonations(s)
+    for item in s.bombs + s.explosions:
+        object.__setattr__(item, "timer", queue.remaining(item))
+
+
+def check_match_config(width: int, height: int, max_players: int) -> None:
+    """Raises ValueError if a map size / player cap cannot be played"""
+    for side in (width, height):
+        if not MIN_MAP_SIZE <= side <= MAX_MAP_SIZE or side % 2 == 0:
+            raise ValueError(f"map sides must be odd, between {MIN_MAP_SIZE} and {MAX_MAP_SIZE}")
+    if not 2 <= max_players <= MAX_PLAYERS_LIMIT:
+        raise ValueError(f"max players must be between 2 and {MAX_PLAYERS_LIMIT}")
+    if max_players > ((width - 1) // 2) * ((height - 1) // 2):
+        raise ValueError(f"a {width}x{height} map has no room for {max_players} spawns")
+
+
+@lru_cache(maxsize=64)
+def spawn_points(width: int = MAP_WIDTH, height: int = MAP_HEIGHT,
+                 count: int = MAX_PLAYERS) -> Tuple[Tuple[int, int], ...]:
+    """
+    Spawn tiles for `count` players: the four corners first, then each time
+    the odd/odd tile farthest from every spawn already chosen.
+    """
+    points = [(1, 1), (1, height-2), (width-2, 1), (width-2, height-2)][:count]
+    nearest = {}
+    for y in range(1, height-1, 2):
+        for x in range(1, width-1, 2):
+            if (x, y) not in points:
+                nearest[(x, y)] = min((x-px)**2 + (y-py)**2 for px, py in points)
+    while len(points) < count and nearest:
+        best = max(nearest, key=nearest.get)
+        del nearest[best]
+        points.append(best)
+        bx, by = best
+        for (x, y), d in nearest.items():
+            nearest[(x, y)] = min(d, (x-bx)**2 + (y-by)**2)
+    return tuple(points)
+
+
+@lru_cache(maxsize=64)
+def safe_zones(width: int = MAP_WIDTH, height: int = MAP_HEIGHT,
+               count: int = MAX_PLAYERS) -> frozenset:
+    """Each spawn plus one step towards the map centre on both axes"""
+    zones = set()
+    for x, y in spawn_points(width, height, count):
+        dx = 1 if x < width // 2 else -1
+        dy = 1 if y < height // 2 else -1
+        zones.update({(x, y), (x+dx, y), (x, y+dy)})
+    return frozenset(zones)
+
+
+def get_safe_zones(s: Optional[State] = None) -> Set[Tuple[int, int]]:
     """Ritorna l'insieme delle zone sicure (spawn areas)"""
-    return {
-        (1, 1), (1, 2), (2, 1),
-        (1, MAP_HEIGHT-2), (1, MAP_HEIGHT-3), (2, MAP_HEIGHT-2),
-        (MAP_WIDTH-2, 1), (MAP_WIDTH-3, 1), (MAP_WIDTH-2, 2),
-        (MAP_WIDTH-2, MAP_HEIGHT-2), (MAP_WIDTH-2, MAP_HEIGHT-3), (MAP_WIDTH-3, MAP_HEIGHT-2)
-    }
+    if s is None:
+        return set(safe_zones())
+    return set(safe_zones(s.map_width, s.map_height, s.max_players))
+
+
+def occupancy(s: State) -> OccupancyGrid:
+    """Returns the tile index of the state, (re)building it if it is missing or stale"""
+    grid = s.occupancy
+    if grid is None or not grid.in_sync(s):
+        grid = s.occupancy = OccupancyGrid.build(s)
+    return grid
 
 
 def connected_players_count(s: State) -> int:
@@ -39,7 +109,7 @@ def connected_players_count(s: State) -> int:
 def can_spectator_join(s: State) -> bool:
     """Checks if a spectator can join as a player"""
     free = 0
-    for i in range(4):
+    for i in range(s.max_players):
         if i not in s.players:
             free += 1
         elif s.players[i].disconnected and s.players[i].disconnect_time_left <= 0:
@@ -65,18 +135,34 @@ def add_chat(s: State, sender_id: int, message: str, is_system: bool = False):
         print(f"[CHAT] {who} {sender_id}: {msg}")
 
 
-def spawn_for(pid: int) -> Tuple[int, int]:
+def spawn_for(pid: int, s: Optional[State] = None) -> Tuple[int, int]:
     """Returns spawn coordinates for a player ID"""
-    return [(1, 1), (1, MAP_HEIGHT-2), (MAP_WIDTH-2, 1), (MAP_WIDTH-2, MAP_HEIGHT-2)][pid % 4]
+    if s is None:
+        points = spawn_points()
+    else:
+        points = spawn_points(s.map_width, s.map_height, s.max_players)
+    return points[pid % len(points)]
 
 
 def add_player(s: State, pid: int, name: str = ""):
     """Adds a new player to the game"""
-    x, y = spawn_for(pid)
-    s.players[pid] = Player(x=x, y=y, name=name or f"Player {pid}")
+    x, y = spawn_for(pid, s)
+    grid = s.occupancy = s.occupancy if s.occupancy is not None and s.occupancy.in_sync(s) else None
+    if grid is not None and pid in s.players:
+        grid.remove_player(pid, s.players[pid])
+    s.players[pid] = player = Player(x=x, y=y, name=name or f"Player {pid}")
+    if grid is not None:
+        grid.add_player(pid, player)
     print(f"[LOBBY] Player {pid} ({name or f'Player {pid}'}) joined the lobby")
 
 
+def remove_player(s: State, pid: int):
+    """Removes a player from the game and from the tile index"""
+    player = s.players.pop(pid, None)
+    if player is not None and s.occupancy is not None:
+        s.occupancy.remove_player(pid, player)
+
+
 def get_current_host(s: State) -> int:
     """Gets or reassigns the current host"""
     if s.current_host_id in s.players and not s.players[s.current_host_id].disconnected:
@@ -93,7 +179,7 @@ def reset_positions(s: State):
     """Resets all player positions and states"""
     for pid, p in s.players.items():
         if not p.disconnected:
-            p.x, p.y = spawn_for(pid)
+            p.x, p.y = spawn_for(pid, s)
             p.alive, p.lives = True, 3
 
 
@@ -105,7 +191,8 @@ def start_game(s: State) -> bool:
         print("[START] Cannot start: need at least 2 players")
         return False
     s.game_state = GAME_STATE_PLAYING
-    s.game_map = generate_map()
+    s.game_map = generate_map(s.map_width, s.map_height, s.max_players)
+    s.block_regen_timer = scaled_ticks(s, BLOCK_REGEN_MIN_TIME)
     reset_positions(s)
     print("[START] Starting game!")
     return True
@@ -118,9 +205,11 @@ def return_to_lobby(s: State):
     s.game_map = []
     s.bombs.clear()
     s.explosions.clear()
+    s.occupancy = None
+    s.detonations = None
     s.winner_id = None
     s.victory_timer = 0
-    s.block_regen_timer = BLOCK_REGEN_MIN_TIME
+    s.block_regen_timer = scaled_ticks(s, BLOCK_REGEN_MIN_TIME)
     disconnected_players = []
     for pid, p in list(s.players.items()):
         if p.disconnected:
@@ -131,39 +220,28 @@ def return_to_lobby(s: State):
             p.alive = True
             p.lives = 3
     for pid in disconnected_players:
-        if pid in s.players:
-            del s.players[pid]
+        remove_player(s, pid)
     stale_mappings = [cid for cid, pid in list(s.client_player_mapping.items()) if pid in disconnected_players]
     for cid in stale_mappings:
         del s.client_player_mapping[cid]
 
 
-def generate_map():
-    """Generates a new game map"""
-    safe_zones = get_safe_zones()
-    m = [[TILE_EMPTY for _ in range(MAP_WIDTH)] for _ in range(MAP_HEIGHT)]
-    for y in range(MAP_HEIGHT):
-        for x in range(MAP_WIDTH):
-            if x in (0, MAP_WIDTH-1) or y in (0, MAP_HEIGHT-1):
-                m[y][x] = TILE_WALL
-            elif x % 2 == 0 and y % 2 == 0:
-                m[y][x] = TILE_WALL
-            elif (x, y) not in safe_zones and random.random() < 0.2:
-                m[y][x] = TILE_BLOCK
-    return m
+def generate_map(width: int = MAP_WIDTH, height: int = MAP_HEIGHT, max_players: int = MAX_PLAYERS):
+    """Generates a new game map (backend chosen by tilemap.set_backend)"""
+    return tilemap.generate(width, height, safe_zones(width, height, max_players))
 
 
 def is_walkable(s: State, x: int, y: int) -> bool:
     """Checks if a tile is walkable"""
-    return bool(s.game_map) and 0 <= x < MAP_WIDTH and 0 <= y < MAP_HEIGHT and s.game_map[y][x] == TILE_EMPTY
+    return tilemap.has_map(s.game_map) and can_enter(s.game_map, s.map_width, s.map_height, x, y)
 
 
 def is_player_at(s: State, x: int, y: int, exclude_id: Optional[int] = None) -> bool:
     """Checks if a player is at given coordinates"""
-    for pid, p in s.players.items():
+    for pid, p in occupancy(s).players_at(x, y).items():
         if exclude_id is not None and pid == exclude_id:
             continue
-        if p.alive and not p.disconnected and p.x == x and p.y == y:
+        if p.alive and not p.disconnected:
             return True
     return False
 
@@ -174,11 +252,13 @@ def move_player(s: State, pid: int, direction: str):
         return
     if pid not in s.players or not s.players[pid].alive:
         return
-    dx, dy = DIRECTIONS.get(direction, (0, 0))
-    px, py = s.players[pid].x, s.players[pid].y
-    nx, ny = px + dx, py + dy
-    if is_walkable(s, nx, ny) and not is_player_at(s, nx, ny, exclude_id=pid):
-        s.players[pid].x, s.players[pid].y = nx, ny
+    if not tilemap.has_map(s.game_map):
+        return
+    player = s.players[pid]
+    moved = step(s.game_map, s.map_width, s.map_height, player.x, player.y, direction,
+                 lambda x, y: is_player_at(s, x, y, exclude_id=pid))
+    if moved:
+        player.x, player.y = moved
 
 
 def place_bomb(s: State, pid: int):
@@ -188,19 +268,72 @@ def place_bomb(s: State, pid: int):
     if pid not in s.players or not s.players[pid].alive:
         return
     x, y = s.players[pid].x, s.players[pid].y
-    if any(b.x == x and b.y == y for b in s.bombs):
+    grid, queue = occupancy(s), detonations(s)
+    if grid.bomb_at(x, y) is not None:
         return
-    s.bombs.append(Bomb(x=x, y=y, timer=BOMB_TIMER_TICKS, owner=pid))
-
-
-def explode_bomb(s: State, bomb: Bomb):
-    """Explodes a bomb and creates explosion effect"""
+    bomb = Bomb(x=x, y=y, timer=scaled_ticks(s, BOMB_TIMER_TICKS), owner=pid)
+    s.bombs.append(bomb)
+    grid.add_bomb(bomb)
+    queue.add(bomb, len(s.bombs) - 1)
+
+
+def remove_bomb(s: State, bomb: Bomb):
+    """Removes an exploded bomb"""
+    grid, queue = occupancy(s), detonations(s)
+    queue.remove(s.bombs, bomb)
+    grid.remove_bomb(bomb)
+
+
+def remove_explosion(s: State, explosion: Explosion):
+    """Removes an expired explosion"""
+    grid, queue = occupancy(s), detonations(s)
+    queue.remove(s.explosions, explosion)
+    grid.remove_fire(explosion)
+
+
+def advance_timers(s: State):
+    """
+    One tick of bomb fuses and explosion lifetimes: only what is due is
+    touched. A bomb caught in an explosion goes off in the same tick
+    (breadth-first, so chains resolve in blast order).
+    """
+    queue = detonations(s)
+    queue.advance()
+    s.tick_count = queue.now
+    due = queue.pop_due(Bomb)
+    if due:
+        chained = detonate(s, due) - len(due)
+        if chained:
+            print(f"[CHAIN] {chained} bomb(s) set off by other explosions")
+    for explosion in queue.pop_due(Explosion):
+        remove_explosion(s, explosion)
+
+
+def detonate(s: State, bombs: List[Bomb]) -> int:
+    """Explodes `bombs` and every bomb their blasts reach; returns how many went off"""
+    work = deque(bombs)
+    count = 0
+    while work:
+        bomb = work.popleft()
+        if not detonations(s).is_live(bomb):
+            continue    # already set off earlier in this chain
+        remove_bomb(s, bomb)
+        count += 1
+        for x, y in explode_bomb(s, bomb):
+            other = occupancy(s).bomb_at(x, y)
+            if other is not None:
+                work.append(other)
+    return count
+
+
+def explode_bomb(s: State, bomb: Bomb) -> List[Tuple[int, int]]:
+    """Explodes a bomb and creates explosion effect; returns the tiles hit"""
     x, y = bomb.x, bomb.y
     affected = [(x, y)]
     for dx, dy in CARDINAL_DIRECTIONS:
         for r in range(1, EXPLOSION_RANGE + 1):
             nx, ny = x + dx*r, y + dy*r
-            if not (0 <= nx < MAP_WIDTH and 0 <= ny < MAP_HEIGHT):
+            if not (0 <= nx < s.map_width and 0 <= ny < s.map_height):
                 break
             tile = s.game_map[ny][nx]
             if tile == TILE_WALL:
@@ -209,13 +342,21 @@ def explode_bomb(s: State, bomb: Bomb):
             if tile == TILE_BLOCK:
                 s.game_map[ny][nx] = TILE_EMPTY
                 break
-    for pid, p in s.players.items():
-        if p.alive and (p.x, p.y) in affected:
-            p.lives -= 1
-            if p.lives <= 0:
-                p.alive = False
-                print(f"[ELIMINATED] Player {pid} eliminated!")
-    s.explosions.append(Explosion(positions=affected, timer=EXPLOSION_TTL_TICKS))
+    grid = occupancy(s)
+    for pos in affected:
+        for pid, p in list(grid.players_at(*pos).items()):
+            if p.alive:
+                p.lives -= 1
+                if p.lives <= 0:
+                    p.alive = False
+                    print(f"[ELIMINATED] Player {pid} eliminated!")
+    queue = detonations(s)
+    # The tick that creates the explosion counts as the first of its lifetime
+    explosion = Explosion(positions=affected, timer=scaled_ticks(s, EXPLOSION_TTL_TICKS - 1))
+    s.explosions.append(explosion)
+    grid.add_fire(explosion)
+    queue.add(explosion, len(s.explosions) - 1)
+    return affected
 
 
 def check_victory(s: State) -> bool:
@@ -226,13 +367,13 @@ def check_victory(s: State) -> bool:
     if len(alive) == 1:
         s.winner_id = alive[0]
         s.game_state = GAME_STATE_VICTORY
-        s.victory_timer = 50
+        s.victory_timer = scaled_ticks(s, VICTORY_TICKS)
         print(f"[VICTORY] Player {s.winner_id} wins!")
         return True
     if len(alive) == 0:
         s.winner_id = -1
         s.game_state = GAME_STATE_VICTORY
-        s.victory_timer = 50
+        s.victory_timer = scaled_ticks(s, VICTORY_TICKS)
         print("[VICTORY] Draw - no winners!")
         return True
     return False
@@ -240,28 +381,51 @@ def check_victory(s: State) -> bool:
 
 def safe_to_place_block(s: State, x: int, y: int) -> bool:
     """Checks if it's safe to place a block at given position"""
-    if not s.game_map or s.game_map[y][x] != TILE_EMPTY:
+    if not tilemap.has_map(s.game_map) or s.game_map[y][x] != TILE_EMPTY:
+        return False
+    grid = occupancy(s)
+    if grid.is_burning(x, y):
         return False
     for dx in (-1, 0, 1):
         for dy in (-1, 0, 1):
-            cx, cy = x+dx, y+dy
-            if 0 <= cx < MAP_WIDTH and 0 <= cy < MAP_HEIGHT:
-                for p in s.players.values():
-                    if not p.disconnected and p.alive and p.x == cx and p.y == cy:
-                        return False
-    safe_zones = get_safe_zones()
-    return (x, y) not in safe_zones
+            for p in grid.players_at(x+dx, y+dy).values():
+                if not p.disconnected and p.alive:
+                    return False
+    return (x, y) not in safe_zones(s.map_width, s.map_height, s.max_players)
+
+
+def max_blocks(s: State) -> int:
+    """Regeneration cap, scaled from the default map to the match's area"""
+    return MAX_BLOCKS_ON_MAP * s.map_width * s.map_height // (MAP_WIDTH * MAP_HEIGHT)
 
 
 def try_regen_block(s: State):
     """Attempts to regenerate a block on the map"""
-    current = sum(1 for row in s.game_map for t in row if t == TILE_BLOCK)
-    if current >= MAX_BLOCKS_ON_MAP:
+    current = tilemap.count(s.game_map, TILE_BLOCK)
+    if current >= max_blocks(s):
         return
-    for _ in range(50):
-        x = random.randint(1, MAP_WIDTH-2)
-        y = random.randint(1, MAP_HEIGHT-2)
-        if safe_to_place_block(s, x, y):
-            s.game_map[y][x] = TILE_BLOCK
-            print(f"[BLOCK REGEN] block at ({x},{y})")
-            return
\ No newline at end of file
+    if tilemap.is_array(s.game_map):
+        pos = tilemap.random_free_tile(s.game_map, _regen_blocked(s))
+        if pos is None:
+            return
+        x, y = pos
+    else:
+        for _ in range(50):
+            x = random.randint(1, s.map_width-2)
+            y = random.randint(1, s.map_height-2)
+            if safe_to_place_block(s, x, y):
+                break
+        else:
+            return
+    s.game_map[y][x] = TILE_BLOCK
+    print(f"[BLOCK REGEN] block at ({x},{y})")
+
+
+def _regen_blocked(s: State) -> Set[Tuple[int, int]]:
+    """Tiles safe_to_place_block refuses besides non-empty ones: safe zones, fire, next to live players"""
+    blocked = set(safe_zones(s.map_width, s.map_height, s.max_players))
+    blocked.update(occupancy(s).burning_tiles())
+    for p in s.players.values():
+        if p.alive and not p.disconnected:
+            blocked.update((p.x+dx, p.y+dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+    return blocked
@@ -0,0 +1,117 @@
+"""
+Detonation queue: bombs and explosions ordered by the tick they go off.
+
+Kept alongside a State (State.detonations) so a tick only touches what
+expires in it instead of counting down every bomb and explosion:
+
+* each entry is due at an absolute tick (State.tick_count + timer);
+* two heaps (bombs, explosions) hand out what is due, stale heap entries
+  (removed or rescheduled items) are skipped when popped;
+* the position of every item in its State list is remembered, so removal
+  swaps with the last element instead of list.remove.
+
+The `timer` fields are only brought up to date when the state is exported
+(core.sync_timers). core.detonations() rebuilds the queue from those
+timers when it no longer matches the State.
+"""
+import heapq
+import itertools
+from typing import Dict, List
+
+from .models import State, Bomb, Explosion
+
+
+class DetonationQueue:
+    """Timer-ordered bombs and explosions of one State"""
+    def __init__(self, now: int = 0):
+        self.now = now
+        self._heaps: Dict[type, list] = {Bomb: [], Explosion: []}
+        self._live: Dict[int, list] = {}     # id(item) -> [item, due tick, index in its list]
+        self._seq = itertools.count()
+        self._stale = False
+        self.bomb_count = 0
+        self.explosion_count = 0
+
+    @classmethod
+    def build(cls, s: State) -> "DetonationQueue":
+        queue = cls(s.tick_count)
+        for index, bomb in enumerate(s.bombs):
+            queue.add(bomb, index)
+        for index, explosion in enumerate(s.explosions):
+            queue.add(explosion, index)
+        return queue
+
+    def in_sync(self, s: State) -> bool:
+        """Cheap check that nothing was added or removed behind the queue's back"""
+        return (not self._stale and self.now == s.tick_count
+                and self.bomb_count == len(s.bombs) and self.explosion_count == len(s.explosions))
+
+    def add(self, item, index: int) -> None:
+        """Schedules a bomb/explosion stored at `index` of its State list, due in item.timer ticks"""
+        if isinstance(item, Bomb):
+            item.attach_schedule(self)
+            self.bomb_count += 1
+        else:
+            self.explosion_count += 1
+        self._live[id(item)] = [item, None, index]
+        self.reschedule(item, item.timer)
+
+    def reschedule(self, item, remaining: int) -> None:
+        """Moves an item to `remaining` ticks from now (Bomb.timer assignments land here)"""
+        entry = self._live.get(id(item))
+        if entry is not None:
+            entry[1] = self.now + remaining
+            heapq.heappush(self._heaps[type(item)], (entry[1], next(self._seq), item))
+
+    def advance(self) -> None:
+        """Moves to the next tick"""
+        self.now += 1
+
+    def remaining(self, item) -> int:
+        return self._live[id(item)][1] - self.now
+
+    def is_live(self, item) -> bool:
+        return id(item) in self._live
+
+    def pop_due(self, kind: type) -> List:
+        """Every live item of `kind` due at or before the current tick, in due order"""
+        heap = self._heaps[kind]
+        due = []
+        while heap and heap[0][0] <= self.now:
+            tick, _, item = heapq.heappop(heap)
+            entry = self._live.get(id(item))
+            if entry is not None and entry[0] is item and entry[1] == tick:
+                due.append(item)
+        return due
+
+    def remove(self, items: list, item) -> None:
+        """Takes `item` out of its State list (swap with last) and of the queue"""
+        entry = self._live.pop(id(item), None)
+        if entry is None:
+            _remove_identical(items, item)
+            return
+        if isinstance(item, Bomb):
+            item.attach_schedule(None)
+            self.bomb_count -= 1
+        else:
+            self.explosion_count -= 1
+        index = entry[2]
+        if index >= len(items) or items[index] is not item:
+            # The list was reordered outside the queue: fall back, rebuild on next use
+            _remove_identical(items, item)
+            self._stale = True
+            return
+        last = items.pop()
+        if last is not item:
+            items[index] = last
+            moved = self._live.get(id(last))
+            if moved is not None:
+                moved[2] = index
+
+
+def _remove_identical(items: list, item) -> None:
+    """list.remove by identity (dataclass == would match any bomb with the same fields)"""
+    for index, candidate in enumerate(items):
+        if candidate is item:
+            del items[index]
+            return
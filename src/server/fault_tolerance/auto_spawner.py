@@ -5,7 +5,7 @@ import os
 import time
 import socket
 import threading
-from typing import Optional
+from typing import List, Optional
 
 _here = os.path.dirname(os.path.abspath(__file__))
 _root = os.path.abspath(os.path.join(_here, "..", "..", ".."))
@@ -20,15 +20,19 @@ from common.constants import PRIMARY_GAME_PORT
 class AutoSpawner:
     """Spawns and monitors a backup server process."""
 
-    def __init__(self, primary_game_port: int = PRIMARY_GAME_PORT):
+    def __init__(self, primary_game_port: int = PRIMARY_GAME_PORT,
+                 extra_args: Optional[List[str]] = None):
         """
         Args:
             primary_game_port: Port the primary game server is listening on.
                                All backup ports are derived from this value.
+            extra_args       : Additional CLI flags forwarded to the backup
+                               (e.g. ["--delta"]) so it serves like the primary.
         """
         self.primary_game_port = primary_game_port
         self.backup_state_port = primary_game_port + 1   # 5557
         self.backup_game_port  = primary_game_port + 2   # 5558
+        self.extra_args = list(extra_args or [])
 
         self.backup_process: Optional[subprocess.Popen] = None
         self._monitor_thread: Optional[threading.Thread] = None
@@ -79,6 +83,7 @@ class AutoSpawner:
             "--port",          str(self.backup_game_port),
             "--primary",       f"localhost:{self.primary_game_port}",
             "--promoted-port", str(self.primary_game_port),
+            *self.extra_args,
         ]
 
         project_root = os.path.abspath(
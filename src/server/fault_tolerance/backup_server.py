@@ -11,6 +11,7 @@ working with zero reconfiguration.
 The promotion callback (defined in mainServer._on_promotion) is responsible
 for actually opening that TCP socket.
 """
+import asyncio
 import json
 import os
 import socket
@@ -30,12 +31,24 @@ for _p in (_root, _src):
 from common.constants import PRIMARY_GAME_PORT, BACKUP_STATE_PORT, PRIMARY_HEARTBEAT_PORT
 from server.models import state_from_dict
 from .failure_detector import FailureDetector
+from .replication import (
+    RECORD_CHECKPOINT, RECORD_DIFF, ReplicaState, ReplicationStats,
+    encode_reply, format_stats, parse_header,
+)
+
+
+def _validate_snapshot(snapshot: dict) -> None:
+    """Raises if the snapshot (or one of its rooms) does not decode to a State"""
+    state_from_dict(snapshot)  # verifica versione e formato
+    for room in snapshot.get("rooms", {}).values():
+        state_from_dict(room)
 
 
 class BackupServer:
     """
     Backup that:
-    1. Opens a state-receiver socket (state_port) -- primary pushes snapshots here.
+    1. Opens a state-receiver socket (state_port) -- primary streams replication
+       records (checkpoints + diffs) here and they are applied incrementally.
     2. Probes the primary's heartbeat port every 0.5 s.
     3. On timeout -> calls on_promotion(replicated_state).
     """
@@ -68,10 +81,15 @@ class BackupServer:
 
         self.is_primary = False
         self.running = True
-        self.replicated_state = None
+        self.replica = ReplicaState()
+        self.replication = ReplicationStats()
+        self._replica_lock = threading.Lock()
+        self._materialized = (0, None, {})  # (seq, State, rooms) cache for replicated_state/_rooms
 
         self.failure_detector = FailureDetector(timeout=1.5)
         self._state_sock: Optional[socket.socket] = None
+        self._state_server: Optional[asyncio.AbstractServer] = None
+        self._update_counter = [0]
 
         print(
             f"[BACKUP] Initialized  "
@@ -101,9 +119,66 @@ class BackupServer:
             f"{self.primary_host}:{self.primary_heartbeat_port}"
         )
 
+    async def serve_async(self) -> None:
+        """
+        asyncio variant of start(): state receiver and heartbeat monitor on
+        the running loop. Promotion runs in an executor because the callback
+        spawns the next backup process.
+        """
+        try:
+            self._state_server = await asyncio.start_server(
+                self._handle_state_conn_async, "0.0.0.0", self.state_port
+            )
+        except OSError as exc:
+            print(f"[BACKUP] State receiver fatal error: {exc}")
+            return
+        print(f"[BACKUP] State receiver listening on port {self.state_port} (asyncio)")
+        print(
+            f"[BACKUP] Monitoring primary heartbeat at "
+            f"{self.primary_host}:{self.primary_heartbeat_port}"
+        )
+        try:
+            while not self.is_primary and self.running:
+                await self._probe_heartbeat_async()
+                if not self.failure_detector.check_primary_status():
+                    print("[BACKUP] [WARN] PRIMARY FAILURE DETECTED")
+                    # Free state_port before the promoted primary spawns its own backup
+                    self._state_server.close()
+                    await self._state_server.wait_closed()
+                    await asyncio.get_running_loop().run_in_executor(None, self._promote_to_primary)
+                    return
+                await asyncio.sleep(0.5)
+        finally:
+            self._state_server.close()
+
+    @property
+    def replicated_state(self):
+        """Default room's State rebuilt from the last applied record (None before the first checkpoint)"""
+        return self._materialize()[1]
+
+    @property
+    def replicated_rooms(self) -> dict:
+        """The other replicated rooms: room id -> (name, State)"""
+        return self._materialize()[2]
+
+    def _materialize(self) -> tuple:
+        with self._replica_lock:
+            seq, snapshot = self.replica.seq, self.replica.snapshot
+        if snapshot is None:
+            return 0, None, {}
+        if self._materialized[0] != seq:
+            rooms = {int(rid): (room.get("room_name", f"Room {rid}"), state_from_dict(room))
+                     for rid, room in snapshot.get("rooms", {}).items()}
+            self._materialized = (seq, state_from_dict(snapshot), rooms)
+        return self._materialized
+
     def get_replicated_state(self):
         return self.replicated_state
 
+    def replication_stats(self) -> dict:
+        """Records received, throughput and snapshot-to-apply latency percentiles"""
+        return self.replication.stats()
+
     def stop(self) -> None:
         print("[BACKUP] Stopping...")
         self.running = False
@@ -150,13 +225,29 @@ class BackupServer:
                 except Exception:
                     pass
 
+    async def _probe_heartbeat_async(self) -> None:
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.primary_host, self.primary_heartbeat_port), 0.5
+            )
+            writer.write(b"HEARTBEAT")
+            resp = await asyncio.wait_for(reader.read(64), 0.5)
+            if resp == b"ALIVE":
+                self.failure_detector.update_heartbeat()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            if writer:
+                writer.close()
+
 
     def _promote_to_primary(self) -> None:
         print("=" * 70)
         print("[BACKUP->PRIMARY] PROMOTING TO PRIMARY")
         print(f"[BACKUP->PRIMARY] Will serve on port {self.promoted_game_port}")
         if self.replicated_state:
-            print("[BACKUP->PRIMARY] Replicated state available -- will restore")
+            print(f"[BACKUP->PRIMARY] Replicated state available (record #{self.replica.seq}) -- will restore")
         else:
             print("[BACKUP->PRIMARY] No replicated state -- starting fresh")
         print("=" * 70)
@@ -181,7 +272,7 @@ class BackupServer:
             self._state_sock.listen(10)
             print(f"[BACKUP] State receiver listening on port {self.state_port}")
 
-            update_counter = [0]
+            update_counter = self._update_counter
 
             while not self.is_primary and self.running:
                 try:
@@ -204,38 +295,21 @@ class BackupServer:
             traceback.print_exc()
 
     def _handle_state_conn(self, conn: socket.socket, counter: list) -> None:
-        """Receive one state snapshot from the primary."""
+        """Apply the primary's replication records until the link closes."""
         try:
             conn.settimeout(5.0)
-            header_buf = b""
-            while b"\n" not in header_buf and len(header_buf) < 1024:
-                chunk = conn.recv(1024)
-                if not chunk:
+            stream = conn.makefile("rb")
+            while self.running and not self.is_primary:
+                header_line = stream.readline(1024)
+                if not header_line:
                     return
-                header_buf += chunk
-
-            if b"STATE_UPDATE:" not in header_buf:
-                return
-
-            header_line, remainder = header_buf.split(b"\n", 1)
-            state_size = int(header_line.split(b":")[1])
-
-            payload = remainder
-            while len(payload) < state_size:
-                chunk = conn.recv(min(65536, state_size - len(payload)))
-                if not chunk:
+                kind, seq, base, created_at, size = parse_header(header_line)
+                payload = stream.read(size)
+                if len(payload) < size:
                     return
-                payload += chunk
-
-            if len(payload) == state_size: #try/except cattura casi e logga un messaggio invece di crashare il backup
-                try:
-                    self.replicated_state = state_from_dict(json.loads(payload)) # parsa i byte come JSON, ricostruisce un State
-                except (json.JSONDecodeError, ValueError, TypeError) as exc:
-                    print(f"[BACKUP] Rejected malformed snapshot: {exc}")
-                    return
-                counter[0] += 1
-                if counter[0] % 20 == 0:
-                    print(f"[BACKUP] State updated (#{counter[0]})")
+                accepted = self._apply_record(kind, seq, base, payload, counter)
+                self._count_record(kind, seq, base, created_at, len(header_line) + size, accepted)
+                conn.sendall(encode_reply(accepted, seq))
 
         except Exception as exc:
             if self.running and not self.is_primary:
@@ -244,4 +318,54 @@ class BackupServer:
             try:
                 conn.close()
             except Exception:
-                pass
\ No newline at end of file
+                pass
+
+    async def _handle_state_conn_async(self, reader: asyncio.StreamReader,
+                                       writer: asyncio.StreamWriter) -> None:
+        """asyncio variant of _handle_state_conn."""
+        try:
+            while self.running and not self.is_primary:
+                header_line = await asyncio.wait_for(reader.readline(), 5.0)
+                if not header_line:
+                    return
+                kind, seq, base, created_at, size = parse_header(header_line)
+                payload = await asyncio.wait_for(reader.readexactly(size), 5.0)
+                accepted = self._apply_record(kind, seq, base, payload, self._update_counter)
+                self._count_record(kind, seq, base, created_at, len(header_line) + size, accepted)
+                writer.write(encode_reply(accepted, seq))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError, OSError) as exc:
+            if self.running and not self.is_primary:
+                print(f"[BACKUP] State handler error: {exc!r}")
+        finally:
+            writer.close()
+
+    def _apply_record(self, kind: str, seq: int, base: int, payload: bytes, counter: list) -> bool:
+        """Applies one record to the replica; False asks the primary for a checkpoint."""
+        try: #try/except cattura casi e logga un messaggio invece di crashare il backup
+            with self._replica_lock:
+                have = self.replica.seq
+                # Checkpoints are checked in full; a diff is checked by applying it
+                validate = _validate_snapshot if kind == RECORD_CHECKPOINT else None
+                applied = self.replica.apply(kind, seq, base, payload, validate=validate)
+        except (json.JSONDecodeError, ValueError, TypeError, KeyError, IndexError, AttributeError) as exc:
+            # The replica keeps the last good state; the NACK brings a checkpoint
+            print(f"[BACKUP] Rejected malformed record #{seq}: {exc!r}, requesting checkpoint")
+            return False
+        if not applied:
+            print(f"[BACKUP] Gap: got record #{seq} on base #{base}, have #{have}, requesting checkpoint")
+            return False
+        counter[0] += 1
+        if counter[0] % 50 == 0:
+            print(f"[BACKUP] State updated (#{counter[0]}, record #{seq})  {format_stats(self.replication.stats())}")
+        return True
+
+    def _count_record(self, kind: str, seq: int, base: int, created_at: float,
+                      size: int, accepted: bool) -> None:
+        """Receive-side metrics: age of the snapshot when applied, records the primary skipped"""
+        self.replication.count(size, kind == RECORD_CHECKPOINT)
+        if not accepted:
+            return
+        self.replication.latency(time.time() - created_at)
+        if kind == RECORD_DIFF:
+            self.replication.dropped += max(0, seq - base - 1)
@@ -0,0 +1,363 @@
+# src/server/fault_tolerance/event_proxy.py
+"""
+Single-threaded variant of TCPProxy built on `selectors` (epoll on Linux).
+
+One loop multiplexes every client/backend pair, including the failover
+reconnection: a lost backend is re-dialled with non-blocking connects
+until the promoted primary answers on the fixed backend port, then the
+RECONNECT handshake and any commands the client sent meanwhile are
+flushed to it. The loop owns a single receive buffer and a single splice
+pipe (see forwarding.Forwarder.relay).
+
+Backpressure is end to end: while a client has unsent data the proxy stops
+reading its backend, so the server's per-connection writer drops stale
+frames instead of the proxy buffering them.
+"""
+import errno
+import selectors
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+import os
+import sys
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.abspath(os.path.join(_here, "..", "..", ".."))
+_src  = os.path.join(_root, "src")
+for _p in (_root, _src):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from common.constants import PROXY_BUFFER_SIZE, PROXY_SESSION_SCAN_BYTES
+from common.binary_protocol import PROTOCOL_LINE
+from server.fault_tolerance.forwarding import DestinationError, Forwarder
+from server.fault_tolerance.proxy_server import ClientSession, TCPProxy
+
+_CONNECT_RETRY = 0.1        # seconds between backend connection attempts
+_INITIAL_CONNECT_TIMEOUT = 15.0
+_STATS_INTERVAL = 10.0
+
+
+class _Pair:
+    """One proxied client and its current backend connection"""
+    def __init__(self, client: socket.socket, addr: Tuple):
+        self.client = client
+        self.session = ClientSession(addr)
+        self.backend: Optional[socket.socket] = None
+        self.connecting = False
+        self.failover = False           # backend lost after being connected once
+        self.deadline = 0.0             # give up reconnecting after this
+        self.retry_at = 0.0
+        self.attempts = 0
+        self.to_client = bytearray()
+        self.to_backend = bytearray()
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self.events: Dict[socket.socket, int] = {}
+
+
+class SelectorProxy(TCPProxy):
+    """TCPProxy with one event loop instead of one thread per client"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._selector = selectors.DefaultSelector()
+        self._pairs: List[_Pair] = []
+        self._buffer = bytearray(PROXY_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._downstream = Forwarder(use_splice=self.use_splice)
+        self._last_stats = 0.0
+        self._reported = None
+
+    def start(self):
+        srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        srv.bind(("0.0.0.0", self.listen_port))
+        srv.listen(128)
+        srv.setblocking(False)
+        self._selector.register(srv, selectors.EVENT_READ, None)
+
+        print("=" * 70)
+        print(f"[PROXY] TCP Proxy -- transparent failover  (event loop: {type(self._selector).__name__})")
+        print(f"[PROXY] Frontend : 0.0.0.0:{self.listen_port}")
+        print(f"[PROXY] Backend  : {self.backend_host}:{self.backend_port}  (FIXED)")
+        print(f"[PROXY] Failover timeout: {self.FAILOVER_TIMEOUT}s")
+        print(f"[PROXY] Forwarding: {'splice' if self._downstream.splicing else 'recv_into'}")
+        print("=" * 70)
+
+        try:
+            while self.running:
+                for key, mask in self._selector.select(timeout=_CONNECT_RETRY):
+                    if key.data is None:
+                        self._accept(srv)
+                    else:
+                        pair, is_client = key.data
+                        self._on_event(pair, key.fileobj, is_client, mask)
+                self._drive_connects()
+                self._log_stats()
+        except KeyboardInterrupt:
+            print("\n[PROXY] Shutting down...")
+        finally:
+            for pair in list(self._pairs):
+                self._close_pair(pair)
+            self._selector.close()
+            self._downstream.close()
+            srv.close()
+
+    def connection_count(self) -> int:
+        return len(self._pairs)
+
+    # ── accept / connect ─────────────────────────────────────────────────────
+
+    def _accept(self, srv: socket.socket) -> None:
+        while True:
+            try:
+                client, addr = srv.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                print(f"[PROXY] Accept error: {exc}")
+                return
+            client.setblocking(False)
+            self._set_keepalive(client)
+            print(f"[PROXY] New connection from {addr}")
+            pair = _Pair(client, addr)
+            pair.deadline = time.time() + _INITIAL_CONNECT_TIMEOUT
+            self._pairs.append(pair)
+            self._start_connect(pair)
+
+    def _start_connect(self, pair: _Pair) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        err = sock.connect_ex((self.backend_host, self.backend_port))
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sock.close()
+            self._schedule_retry(pair)
+            return
+        pair.backend = sock
+        pair.connecting = True
+        self._update_events(pair)
+
+    def _schedule_retry(self, pair: _Pair) -> None:
+        pair.backend = None
+        pair.connecting = False
+        pair.attempts += 1
+        pair.retry_at = time.time() + _CONNECT_RETRY
+        if pair.attempts % 20 == 0:
+            print(
+                f"[PROXY] Still waiting for backend on port "
+                f"{self.backend_port}... (attempt {pair.attempts})"
+            )
+
+    def _drive_connects(self) -> None:
+        """Retries pending backend connections; drops pairs past their deadline."""
+        now = time.time()
+        for pair in list(self._pairs):
+            if pair.backend is not None:
+                continue
+            if now > pair.deadline:
+                if pair.failover:
+                    print(f"[PROXY] [FAIL] Failover failed after {self.FAILOVER_TIMEOUT}s")
+                else:
+                    print(f"[PROXY] Could not reach backend for {pair.session.client_addr}")
+                self._close_pair(pair)
+            elif now >= pair.retry_at:
+                self._start_connect(pair)
+
+    def _on_connected(self, pair: _Pair) -> None:
+        err = pair.backend.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            self._forget(pair, pair.backend)
+            pair.backend.close()
+            self._schedule_retry(pair)
+            return
+        pair.connecting = False
+        pair.attempts = 0
+        self._set_keepalive(pair.backend)
+        if pair.failover:
+            session = pair.session
+            if session.session_id:
+                hello = f"RECONNECT:{session.session_id}\n"
+                if session.binary:
+                    # The new primary must keep framing this client's stream
+                    hello += PROTOCOL_LINE + "\n"
+                pair.to_backend[:0] = hello.encode()
+                print(f"[PROXY] Sent RECONNECT:{session.session_id}")
+            if pair.to_backend:
+                print(f"[PROXY] Flushing {len(pair.to_backend)} buffered byte(s) to new backend")
+            print(f"[PROXY] [OK] Reconnected to new primary on port {self.backend_port}")
+        else:
+            print(f"[PROXY] {pair.session.client_addr} <-> backend:{self.backend_port}")
+        pair.failover = False
+        self._flush(pair, to_client=False)
+        self._update_events(pair)
+
+    def _backend_lost(self, pair: _Pair) -> None:
+        session = pair.session
+        hint = f" (Player {session.player_id} / {session.player_name})" \
+               if session.player_id is not None else ""
+        print(
+            f"[PROXY] Backend lost{hint} -- "
+            f"waiting for new primary on port {self.backend_port}..."
+        )
+        self._forget(pair, pair.backend)
+        self._safe_close(pair.backend)
+        pair.backend = None
+        pair.connecting = False
+        pair.failover = True
+        pair.deadline = time.time() + self.FAILOVER_TIMEOUT
+        pair.retry_at = 0.0
+        self._update_events(pair)
+
+    # ── data path ────────────────────────────────────────────────────────────
+
+    def _on_event(self, pair: _Pair, sock: socket.socket, is_client: bool, mask: int) -> None:
+        if pair not in self._pairs or (not is_client and sock is not pair.backend):
+            return
+        if not is_client and pair.connecting:
+            self._on_connected(pair)
+            return
+        if mask & selectors.EVENT_WRITE:
+            if not self._flush(pair, to_client=is_client):
+                return
+        if mask & selectors.EVENT_READ:
+            if is_client:
+                self._read_client(pair)
+            else:
+                self._read_backend(pair)
+        if pair in self._pairs:
+            self._update_events(pair)
+
+    def _read_client(self, pair: _Pair) -> None:
+        try:
+            n = pair.client.recv_into(self._buffer)
+        except BlockingIOError:
+            return
+        except OSError:
+            n = 0
+        if not n:
+            self._close_pair(pair)
+            return
+        data = self._view[:n]
+        session = pair.session
+        if not session.first_message_seen:
+            session.first_message_seen = True
+            session.binary = PROTOCOL_LINE.encode() in data
+        pair.bytes_up += n
+        pair.to_backend += data
+        if pair.backend is not None and not pair.connecting:
+            self._flush(pair, to_client=False)
+
+    def _read_backend(self, pair: _Pair) -> None:
+        session = pair.session
+        try:
+            if session.inspecting:
+                n = pair.backend.recv_into(self._buffer)
+                if n:
+                    data = bytes(self._view[:n])
+                    self._parse_session(data, session)
+                    session.scanned_bytes += n
+                    if session.scanned_bytes >= PROXY_SESSION_SCAN_BYTES:
+                        session.inspecting = False
+                    pair.to_client += data
+            else:
+                n, leftover = self._downstream.relay(pair.backend, pair.client)
+                pair.to_client += leftover
+        except BlockingIOError:
+            return
+        except DestinationError:
+            self._close_pair(pair)
+            return
+        except OSError:
+            n = 0
+        if not n:
+            self._backend_lost(pair)
+            return
+        pair.bytes_down += n
+        if pair.to_client:
+            self._flush(pair, to_client=True)
+
+    def _flush(self, pair: _Pair, to_client: bool) -> bool:
+        """Sends buffered bytes; returns False if the pair was closed or failed over."""
+        buf = pair.to_client if to_client else pair.to_backend
+        sock = pair.client if to_client else pair.backend
+        if not buf or sock is None:
+            return True
+        try:
+            sent = sock.send(buf)
+        except BlockingIOError:
+            return True
+        except OSError:
+            if to_client:
+                self._close_pair(pair)
+            else:
+                self._backend_lost(pair)
+            return False
+        del buf[:sent]
+        return True
+
+    # ── bookkeeping ──────────────────────────────────────────────────────────
+
+    def _update_events(self, pair: _Pair) -> None:
+        """
+        Client: readable unless too much is waiting for the backend, writable
+        while it has pending output. Backend: writable while connecting or
+        with pending commands, readable only once the client caught up.
+        """
+        client_events = 0
+        if len(pair.to_backend) < PROXY_BUFFER_SIZE:
+            client_events |= selectors.EVENT_READ
+        if pair.to_client:
+            client_events |= selectors.EVENT_WRITE
+        self._set_events(pair, pair.client, client_events, True)
+        if pair.backend is None:
+            return
+        if pair.connecting:
+            backend_events = selectors.EVENT_WRITE
+        else:
+            backend_events = 0 if pair.to_client else selectors.EVENT_READ
+            if pair.to_backend:
+                backend_events |= selectors.EVENT_WRITE
+        self._set_events(pair, pair.backend, backend_events, False)
+
+    def _set_events(self, pair: _Pair, sock: socket.socket, events: int, is_client: bool) -> None:
+        current = pair.events.get(sock, 0)
+        if events == current:
+            return
+        if not events:
+            self._selector.unregister(sock)
+            del pair.events[sock]
+        elif not current:
+            self._selector.register(sock, events, (pair, is_client))
+            pair.events[sock] = events
+        else:
+            self._selector.modify(sock, events, (pair, is_client))
+            pair.events[sock] = events
+
+    def _forget(self, pair: _Pair, sock: Optional[socket.socket]) -> None:
+        if sock is not None and pair.events.pop(sock, 0):
+            self._selector.unregister(sock)
+
+    def _close_pair(self, pair: _Pair) -> None:
+        if pair not in self._pairs:
+            return
+        self._pairs.remove(pair)
+        for sock in (pair.backend, pair.client):
+            self._forget(pair, sock)
+            self._safe_close(sock)
+        print(
+            f"[PROXY] Closed {pair.session.client_addr}  (session={pair.session.session_id}  "
+            f"up={pair.bytes_up}B  down={pair.bytes_down}B)"
+        )
+
+    def _log_stats(self) -> None:
+        now = time.time()
+        if now - self._last_stats < _STATS_INTERVAL:
+            return
+        self._last_stats = now
+        failover = sum(1 for p in self._pairs if p.failover)
+        snapshot = (len(self._pairs), failover)
+        if snapshot != self._reported:
+            self._reported = snapshot
+            print(f"[PROXY] Active: {len(self._pairs)} connection(s)  in failover: {failover}")
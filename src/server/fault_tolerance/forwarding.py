@@ -0,0 +1,143 @@
+# src/server/fault_tolerance/forwarding.py
+"""
+Data path of the TCP proxy.
+
+Once the proxy knows a client's session it no longer needs to look at the
+bytes it forwards. On Linux the backend -> client stream is then moved with
+os.splice through a pipe, so the payload never enters Python; elsewhere
+(or with splice disabled) it is received with recv_into into a buffer
+allocated once, and sent from a memoryview of it. Only the part a slow
+client cannot take right away is copied out.
+"""
+import os
+import select
+import socket
+from typing import Optional, Tuple
+
+import sys
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.abspath(os.path.join(_here, "..", "..", ".."))
+_src  = os.path.join(_root, "src")
+for _p in (_root, _src):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from common.constants import PROXY_BUFFER_SIZE, PROXY_SEND_TIMEOUT
+
+SPLICE_AVAILABLE = hasattr(os, "splice")
+
+
+class DestinationError(OSError):
+    """Writing to the destination failed; the source side is still healthy"""
+
+
+def send_all(sock: socket.socket, data, timeout: float = PROXY_SEND_TIMEOUT) -> None:
+    """sendall for a non-blocking socket: waits for room instead of failing"""
+    view = memoryview(data)
+    while view:
+        try:
+            sent = sock.send(view)
+        except BlockingIOError:
+            if not select.select([], [sock], [], timeout)[1]:
+                raise TimeoutError(f"peer did not read for {timeout}s")
+            continue
+        view = view[sent:]
+
+
+class Forwarder:
+    """One direction of a proxied connection (src -> dst)"""
+    def __init__(self, size: int = PROXY_BUFFER_SIZE, use_splice: bool = True):
+        self.size = size
+        self.bytes_forwarded = 0
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._pipe: Optional[tuple] = None
+        if use_splice and SPLICE_AVAILABLE:
+            try:
+                self._pipe = os.pipe()
+            except OSError:
+                self._pipe = None
+
+    @property
+    def splicing(self) -> bool:
+        return self._pipe is not None
+
+    def recv(self, src: socket.socket) -> memoryview:
+        """
+        Reads what is available into the preallocated buffer. The view is
+        only valid until the next call; an empty view means EOF.
+        Raises BlockingIOError when nothing is ready.
+        """
+        n = src.recv_into(self._buffer)
+        return self._view[:n]
+
+    def relay(self, src: socket.socket, dst: socket.socket) -> Tuple[int, bytes]:
+        """
+        Non-blocking: moves one chunk from src to dst without inspecting it.
+        Returns (bytes read, the part dst could not take yet); 0 bytes read
+        means EOF on src. Raises BlockingIOError when src has nothing,
+        DestinationError when dst fails, OSError when src fails.
+
+        The pipe and buffer are left empty afterwards, so one Forwarder can
+        serve every connection of an event loop.
+        """
+        if self._pipe is None:
+            n = src.recv_into(self._buffer)
+            sent = self._send_some(dst, self._view[:n]) if n else 0
+            self.bytes_forwarded += n
+            return n, bytes(self._view[sent:n])
+        pipe_r, pipe_w = self._pipe
+        n = os.splice(src.fileno(), pipe_w, self.size, flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+        sent = 0
+        try:
+            while sent < n:
+                sent += os.splice(pipe_r, dst.fileno(), n - sent,
+                                  flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+        except BlockingIOError:
+            pass
+        except OSError as exc:
+            self._read_pipe(n - sent)
+            raise DestinationError(str(exc)) from exc
+        self.bytes_forwarded += n
+        return n, self._read_pipe(n - sent)
+
+    def forward(self, src: socket.socket, dst: socket.socket) -> int:
+        """
+        Blocking variant of relay() for the thread-per-client proxy: waits
+        (up to PROXY_SEND_TIMEOUT) until dst has taken the whole chunk.
+        """
+        n, leftover = self.relay(src, dst)
+        if leftover:
+            try:
+                send_all(dst, leftover)
+            except OSError as exc:
+                raise DestinationError(str(exc)) from exc
+        return n
+
+    @staticmethod
+    def _send_some(dst: socket.socket, data: memoryview) -> int:
+        try:
+            return dst.send(data)
+        except BlockingIOError:
+            return 0
+        except OSError as exc:
+            raise DestinationError(str(exc)) from exc
+
+    def _read_pipe(self, size: int) -> bytes:
+        """Empties `size` bytes left in the pipe into user space"""
+        chunks = []
+        while size > 0:
+            chunk = os.read(self._pipe[0], size)
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self) -> None:
+        if self._pipe:
+            for fd in self._pipe:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            self._pipe = None
@@ -1,8 +1,8 @@
+import asyncio
 import socket
 import threading
-import json
 import time
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import os
 import sys
@@ -14,12 +14,85 @@ for _p in (_root, _src):
     if _p not in sys.path:
         sys.path.insert(0, _p)
 
-from server.models import state_to_dict
+from server.fault_tolerance.replication import (
+    ReplicationLog, ReplicationStats, format_stats, parse_reply,
+)
+
+
+class _BackupLink:
+    """
+    Persistent replication channel to one backup.
+
+    The sender always ships the newest record: while a send (or the
+    reconnect) is in progress newer snapshots simply replace older ones,
+    so a slow backup skips records instead of queueing them.
+    """
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.sock: Optional[socket.socket] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.sender = None                  # Thread or asyncio.Task
+        self.cond = threading.Condition()   # threaded mode: new record / NACK
+        self.wakeup: Optional[asyncio.Event] = None
+        self.base_seq = 0
+        self.base: Optional[dict] = None    # last snapshot sent
+        self.needs_checkpoint = True
+        self.checkpoint_seq = 0
+        self.sent_at: Dict[int, float] = {}
+        self.stats = ReplicationStats()
+
+    def close(self) -> None:
+        if self.sock:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+        if self.writer:
+            self.writer.close()
+        self.sock = self.writer = None
+        self.needs_checkpoint = True
+        self.sent_at.clear()
+
+    def on_reply(self, line: bytes) -> None:
+        """ACK: latency sample; NACK for a record older than the last checkpoint is stale"""
+        accepted, seq = parse_reply(line)
+        if accepted:
+            sent = self.sent_at.pop(seq, None)
+            for old in [s for s in self.sent_at if s < seq]:
+                del self.sent_at[old]
+            if sent is not None:
+                self.stats.latency(time.monotonic() - sent)
+        elif seq >= self.checkpoint_seq:
+            self.needs_checkpoint = True
+
+    def next_record(self, log: ReplicationLog) -> Tuple[int, dict, bytes]:
+        """Newest record for this backup; counts the records it skips"""
+        base = None if self.needs_checkpoint else self.base
+        seq, snapshot, record, checkpoint = log.record(self.base_seq, base)
+        if base is not None:
+            self.stats.dropped += max(0, seq - self.base_seq - 1)
+        self.needs_checkpoint = False
+        if checkpoint:
+            self.checkpoint_seq = seq
+        self.sent_at[seq] = time.monotonic()
+        self.stats.count(len(record), checkpoint)
+        return seq, snapshot, record
+
+    def has_news(self, log: ReplicationLog) -> bool:
+        return log.seq > 0 and (self.needs_checkpoint or log.seq > self.base_seq)
+
+
 class PrimaryServer:
     """
     Implements the primary-side fault-tolerance duties:
       * Heartbeat responder  (TCP, one short-lived connection per probe)
-      * Periodic state replication to every registered backup
+      * Periodic state replication to every registered backup: the game's
+        latest published snapshot (read without the game lock) as a DIFF
+        record per interval over one persistent connection per backup,
+        with a full CHECKPOINT on (re)connect, on NACK and periodically.
+        Each backup has its own sender, so a slow one never delays the
+        others; it just receives fewer, newer records.
     """
 
     def __init__(
@@ -28,15 +101,19 @@ class PrimaryServer:
         backup_state_ports: List[Tuple[str, int]],
         heartbeat_port: int,
         replication_interval: float = 0.1,
+        checkpoint_interval: Optional[int] = None,
     ):
         """
         Args:
-            game_service         : live GameService instance
+            game_service         : live GameService, or anything with its snapshot()
+                                   (the server passes its RoomManager)
             backup_state_ports   : list of (host, state_receiver_port)
                                    e.g. [("localhost", 5557)]
             heartbeat_port       : port to listen on for heartbeat probes
                                    e.g. 5565
             replication_interval : seconds between state snapshots
+            checkpoint_interval  : records between full checkpoints
+                                   (default REPLICATION_CHECKPOINT_INTERVAL)
         """
         self.game_service = game_service
         self.backup_state_ports = list(backup_state_ports)
@@ -44,7 +121,12 @@ class PrimaryServer:
         self.replication_interval = replication_interval
         self.running = True
         self._replication_counter = 0
+        self._replicated_version = 0
         self._lock = threading.Lock()
+        self.log = ReplicationLog() if checkpoint_interval is None else ReplicationLog(checkpoint_interval)
+        self._links: Dict[Tuple[str, int], _BackupLink] = {
+            entry: _BackupLink(*entry) for entry in self.backup_state_ports
+        }
 
         print(
             f"[PRIMARY] Initialized  heartbeat_port={heartbeat_port}  "
@@ -68,17 +150,56 @@ class PrimaryServer:
         ).start()
         print(f"[PRIMARY] State replication starting (interval={self.replication_interval}s)")
 
+    async def serve_async(self) -> None:
+        """asyncio variant of start(): heartbeats and replication on the running loop."""
+        try:
+            heartbeat_server = await asyncio.start_server(
+                self._handle_heartbeat_async, "0.0.0.0", self.heartbeat_port
+            )
+        except OSError as exc:
+            print(f"[PRIMARY] Fatal heartbeat error: {exc}")
+            return
+        print(f"[PRIMARY] Heartbeat responder listening on port {self.heartbeat_port} (asyncio)")
+        print(f"[PRIMARY] State replication starting (interval={self.replication_interval}s)")
+        try:
+            while self.running:
+                try:
+                    self._append_snapshot()
+                    for link in self._current_links():
+                        if link.sender is None or link.sender.done():
+                            link.wakeup = asyncio.Event()
+                            link.sender = asyncio.get_running_loop().create_task(self._link_sender_async(link))
+                        link.wakeup.set()
+                    self._log_replication()
+                except Exception as exc:
+                    print(f"[PRIMARY] Replication error: {exc}")
+                await asyncio.sleep(self.replication_interval)
+        finally:
+            heartbeat_server.close()
+            for link in self._current_links():
+                link.close()
+
     def add_backup(self, host: str, state_port: int) -> None:
         """Dynamically register a new backup target (thread-safe)."""
         with self._lock:
             entry = (host, state_port)
             if entry not in self.backup_state_ports:
                 self.backup_state_ports.append(entry)
+                self._links[entry] = _BackupLink(host, state_port)
                 print(f"[PRIMARY] Added backup target {host}:{state_port}")
 
     def stop(self) -> None:
         print("[PRIMARY] Stopping...")
         self.running = False
+        for link in self._current_links():
+            with link.cond:
+                link.cond.notify_all()
+            if link.wakeup:
+                link.wakeup.set()
+
+    def replication_stats(self) -> Dict[str, dict]:
+        """Per-backup counters, throughput and ACK latency percentiles"""
+        return {f"{link.host}:{link.port}": link.stats.stats() for link in self._current_links()}
 
    
 
@@ -130,48 +251,164 @@ class PrimaryServer:
             except Exception:
                 pass
 
+    @staticmethod
+    async def _handle_heartbeat_async(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            data = await asyncio.wait_for(reader.read(64), 1.0)
+            if data == b"HEARTBEAT":
+                writer.write(b"ALIVE")
+                await writer.drain()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
     
     def _periodic_replication(self) -> None:
         while self.running:
             try:
-                snapshot = json.dumps(state_to_dict(self.game_service.state)).encode("utf-8")
-                with self._lock:
-                    targets = list(self.backup_state_ports)
-
-                ok = sum(
-                    1 for host, port in targets
-                    if self._send_snapshot(host, port, snapshot)
-                )
-
-                self._replication_counter += 1
-                if self._replication_counter % 10 == 0:
-                    print(
-                        f"[PRIMARY] Replicated to {ok}/{len(targets)} backup(s)  "
-                        f"(tick #{self._replication_counter})"
-                    )
+                self._append_snapshot()
+                for link in self._current_links():
+                    if link.sender is None or not link.sender.is_alive():
+                        link.sender = threading.Thread(
+                            target=self._link_sender, args=(link,), daemon=True,
+                            name=f"primary-replication-{link.port}",
+                        )
+                        link.sender.start()
+                    with link.cond:
+                        link.cond.notify()
+                self._log_replication()
 
             except Exception as exc:
                 print(f"[PRIMARY] Replication error: {exc}")
 
             time.sleep(self.replication_interval)
 
-    def _send_snapshot(self, host: str, port: int, snapshot: bytes) -> bool:
-        """Push one state snapshot to a backup. Returns True on success."""
-        sock = None
+    def _append_snapshot(self) -> None:
+        """Logs the game's latest published snapshot unless it already was"""
+        snapshot = self.game_service.snapshot()
+        if snapshot.version != self._replicated_version:
+            self._replicated_version = snapshot.version
+            self.log.append(snapshot.replica)
+
+    def _current_links(self) -> List[_BackupLink]:
+        with self._lock:
+            return list(self._links.values())
+
+    def _log_replication(self) -> None:
+        self._replication_counter += 1
+        if self._replication_counter % 50 == 0:
+            for link in self._current_links():
+                state = "up" if link.sock or link.writer else "down"
+                print(
+                    f"[PRIMARY] Replication -> {link.host}:{link.port} ({state}, record #{self.log.seq})  "
+                    f"{format_stats(link.stats.stats())}"
+                )
+
+    def _log_link_failure(self, link: _BackupLink, exc: Exception) -> None:
+        if self._replication_counter % 20 == 0:
+            print(f"[PRIMARY] Replication failed -> {link.host}:{link.port}  ({exc!r})")
+
+    def _link_sender(self, link: _BackupLink) -> None:
+        """Ships the newest record to one backup whenever there is one."""
+        while self.running:
+            with link.cond:
+                link.cond.wait_for(lambda: not self.running or link.has_news(self.log), timeout=1.0)
+                if not self.running or not link.has_news(self.log):
+                    continue
+            if link.sock is None and not self._connect(link):
+                time.sleep(self.replication_interval)
+                continue
+            with link.cond:
+                sock = link.sock
+                if sock is None:
+                    continue
+                seq, snapshot, record = link.next_record(self.log)
+            try:
+                sock.sendall(record)
+            except OSError as exc:
+                self._log_link_failure(link, exc)
+                with link.cond:
+                    if link.sock is sock:
+                        link.close()
+                continue
+            with link.cond:
+                link.base_seq, link.base = seq, snapshot
+        with link.cond:
+            link.close()
+
+    def _connect(self, link: _BackupLink) -> bool:
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2.0)
-            sock.connect((host, port))
-            header = f"STATE_UPDATE:{len(snapshot)}\n".encode()
-            sock.sendall(header + snapshot)
-            return True
-        except Exception as exc:
-            if self._replication_counter % 20 == 0:
-                print(f"[PRIMARY] Replication failed -> {host}:{port}  ({exc})")
+            sock = socket.create_connection((link.host, link.port), timeout=2.0)
+        except OSError as exc:
+            self._log_link_failure(link, exc)
             return False
-        finally:
-            if sock:
+        with link.cond:
+            link.sock = sock
+            link.needs_checkpoint = True
+        threading.Thread(target=self._read_replies, args=(link, sock), daemon=True).start()
+        return True
+
+    def _read_replies(self, link: _BackupLink, sock: socket.socket) -> None:
+        """Reads ACK/NACK lines until the channel closes."""
+        buf = b""
+        try:
+            while self.running:
                 try:
-                    sock.close()
-                except Exception:
-                    pass
\ No newline at end of file
+                    chunk = sock.recv(4096)
+                except socket.timeout:
+                    continue
+                if not chunk:
+                    break
+                buf += chunk
+                *lines, buf = buf.split(b"\n")
+                with link.cond:
+                    for line in lines:
+                        link.on_reply(line)
+                    link.cond.notify()
+        except (OSError, ValueError):
+            pass
+        with link.cond:
+            if link.sock is sock:
+                link.close()
+                link.cond.notify()
+
+    async def _link_sender_async(self, link: _BackupLink) -> None:
+        """asyncio variant of _link_sender."""
+        while self.running:
+            if not link.has_news(self.log):
+                link.wakeup.clear()
+                await link.wakeup.wait()
+                continue
+            try:
+                if link.writer is None:
+                    reader, link.writer = await asyncio.wait_for(
+                        asyncio.open_connection(link.host, link.port), 2.0
+                    )
+                    link.needs_checkpoint = True
+                    asyncio.get_running_loop().create_task(self._read_replies_async(link, reader, link.writer))
+                seq, snapshot, record = link.next_record(self.log)
+                link.writer.write(record)
+                await asyncio.wait_for(link.writer.drain(), 2.0)
+                link.base_seq, link.base = seq, snapshot
+            except (OSError, asyncio.TimeoutError) as exc:
+                self._log_link_failure(link, exc)
+                link.close()
+                await asyncio.sleep(self.replication_interval)
+        link.close()
+
+    @staticmethod
+    async def _read_replies_async(link: _BackupLink, reader: asyncio.StreamReader,
+                                  writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                link.on_reply(line)
+                link.wakeup.set()
+        except (OSError, ValueError):
+            pass
+        if link.writer is writer:
+            link.close()
+            link.wakeup.set()
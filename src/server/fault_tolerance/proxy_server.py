@@ -16,7 +16,9 @@ for _p in (_root, _src):
     if _p not in sys.path:
         sys.path.insert(0, _p)
 
-from common.constants import PROXY_FRONTEND_PORT, PRIMARY_GAME_PORT
+from common.constants import PROXY_FRONTEND_PORT, PRIMARY_GAME_PORT, PROXY_SESSION_SCAN_BYTES
+from common.binary_protocol import PROTOCOL_LINE
+from server.fault_tolerance.forwarding import SPLICE_AVAILABLE, DestinationError, Forwarder, send_all
 
 
 class ClientSession:
@@ -28,6 +30,10 @@ class ClientSession:
         self.player_id: Optional[int] = None
         self.player_name: Optional[str] = None
         self.is_spectator: bool = False
+        self.first_message_seen: bool = False
+        self.binary: bool = False   # client negotiated the binary protocol
+        self.inspecting: bool = True  # backend data still scanned for join_success
+        self.scanned_bytes: int = 0
 
     def __repr__(self):
         return (
@@ -43,6 +49,8 @@ class TCPProxy:
     * Session capture from server's join_success JSON response
     * RECONNECT handshake on backend reconnection after failover
     * Client-side buffering during failover window
+    * Opaque forwarding once the session is known (os.splice on Linux,
+      recv_into into preallocated buffers elsewhere)
     """
 
     FAILOVER_TIMEOUT = 30.0  
@@ -51,9 +59,11 @@ class TCPProxy:
         self,
         listen_port: int = PROXY_FRONTEND_PORT,
         backend_port: int = PRIMARY_GAME_PORT,
+        use_splice: bool = True,
     ):
         self.listen_port = listen_port
         self.backend_port = backend_port
+        self.use_splice = use_splice and SPLICE_AVAILABLE
         self.backend_host = "localhost"
         self.running = True
         self._active: Dict[Tuple, threading.Thread] = {}
@@ -70,6 +80,7 @@ class TCPProxy:
         print(f"[PROXY] Frontend : 0.0.0.0:{self.listen_port}")
         print(f"[PROXY] Backend  : {self.backend_host}:{self.backend_port}  (FIXED)")
         print(f"[PROXY] Failover timeout: {self.FAILOVER_TIMEOUT}s")
+        print(f"[PROXY] Forwarding: {'splice' if self.use_splice else 'recv_into'}")
         print("=" * 70)
 
         threading.Thread(target=self._reap_threads, daemon=True).start()
@@ -102,6 +113,8 @@ class TCPProxy:
     def _handle_connection(self, client_sock: socket.socket, addr: Tuple):
         backend_sock = None
         session = ClientSession(addr)
+        upstream = Forwarder(use_splice=False)   # client commands: small, buffered on failover
+        downstream = Forwarder(use_splice=self.use_splice)
         try:
             backend_sock = self._connect_backend(wait=True)
             if not backend_sock:
@@ -109,110 +122,105 @@ class TCPProxy:
                 return
             self._set_keepalive(backend_sock)
             print(f"[PROXY] {addr} <-> backend:{self.backend_port}")
-            self._forward(client_sock, backend_sock, session)
+            self._forward(client_sock, backend_sock, session, upstream, downstream)
         except Exception as exc:
             print(f"[PROXY] Error for {addr}: {exc}")
         finally:
             for s in (backend_sock, client_sock):
                 self._safe_close(s)
-            print(f"[PROXY] Closed {addr}  (session={session.session_id})")
+            for forwarder in (upstream, downstream):
+                forwarder.close()
+            print(
+                f"[PROXY] Closed {addr}  (session={session.session_id}  "
+                f"up={upstream.bytes_forwarded}B  down={downstream.bytes_forwarded}B)"
+            )
 
     def _forward(
         self,
         client_sock: socket.socket,
         backend_sock: socket.socket,
         session: ClientSession,
+        upstream: Forwarder,
+        downstream: Forwarder,
     ):
         """Forward data both ways; handle backend failures transparently."""
         client_sock.setblocking(False)
         backend_sock.setblocking(False)
 
-        sockets = [client_sock, backend_sock]
         client_buf: List[bytes] = []
-        in_failover = False
 
         while self.running:
+            sockets = [client_sock, backend_sock]
             try:
                 readable, _, exceptional = select.select(sockets, [], sockets, 0.5)
             except Exception:
                 break
-            for s in exceptional:
-                if s is backend_sock and not in_failover:
-                    in_failover = True
-                    new_be = self._do_failover(backend_sock, session)
-                    if new_be:
-                        backend_sock = new_be
-                        backend_sock.setblocking(False)
-                        sockets = [client_sock, backend_sock]
-                        self._flush_buf(client_buf, backend_sock)
-                        in_failover = False
-                    else:
-                        return
-                elif s is client_sock:
-                    return
-            for s in readable:
+            if client_sock in exceptional:
+                return
+            backend_lost = backend_sock in exceptional
+
+            if client_sock in readable:
                 try:
-                    data = s.recv(8192)
+                    data = upstream.recv(client_sock)
                 except BlockingIOError:
-                    continue
+                    data = None
                 except OSError:
-                    if s is client_sock:
-                        return
-                    if not in_failover:
-                        in_failover = True
-                        new_be = self._do_failover(backend_sock, session)
-                        if new_be:
-                            backend_sock = new_be
-                            backend_sock.setblocking(False)
-                            sockets = [client_sock, backend_sock]
-                            self._flush_buf(client_buf, backend_sock)
-                            in_failover = False
-                        else:
-                            return
-                    continue
-
-                if not data:
-                    if s is client_sock:
+                    return
+                if data is not None:
+                    if not data:
                         return
-                    if not in_failover:
-                        in_failover = True
-                        new_be = self._do_failover(backend_sock, session)
-                        if new_be:
-                            backend_sock = new_be
-                            backend_sock.setblocking(False)
-                            sockets = [client_sock, backend_sock]
-                            self._flush_buf(client_buf, backend_sock)
-                            in_failover = False
-                        else:
-                            return
-                    continue
-
-                if s is client_sock:
-                    if in_failover:
-                        client_buf.append(data)
-                    else:
-                        try:
-                            backend_sock.sendall(data)
-                        except OSError:
-                            if not in_failover:
-                                client_buf.append(data)
-                                in_failover = True
-                                new_be = self._do_failover(backend_sock, session)
-                                if new_be:
-                                    backend_sock = new_be
-                                    backend_sock.setblocking(False)
-                                    sockets = [client_sock, backend_sock]
-                                    self._flush_buf(client_buf, backend_sock)
-                                    in_failover = False
-                                else:
-                                    return
-                else:
-                    if not session.session_id:
-                        self._parse_session(data, session)
+                    if not session.first_message_seen:
+                        session.first_message_seen = True
+                        session.binary = PROTOCOL_LINE.encode() in data
                     try:
-                        client_sock.sendall(data)
+                        send_all(backend_sock, data)
+                        upstream.bytes_forwarded += len(data)
                     except OSError:
-                        return
+                        client_buf.append(bytes(data))
+                        backend_lost = True
+
+            if backend_sock in readable and not backend_lost:
+                try:
+                    if session.inspecting:
+                        moved = self._relay_inspected(backend_sock, client_sock, session, downstream)
+                    else:
+                        moved = downstream.forward(backend_sock, client_sock)
+                    backend_lost = moved == 0
+                except BlockingIOError:
+                    pass
+                except DestinationError:
+                    return
+                except OSError:
+                    backend_lost = True
+
+            if backend_lost:
+                backend_sock = self._do_failover(backend_sock, session)
+                if not backend_sock:
+                    return
+                backend_sock.setblocking(False)
+                self._flush_buf(client_buf, backend_sock)
+
+    def _relay_inspected(
+        self,
+        backend_sock: socket.socket,
+        client_sock: socket.socket,
+        session: ClientSession,
+        downstream: Forwarder,
+    ) -> int:
+        """Forward one backend chunk while still looking for the join response."""
+        data = downstream.recv(backend_sock)
+        if not data:
+            return 0
+        self._parse_session(bytes(data), session)
+        session.scanned_bytes += len(data)
+        if session.scanned_bytes >= PROXY_SESSION_SCAN_BYTES:
+            session.inspecting = False
+        try:
+            send_all(client_sock, data)
+        except OSError as exc:
+            raise DestinationError(str(exc)) from exc
+        downstream.bytes_forwarded += len(data)
+        return len(data)
 
 
     def _do_failover(
@@ -239,7 +247,11 @@ class TCPProxy:
 
         if session.session_id:
             try:
-                new_sock.sendall(f"RECONNECT:{session.session_id}\n".encode())
+                hello = f"RECONNECT:{session.session_id}\n"
+                if session.binary:
+                    # The new primary must keep framing this client's stream
+                    hello += PROTOCOL_LINE + "\n"
+                new_sock.sendall(hello.encode())
                 print(f"[PROXY] Sent RECONNECT:{session.session_id}")
             except Exception as exc:
                 print(f"[PROXY] Failed to send RECONNECT: {exc}")
@@ -285,17 +297,21 @@ class TCPProxy:
 
     def _parse_session(self, data: bytes, session: ClientSession):
         """Extract session metadata from the server's join_success JSON."""
+        decoder = json.JSONDecoder()
         try:
             text = data.decode("utf-8", errors="replace")
             for line in text.split("\n"):
-                line = line.strip()
-                if not line:
+                # Binary protocol: the JSON sits inside a frame, after its header
+                start = line.find("{")
+                if start < 0:
                     continue
                 try:
-                    msg = json.loads(line)
+                    msg, _ = decoder.raw_decode(line, start)
                     if not isinstance(msg, dict):
                         continue
                     if msg.get("join_success"):
+                        # From here on the backend stream is forwarded opaquely
+                        session.inspecting = False
                         session.player_id   = msg.get("player_id")
                         session.player_name = msg.get("player_name")
                         session.is_spectator = msg.get("is_spectator", False)
@@ -327,7 +343,7 @@ class TCPProxy:
         print(f"[PROXY] Flushing {len(buf)} buffered chunk(s) to new backend")
         for chunk in buf:
             try:
-                sock.sendall(chunk)
+                send_all(sock, chunk)
             except Exception as exc:
                 print(f"[PROXY] Flush error: {exc}")
                 break
@@ -382,9 +398,25 @@ def main():
         "--backend-port", type=int, default=PRIMARY_GAME_PORT,
         help=f"Fixed backend port (default: {PRIMARY_GAME_PORT})",
     )
+    parser.add_argument(
+        "--no-splice", action="store_true",
+        help="Copy through preallocated buffers instead of os.splice (Linux only)",
+    )
+    parser.add_argument(
+        "--event-loop", action="store_true",
+        help="Serve all clients from one selectors/epoll loop instead of a thread per client",
+    )
     args = parser.parse_args()
 
-    proxy = TCPProxy(listen_port=args.listen_port, backend_port=args.backend_port)
+    proxy_class = TCPProxy
+    if args.event_loop:
+        from server.fault_tolerance.event_proxy import SelectorProxy
+        proxy_class = SelectorProxy
+    proxy = proxy_class(
+        listen_port=args.listen_port,
+        backend_port=args.backend_port,
+        use_splice=not args.no_splice,
+    )
     proxy.start()
 
 
@@ -0,0 +1,319 @@
+# src/server/fault_tolerance/replication.py
+"""
+Replication log shipped from the primary to its backups.
+
+The primary turns each replication snapshot (the `state_to_dict` shape) into
+a record with a sequence number: a DIFF against an earlier snapshot, or a
+full CHECKPOINT every `checkpoint_interval` records and whenever a backup
+(re)connects or reports a gap. Records travel over one persistent
+connection per backup as
+
+    <KIND>:<seq>:<base seq>:<creation time>:<payload length>\\n<JSON payload>
+
+and the backup answers every record with ACK:<seq>\\n or NACK:<seq>\\n.
+A backup that is behind is not sent the records it missed: the next record
+is a DIFF from the last snapshot it was sent straight to the newest one.
+
+The backup applies records in order (ReplicaState). A DIFF whose base is
+not the last applied seq is refused with NACK and the primary sends a
+checkpoint next.
+
+CHECKPOINT payloads carry the map as a base64 2 bit per tile buffer
+(server.tilemap.pack) instead of rows of JSON ints.
+
+A snapshot may hold other rooms under "rooms" (room id -> snapshot of the
+same shape, see RoomManager.snapshot()); each one is diffed and packed
+like the top-level one.
+
+Unlike the broadcast deltas (common.state_delta), bombs, timers and every
+other field are replicated exactly: the backup must resume the simulation.
+"""
+import base64
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import os
+import sys
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.abspath(os.path.join(_here, "..", "..", ".."))
+_src  = os.path.join(_root, "src")
+for _p in (_root, _src):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from common.constants import REPLICATION_CHECKPOINT_INTERVAL, REPLICATION_STATS_WINDOW
+from common.state_delta import diff_chat, diff_map
+from common.stats import percentile
+from server import tilemap
+
+RECORD_CHECKPOINT = "CHECKPOINT"
+RECORD_DIFF = "DIFF"
+ACK = "ACK"
+NACK = "NACK"
+
+# Keys holding id -> entry dicts, diffed entry by entry
+_KEYED = ("players", "spectators", "client_player_mapping")
+_MAP_KEY = "game_map"
+_PACKED_MAP = "packed"
+_CHAT_KEY = "chat_messages"
+_ROOMS_KEY = "rooms"
+_MISSING = object()
+
+
+def diff_snapshot(prev: Dict[str, Any], curr: Dict[str, Any]) -> Dict[str, Any]:
+    """Changes turning snapshot `prev` into `curr` (both in JSON shape)"""
+    diff: Dict[str, Any] = {}
+    changed = {}
+    for key, value in curr.items():
+        old = prev.get(key, _MISSING)
+        if old == value:
+            continue
+        if key == _MAP_KEY and old is not _MISSING:
+            tiles = diff_map(old, value)
+            if tiles is not None:
+                diff["tiles"] = tiles
+                continue
+        elif key in _KEYED and isinstance(old, dict):
+            entries = {k: v for k, v in value.items() if old.get(k, _MISSING) != v}
+            removed = [k for k in old if k not in value]
+            diff.setdefault("keyed", {})[key] = {"set": entries, "del": removed}
+            continue
+        elif key == _CHAT_KEY and old is not _MISSING:
+            appended = diff_chat(old, value)
+            if appended is not None:
+                diff["chat"] = {"append": appended, "keep": len(value)}
+                continue
+        elif key == _ROOMS_KEY and isinstance(old, dict):
+            diff["rooms"] = {
+                "set": {rid: room for rid, room in value.items() if rid not in old},
+                "diff": {rid: diff_snapshot(old[rid], room) for rid, room in value.items()
+                         if rid in old and old[rid] != room},
+                "del": [rid for rid in old if rid not in value],
+            }
+            continue
+        changed[key] = value
+    if changed:
+        diff["set"] = changed
+    return diff
+
+
+def apply_snapshot_diff(base: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a new snapshot with `diff` applied; `base` is not mutated"""
+    snapshot = dict(base)
+    snapshot.update(diff.get("set", {}))
+    tiles = diff.get("tiles")
+    if tiles:
+        game_map = list(snapshot[_MAP_KEY])
+        copied = set()
+        for x, y, tile in tiles:
+            if y not in copied:
+                game_map[y] = list(game_map[y])
+                copied.add(y)
+            game_map[y][x] = tile
+        snapshot[_MAP_KEY] = game_map
+    for key, change in diff.get("keyed", {}).items():
+        entries = dict(snapshot.get(key, {}))
+        for k in change["del"]:
+            entries.pop(k, None)
+        entries.update(change["set"])
+        snapshot[key] = entries
+    chat = diff.get("chat")
+    if chat:
+        messages = list(snapshot.get(_CHAT_KEY, [])) + chat["append"]
+        snapshot[_CHAT_KEY] = messages[len(messages) - chat["keep"]:] if chat["keep"] else []
+    rooms_change = diff.get("rooms")
+    if rooms_change:
+        rooms = dict(snapshot.get(_ROOMS_KEY, {}))
+        for rid in rooms_change["del"]:
+            rooms.pop(rid, None)
+        for rid, room_diff in rooms_change["diff"].items():
+            rooms[rid] = apply_snapshot_diff(rooms[rid], room_diff)
+        rooms.update(rooms_change["set"])
+        snapshot[_ROOMS_KEY] = rooms
+    return snapshot
+
+
+def encode_checkpoint(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Checkpoint payload: the snapshot with its map (and every room's) packed"""
+    payload = dict(snapshot)
+    if _ROOMS_KEY in payload:
+        payload[_ROOMS_KEY] = {rid: encode_checkpoint(room) for rid, room in payload[_ROOMS_KEY].items()}
+    game_map = snapshot.get(_MAP_KEY)
+    if not game_map:
+        return payload
+    try:
+        packed = tilemap.pack(game_map)
+    except ValueError:
+        return payload      # tiles outside 2 bits: ship the rows
+    payload[_MAP_KEY] = {_PACKED_MAP: base64.b64encode(packed).decode("ascii")}
+    return payload
+
+
+def decode_checkpoint(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of encode_checkpoint"""
+    game_map = payload.get(_MAP_KEY)
+    if isinstance(game_map, dict):
+        payload[_MAP_KEY] = tilemap.unpack(base64.b64decode(game_map[_PACKED_MAP]))
+    for room in payload.get(_ROOMS_KEY, {}).values():
+        decode_checkpoint(room)
+    return payload
+
+
+def encode_record(kind: str, seq: int, base: int, created_at: float, payload: Dict[str, Any]) -> bytes:
+    body = json.dumps(payload).encode("utf-8")
+    return f"{kind}:{seq}:{base}:{created_at:.6f}:{len(body)}\n".encode() + body
+
+
+def parse_header(line: bytes) -> Tuple[str, int, int, float, int]:
+    """Splits a record header line into (kind, seq, base seq, creation time, payload length)"""
+    kind, seq, base, created_at, size = line.decode("ascii").strip().split(":")
+    if kind not in (RECORD_CHECKPOINT, RECORD_DIFF):
+        raise ValueError(f"unknown record kind {kind!r}")
+    return kind, int(seq), int(base), float(created_at), int(size)
+
+
+def encode_reply(accepted: bool, seq: int) -> bytes:
+    return f"{ACK if accepted else NACK}:{seq}\n".encode()
+
+
+def parse_reply(line: bytes) -> Tuple[bool, int]:
+    """Splits a backup reply into (accepted, seq)"""
+    verb, seq = line.decode("ascii").strip().split(":")
+    if verb not in (ACK, NACK):
+        raise ValueError(f"unknown reply {verb!r}")
+    return verb == ACK, int(seq)
+
+
+class ReplicationLog:
+    """
+    Primary side: the newest snapshot and its records.
+
+    Backups that received the previous record share one encoded DIFF;
+    a backup that fell behind gets a DIFF from the last snapshot it was
+    sent (the records in between are dropped), or a checkpoint.
+    """
+    def __init__(self, checkpoint_interval: int = REPLICATION_CHECKPOINT_INTERVAL):
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.seq = 0
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.created_at = 0.0
+        self._lock = threading.Lock()
+        self._diff_record: Optional[bytes] = None
+        self._checkpoint_record: Optional[bytes] = None
+
+    def append(self, snapshot: Dict[str, Any]) -> int:
+        """Adds the newest snapshot; returns its sequence number"""
+        with self._lock:
+            self.seq += 1
+            previous, self.snapshot = self.snapshot, snapshot
+            self.created_at = time.time()
+            self._checkpoint_record = None
+            self._diff_record = None
+            if previous is not None and not self._checkpoint_due():
+                self._diff_record = encode_record(RECORD_DIFF, self.seq, self.seq - 1, self.created_at,
+                                                  diff_snapshot(previous, snapshot))
+            return self.seq
+
+    def record(self, base_seq: int, base: Optional[Dict[str, Any]]) -> Tuple[int, Dict[str, Any], bytes, bool]:
+        """
+        Newest record for a backup whose last received snapshot is `base`
+        (None forces a checkpoint). Returns (seq, snapshot, encoded record, is checkpoint).
+        """
+        with self._lock:
+            seq, snapshot, created_at = self.seq, self.snapshot, self.created_at
+            if base is None or self._checkpoint_due():
+                if self._checkpoint_record is None:
+                    self._checkpoint_record = encode_record(RECORD_CHECKPOINT, seq, 0, created_at,
+                                                                 encode_checkpoint(snapshot))
+                return seq, snapshot, self._checkpoint_record, True
+            if base_seq == seq - 1 and self._diff_record is not None:
+                return seq, snapshot, self._diff_record, False
+        # Lagging backup: diff outside the lock, it is specific to this link
+        diff = diff_snapshot(base, snapshot)
+        return seq, snapshot, encode_record(RECORD_DIFF, seq, base_seq, created_at, diff), False
+
+    def _checkpoint_due(self) -> bool:
+        return self.seq % self.checkpoint_interval == 0
+
+
+class ReplicationStats:
+    """Record count, bytes, drops and latency window for one end of a link"""
+    def __init__(self, window: int = REPLICATION_STATS_WINDOW):
+        self.records = 0
+        self.bytes = 0
+        self.checkpoints = 0
+        self.dropped = 0
+        self.started_at = time.monotonic()
+        self._latencies: deque = deque(maxlen=window)
+
+    def count(self, size: int, checkpoint: bool) -> None:
+        self.records += 1
+        self.bytes += size
+        if checkpoint:
+            self.checkpoints += 1
+
+    def latency(self, seconds: float) -> None:
+        self._latencies.append(max(0.0, seconds))
+
+    def stats(self) -> dict:
+        """Counters, throughput since start and latency percentiles (ms)"""
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        ordered = sorted(self._latencies)
+        return {
+            "records": self.records,
+            "checkpoints": self.checkpoints,
+            "dropped": self.dropped,
+            "bytes": self.bytes,
+            "records_per_s": self.records / elapsed,
+            "kb_per_s": self.bytes / 1024.0 / elapsed,
+            "p50_ms": percentile(ordered, 50) * 1000.0,
+            "p95_ms": percentile(ordered, 95) * 1000.0,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000.0,
+        }
+
+
+def format_stats(stats: dict) -> str:
+    return (
+        f"records={stats['records']} (checkpoints={stats['checkpoints']} dropped={stats['dropped']})  "
+        f"{stats['records_per_s']:.1f} rec/s  {stats['kb_per_s']:.1f} KB/s  "
+        f"latency p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms max={stats['max_ms']:.1f}ms"
+    )
+
+
+class ReplicaState:
+    """Backup side: the replicated snapshot and the last applied seq"""
+    def __init__(self):
+        self.seq = 0
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.checkpoints = 0
+        self.diffs = 0
+        self.gaps = 0
+
+    def apply(self, kind: str, seq: int, base: int, payload: bytes,
+              validate: Optional[Callable[[Dict[str, Any]], Any]] = None) -> bool:
+        """
+        Applies one record; False means a gap (a checkpoint is needed).
+        The new snapshot is built (and checked by `validate`, which raises
+        on a bad one) before it replaces the current one, so a malformed
+        record raises and leaves the replica as it was.
+        """
+        if kind == RECORD_CHECKPOINT:
+            snapshot = decode_checkpoint(json.loads(payload))
+        elif self.snapshot is None or base != self.seq or seq <= base:
+            self.gaps += 1
+            return False
+        else:
+            snapshot = apply_snapshot_diff(self.snapshot, json.loads(payload))
+        if validate is not None:
+            validate(snapshot)
+        self.snapshot = snapshot
+        self.seq = seq
+        if kind == RECORD_CHECKPOINT:
+            self.checkpoints += 1
+        else:
+            self.diffs += 1
+        return True
@@ -5,6 +5,7 @@ from .models import (
     GAME_STATE_LOBBY, GAME_STATE_PLAYING, GAME_STATE_VICTORY,
     BLOCK_REGEN_MIN_TIME, BLOCK_REGEN_MAX_TIME
 )
+from .tilemap import to_rows
 from .core import (
     add_player as core_add_player,
     get_current_host as core_get_current_host,
@@ -14,7 +15,9 @@ from .core import (
     add_chat,
     place_bomb as core_place_bomb,
     move_player as core_move_player,
-    explode_bomb as core_explode_bomb,
+    advance_timers as core_advance_timers,
+    sync_timers as core_sync_timers,
+    remove_player as core_remove_player,
     check_victory as core_check_victory,
     try_regen_block
 )
@@ -80,7 +83,7 @@ class GameServer:
         if spectator_id not in self.s.spectators:
             return -1
         new_pid = None
-        for i in range(4):
+        for i in range(self.s.max_players):
             if i not in self.s.players:
                 new_pid = i
                 break
@@ -100,8 +103,7 @@ class GameServer:
         player_name = p.name or f"Player {player_id}"
         print(f"[DISCONNECT] {player_name} disconnected")
         if self.s.game_state == GAME_STATE_LOBBY:
-            if player_id in self.s.players:
-                del self.s.players[player_id]
+            core_remove_player(self.s, player_id)
             stale = [cid for cid, pid in list(self.s.client_player_mapping.items()) if pid == player_id]
             for cid in stale:
                 del self.s.client_player_mapping[cid]
@@ -147,15 +149,7 @@ class GameServer:
             return
         if self.s.game_state != GAME_STATE_PLAYING:
             return
-        for b in list(self.s.bombs):
-            b.timer -= 1
-            if b.timer <= 0:
-                core_explode_bomb(self.s, b)
-                self.s.bombs.remove(b)
-        for e in list(self.s.explosions):
-            e.timer -= 1
-            if e.timer <= 0:
-                self.s.explosions.remove(e)
+        core_advance_timers(self.s)
         if core_check_victory(self.s):
             if self.s.winner_id == -1:
                 self.add_chat_message(-1, "Draw - no winners!", is_system=True)
@@ -185,8 +179,9 @@ class GameServer:
             base["can_start"] = connected_players_count(self.s) >= 2
             base["can_spectator_join"] = can_spectator_join(self.s)
         elif self.s.game_state == GAME_STATE_PLAYING:
+            core_sync_timers(self.s)
             base.update({
-                "map": self.s.game_map,
+                "map": to_rows(self.s.game_map),
                 "bombs": [vars(b) for b in self.s.bombs],
                 "explosions": [vars(e) for e in self.s.explosions]
             })
@@ -1,4 +1,5 @@
 
+import asyncio
 import json
 import os
 import random
@@ -16,15 +17,33 @@ for _p in (_root, _src):
     if _p not in sys.path:
         sys.path.insert(0, _p)
 
-from server.services.game_service import GameService
-from server.controller.command_controller import CommandController
-from server.network.server_network import ClientHandler, send_state_to_clients
+from server.core import check_match_config
+from server import tilemap
+from server.services.room_manager import Room, RoomManager
+from server.services.tick_scheduler import TickScheduler
+from server.network.server_network import ClientHandler, StateBroadcaster, RECV_SIZE
+from server.network.framing import CommandReader, split_handshake
+from server.network.broadcast import (
+    BroadcastEngine, ConnectionWriter, SelectorConnectionWriter, AsyncConnectionWriter,
+    NONBLOCKING_SEND_AVAILABLE,
+)
+from server.network.async_server import AsyncServerRunner
+from server.network.latency import format_latency_table
+from common.binary_protocol import PROTOCOL_LINE
 from common.constants import (
     PRIMARY_GAME_PORT,
     BACKUP_STATE_PORT,
     PRIMARY_HEARTBEAT_PORT,
     DEFAULT_PORT,
+    MAP_WIDTH,
+    MAP_HEIGHT,
     MAX_PLAYERS,
+    DEFAULT_ROOM_ID,
+    SIM_TICK_RATE,
+    BROADCAST_RATE,
+    PING_INTERVAL,
+    LATENCY_REPORT_INTERVAL,
+    MAINTENANCE_INTERVAL,
 )
 
 try:
@@ -36,13 +55,18 @@ except ImportError as _ft_err:
     FAULT_TOLERANCE_AVAILABLE = False
     print(f"[WARNING] Fault tolerance unavailable: {_ft_err}")
 
+# Threaded mode: one shared sending thread where non-blocking send() exists, else a thread per client
+_THREADED_WRITER = SelectorConnectionWriter if NONBLOCKING_SEND_AVAILABLE else ConnectionWriter
+
 
 class BombermanServer:
     """
     Main server class.  Responsibilities:
     * TCP accept loop (fresh joins + RECONNECT post-failover)
     * Per-client handler threads with automatic cleanup
-    * Game loop (tick every 100 ms + broadcast state)
+      (or one asyncio event loop for everything with use_asyncio=True)
+    * Rooms: independent matches in one process, ticked by one game loop
+    * Game loop (fixed-timestep ticks + broadcast at its own rate)
     * Fault-tolerance orchestration (primary / backup modes)
     """
 
@@ -61,6 +85,14 @@ class BombermanServer:
         primary_addr: Optional[str] = None,
         promoted_port: Optional[int] = None,
         enable_fault_tolerance: bool = True,
+        delta_broadcast: bool = False,
+        use_asyncio: bool = False,
+        tick_rate: float = SIM_TICK_RATE,
+        broadcast_rate: float = BROADCAST_RATE,
+        map_width: int = MAP_WIDTH,
+        map_height: int = MAP_HEIGHT,
+        max_players: int = MAX_PLAYERS,
+        latency_report: float = LATENCY_REPORT_INTERVAL,
     ):
         """
         Args:
@@ -72,6 +104,16 @@ class BombermanServer:
             promoted_port        : port to re-open on after promotion
                                    (must equal PRIMARY_GAME_PORT so proxy still works)
             enable_fault_tolerance: False -> standalone mode
+            delta_broadcast      : send per-client deltas with periodic keyframes
+                                   instead of the full state every tick
+            use_asyncio          : serve clients, heartbeats and replication on
+                                   one asyncio event loop instead of threads
+            tick_rate            : simulation ticks per second
+            broadcast_rate       : state broadcasts per second (<= tick_rate)
+            map_width, map_height: map size of the main room and of rooms created
+                                   without their own (odd sides)
+            max_players          : player cap of those rooms
+            latency_report       : seconds between per-client latency tables (0 = never)
         """
         self.host = host
         self.port = port
@@ -79,12 +121,27 @@ class BombermanServer:
         self.promoted_port = promoted_port if promoted_port is not None else port
         self.enable_fault_tolerance = enable_fault_tolerance and FAULT_TOLERANCE_AVAILABLE
 
-        self.game_service = GameService()
-        self.player_slots = [False] * MAX_PLAYERS
-        self.command_controller = CommandController(self.game_service, self.player_slots)
-
-        self.clients: list = []
-        self.spectator_clients: list = []
+        self.delta_broadcast = delta_broadcast
+        self.use_asyncio = use_asyncio
+        self.broadcast_engine = BroadcastEngine(
+            writer_factory=AsyncConnectionWriter if use_asyncio else _THREADED_WRITER
+        )
+        # Every room broadcasts through the shared engine (one writer per connection)
+        self.rooms = RoomManager(
+            lambda: StateBroadcaster(delta_mode=delta_broadcast, engine=self.broadcast_engine),
+            map_width=map_width, map_height=map_height, max_players=max_players, tick_rate=tick_rate,
+        )
+        self._reported_drops = 0
+        self._cleanup_ticker = 0
+        self.scheduler = TickScheduler(tick_rate, broadcast_rate)
+        self._reported_overruns = 0
+        self.latency_report = latency_report
+        self._next_ping = 0.0
+        self._next_latency_report = time.monotonic() + latency_report
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending_async: list = []
+        self._async_runner: Optional[AsyncServerRunner] = None
 
         self.primary_manager: Optional[PrimaryServer] = None
         self.backup_manager: Optional[BackupServer] = None
@@ -105,27 +162,96 @@ class BombermanServer:
             print("[SERVER] Standalone mode (no fault tolerance)")
             self.mode = "standalone"
 
+    # Shortcuts to the default room (room 0), where fresh joins land.
+    @property
+    def game_service(self):
+        return self.rooms.default_room.game_service
+
+    @property
+    def player_slots(self) -> list:
+        return self.rooms.default_room.player_slots
+
+    @property
+    def command_controller(self):
+        return self.rooms.default_room.command_controller
+
+    @property
+    def clients(self) -> list:
+        return self.rooms.default_room.clients
+
+    @property
+    def spectator_clients(self) -> list:
+        return self.rooms.default_room.spectator_clients
+
+    @property
+    def broadcaster(self) -> StateBroadcaster:
+        return self.rooms.default_room.broadcaster
+
     def _setup_as_primary(self):
         """Spawn a backup process and start heartbeat responder + replication."""
         print("=" * 70)
         print(f"[PRIMARY] Starting as PRIMARY on port {self.port}")
         print("=" * 70)
 
-        self.auto_spawner = AutoSpawner(primary_game_port=self.port)
+        self.auto_spawner = AutoSpawner(
+            primary_game_port=self.port,
+            extra_args=self._backup_args(),
+        )
         backup_state_port = self.auto_spawner.spawn_backup_server()
 
         if backup_state_port:
             self.primary_manager = PrimaryServer(
-                game_service=self.game_service,
+                game_service=self.rooms,
                 backup_state_ports=[("localhost", backup_state_port)],
                 heartbeat_port=self.port + 9,   
                 replication_interval=0.1,
             )
-            self.primary_manager.start()
+            self._start_ft_manager(self.primary_manager)
             print(f"[PRIMARY] Replicating state to backup on port {backup_state_port}")
         else:
             print("[PRIMARY] [WARN] Could not spawn backup -- running without replication")
 
+    def _backup_args(self) -> list:
+        """CLI flags the spawned backup must share with this server."""
+        args = []
+        if self.delta_broadcast:
+            args.append("--delta")
+        if self.use_asyncio:
+            args.append("--asyncio")
+        if self.scheduler.tick_rate != SIM_TICK_RATE:
+            args += ["--tick-rate", str(self.scheduler.tick_rate)]
+        if self.scheduler.broadcast_rate != BROADCAST_RATE:
+            args += ["--broadcast-rate", str(self.scheduler.broadcast_rate)]
+        width, height, players = self.rooms.defaults
+        if (width, height) != (MAP_WIDTH, MAP_HEIGHT):
+            args += ["--map-size", f"{width}x{height}"]
+        if players != MAX_PLAYERS:
+            args += ["--max-players", str(players)]
+        if tilemap.backend() != tilemap.DEFAULT_BACKEND:
+            args += ["--map-backend", tilemap.backend()]
+        return args
+
+    def _start_ft_manager(self, manager):
+        """Start a PrimaryServer/BackupServer on threads or on the event loop."""
+        if self.use_asyncio:
+            self._run_async(manager.serve_async())
+        else:
+            manager.start()
+
+    def _run_async(self, coro):
+        """Schedule a coroutine on the event loop (queued until it is running)."""
+        if self._loop is None:
+            self._pending_async.append(coro)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _attach_loop(self, loop: asyncio.AbstractEventLoop):
+        """Called by AsyncServerRunner once the event loop is running."""
+        self._loop = loop
+        pending, self._pending_async = self._pending_async, []
+        for coro in pending:
+            loop.create_task(coro)
+
     def _setup_as_backup(self, primary_addr: str):
         """Start BackupServer that monitors the primary and promotes on failure."""
         print("=" * 70)
@@ -145,14 +271,14 @@ class BombermanServer:
             promoted_game_port=self.promoted_port,
             on_promotion=self._on_promotion,
         )
-        self.backup_manager.start()
+        self._start_ft_manager(self.backup_manager)
 
     def _on_promotion(self, replicated_state):
         """
         Called by BackupServer when the primary is declared dead.
 
-        1. Restore replicated game state (if available).
-        2. Rebuild reconnect_registry so clients can re-attach.
+        1. Restore every replicated room (if available).
+        2. Rebuild reconnect_registry so clients can re-attach to their room.
         3. Switch self.port to promoted_port (= PRIMARY_GAME_PORT).
         4. Become the new primary (spawn backup + start replication).
         5. Open TCP accept socket on promoted_port in a new thread.
@@ -160,40 +286,38 @@ class BombermanServer:
         print("[PROMOTION] Taking over as PRIMARY...")
 
         if replicated_state:
-            self.game_service.state = replicated_state
-
-            self.player_slots = [False] * MAX_PLAYERS
-            for slot in replicated_state.players:
-                if 0 <= slot < MAX_PLAYERS:
-                    self.player_slots[slot] = True
-
-            self.command_controller = CommandController(
-                self.game_service, self.player_slots
-            )
+            rooms = [self.rooms.restore_room(DEFAULT_ROOM_ID, self.rooms.default_room.name, replicated_state)]
+            for room_id, (name, state) in self.backup_manager.replicated_rooms.items():
+                rooms.append(self.rooms.restore_room(room_id, name, state))
 
             with self.reconnect_lock:
                 self.reconnect_registry.clear()
-                for slot, player in replicated_state.players.items():
-                    sid = getattr(player, "original_client_id", None)
-                    if sid:
-                        self.reconnect_registry[sid] = {
-                            "player_id": slot,
-                            "name": getattr(player, "name", f"Player{slot}"),
-                            "is_spectator": False,
-                        }
-                for spec_id, spec_data in replicated_state.spectators.items():
-                    sid = spec_data.get("original_client_id")
-                    if sid:
-                        self.reconnect_registry[sid] = {
-                            "player_id": spec_id,
-                            "name": spec_data.get("name", f"Spectator{spec_id}"),
-                            "is_spectator": True,
-                        }
+                for room in rooms:
+                    state = room.game_service.state
+                    for slot, player in state.players.items():
+                        sid = getattr(player, "original_client_id", None)
+                        if sid:
+                            self.reconnect_registry[sid] = {
+                                "player_id": slot,
+                                "name": getattr(player, "name", f"Player{slot}"),
+                                "is_spectator": False,
+                                "room_id": room.room_id,
+                            }
+                    for spec_id, spec_data in state.spectators.items():
+                        sid = spec_data.get("original_client_id")
+                        if sid:
+                            self.reconnect_registry[sid] = {
+                                "player_id": spec_id,
+                                "name": spec_data.get("name", f"Spectator{spec_id}"),
+                                "is_spectator": True,
+                                "room_id": room.room_id,
+                            }
 
             print(
                 f"[PROMOTION] State restored: "
                 f"game={replicated_state.game_state}  "
                 f"players={list(replicated_state.players.keys())}  "
+                f"rooms={[room.room_id for room in rooms]}  "
                 f"reconnect_entries={len(self.reconnect_registry)}"
             )
         else:
@@ -202,17 +326,23 @@ class BombermanServer:
         self.mode = "primary"
         self._setup_as_primary()
 
-        
-        threading.Thread(
-            target=self._accept_loop,
-            daemon=False,
-            name="accept-loop-promoted",
-        ).start()
+        if self.use_asyncio:
+            self._run_async(self._async_runner.listen(self.port))
+        else:
+            threading.Thread(
+                target=self._accept_loop,
+                daemon=False,
+                name="accept-loop-promoted",
+            ).start()
 
         print(f"[PROMOTION] [OK] Now serving as PRIMARY on port {self.port}")
 
     def start(self):
         """Start game loop (daemon thread) then run accept loop (blocking)."""
+        if self.use_asyncio:
+            self._async_runner = AsyncServerRunner(self)
+            self._async_runner.run()
+            return
         threading.Thread(
             target=self._game_loop, daemon=True, name="game-loop"
         ).start()
@@ -269,47 +399,149 @@ class BombermanServer:
                 pass
 
     def _game_loop(self):
-        cleanup_ticker = 0
         while True:
-            self.game_service.tick()
-            cleanup_ticker += 1
-            if cleanup_ticker >= 50:
-                self.game_service.cleanup_client_mappings()
-                cleanup_ticker = 0
-            state = self.game_service.get_state()
-            send_state_to_clients(self.clients, self.spectator_clients, state)
-            time.sleep(0.1)
+            self._game_step()
+            time.sleep(self.scheduler.delay())
+
+    def _game_step(self):
+        """Run the simulation ticks that are due, then broadcast if due."""
+        steps, broadcast = self.scheduler.due()
+        for _ in range(steps):
+            started = time.perf_counter()
+            self.rooms.tick_all()
+            self.scheduler.record(time.perf_counter() - started)
+            self._cleanup_ticker += 1
+            if self._cleanup_ticker >= MAINTENANCE_INTERVAL * self.scheduler.tick_rate:
+                for room in self.rooms.all():
+                    room.game_service.cleanup_client_mappings()
+                self.rooms.remove_empty_rooms()
+                self._log_broadcast_stats()
+                self._log_tick_stats()
+                self._log_input_stats()
+                self._cleanup_ticker = 0
+        now = time.monotonic()
+        if now >= self._next_ping:
+            self._next_ping = now + PING_INTERVAL
+            self.broadcast_engine.ping_all(now)
+            self._log_latency_stats(now)
+        if broadcast:
+            self.rooms.broadcast_all()
+
+    def _log_tick_stats(self):
+        """Report tick duration percentiles when ticks overran or fell behind."""
+        stats = self.scheduler.stats()
+        late = stats["overruns"] + stats["caught_up"] + stats["skipped"]
+        if late == self._reported_overruns:
+            return
+        self._reported_overruns = late
+        print(
+            f"[TICK] {stats['tick_rate']:g} Hz  "
+            f"p50={stats['p50_ms']:.2f}ms  p95={stats['p95_ms']:.2f}ms  "
+            f"p99={stats['p99_ms']:.2f}ms  max={stats['max_ms']:.2f}ms  "
+            f"overruns={stats['overruns']}  caught_up={stats['caught_up']}  "
+            f"skipped={stats['skipped']}"
+        )
+
+    def _log_input_stats(self):
+        """Report queued client inputs of rooms whose inputs waited longer than a tick."""
+        for room in self.rooms.all():
+            stats = room.game_service.input_stats()
+            if stats["latency_p95_ms"] <= self.scheduler.tick_period * 1000.0:
+                continue
+            print(
+                f"[INPUT] room {room.room_id}  inputs={stats['inputs']}  "
+                f"per_tick p50={stats['per_tick_p50']} max={stats['per_tick_max']}  "
+                f"queue latency p50={stats['latency_p50_ms']:.1f}ms "
+                f"p95={stats['latency_p95_ms']:.1f}ms max={stats['latency_max_ms']:.1f}ms"
+            )
+
+    def _log_latency_stats(self, now: float):
+        """Per-client RTT, jitter and send-queue delay table, plus merged histograms."""
+        if self.latency_report <= 0 or now < self._next_latency_report:
+            return
+        self._next_latency_report = now + self.latency_report
+        stats = [s for s in self.broadcast_engine.stats() if not s["closed"]]
+        if not stats:
+            return
+        print(f"[LATENCY] {len(stats)} connection(s)")
+        for line in format_latency_table(stats):
+            print(f"[LATENCY] {line}")
+
+    def _log_broadcast_stats(self):
+        """Report slow readers: queue depth and frames dropped since last report."""
+        totals = self.broadcast_engine.totals()
+        dropped = totals["frames_dropped"] - self._reported_drops
+        self._reported_drops = totals["frames_dropped"]
+        if dropped > 0:
+            print(
+                f"[BROADCAST] {totals['connections']} connection(s)  "
+                f"max_queue_depth={totals['max_queue_depth']}  "
+                f"dropped={dropped} frame(s)"
+            )
 
     def _handle_new_connection(self, conn: socket.socket, addr: tuple):
         """Dispatch: RECONNECT handshake (post-failover) or fresh join."""
         try:
-            conn.settimeout(2.0)
+            command_reader = CommandReader()
+            commands = []
+            deadline = time.monotonic() + 2.0
             try:
-                raw = conn.recv(4096).decode("utf-8", errors="replace").strip()
+                # Until the handshake line(s) are complete; commands pipelined after them are kept
+                while True:
+                    conn.settimeout(max(0.01, deadline - time.monotonic()))
+                    data = conn.recv(RECV_SIZE)
+                    if not data:
+                        break
+                    commands += command_reader.feed(data)
+                    if not command_reader.has_partial():
+                        break
             except socket.timeout:
-                raw = ""
+                pass
             finally:
                 conn.settimeout(None)
 
-            if raw.startswith("RECONNECT:"):
-                self._handle_reconnect(conn, addr, raw)
-            else:
-                self._handle_fresh_join(conn, addr)
+            handshake, pending = split_handshake(commands)
+            handler = self._admit(conn, addr, handshake)
+            handler.adopt(command_reader, pending)
 
         except (OSError, socket.error) as exc:
             print(f"[SERVER] Network error for {addr}: {exc}")
+            self.broadcast_engine.remove(conn)
             self._safe_close(conn)
+            return
         except Exception as exc:
             print(f"[SERVER] Error for {addr}: {exc}")
+            self.broadcast_engine.remove(conn)
             self._safe_close(conn)
+            return
+        # This thread becomes the client's handler thread.
+        self._run_handler(handler)
 
+    def _admit(self, conn, addr: tuple, first_message: str) -> ClientHandler:
+        """
+        Transport-independent join: register the connection as player or
+        spectator, queue the join response and return its ClientHandler.
+        `conn` is a socket (threaded mode) or a StreamWriter (asyncio mode).
+        A PROTO:BIN1 line in the first message selects the binary protocol.
+        """
+        if PROTOCOL_LINE in first_message.splitlines():
+            self.broadcast_engine.set_binary(conn)
+        if first_message.startswith("RECONNECT:"):
+            return self._handle_reconnect(conn, addr, first_message)
+        return self._handle_fresh_join(conn, addr)
+
+    def _make_handler(self, room: Room, conn, addr, user_id, is_spectator, name, session_id) -> ClientHandler:
+        return ClientHandler(
+            conn, addr, room.command_controller, user_id, is_spectator, name, session_id,
+            broadcaster=room.broadcaster, room_id=room.room_id, lobby=self,
+        )
 
-    def _handle_reconnect(self, conn: socket.socket, addr: tuple, msg: str):
+
+    def _handle_reconnect(self, conn, addr: tuple, msg: str) -> ClientHandler:
         parts = msg.split(":", 1)
         if len(parts) < 2:
             print(f"[RECONNECT] Bad format from {addr}: {msg!r}")
-            self._handle_fresh_join(conn, addr)
-            return
+            return self._handle_fresh_join(conn, addr)
         session_id = parts[1].split("\n")[0].strip()
         print(f"[RECONNECT] {addr}  session_id={session_id}")
 
@@ -319,7 +551,8 @@ class BombermanServer:
                 try:
                     target_pid = int(session_id.split("_")[1])
                     for sid, entry in self.reconnect_registry.items():
-                        if entry["player_id"] == target_pid and not entry["is_spectator"]:
+                        if (entry["player_id"] == target_pid and not entry["is_spectator"]
+                                and entry.get("room_id", DEFAULT_ROOM_ID) == DEFAULT_ROOM_ID):
                             info = entry
                             session_id = sid
                             print(f"[RECONNECT] Fallback match: player_id={target_pid}")
@@ -329,152 +562,188 @@ class BombermanServer:
 
         if not info:
             print(f"[RECONNECT] Unknown session {session_id} -- treating as new")
-            self._handle_fresh_join(conn, addr)
-            return
+            return self._handle_fresh_join(conn, addr)
 
         pid     = info["player_id"]
         name    = info["name"]
         is_spec = info["is_spectator"]
-        print(f"[RECONNECT] [OK] Restoring Player {pid} ({name})  spectator={is_spec}")
-
-        conn.sendall((json.dumps({
+        room    = self.rooms.get(info.get("room_id", DEFAULT_ROOM_ID))
+        if room is None:
+            # Its ids may belong to someone else in another room: join afresh instead
+            print(f"[RECONNECT] [REJECTED] Room {info.get('room_id')} of session {session_id} is closed")
+            with self.reconnect_lock:
+                self.reconnect_registry.pop(session_id, None)
+            self.broadcast_engine.send(conn, (json.dumps({
+                "reconnect_error": "room closed",
+                "room_id": info.get("room_id"),
+            }) + "\n").encode())
+            return self._handle_fresh_join(conn, addr)
+        print(f"[RECONNECT] [OK] Restoring Player {pid} ({name})  spectator={is_spec}  room={room.room_id}")
+
+        room.broadcaster.send(conn, (json.dumps({
             "join_success": True,
             "player_id": pid,
             "is_spectator": is_spec,
             "player_name": name,
             "reconnected": True,
+            "room_id": room.room_id,
         }) + "\n").encode())
 
         if is_spec:
-            self.spectator_clients.append(conn)
+            room.spectator_clients.append(conn)
         else:
-            if 0 <= pid < MAX_PLAYERS:
-                self.player_slots[pid] = True
-            self.clients.append(conn)
-            if pid not in self.game_service.state.players:
-                self.game_service.add_player(pid, name)
-                self.game_service.state.players[pid].original_client_id = session_id
-                self.game_service.register_client_player(session_id, pid)
+            if 0 <= pid < len(room.player_slots):
+                room.player_slots[pid] = True
+            room.clients.append(conn)
+            if pid not in room.game_service.state.players:
+                room.game_service.add_player(pid, name)
+                room.game_service.state.players[pid].original_client_id = session_id
+                room.game_service.register_client_player(session_id, pid)
                 print(f"[RECONNECT] Re-added Player {pid} ({name}) to game state")
-        with self.reconnect_lock:
-            self.reconnect_registry[session_id] = {
-                "player_id": pid,
-                "name": name,
-                "is_spectator": is_spec,
-            }
+        self._register_session(session_id, pid, name, is_spec, room)
 
-        handler = ClientHandler(
-            conn, addr, self.command_controller, pid, is_spec, name, session_id
-        )
-        threading.Thread(
-            target=self._run_handler, args=(handler, pid, is_spec, session_id), daemon=True
-        ).start()
+        return self._make_handler(room, conn, addr, pid, is_spec, name, session_id)
 
-    def _handle_fresh_join(self, conn: socket.socket, addr: tuple):
-        name = self._unique_name()
+    def _handle_fresh_join(self, conn, addr: tuple) -> ClientHandler:
+        room = self.rooms.default_room
+        name = self._unique_name(room)
         session_id = f"client_{uuid.uuid4().hex}"
-
-        if self.game_service.state.game_state == "playing":
-            self._assign_spectator(conn, addr, name, session_id)
-        else:
-            slot = self._free_slot()
-            if slot is not None:
-                self._assign_player(conn, addr, slot, name, session_id)
-            else:
-                self._assign_spectator(conn, addr, name, session_id, reason="lobby full")
-
-    def _assign_player(self, conn, addr, slot, name, session_id):
-        self.player_slots[slot] = True
-        self.game_service.add_player(slot, name)
-        self.game_service.state.players[slot].original_client_id = session_id
-        self.game_service.register_client_player(session_id, slot)
-        with self.reconnect_lock:
-            self.reconnect_registry[session_id] = {
-                "player_id": slot,
-                "name": name,
-                "is_spectator": False,
-            }
-        self.clients.append(conn)
-        conn.sendall((json.dumps({
+        user_id, is_spec = self._join_room(room, conn, addr, name, session_id)
+        return self._make_handler(room, conn, addr, user_id, is_spec, name, session_id)
+
+    def _join_room(self, room: Room, conn, addr, name, session_id) -> tuple:
+        """Seat a connection in `room` as player or spectator; returns (user_id, is_spectator)."""
+        if room.game_service.state.game_state == "playing":
+            return self._assign_spectator(room, conn, addr, name, session_id)
+        slot = room.free_slot()
+        if slot is not None:
+            return self._assign_player(room, conn, addr, slot, name, session_id)
+        return self._assign_spectator(room, conn, addr, name, session_id, reason="lobby full")
+
+    def _assign_player(self, room: Room, conn, addr, slot, name, session_id) -> tuple:
+        room.player_slots[slot] = True
+        room.game_service.add_player(slot, name)
+        room.game_service.state.players[slot].original_client_id = session_id
+        room.game_service.register_client_player(session_id, slot)
+        self._register_session(session_id, slot, name, False, room)
+        room.broadcaster.send(conn, (json.dumps({
             "join_success": True,
             "player_id": slot,
             "is_spectator": False,
             "player_name": name,
             "session_id": session_id,
+            "room_id": room.room_id,
         }) + "\n").encode())
-        handler = ClientHandler(
-            conn, addr, self.command_controller, slot, False, name, session_id
-        )
-        threading.Thread(
-            target=self._run_handler, args=(handler, slot, False, session_id), daemon=True
-        ).start()
-        print(f"[JOIN] {addr} -> Player {slot} ({name})  session={session_id}")
-
-    def _assign_spectator(self, conn, addr, name, session_id, reason="game in progress"):
-        sid = self.game_service.add_spectator(name)
-        self.game_service.state.spectators[sid]["original_client_id"] = session_id
-        with self.reconnect_lock:
-            self.reconnect_registry[session_id] = {
-                "player_id": sid,
-                "name": name,
-                "is_spectator": True,
-            }
-        self.spectator_clients.append(conn)
-        conn.sendall((json.dumps({
+        room.clients.append(conn)
+        print(f"[JOIN] {addr} -> Player {slot} ({name})  room={room.room_id}  session={session_id}")
+        return slot, False
+
+    def _assign_spectator(self, room: Room, conn, addr, name, session_id, reason="game in progress") -> tuple:
+        sid = room.game_service.add_spectator(name)
+        room.game_service.state.spectators[sid]["original_client_id"] = session_id
+        self._register_session(session_id, sid, name, True, room)
+        room.broadcaster.send(conn, (json.dumps({
             "join_success": True,
             "player_id": sid,
             "is_spectator": True,
             "player_name": name,
             "session_id": session_id,
+            "room_id": room.room_id,
         }) + "\n").encode())
-        handler = ClientHandler(
-            conn, addr, self.command_controller, sid, True, name, session_id
+        room.spectator_clients.append(conn)
+        print(f"[JOIN] {addr} -> Spectator {sid} ({name})  [{reason}]  room={room.room_id}  session={session_id}")
+        return sid, True
+
+    def _register_session(self, session_id, user_id, name, is_spectator, room: Room):
+        with self.reconnect_lock:
+            self.reconnect_registry[session_id] = {
+                "player_id": user_id,
+                "name": name,
+                "is_spectator": is_spectator,
+                "room_id": room.room_id,
+            }
+
+    def handle_room_command(self, handler: ClientHandler, request: dict):
+        """ROOMS / CREATE_ROOM:<name> / JOIN_ROOM:<id> sent by a connected client."""
+        kind = request["type"]
+        if kind == "list_rooms":
+            handler._send((json.dumps({
+                "rooms": self.rooms.list_rooms(),
+                "room_id": handler.room_id,
+            }) + "\n").encode())
+            return
+        if kind == "create_room":
+            try:
+                room = self.rooms.create_room(request.get("name", ""), request.get("map_width"),
+                                              request.get("map_height"), request.get("max_players"))
+            except ValueError as exc:
+                handler._send((json.dumps({"room_error": str(exc)}) + "\n").encode())
+                return
+            error = "room limit reached"
+        else:
+            room = self.rooms.get(request["room_id"])
+            error = "no such room"
+        if room is None:
+            handler._send((json.dumps({"room_error": error}) + "\n").encode())
+            return
+        if room.room_id != handler.room_id:
+            self._move_to_room(handler, room)
+
+    def _move_to_room(self, handler: ClientHandler, room: Room):
+        old_room = self.rooms.get(handler.room_id)
+        if old_room:
+            self._leave_room(old_room, handler)
+        user_id, is_spec = self._join_room(
+            room, handler.conn, handler.addr, handler.player_name, handler.client_id
         )
-        threading.Thread(
-            target=self._run_handler, args=(handler, sid, True, session_id), daemon=True
-        ).start()
-        print(f"[JOIN] {addr} -> Spectator {sid} ({name})  [{reason}]  session={session_id}")
+        handler.enter_room(room.room_id, room.command_controller, room.broadcaster, user_id, is_spec)
 
-    def _run_handler(self, handler: ClientHandler, user_id: int, is_spectator: bool, session_id: str = None):
+    def _run_handler(self, handler: ClientHandler):
         """Run ClientHandler; clean up broadcast lists and game state on exit."""
         try:
             handler.handle()
         finally:
-            final_id   = handler.user_id
-            final_spec = handler.is_spectator
+            self._release_client(handler)
 
-            for lst in (self.clients, self.spectator_clients):
-                try:
-                    lst.remove(handler.conn)
-                except ValueError:
-                    pass
-            if final_spec or (isinstance(final_id, int) and final_id >= 100):
-                try:
-                    self.game_service.remove_spectator(final_id)
-                except Exception as exc:
-                    print(f"[CLEANUP] Spectator remove error: {exc}")
-            else:
-                try:
-                    if 0 <= final_id < MAX_PLAYERS:
-                        self.player_slots[final_id] = False
-                    self.game_service.handle_player_disconnect(final_id)
-                except Exception as exc:
-                    print(f"[CLEANUP] Player disconnect error: {exc}")
+    def _release_client(self, handler: ClientHandler):
+        """Remove a closed connection from its room and the broadcast engine."""
+        room = self.rooms.get(handler.room_id)
+        if room:
+            self._leave_room(room, handler)
+        self.broadcast_engine.remove(handler.conn)
 
-    def _free_slot(self) -> Optional[int]:
-        for i in range(MAX_PLAYERS):
-            if not self.player_slots[i] and i not in self.game_service.state.players:
-                return i
-        return None
+    def _leave_room(self, room: Room, handler: ClientHandler):
+        """Remove a connection from a room's broadcast lists and game state."""
+        final_id   = handler.user_id
+        final_spec = handler.is_spectator
 
-    def _unique_name(self) -> str:
+        for lst in (room.clients, room.spectator_clients):
+            try:
+                lst.remove(handler.conn)
+            except ValueError:
+                pass
+        room.broadcaster.request_keyframe(handler.conn)
+        if final_spec or (isinstance(final_id, int) and final_id >= 100):
+            try:
+                room.game_service.remove_spectator(final_id)
+            except Exception as exc:
+                print(f"[CLEANUP] Spectator remove error: {exc}")
+        else:
+            try:
+                if 0 <= final_id < len(room.player_slots):
+                    room.player_slots[final_id] = False
+                room.game_service.handle_player_disconnect(final_id)
+            except Exception as exc:
+                print(f"[CLEANUP] Player disconnect error: {exc}")
+
+    def _unique_name(self, room: Room) -> str:
         used = {
             p.name
-            for p in self.game_service.state.players.values()
+            for p in room.game_service.state.players.values()
             if p.name
         } | {
             s["name"]
-            for s in self.game_service.state.spectators.values()
+            for s in room.game_service.state.spectators.values()
             if s.get("name")
         }
         available = [n for n in self.RANDOM_NAMES if n not in used]
@@ -525,10 +794,54 @@ def main():
         "--no-ft", action="store_true",
         help="Disable fault tolerance (standalone mode, listens on DEFAULT_PORT)",
     )
+    parser.add_argument(
+        "--delta", action="store_true",
+        help="Broadcast state deltas with periodic keyframes instead of full state",
+    )
+    parser.add_argument(
+        "--asyncio", action="store_true",
+        help="Serve clients, heartbeats and replication on one asyncio event loop",
+    )
+    parser.add_argument(
+        "--tick-rate", type=float, default=SIM_TICK_RATE,
+        help=f"Simulation ticks per second (default: {SIM_TICK_RATE}); "
+             "game timers are scaled to it and keep their wall-clock length",
+    )
+    parser.add_argument(
+        "--broadcast-rate", type=float, default=BROADCAST_RATE,
+        help=f"State broadcasts per second, at most the tick rate (default: {BROADCAST_RATE})",
+    )
+    parser.add_argument(
+        "--map-size", type=str, default=f"{MAP_WIDTH}x{MAP_HEIGHT}",
+        help=f"WIDTHxHEIGHT of the main room's map, odd sides (default: {MAP_WIDTH}x{MAP_HEIGHT})",
+    )
+    parser.add_argument(
+        "--max-players", type=int, default=MAX_PLAYERS,
+        help=f"Player cap of the main room (default: {MAX_PLAYERS})",
+    )
+    parser.add_argument(
+        "--map-backend", choices=tilemap.BACKENDS, default=tilemap.DEFAULT_BACKEND,
+        help=f"Tile map storage: Python lists or numpy uint8 arrays, numpy needs NumPy (default: {tilemap.DEFAULT_BACKEND})",
+    )
+    parser.add_argument(
+        "--latency-report", type=float, default=LATENCY_REPORT_INTERVAL,
+        help=f"Seconds between per-client RTT/jitter/queue-delay tables (default: {LATENCY_REPORT_INTERVAL:g}, 0 = off)",
+    )
     args = parser.parse_args()
 
     if args.mode == "backup" and not args.primary:
         parser.error("--primary is required in backup mode")
+    if args.tick_rate <= 0 or args.broadcast_rate <= 0:
+        parser.error("--tick-rate and --broadcast-rate must be positive")
+    try:
+        map_width, map_height = (int(side) for side in args.map_size.lower().split("x"))
+        check_match_config(map_width, map_height, args.max_players)
+    except ValueError as exc:
+        parser.error(f"--map-size/--max-players: {exc}")
+    try:
+        tilemap.set_backend(args.map_backend)
+    except ValueError as exc:
+        parser.error(f"--map-backend: {exc}")
     port = DEFAULT_PORT if args.no_ft else args.port
 
     server = BombermanServer(
@@ -538,6 +851,14 @@ def main():
         primary_addr=args.primary,
         promoted_port=args.promoted_port,
         enable_fault_tolerance=not args.no_ft,
+        delta_broadcast=args.delta,
+        use_asyncio=args.asyncio,
+        tick_rate=args.tick_rate,
+        broadcast_rate=args.broadcast_rate,
+        map_width=map_width,
+        map_height=map_height,
+        max_players=args.max_players,
+        latency_report=args.latency_report,
     )
     server.start()
 
@@ -1,11 +1,12 @@
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Tuple, Optional
 import time as _time
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from common.constants import MAX_MESSAGE_LENGTH, MAX_CHAT_MESSAGES
+from common.constants import MAX_MESSAGE_LENGTH, MAX_CHAT_MESSAGES, MAX_PLAYERS, SIM_TICK_RATE
+from .tilemap import to_rows
 
 MAP_WIDTH = 15
 MAP_HEIGHT = 13
@@ -15,11 +16,14 @@ GAME_STATE_LOBBY = "lobby"
 GAME_STATE_PLAYING = "playing"
 GAME_STATE_VICTORY = "victory"
 
+# Timers are given in ticks at SIM_TICK_RATE; core.scaled_ticks() converts
+# them to a room's tick rate so they last the same wall-clock time
 BOMB_TIMER_TICKS = 20
 EXPLOSION_TTL_TICKS = 5
 EXPLOSION_RANGE = 2
 BLOCK_REGEN_MIN_TIME = 30
 BLOCK_REGEN_MAX_TIME = 80
+VICTORY_TICKS = 50
 MAX_BLOCKS_ON_MAP = 30
 DISCONNECT_TIMEOUT = 20
 
@@ -34,6 +38,23 @@ class Player:
     disconnected: bool = False
     disconnect_time: Optional[float] = None
     original_client_id: Optional[str] = None
+    input_seq: int = 0      # last client move sequence number applied (client prediction)
+
+    # The occupancy link lives in a slot so vars()/asdict() never see it
+    __slots__ = ("__dict__", "_occupancy")
+
+    def __setattr__(self, name, value):
+        link = getattr(self, "_occupancy", None)
+        if link is not None and name in ("x", "y"):
+            old = (self.x, self.y)
+            object.__setattr__(self, name, value)
+            link[0].player_moved(link[1], self, old)
+        else:
+            object.__setattr__(self, name, value)
+
+    def attach_occupancy(self, grid, pid: int) -> None:
+        """Reports future moves to grid (None detaches)"""
+        object.__setattr__(self, "_occupancy", (grid, pid) if grid is not None else None)
 
 @dataclass
 class Bomb:
@@ -43,6 +64,20 @@ class Bomb:
     timer: int
     owner: int
 
+    # The detonation queue link lives in a slot so vars()/asdict() never see it
+    __slots__ = ("__dict__", "_schedule")
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name == "timer":
+            queue = getattr(self, "_schedule", None)
+            if queue is not None:
+                queue.reschedule(self, value)
+
+    def attach_schedule(self, queue) -> None:
+        """Reports future timer changes to queue (None detaches)"""
+        object.__setattr__(self, "_schedule", queue)
+
 @dataclass
 class Explosion:
     """Represents an explosion effect"""
@@ -65,11 +100,33 @@ class State:
     chat_messages: List[dict] = field(default_factory=list)
     client_player_mapping: Dict[str, int] = field(default_factory=dict)
     block_regen_timer: int = BLOCK_REGEN_MIN_TIME
+    map_width: int = MAP_WIDTH
+    map_height: int = MAP_HEIGHT
+    max_players: int = MAX_PLAYERS
+    tick_count: int = 0
+    tick_rate: float = SIM_TICK_RATE
+    # Tile index built by core.occupancy(); never serialized or compared
+    occupancy: Any = field(default=None, repr=False, compare=False)
+    # Timer-ordered bombs/explosions built by core.detonations(); same
+    detonations: Any = field(default=None, repr=False, compare=False)
 
     @staticmethod
     def now() -> float:
         """Returns current timestamp"""
         return _time.time()
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """
+    One published version of a State, built by the game loop after a tick.
+    Other threads read it without the game lock: nothing in it is mutated
+    after publication (map rows are tuples shared between versions).
+    """
+    version: int
+    tick: int
+    view: Dict[str, Any]        # get_state() shape, JSON keys (broadcast)
+    replica: Dict[str, Any]     # state_to_dict() shape (replication)
     
 
 STATE_VERSION = 1
@@ -82,19 +139,25 @@ def state_to_dict(state: "State") -> Dict[str, Any]:
         "game_state": state.game_state,
         "winner_id": state.winner_id,
         "victory_timer": state.victory_timer,
-        "game_map": state.game_map,
-        "bombs": [asdict(b) for b in state.bombs],
+        "game_map": to_rows(state.game_map),
+        # Players and bombs only hold scalars: a shallow copy is asdict() without its deepcopy
+        "bombs": [dict(vars(b)) for b in state.bombs],
         "explosions": [
             {"positions": [list(p) for p in e.positions], "timer": e.timer}
             for e in state.explosions
         ],
-        "players": {str(pid): asdict(p) for pid, p in state.players.items()},
+        "players": {str(pid): dict(vars(p)) for pid, p in state.players.items()},
         "spectators": {str(sid): dict(s) for sid, s in state.spectators.items()},
         "current_host_id": state.current_host_id,
         "next_spectator_id": state.next_spectator_id,
         "chat_messages": list(state.chat_messages),
         "client_player_mapping": dict(state.client_player_mapping),
         "block_regen_timer": state.block_regen_timer,
+        "map_width": state.map_width,
+        "map_height": state.map_height,
+        "max_players": state.max_players,
+        "tick_count": state.tick_count,
+        "tick_rate": state.tick_rate,
     }
 
 
@@ -125,4 +188,9 @@ def state_from_dict(d: Dict[str, Any]) -> "State":
         chat_messages=list(d.get("chat_messages", [])),
         client_player_mapping=dict(d.get("client_player_mapping", {})),
         block_regen_timer=d.get("block_regen_timer", BLOCK_REGEN_MIN_TIME),
+        map_width=d.get("map_width", MAP_WIDTH),
+        map_height=d.get("map_height", MAP_HEIGHT),
+        max_players=d.get("max_players", MAX_PLAYERS),
+        tick_count=d.get("tick_count", 0),
+        tick_rate=d.get("tick_rate", SIM_TICK_RATE),
     )
\ No newline at end of file
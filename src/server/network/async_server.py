@@ -0,0 +1,92 @@
+"""
+asyncio network core for BombermanServer (--asyncio).
+
+Joins, RECONNECT, client commands, state broadcast and the game tick all
+run as tasks on one event loop instead of two OS threads per connection.
+Fault-tolerance services (heartbeats, replication) are scheduled on the same
+loop through BombermanServer._start_ft_manager.
+"""
+import asyncio
+
+from server.network.framing import CommandReader, split_handshake
+from server.network.server_network import RECV_SIZE
+
+# Seconds a new connection has to send its first message (RECONNECT:<sid>)
+FIRST_MESSAGE_TIMEOUT = 2.0
+
+
+class AsyncServerRunner:
+    """Runs the accept loop, client handlers and game loop of a BombermanServer"""
+    def __init__(self, server):
+        self.server = server
+        self.loop: asyncio.AbstractEventLoop = None
+        self.listeners: list = []
+
+    def run(self) -> None:
+        """Blocks running the event loop until interrupted"""
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            print("\n[SERVER] Shutting down...")
+            self.server._shutdown()
+
+    async def main(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.server._attach_loop(self.loop)
+        self.loop.create_task(self._game_loop())
+        if not await self.listen(self.server.port):
+            return
+        await asyncio.Event().wait()
+
+    async def listen(self, port: int) -> bool:
+        """Opens a listening socket on `port`; returns False if bind fails"""
+        try:
+            listener = await asyncio.start_server(self._handle_new_connection, self.server.host, port)
+        except OSError as exc:
+            print(f"[SERVER] Fatal accept error: {exc}")
+            return False
+        self.listeners.append(listener)
+        print(f"[SERVER] Listening on {self.server.host}:{port}  mode={self.server.mode.upper()}  (asyncio)")
+        print(
+            f"[SERVER] Fault tolerance: "
+            f"{'ENABLED' if self.server.enable_fault_tolerance else 'DISABLED'}"
+        )
+        print("=" * 70)
+        return True
+
+    async def _game_loop(self) -> None:
+        while True:
+            self.server._game_step()
+            await asyncio.sleep(self.server.scheduler.delay())
+
+    async def _handle_new_connection(self, reader: asyncio.StreamReader,
+                                     writer: asyncio.StreamWriter) -> None:
+        """Same flow as the threaded server: first message, admit, handle, release"""
+        addr = writer.get_extra_info("peername")
+        try:
+            command_reader = CommandReader()
+            commands = []
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + FIRST_MESSAGE_TIMEOUT
+            try:
+                while True:
+                    data = await asyncio.wait_for(reader.read(RECV_SIZE), max(0.01, deadline - loop.time()))
+                    if not data:
+                        break
+                    commands += command_reader.feed(data)
+                    if not command_reader.has_partial():
+                        break
+            except asyncio.TimeoutError:
+                pass
+            handshake, pending = split_handshake(commands)
+            handler = self.server._admit(writer, addr, handshake)
+            handler.adopt(command_reader, pending)
+        except Exception as exc:
+            print(f"[SERVER] Error for {addr}: {exc}")
+            self.server.broadcast_engine.remove(writer)
+            writer.close()
+            return
+        try:
+            await handler.handle_async(reader)
+        finally:
+            self.server._release_client(handler)
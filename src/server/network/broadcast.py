@@ -0,0 +1,493 @@
+"""
+Broadcast engine: per-connection send queues fed by the game loop.
+
+The game loop encodes each frame once and hands the same memoryview to every
+connection writer. Queuing is O(1) and never touches the socket, so a slow
+reader can only fill its own queue; it cannot stall the tick for everyone
+else. When a queue is full its stale state frames are discarded, so a
+lagging client jumps straight to the newest state.
+
+SelectorConnectionWriter queues are drained by one shared WriterLoop thread
+with non-blocking sends (MSG_DONTWAIT, Linux/BSD/macOS). ConnectionWriter is
+the portable fallback with one sending thread per connection.
+AsyncConnectionWriter offers the same interface on top of an asyncio
+StreamWriter for the event-loop server mode.
+"""
+import asyncio
+import selectors
+import socket
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Dict, List, Optional, Union
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from common.constants import BROADCAST_MAX_QUEUE_FRAMES
+from common.binary_protocol import encode_text
+from server.network.latency import LatencyTracker
+
+Payload = Union[bytes, memoryview]
+
+# send() that fails with EAGAIN instead of blocking, without switching the
+# socket to non-blocking mode (its handler thread still does blocking recv)
+NONBLOCKING_SEND_AVAILABLE = hasattr(socket, "MSG_DONTWAIT")
+_MSG_DONTWAIT = getattr(socket, "MSG_DONTWAIT", 0)
+
+
+class _FrameQueue:
+    """
+    Queue bookkeeping shared by the threaded and asyncio writers.
+
+    Items are (payload, droppable, queued_at): state frames are droppable,
+    control messages (join/conversion/PONG/ping) are not. The time each
+    payload waited in the queue goes to `latency`. Subclasses provide the
+    locking and the wake-up of the sending side.
+    """
+    def __init__(self, conn, max_queue: int):
+        self.conn = conn
+        self.max_queue = max(1, max_queue)
+        self.peer = self._peer_name(conn)
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_dropped = 0
+        self.closed = False
+        self.latency = LatencyTracker()
+        self._queue: deque = deque()
+        self._state_frames = 0
+        self._sending = False
+
+    @staticmethod
+    def _peer_name(conn) -> str:
+        try:
+            if hasattr(conn, "get_extra_info"):
+                peer = conn.get_extra_info("peername")
+            else:
+                peer = conn.getpeername()
+            return "%s:%s" % tuple(peer[:2])
+        except (OSError, AttributeError, TypeError):
+            return "?"
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of payloads waiting to be written"""
+        return len(self._queue)
+
+    def is_congested(self) -> bool:
+        """True when the next state frame would overflow the queue"""
+        return self._state_frames >= self.max_queue
+
+    def stats(self) -> dict:
+        stats = {
+            "peer": self.peer,
+            "queue_depth": self.queue_depth,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "frames_dropped": self.frames_dropped,
+            "closed": self.closed,
+        }
+        stats.update(self.latency.stats())
+        return stats
+
+    def _enqueue(self, payload: Payload, droppable: bool) -> bool:
+        if self.closed:
+            return False
+        if droppable:
+            if self._state_frames >= self.max_queue:
+                self._drop_backlog()
+            self._state_frames += 1
+        self._queue.append((payload, droppable, time.monotonic()))
+        return True
+
+    def _drop_backlog(self) -> int:
+        kept = deque(item for item in self._queue if not item[1])
+        dropped = len(self._queue) - len(kept)
+        self._queue = kept
+        self._state_frames = 0
+        self.frames_dropped += dropped
+        return dropped
+
+    def _dequeue(self) -> tuple:
+        payload, droppable, queued_at = self._queue.popleft()
+        if droppable:
+            self._state_frames -= 1
+        self._sending = True
+        self.latency.record_queue_delay(time.monotonic() - queued_at)
+        return payload, droppable
+
+    def _sent(self, payload: Payload, droppable: bool) -> None:
+        self._sending = False
+        if droppable:
+            self.frames_sent += 1
+        self.bytes_sent += len(payload)
+
+    def _close(self) -> None:
+        self.closed = True
+        self._sending = False
+        self._queue.clear()
+        self._state_frames = 0
+
+
+class ConnectionWriter(_FrameQueue):
+    """Owns all writes to one socket; frames are sent by a dedicated thread"""
+    def __init__(self, conn: socket.socket, max_queue: int = BROADCAST_MAX_QUEUE_FRAMES):
+        super().__init__(conn, max_queue)
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"writer-{self.peer}")
+        self._thread.start()
+
+    def push_frame(self, frame: Payload) -> None:
+        """Queues a droppable state frame"""
+        with self._cond:
+            if self._enqueue(frame, True):
+                self._cond.notify()
+
+    def push_control(self, data: Payload) -> None:
+        """Queues a message that must be delivered (join/conversion/PONG)"""
+        with self._cond:
+            if self._enqueue(data, False):
+                self._cond.notify()
+
+    def drop_backlog(self) -> int:
+        """Discards queued state frames; returns how many were dropped"""
+        with self._cond:
+            return self._drop_backlog()
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Waits until the queue is empty; returns False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: (not self._queue and not self._sending) or self.closed, timeout
+            )
+
+    def close(self) -> None:
+        """Stops the writer thread; pending payloads are discarded"""
+        with self._cond:
+            self._close()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self.closed)
+                if self.closed:
+                    return
+                payload, droppable = self._dequeue()
+            try:
+                self.conn.sendall(payload)
+            except (OSError, ConnectionError, BrokenPipeError, AttributeError):
+                self.close()
+                return
+            with self._cond:
+                self._sent(payload, droppable)
+                self._cond.notify_all()
+
+
+class WriterLoop:
+    """
+    One thread sending for every SelectorConnectionWriter.
+
+    Writers with new payloads are handed over through a ready list plus a
+    wake-up socket; a writer whose socket is full is registered for
+    EVENT_WRITE and resumed when the client reads again.
+    """
+    _shared: Optional["WriterLoop"] = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "WriterLoop":
+        """The process-wide loop, started on first use"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._ready: deque = deque()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="writer-loop")
+        self._thread.start()
+
+    def wake(self, writer: "SelectorConnectionWriter") -> None:
+        """Schedules `writer` for a send attempt on the loop thread"""
+        with self._lock:
+            self._ready.append(writer)
+            signal = len(self._ready) == 1
+        if signal:
+            try:
+                self._wake_w.send(b"\0")
+            except OSError:
+                pass    # wake-up socket full: the loop is already due to run
+
+    def _run(self) -> None:
+        while True:
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    self._drain_wakeups()
+                else:
+                    self._service(key.data)
+            with self._lock:
+                ready, self._ready = self._ready, deque()
+            for writer in ready:
+                self._service(writer)
+
+    def _drain_wakeups(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def _service(self, writer: "SelectorConnectionWriter") -> None:
+        blocked = writer._write_some()
+        if blocked and not writer._registered:
+            self._register(writer)
+        elif not blocked and writer._registered:
+            self._unregister(writer)
+
+    def _register(self, writer: "SelectorConnectionWriter") -> None:
+        try:
+            self._selector.register(writer.conn, selectors.EVENT_WRITE, writer)
+        except KeyError:
+            # The fd of a connection closed behind our back was reused by this one
+            stale = self._selector.get_key(writer.conn).data
+            self._unregister(stale)
+            stale.close()
+            self._selector.register(writer.conn, selectors.EVENT_WRITE, writer)
+        except (ValueError, OSError):
+            writer.close()      # socket already closed
+            return
+        writer._registered = True
+
+    def _unregister(self, writer: "SelectorConnectionWriter") -> None:
+        try:
+            self._selector.unregister(writer.conn)
+        except (KeyError, ValueError, OSError):
+            pass
+        writer._registered = False
+
+
+class SelectorConnectionWriter(_FrameQueue):
+    """Same contract as ConnectionWriter, without a thread: a shared WriterLoop sends"""
+    def __init__(self, conn: socket.socket, max_queue: int = BROADCAST_MAX_QUEUE_FRAMES,
+                 loop: Optional[WriterLoop] = None):
+        super().__init__(conn, max_queue)
+        self._cond = threading.Condition()
+        self._loop = loop or WriterLoop.shared()
+        self._current: Optional[tuple] = None    # (view, payload, droppable) being written
+        self._offset = 0
+        self._scheduled = False
+        self._registered = False                 # waiting for EVENT_WRITE (loop thread only)
+
+    def push_frame(self, frame: Payload) -> None:
+        """Queues a droppable state frame"""
+        self._push(frame, True)
+
+    def push_control(self, data: Payload) -> None:
+        """Queues a message that must be delivered (join/conversion/PONG)"""
+        self._push(data, False)
+
+    def _push(self, payload: Payload, droppable: bool) -> None:
+        with self._cond:
+            if not self._enqueue(payload, droppable) or self._scheduled:
+                return
+            self._scheduled = True
+        self._loop.wake(self)
+
+    def drop_backlog(self) -> int:
+        """Discards queued state frames; returns how many were dropped"""
+        with self._cond:
+            return self._drop_backlog()
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Waits until the queue is empty; returns False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: (not self._queue and not self._sending) or self.closed, timeout
+            )
+
+    def close(self) -> None:
+        """Discards pending payloads; the loop forgets the socket"""
+        with self._cond:
+            self._close()
+            self._current = None
+            self._cond.notify_all()
+        self._loop.wake(self)
+
+    def _write_some(self) -> bool:
+        """Loop thread: sends until the queue is empty (False) or the socket is full (True)"""
+        while True:
+            with self._cond:
+                self._scheduled = False
+                if self.closed:
+                    return False
+                if self._current is None:
+                    if not self._queue:
+                        self._cond.notify_all()
+                        return False
+                    payload, droppable = self._dequeue()
+                    self._current = (memoryview(payload), payload, droppable)
+                    self._offset = 0
+                view, payload, droppable = self._current
+            try:
+                sent = self.conn.send(view[self._offset:], _MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                return True
+            except (OSError, ConnectionError, AttributeError):
+                self.close()
+                return False
+            with self._cond:
+                self._offset += sent
+                if self._offset >= len(view):
+                    self._current = None
+                    self._sent(payload, droppable)
+                    self._cond.notify_all()
+
+
+class AsyncConnectionWriter(_FrameQueue):
+    """
+    Same contract as ConnectionWriter for an asyncio StreamWriter.
+    Must be created and fed from the event loop thread; a task drains it.
+    """
+    def __init__(self, conn: asyncio.StreamWriter, max_queue: int = BROADCAST_MAX_QUEUE_FRAMES):
+        super().__init__(conn, max_queue)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def push_frame(self, frame: Payload) -> None:
+        """Queues a droppable state frame"""
+        if self._enqueue(frame, True):
+            self._wakeup.set()
+
+    def push_control(self, data: Payload) -> None:
+        """Queues a message that must be delivered (join/conversion/PONG)"""
+        if self._enqueue(data, False):
+            self._wakeup.set()
+
+    def drop_backlog(self) -> int:
+        """Discards queued state frames; returns how many were dropped"""
+        return self._drop_backlog()
+
+    def flush(self, timeout: float = 0.0) -> bool:
+        """Non-blocking: True if nothing is pending (await drain() instead)"""
+        return (not self._queue and not self._sending) or self.closed
+
+    def close(self) -> None:
+        """Stops the drain task; pending payloads are discarded"""
+        self._close()
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue and not self.closed:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if self.closed:
+                return
+            payload, droppable = self._dequeue()
+            try:
+                self.conn.write(payload)
+                await self.conn.drain()
+            except (OSError, ConnectionError, AttributeError):
+                self.close()
+                return
+            self._sent(payload, droppable)
+
+
+class BroadcastEngine:
+    """Registry of connection writers shared by the game loop and client handlers"""
+    def __init__(self, max_queue: int = BROADCAST_MAX_QUEUE_FRAMES, writer_factory=ConnectionWriter):
+        """
+        Args:
+            max_queue      : state frames a connection may buffer
+            writer_factory : SelectorConnectionWriter (one shared thread),
+                             ConnectionWriter (a thread each) or AsyncConnectionWriter
+        """
+        self.max_queue = max_queue
+        self.writer_factory = writer_factory
+        self._writers: Dict[socket.socket, _FrameQueue] = {}
+        self._binary: set = set()
+        self._removed = weakref.WeakSet()       # never get a writer again
+        self._lock = threading.Lock()
+
+    def set_binary(self, conn) -> None:
+        """Marks a connection as using the binary protocol (negotiated at join)"""
+        with self._lock:
+            self._binary.add(conn)
+
+    def is_binary(self, conn) -> bool:
+        return conn in self._binary
+
+    def writer_for(self, conn) -> Optional[_FrameQueue]:
+        """Returns the writer of a connection, creating it on first use; None once removed"""
+        with self._lock:
+            writer = self._writers.get(conn)
+            if writer is None:
+                if conn in self._removed:
+                    return None
+                writer = self.writer_factory(conn, self.max_queue)
+                self._writers[conn] = writer
+            return writer
+
+    def send(self, conn: socket.socket, data: Payload) -> None:
+        """Queues a control message, preserving order with state frames (dropped once removed)"""
+        if conn in self._binary:
+            data = encode_text(data)
+        writer = self.writer_for(conn)
+        if writer is not None:
+            writer.push_control(data)
+
+    def ping_all(self, now: float) -> int:
+        """Queues a numbered {"ping": n} on every open connection; returns how many"""
+        with self._lock:
+            writers = [(conn, writer) for conn, writer in self._writers.items() if not writer.closed]
+        for conn, writer in writers:
+            number = writer.latency.next_ping(now)
+            self.send(conn, b'{"ping": %d}\n' % number)
+        return len(writers)
+
+    def record_pong(self, conn, number: int, now: float) -> None:
+        """Answer PONG:<n> read from a connection"""
+        with self._lock:
+            writer = self._writers.get(conn)
+        if writer is not None:
+            writer.latency.pong(number, now)
+
+    def remove(self, conn: socket.socket) -> None:
+        """Closes the connection's writer; later sends to it are ignored"""
+        with self._lock:
+            writer = self._writers.pop(conn, None)
+            self._binary.discard(conn)
+            self._removed.add(conn)
+        if writer:
+            writer.close()
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Waits for every writer to drain its queue"""
+        with self._lock:
+            writers = list(self._writers.values())
+        return all(w.flush(timeout) for w in writers)
+
+    def stats(self) -> List[dict]:
+        """Per-connection queue depth and counters"""
+        with self._lock:
+            writers = list(self._writers.values())
+        return [w.stats() for w in writers]
+
+    def totals(self) -> dict:
+        """Aggregated counters across all connections"""
+        stats = self.stats()
+        return {
+            "connections": len(stats),
+            "max_queue_depth": max((s["queue_depth"] for s in stats), default=0),
+            "frames_dropped": sum(s["frames_dropped"] for s in stats),
+            "bytes_sent": sum(s["bytes_sent"] for s in stats),
+        }
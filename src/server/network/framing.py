@@ -0,0 +1,75 @@
+"""
+Framing of the client -> server command channel.
+
+Every command is one line terminated by "\\n" (a trailing "\\r" is
+ignored). TCP may coalesce several commands into one segment or split one
+across segments, so each connection keeps a CommandReader: it is fed
+whatever recv() returned and hands back the complete commands, keeping a
+partial line for the next call. A client can pipeline any number of
+inputs and the server handles the whole batch from one recv().
+
+Lines longer than MAX_COMMAND_BYTES are dropped (and counted) without
+being buffered, so a misbehaving peer cannot grow the buffer.
+"""
+from typing import List, Tuple
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from common.constants import MAX_COMMAND_BYTES
+from common.binary_protocol import PROTOCOL_LINE
+
+
+class CommandReader:
+    """Splits one connection's byte stream into commands"""
+    def __init__(self, max_line: int = MAX_COMMAND_BYTES):
+        self.max_line = max_line
+        self._buffer = bytearray()
+        self._discarding = False    # inside an oversized line, until its "\n"
+        self.commands = 0
+        self.oversized = 0
+
+    def feed(self, data: bytes) -> List[str]:
+        """Complete commands in `data` (plus what was buffered), in order; blank lines skipped"""
+        self._buffer += data
+        lines = self._buffer.split(b"\n")
+        rest = lines.pop()
+        if self._discarding and lines:
+            lines.pop(0)
+            self._discarding = False
+        self._buffer = bytearray(rest)
+        if len(self._buffer) > self.max_line:
+            self._buffer.clear()
+            if not self._discarding:
+                self._discarding = True
+                self.oversized += 1
+        commands = []
+        for line in lines:
+            if len(line) > self.max_line:
+                self.oversized += 1
+                continue
+            try:
+                command = line.decode("utf-8").strip()
+            except UnicodeDecodeError:
+                continue
+            if command:
+                commands.append(command)
+        self.commands += len(commands)
+        return commands
+
+    def has_partial(self) -> bool:
+        """True while an unterminated line is buffered"""
+        return bool(self._buffer) or self._discarding
+
+
+def split_handshake(commands: List[str]) -> Tuple[str, List[str]]:
+    """
+    Splits the first commands of a connection into the handshake lines
+    (RECONNECT:<session>, PROTO:...) and the game commands the client
+    pipelined right after them. The handshake comes back joined by "\n".
+    """
+    count = 0
+    while count < len(commands) and (commands[count].startswith("RECONNECT:")
+                                     or commands[count] == PROTOCOL_LINE):
+        count += 1
+    return "\n".join(commands[:count]), commands[count:]
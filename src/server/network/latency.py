@@ -0,0 +1,145 @@
+"""
+Per-connection latency telemetry: RTT, jitter and send-queue delay.
+
+The server pings every connection with a {"ping": <n>} control message,
+queued in order with the state frames, and the client answers with the
+command PONG:<n>. The RTT runs from the moment the ping is queued to the
+moment the handler reads the answer, so it includes the time the ping
+waited in the connection's send queue. That queue delay is measured on
+every payload the writer sends, so RTT minus queue delay is the network
+(and client) share, and neither depends on the tick loop. Jitter is the
+RFC 3550 smoothed variation between consecutive RTTs.
+
+Histograms use fixed millisecond buckets so connections can be merged.
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# Upper bounds (ms) of the histogram buckets; one more bucket counts anything slower
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+# Unanswered pings remembered per connection; older ones count as lost
+MAX_OUTSTANDING_PINGS = 8
+_SRTT_GAIN = 1 / 8
+_JITTER_GAIN = 1 / 16
+
+
+class LatencyHistogram:
+    """Sample counts per latency bucket"""
+    def __init__(self, bounds_ms: tuple = LATENCY_BUCKETS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.samples = 0
+        self.max_ms = 0.0
+
+    def add(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        self.counts[bisect_left(self.bounds_ms, ms)] += 1
+        self.samples += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.samples += other.samples
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound (ms) of the bucket holding the pct-th percentile; max_ms for the last one"""
+        if not self.samples:
+            return 0.0
+        rank = pct / 100.0 * self.samples
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return float(self.bounds_ms[i]) if i < len(self.bounds_ms) else self.max_ms
+        return self.max_ms
+
+    def copy(self) -> "LatencyHistogram":
+        histogram = LatencyHistogram(self.bounds_ms)
+        histogram.merge(self)
+        return histogram
+
+    def format(self) -> str:
+        labels = [f"<={bound}ms" for bound in self.bounds_ms] + [f">{self.bounds_ms[-1]}ms"]
+        return "  ".join(f"{label}:{count}" for label, count in zip(labels, self.counts))
+
+
+class LatencyTracker:
+    """Ping bookkeeping and latency statistics of one connection (thread safe)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_ping = 0
+        self._outstanding: Dict[int, float] = {}    # ping number -> queued at (monotonic)
+        self.pings_sent = 0
+        self.pings_lost = 0
+        self.rtt: Optional[float] = None            # last sample, seconds
+        self.srtt: Optional[float] = None           # smoothed, seconds
+        self.jitter = 0.0
+        self.queue_delay = 0.0                      # last payload's wait in the send queue
+        self.rtt_histogram = LatencyHistogram()
+        self.queue_histogram = LatencyHistogram()
+
+    def next_ping(self, now: float) -> int:
+        """Number of a ping queued at `now`"""
+        with self._lock:
+            self._next_ping += 1
+            self.pings_sent += 1
+            self._outstanding[self._next_ping] = now
+            while len(self._outstanding) > MAX_OUTSTANDING_PINGS:
+                del self._outstanding[min(self._outstanding)]
+                self.pings_lost += 1
+            return self._next_ping
+
+    def pong(self, number: int, now: float) -> Optional[float]:
+        """Records the answer to ping `number`; returns the RTT, None for unknown pings"""
+        with self._lock:
+            sent_at = self._outstanding.pop(number, None)
+            if sent_at is None:
+                return None
+            rtt = now - sent_at
+            if self.rtt is not None:
+                self.jitter += (abs(rtt - self.rtt) - self.jitter) * _JITTER_GAIN
+            self.srtt = rtt if self.srtt is None else self.srtt + (rtt - self.srtt) * _SRTT_GAIN
+            self.rtt = rtt
+            self.rtt_histogram.add(rtt)
+            return rtt
+
+    def record_queue_delay(self, seconds: float) -> None:
+        with self._lock:
+            self.queue_delay = seconds
+            self.queue_histogram.add(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rtt_ms": None if self.rtt is None else self.rtt * 1000.0,
+                "srtt_ms": None if self.srtt is None else self.srtt * 1000.0,
+                "jitter_ms": self.jitter * 1000.0,
+                "queue_ms": self.queue_delay * 1000.0,
+                "queue_p95_ms": self.queue_histogram.percentile(95),
+                "pings_sent": self.pings_sent,
+                "pings_lost": self.pings_lost,
+                "rtt_histogram": self.rtt_histogram.copy(),
+                "queue_histogram": self.queue_histogram.copy(),
+            }
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}ms"
+
+
+def format_latency_table(stats: List[dict]) -> List[str]:
+    """Per-connection table and merged histograms, one log line each"""
+    lines = [f"{'peer':<22} {'rtt':>9} {'srtt':>9} {'jitter':>9} {'queue':>9} {'q p95':>9} {'lost':>5}"]
+    rtt = LatencyHistogram()
+    queue = LatencyHistogram()
+    for s in stats:
+        lines.append(f"{s['peer']:<22} {_ms(s['rtt_ms']):>9} {_ms(s['srtt_ms']):>9} {_ms(s['jitter_ms']):>9} "
+                     f"{_ms(s['queue_ms']):>9} {_ms(s['queue_p95_ms']):>9} {s['pings_lost']:>5}")
+        rtt.merge(s["rtt_histogram"])
+        queue.merge(s["queue_histogram"])
+    lines.append(f"rtt   {rtt.format()}")
+    lines.append(f"queue {queue.format()}")
+    return lines
@@ -3,16 +3,34 @@ Server-side network management
 """
 import socket
 import json
+import struct
 import sys
 import os
+import threading
+import time
+from typing import Dict, List, Optional
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from server.controller.command_controller import CommandController
+from server.network.broadcast import BroadcastEngine
+from server.network.framing import CommandReader
+from common.constants import DELTA_KEYFRAME_INTERVAL, DEFAULT_ROOM_ID
+from common.state_delta import normalize_state, diff_state
+from common.binary_protocol import encode_state, encode_chat, chat_version
+
+# Bytes per recv(): a burst of pipelined commands is handled from one call
+RECV_SIZE = 4096
 
 class ClientHandler:
     """Handles communication with a single client"""
     def __init__(self, conn: socket.socket, addr: tuple, command_controller: CommandController,
-                 user_id: int, is_spectator: bool, player_name: str, client_id: str):
+                 user_id: int, is_spectator: bool, player_name: str, client_id: str,
+                 broadcaster: Optional["StateBroadcaster"] = None,
+                 room_id: int = DEFAULT_ROOM_ID, lobby=None):
+        """
+        `lobby` executes room commands (ROOMS / CREATE_ROOM / JOIN_ROOM):
+        any object with handle_room_command(handler, request), i.e. the server.
+        """
         self.conn = conn
         self.addr = addr
         self.controller = command_controller
@@ -22,39 +40,37 @@ class ClientHandler:
         self.client_id = client_id
         self.user_type = "Spectator" if is_spectator else "Player"
         self.display_name = player_name or f"{self.user_type} {user_id}"
+        self.broadcaster = broadcaster
+        self.room_id = room_id
+        self.lobby = lobby
+        self.command_reader = CommandReader()
+        self._pending: List[str] = []
+
+    def enter_room(self, room_id: int, command_controller: CommandController,
+                   broadcaster: "StateBroadcaster", user_id: int, is_spectator: bool) -> None:
+        """Re-routes this connection to another room's controller and broadcaster"""
+        self.room_id = room_id
+        self.controller = command_controller
+        self.broadcaster = broadcaster
+        self.user_id = user_id
+        self.is_spectator = is_spectator
+        self.user_type = "Spectator" if is_spectator else "Player"
+
+    def adopt(self, command_reader: CommandReader, pending: List[str]) -> None:
+        """Takes over the reader used for the handshake and the commands that arrived with it"""
+        self.command_reader = command_reader
+        self._pending = list(pending)
 
     def handle(self):
         """Main client handling loop"""
         print(f"[HANDLER] Starting {self.user_type} {self.user_id} ({self.display_name}) from {self.addr}")
         try:
+            self._process_pending()
             while True:
-                data = self.conn.recv(1024)
+                data = self.conn.recv(RECV_SIZE)
                 if not data:
                     break
-                try:
-                    message = data.decode("utf-8").strip()
-                except UnicodeDecodeError:
-                    continue
-                if not message:
-                    continue
-                response = self.controller.handle_command(message, self.user_id, self.is_spectator, self.player_name)
-                if response.get("type") == "pong":
-                    self.conn.sendall(b"PONG\n")
-                elif response.get("type") == "conversion":
-                    if response.get("success"):
-                        old_user_id = self.user_id
-                        self.user_id = response["new_player_id"]
-                        self.is_spectator = False
-                        self.user_type = "Player"
-                        print(f"[HANDLER] Spectator {old_user_id} converted to Player {self.user_id}")
-                        resp_json = json.dumps({
-                            "conversion_success": True,
-                            "new_player_id": self.user_id,
-                            "is_spectator": False
-                        })
-                        self.conn.sendall((resp_json + "\n").encode())
-                    else:
-                        self.conn.sendall(b'{"conversion_success": false}\n')
+                self.process(data)
         except ConnectionResetError:
             pass
         except (OSError, ConnectionError, BrokenPipeError) as e:
@@ -62,6 +78,70 @@ class ClientHandler:
         finally:
             self._cleanup()
 
+    async def handle_async(self, reader) -> None:
+        """asyncio variant of handle(); `self.conn` is the StreamWriter"""
+        print(f"[HANDLER] Starting {self.user_type} {self.user_id} ({self.display_name}) from {self.addr}")
+        try:
+            self._process_pending()
+            while True:
+                data = await reader.read(RECV_SIZE)
+                if not data:
+                    break
+                self.process(data)
+        except ConnectionResetError:
+            pass
+        except (OSError, ConnectionError) as e:
+            print(f"[HANDLER] Error: {e}")
+        finally:
+            self._cleanup()
+
+    def process(self, data: bytes) -> None:
+        """Handles one chunk received from the client: every complete command in it (transport independent)"""
+        for command in self.command_reader.feed(data):
+            self.process_command(command)
+
+    def _process_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        for command in pending:
+            self.process_command(command)
+
+    def process_command(self, message: str) -> None:
+        """Executes one framed command"""
+        response = self.controller.handle_command(message, self.user_id, self.is_spectator, self.player_name)
+        if response.get("type") == "pong":
+            self._send(b"PONG\n")
+        elif response.get("type") == "resync":
+            if self.broadcaster:
+                self.broadcaster.request_keyframe(self.conn)
+        elif response.get("type") == "ping_reply":
+            if self.broadcaster:
+                self.broadcaster.record_pong(self.conn, response["ping"], time.monotonic())
+        elif response.get("type") in ("list_rooms", "create_room", "join_room"):
+            if self.lobby:
+                self.lobby.handle_room_command(self, response)
+        elif response.get("type") == "conversion":
+            if response.get("success"):
+                old_user_id = self.user_id
+                self.user_id = response["new_player_id"]
+                self.is_spectator = False
+                self.user_type = "Player"
+                print(f"[HANDLER] Spectator {old_user_id} converted to Player {self.user_id}")
+                resp_json = json.dumps({
+                    "conversion_success": True,
+                    "new_player_id": self.user_id,
+                    "is_spectator": False
+                })
+                self._send((resp_json + "\n").encode())
+            else:
+                self._send(b'{"conversion_success": false}\n')
+
+    def _send(self, data: bytes) -> None:
+        """Writes through the broadcaster (keeps ordering with state frames)"""
+        if self.broadcaster:
+            self.broadcaster.send(self.conn, data)
+        else:
+            self.conn.sendall(data)
+
     def _cleanup(self):
         """Cleanup when client disconnects"""
         print(f"[HANDLER] Disconnecting {self.user_type} {self.user_id} ({self.display_name}) from {self.addr}")
@@ -70,22 +150,125 @@ class ClientHandler:
         except (OSError, AttributeError):
             pass
 
-def send_state_to_clients(clients: list, spectators: list, state: dict):
-    """Sends game state to all connected clients"""
-    state_json = json.dumps(state) + "\n"
-    for client in list(clients):
-        try:
-            client.sendall(state_json.encode())
-        except (OSError, ConnectionError, BrokenPipeError, AttributeError):
-            try:
-                clients.remove(client)
-            except ValueError:
-                pass
-    for spectator in list(spectators):
+class StateBroadcaster:
+    """
+    Sends the per-tick state to every connection through a BroadcastEngine.
+
+    Each frame kind is encoded once per tick into a shared memoryview and
+    queued on every connection's writer; the game loop never blocks on a
+    socket. In delta mode each connection has a baseline: the sequence
+    number of the last frame queued for it. TCP delivers frames in order, so
+    a connection whose baseline is the previous frame gets the shared delta;
+    any other connection (new, resyncing, or whose stale backlog was
+    dropped) gets a full keyframe. A keyframe is also forced every
+    `keyframe_interval` frames.
+
+    Connections that negotiated the binary protocol get a binary STATE
+    frame every time instead, plus a CHAT frame whenever the chat changed
+    since the last one they were sent.
+    """
+    def __init__(self, delta_mode: bool = False, keyframe_interval: int = DELTA_KEYFRAME_INTERVAL,
+                 engine: Optional[BroadcastEngine] = None):
+        self.delta_mode = delta_mode
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.engine = engine or BroadcastEngine()
+        self.frame_seq = 0
+        self._previous: Optional[dict] = None
+        self._baselines: Dict[socket.socket, int] = {}
+        self._chat_versions: Dict[socket.socket, tuple] = {}
+        self._lock = threading.Lock()
+
+    def broadcast(self, clients: list, spectators: list, state: dict) -> None:
+        """Queues one frame (delta or keyframe) for all clients and spectators"""
+        with self._lock:
+            self.frame_seq += 1
+            seq = self.frame_seq
+            delta_frame = None
+            if self.delta_mode:
+                snapshot = normalize_state(state)
+                previous, self._previous = self._previous, snapshot
+                if previous is not None and seq % self.keyframe_interval != 0:
+                    delta_frame = _encode_frame({
+                        "delta": diff_state(previous, snapshot),
+                        "frame_seq": seq,
+                        "base_seq": seq - 1,
+                    })
+            else:
+                snapshot = state
+            keyframe = None
+            binary_frame = None
+            chat = state.get("chat_messages", [])
+            chat_key = chat_version(chat)
+            chat_frame = None
+            binary_failed = False
+            for conns in (clients, spectators):
+                for conn in list(conns):
+                    writer = self.engine.writer_for(conn)
+                    if writer is None or writer.closed:
+                        self._drop_connection(conn, conns)
+                        continue
+                    if writer.is_congested():
+                        # Slow reader: its queued frames are stale, resync it
+                        writer.drop_backlog()
+                        self._baselines.pop(conn, None)
+                    if self.engine.is_binary(conn):
+                        if binary_frame is None and not binary_failed:
+                            try:
+                                binary_frame = memoryview(encode_state(state))
+                            except (struct.error, ValueError, KeyError, TypeError) as exc:
+                                # Binary clients miss this frame; JSON ones and the tick loop carry on
+                                print(f"[BROADCAST] [WARN] Cannot encode binary frame #{seq}: {exc!r}")
+                                binary_failed = True
+                        if binary_failed:
+                            continue
+                        if self._chat_versions.get(conn) != chat_key:
+                            if chat_frame is None:
+                                chat_frame = encode_chat(chat)
+                            writer.push_control(chat_frame)
+                            self._chat_versions[conn] = chat_key
+                        writer.push_frame(binary_frame)
+                        continue
+                    if delta_frame is not None and self._baselines.get(conn) == seq - 1:
+                        payload = delta_frame
+                    else:
+                        if keyframe is None:
+                            keyframe = _encode_frame(dict(snapshot, frame_seq=seq))
+                        payload = keyframe
+                    writer.push_frame(payload)
+                    self._baselines[conn] = seq
+
+    def send(self, conn: socket.socket, data: bytes) -> None:
+        """Queues a control message for one connection"""
+        self.engine.send(conn, data)
+
+    def record_pong(self, conn: socket.socket, number: int, now: float) -> None:
+        """Answer to a server ping: updates the connection's RTT statistics"""
+        self.engine.record_pong(conn, number, now)
+
+    def request_keyframe(self, conn: socket.socket) -> None:
+        """Drops the baseline of a connection so its next frame is a keyframe"""
+        with self._lock:
+            self._baselines.pop(conn, None)
+            self._chat_versions.pop(conn, None)
+
+    def forget(self, conn: socket.socket) -> None:
+        """Removes all per-connection state for a closed connection"""
+        self.request_keyframe(conn)
+        self.engine.remove(conn)
+
+    def stats(self) -> list:
+        """Per-connection queue depth, sent and dropped frame counters"""
+        return self.engine.stats()
+
+    def _drop_connection(self, conn: socket.socket, conns: list) -> None:
+        self._baselines.pop(conn, None)
+        self._chat_versions.pop(conn, None)
+        self.engine.remove(conn)
         try:
-            spectator.sendall(state_json.encode())
-        except (OSError, ConnectionError, BrokenPipeError, AttributeError):
-            try:
-                spectators.remove(spectator)
-            except ValueError:
-                pass
\ No newline at end of file
+            conns.remove(conn)
+        except ValueError:
+            pass
+
+
+def _encode_frame(frame: dict) -> memoryview:
+    return memoryview((json.dumps(frame) + "\n").encode())
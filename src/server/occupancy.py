@@ -0,0 +1,107 @@
+"""
+Occupancy index: which players, bomb and fire are on each tile.
+
+Kept alongside a State (State.occupancy) so collision, bomb and damage
+checks are dictionary lookups instead of scans over all players/bombs.
+
+* Players register themselves: Player.__setattr__ reports every x/y change,
+  so the index follows moves made anywhere (core, services, tests).
+* Bombs and explosions are added/removed by core.
+* core.occupancy() rebuilds the index when the counts no longer match the
+  State (e.g. lists replaced by a snapshot restore).
+"""
+from typing import Dict, List, Optional, Tuple
+
+from .models import State, Player, Bomb, Explosion
+
+Pos = Tuple[int, int]
+
+
+class OccupancyGrid:
+    """Sparse tile -> occupants index for one State"""
+    def __init__(self):
+        self._players: Dict[Pos, Dict[int, Player]] = {}
+        self._bombs: Dict[Pos, Bomb] = {}
+        self._fire: Dict[Pos, List[Explosion]] = {}
+        self.player_count = 0
+        self.bomb_count = 0
+        self.explosion_count = 0
+
+    @classmethod
+    def build(cls, s: State) -> "OccupancyGrid":
+        grid = cls()
+        for pid, player in s.players.items():
+            grid.add_player(pid, player)
+        for bomb in s.bombs:
+            grid.add_bomb(bomb)
+        for explosion in s.explosions:
+            grid.add_fire(explosion)
+        return grid
+
+    def in_sync(self, s: State) -> bool:
+        """Cheap check that nothing was added or removed behind the index's back"""
+        return (self.player_count == len(s.players) and self.bomb_count == len(s.bombs)
+                and self.explosion_count == len(s.explosions))
+
+    # ── players ──────────────────────────────────────────────────────────────
+
+    def add_player(self, pid: int, player: Player) -> None:
+        player.attach_occupancy(self, pid)
+        self._players.setdefault((player.x, player.y), {})[pid] = player
+        self.player_count += 1
+
+    def remove_player(self, pid: int, player: Player) -> None:
+        player.attach_occupancy(None, pid)
+        self._discard_player((player.x, player.y), pid)
+        self.player_count -= 1
+
+    def player_moved(self, pid: int, player: Player, old: Pos) -> None:
+        """Called by Player when its x or y changes"""
+        self._discard_player(old, pid)
+        self._players.setdefault((player.x, player.y), {})[pid] = player
+
+    def players_at(self, x: int, y: int) -> Dict[int, Player]:
+        return self._players.get((x, y), {})
+
+    def _discard_player(self, pos: Pos, pid: int) -> None:
+        cell = self._players.get(pos)
+        if cell is not None:
+            cell.pop(pid, None)
+            if not cell:
+                del self._players[pos]
+
+    # ── bombs ────────────────────────────────────────────────────────────────
+
+    def add_bomb(self, bomb: Bomb) -> None:
+        self._bombs[(bomb.x, bomb.y)] = bomb
+        self.bomb_count += 1
+
+    def remove_bomb(self, bomb: Bomb) -> None:
+        if self._bombs.get((bomb.x, bomb.y)) is bomb:
+            del self._bombs[(bomb.x, bomb.y)]
+        self.bomb_count -= 1
+
+    def bomb_at(self, x: int, y: int) -> Optional[Bomb]:
+        return self._bombs.get((x, y))
+
+    # ── fire ─────────────────────────────────────────────────────────────────
+
+    def add_fire(self, explosion: Explosion) -> None:
+        for x, y in explosion.positions:
+            self._fire.setdefault((x, y), []).append(explosion)
+        self.explosion_count += 1
+
+    def remove_fire(self, explosion: Explosion) -> None:
+        for x, y in explosion.positions:
+            cell = self._fire.get((x, y))
+            if cell and explosion in cell:
+                cell.remove(explosion)
+                if not cell:
+                    del self._fire[(x, y)]
+        self.explosion_count -= 1
+
+    def is_burning(self, x: int, y: int) -> bool:
+        return (x, y) in self._fire
+
+    def burning_tiles(self):
+        return self._fire.keys()
@@ -4,6 +4,7 @@ Combines and orchestrates functions from core.py
 """
 from functools import wraps
 from typing import Any, Dict, Optional
+import math
 import sys
 import os
 import random
@@ -25,19 +26,32 @@ def _synchronized(method):
 
 from server.models import (
     State,
+    StateSnapshot,
+    MAP_WIDTH,
+    MAP_HEIGHT,
+    state_to_dict,
     GAME_STATE_LOBBY,
     GAME_STATE_PLAYING,
     GAME_STATE_VICTORY,
     BLOCK_REGEN_MIN_TIME,
     BLOCK_REGEN_MAX_TIME
 )
-from server import core
+from server import core, tilemap
+from server.services.input_queue import InputQueue
+from common.state_delta import normalize_state
+from common.constants import MAX_PLAYERS, SIM_TICK_RATE
 
 class GameService:
     """Service containing all game business logic"""
-    def __init__(self):
+    def __init__(self, map_width: int = MAP_WIDTH, map_height: int = MAP_HEIGHT, max_players: int = MAX_PLAYERS,
+                 tick_rate: float = SIM_TICK_RATE):
+        """`tick_rate` is how often tick() is called; game timers are scaled to it"""
+        core.check_match_config(map_width, map_height, max_players)
         self._lock = threading.RLock()
-        self.state = State()
+        self.state = State(map_width=map_width, map_height=map_height, max_players=max_players,
+                           tick_rate=tick_rate)
+        self.inputs = InputQueue()
+        self._snapshot: Optional[StateSnapshot] = None
     
     @_synchronized
     def add_player(self, player_id: int, name: str = "") -> None:
@@ -58,8 +72,7 @@ class GameService:
         player_name = player.name or f"Player {player_id}"
         print(f"[DISCONNECT] {player_name} disconnected")
         if self.state.game_state == GAME_STATE_LOBBY:
-            if player_id in self.state.players:
-                del self.state.players[player_id]
+            core.remove_player(self.state, player_id)
             stale = [cid for cid, pid in list(self.state.client_player_mapping.items()) if pid == player_id]
             for cid in stale:
                 del self.state.client_player_mapping[cid]
@@ -68,6 +81,7 @@ class GameService:
                 self.get_current_host()
         elif self.state.game_state == GAME_STATE_PLAYING:
             player.disconnected = True
+            player.disconnect_time = self.state.now()
             player.alive = False
             self._add_system_message(f"{player_name} disconnected")
             self.check_victory()
@@ -111,8 +125,8 @@ class GameService:
         return new_pid
     
     def _find_free_player_slot(self) -> Optional[int]:
-        """Finds a free player slot (0-3) or returns None if all slots are full"""
-        for i in range(4):
+        """Finds a free player slot (0..max_players-1) or returns None if all slots are full"""
+        for i in range(self.state.max_players):
             if i not in self.state.players:
                 return i
         return None
@@ -170,9 +184,41 @@ class GameService:
         """Adds a system message"""
         self.add_chat_message(-1, message, is_system=True)
     
+    def submit_input(self, user_id: int, action: str, arg=None, input_seq: Optional[int] = None) -> None:
+        """Queues a client command for the start of the next tick (no lock taken)"""
+        self.inputs.put(user_id, action, arg, input_seq)
+
+    def _apply_inputs(self) -> None:
+        """Applies the commands queued since the previous tick"""
+        for item in self.inputs.drain():
+            if item.action == "move":
+                core.move_player(self.state, item.user_id, item.arg)
+                if item.input_seq is not None and item.user_id in self.state.players:
+                    # Acknowledged whether or not the move was allowed: the client replays the rest
+                    self.state.players[item.user_id].input_seq = item.input_seq
+            elif item.action == "bomb":
+                core.place_bomb(self.state, item.user_id)
+            elif item.action == "chat":
+                self.add_chat_message(item.user_id, item.arg)
+            elif item.action == "start":
+                if (self.state.game_state == GAME_STATE_LOBBY and
+                        item.user_id == self.get_current_host() and self.start_game()):
+                    print(f"[GAME] Player {item.user_id} ({item.arg}) started the game")
+            elif item.action == "play_again":
+                if self.state.game_state == GAME_STATE_VICTORY:
+                    self.return_to_lobby()
+
+    def input_stats(self) -> dict:
+        return self.inputs.stats()
+
     @_synchronized
     def tick(self) -> None:
-        """Updates game state (called every frame)"""
+        """Updates game state (called every frame): queued inputs, simulation, then a new snapshot"""
+        self._apply_inputs()
+        self._advance()
+        self._publish()
+
+    def _advance(self) -> None:
         if self.state.game_state == GAME_STATE_VICTORY:
             self.state.victory_timer -= 1
             if self.state.victory_timer <= 0:
@@ -180,48 +226,109 @@ class GameService:
             return
         if self.state.game_state != GAME_STATE_PLAYING:
             return
-        for bomb in list(self.state.bombs):
-            bomb.timer -= 1
-            if bomb.timer <= 0:
-                core.explode_bomb(self.state, bomb)
-                self.state.bombs.remove(bomb)
-        for explosion in list(self.state.explosions):
-            explosion.timer -= 1
-            if explosion.timer <= 0:
-                self.state.explosions.remove(explosion)
+        core.advance_timers(self.state)
         if self.check_victory():
             return
         self.state.block_regen_timer -= 1
         if self.state.block_regen_timer <= 0:
             core.try_regen_block(self.state)
-            self.state.block_regen_timer = random.randint(BLOCK_REGEN_MIN_TIME, BLOCK_REGEN_MAX_TIME)
-    
+            self.state.block_regen_timer = random.randint(core.scaled_ticks(self.state, BLOCK_REGEN_MIN_TIME),
+                                                          core.scaled_ticks(self.state, BLOCK_REGEN_MAX_TIME))
+
+    def snapshot(self) -> StateSnapshot:
+        """Latest published snapshot; no lock unless none was published yet"""
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                snap = self._snapshot or self._publish()
+        return snap
+
+    def _publish(self) -> StateSnapshot:
+        """Builds and publishes the next snapshot (game lock held)"""
+        core.sync_timers(self.state)
+        previous = self._snapshot
+        game_map = self._shared_rows(previous.replica["game_map"] if previous else ())
+        # Fresh containers; chat message dicts are shared, core never modifies them once added
+        replica = state_to_dict(self.state)
+        replica["game_map"] = game_map
+        # Same shape as get_state(), but every container comes from the replica's copies
+        view = self._view()
+        for key in ("players", "spectators", "chat_messages"):
+            view[key] = replica[key]
+        for key in ("bombs", "explosions"):
+            if key in view:
+                view[key] = self._client_timers(replica[key])
+        if self.state.game_state == GAME_STATE_PLAYING:
+            view["map"] = game_map
+        self._snapshot = StateSnapshot(
+            version=previous.version + 1 if previous else 1,
+            tick=self.state.tick_count,
+            view=view,
+            replica=replica,
+        )
+        return self._snapshot
+
+    def _shared_rows(self, previous: tuple) -> tuple:
+        """The map as a tuple of row tuples, reusing the previous snapshot's unchanged rows"""
+        rows = tilemap.to_rows(self.state.game_map)
+        if len(previous) != len(rows):
+            return tuple(tuple(row) for row in rows)
+        shared = []
+        for old, row in zip(previous, rows):
+            row = tuple(row)
+            shared.append(old if old == row else row)
+        return tuple(shared)
+
     @_synchronized
     def get_state(self) -> Dict[str, Any]:
-        """Exports current state for sending to clients"""
+        """Exports current state for sending to clients (live objects, see snapshot())"""
+        core.sync_timers(self.state)
+        base = self._view()
+        if self.state.game_state == GAME_STATE_PLAYING:
+            base["map"] = tilemap.to_rows(self.state.game_map)
+        return base
+
+    def _view(self) -> Dict[str, Any]:
+        """get_state() without the map"""
         base = {
             "game_state": self.state.game_state,
             "players": {pid: vars(p) for pid, p in self.state.players.items()},
             "spectators": self.state.spectators,
             "chat_messages": self.state.chat_messages,
-            "current_host_id": self.get_current_host()
+            "current_host_id": self.get_current_host(),
+            "max_players": self.state.max_players
         }
         if self.state.game_state == GAME_STATE_LOBBY:
             base["can_start"] = core.connected_players_count(self.state) >= 2
             base["can_spectator_join"] = core.can_spectator_join(self.state)
         elif self.state.game_state == GAME_STATE_PLAYING:
             base.update({
-                "map": self.state.game_map,
-                "bombs": [vars(b) for b in self.state.bombs],
-                "explosions": [vars(e) for e in self.state.explosions]
+                "bombs": self._client_timers([vars(b) for b in self.state.bombs]),
+                "explosions": self._client_timers([vars(e) for e in self.state.explosions])
             })
         elif self.state.game_state == GAME_STATE_VICTORY:
             base.update({
                 "winner_id": self.state.winner_id,
-                "victory_timer": self.state.victory_timer
+                "victory_timer": self._client_ticks(self.state.victory_timer)
             })
         return base
+
+    def _client_ticks(self, ticks: int) -> int:
+        """Clients count timers in ticks at SIM_TICK_RATE, whatever the server's rate (never 0 early)"""
+        return math.ceil(ticks * SIM_TICK_RATE / self.state.tick_rate)
+
+    def _client_timers(self, items: list) -> list:
+        """Bombs/explosions with their timer in client ticks (new dicts only when they differ)"""
+        if self.state.tick_rate == SIM_TICK_RATE:
+            return items
+        return [dict(item, timer=self._client_ticks(item["timer"])) for item in items]
    
+    @_synchronized
+    def export_snapshot(self) -> Dict[str, Any]:
+        """Deep copy of the full state in JSON shape, taken between ticks (replication)"""
+        core.sync_timers(self.state)
+        return normalize_state(state_to_dict(self.state))
+
     @_synchronized
     def register_client_player(self, client_id: str, player_id: int) -> None:
         """Registers client-player mapping"""
@@ -0,0 +1,84 @@
+"""
+Per-tick input queue between client handlers and the game loop.
+
+Handler threads (or the asyncio loop) only append parsed commands to a
+deque, which needs no lock of ours, so they never wait for a tick or a
+state export holding the GameService lock. At the start of every tick the
+game loop takes everything queued so far and applies it in one batch,
+sorted by global arrival number: the batch order is fixed once the inputs
+are numbered, each client's own commands keep their order, and same-tick
+conflicts (a contested tile, two bombs) go to whoever sent first instead
+of always to the lowest player id.
+"""
+import itertools
+import time
+from collections import deque
+from typing import Any, List, NamedTuple, Optional
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(current_dir)
+src_dir = os.path.dirname(server_dir)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from common.constants import TICK_STATS_WINDOW
+from common.stats import percentile
+
+
+class Input(NamedTuple):
+    user_id: int
+    seq: int
+    action: str
+    arg: Any
+    queued_at: float
+    input_seq: Optional[int] = None     # client-assigned, acknowledged back in the state
+
+
+class InputQueue:
+    """Commands waiting for the next tick, plus per-tick count and latency windows"""
+    def __init__(self, window: int = TICK_STATS_WINDOW):
+        self._pending: deque = deque()
+        self._seq = itertools.count()
+        self._counts: deque = deque(maxlen=window)
+        self._latencies: deque = deque(maxlen=window)
+        self.total = 0
+
+    def put(self, user_id: int, action: str, arg: Any = None, input_seq: Optional[int] = None) -> None:
+        """Queues one command (any thread)"""
+        self._pending.append(Input(user_id, next(self._seq), action, arg, time.perf_counter(), input_seq))
+
+    def drain(self) -> List[Input]:
+        """Everything queued so far, in application order (game loop only)"""
+        batch = []
+        pop = self._pending.popleft
+        while True:
+            try:
+                batch.append(pop())
+            except IndexError:
+                break
+        now = time.perf_counter()
+        self._latencies.extend(now - item.queued_at for item in batch)
+        self._counts.append(len(batch))
+        self.total += len(batch)
+        # Two handlers can append out of numbering order; the number decides
+        batch.sort(key=lambda item: item.seq)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        """Inputs per tick and queue latency percentiles (ms) over the window"""
+        counts = sorted(self._counts)
+        latencies = sorted(self._latencies)
+        return {
+            "inputs": self.total,
+            "pending": len(self._pending),
+            "per_tick_p50": percentile(counts, 50),
+            "per_tick_max": counts[-1] if counts else 0,
+            "latency_p50_ms": percentile(latencies, 50) * 1000.0,
+            "latency_p95_ms": percentile(latencies, 95) * 1000.0,
+            "latency_max_ms": (latencies[-1] if latencies else 0.0) * 1000.0,
+        }
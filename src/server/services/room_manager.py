@@ -0,0 +1,209 @@
+"""
+Room manager: many independent matches hosted by one server process.
+
+Each Room owns its own GameService, player slots, CommandController,
+connection lists and StateBroadcaster. All rooms' broadcasters share one
+BroadcastEngine, so a connection keeps the same writer when it moves
+between rooms. Room DEFAULT_ROOM_ID always exists. RoomManager.snapshot()
+is what primary/backup replication ships: the default room's state, with
+every other room nested under "rooms" by room id.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(current_dir)
+src_dir = os.path.dirname(server_dir)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from server.models import State, StateSnapshot, DISCONNECT_TIMEOUT
+from server.services.game_service import GameService
+from server.controller.command_controller import CommandController
+from common.constants import DEFAULT_ROOM_ID, MAP_WIDTH, MAP_HEIGHT, MAX_PLAYERS, MAX_ROOMS, SIM_TICK_RATE
+
+# A new room survives this long before its creator has moved into it
+EMPTY_ROOM_GRACE_SECONDS = 10.0
+
+
+class Room:
+    """One match: game state plus the connections watching it"""
+    def __init__(self, room_id: int, name: str, broadcaster,
+                 map_width: int = MAP_WIDTH, map_height: int = MAP_HEIGHT, max_players: int = MAX_PLAYERS,
+                 tick_rate: float = SIM_TICK_RATE):
+        self.room_id = room_id
+        self.name = name
+        self.game_service = GameService(map_width, map_height, max_players, tick_rate)
+        self.player_slots = [False] * max_players
+        self.command_controller = CommandController(self.game_service, self.player_slots)
+        self.clients: list = []
+        self.spectator_clients: list = []
+        self.broadcaster = broadcaster
+        self.created_at = time.monotonic()
+        self.reconnect_until = 0.0      # restored on promotion: its players are on their way back
+
+    def is_empty(self) -> bool:
+        return not self.clients and not self.spectator_clients
+
+    def awaiting_reconnect(self) -> bool:
+        """True while a player who dropped mid-game may still come back (DISCONNECT_TIMEOUT)"""
+        if time.monotonic() < self.reconnect_until:
+            return True
+        now = State.now()
+        return any(p["disconnected"] and p.get("disconnect_time") is not None
+                   and now - p["disconnect_time"] < DISCONNECT_TIMEOUT
+                   for p in self.game_service.snapshot().replica["players"].values())
+
+    def free_slot(self) -> Optional[int]:
+        for i in range(len(self.player_slots)):
+            if not self.player_slots[i] and i not in self.game_service.state.players:
+                return i
+        return None
+
+    def info(self) -> dict:
+        """Summary sent to clients by the ROOMS command (from the latest snapshot)"""
+        state = self.game_service.snapshot().replica
+        return {
+            "room_id": self.room_id,
+            "name": self.name,
+            "game_state": state["game_state"],
+            "players": len(state["players"]),
+            "spectators": len(state["spectators"]),
+            "max_players": len(self.player_slots),
+            "map_width": state["map_width"],
+            "map_height": state["map_height"],
+        }
+
+    def tick(self) -> None:
+        """Advances the match one simulation tick"""
+        self.game_service.tick()
+
+    def broadcast(self) -> None:
+        """Sends the latest published state to everyone in the room"""
+        state = self.game_service.snapshot().view
+        self.broadcaster.broadcast(self.clients, self.spectator_clients, state)
+
+
+class RoomManager:
+    """Registry of rooms ticked together by the server's single game loop"""
+    def __init__(self, broadcaster_factory: Callable, max_rooms: int = MAX_ROOMS,
+                 map_width: int = MAP_WIDTH, map_height: int = MAP_HEIGHT, max_players: int = MAX_PLAYERS,
+                 tick_rate: float = SIM_TICK_RATE):
+        """
+        Args:
+            broadcaster_factory : returns a new StateBroadcaster for a room
+            max_rooms           : upper bound on rooms, default room included
+            map_width, map_height, max_players
+                                : match settings of rooms created without their own
+            tick_rate           : simulation ticks per second of the game loop
+        """
+        self.broadcaster_factory = broadcaster_factory
+        self.max_rooms = max_rooms
+        self.tick_rate = tick_rate
+        self.defaults = (map_width, map_height, max_players)
+        self.rooms: Dict[int, Room] = {}
+        self._next_id = DEFAULT_ROOM_ID
+        self._lock = threading.Lock()
+        self._snapshot: Optional[StateSnapshot] = None
+        self._snapshot_key: tuple = ()
+        self.default_room = self.create_room("Main")
+
+    def create_room(self, name: str = "", map_width: Optional[int] = None, map_height: Optional[int] = None,
+                    max_players: Optional[int] = None) -> Optional[Room]:
+        """
+        Creates a room; returns None when max_rooms is reached.
+        Raises ValueError for an unplayable map size / player cap.
+        """
+        width, height, players = self.defaults
+        settings = (map_width or width, map_height or height, max_players or players)
+        with self._lock:
+            if len(self.rooms) >= self.max_rooms:
+                return None
+            room = Room(self._next_id, name or f"Room {self._next_id}", self.broadcaster_factory(), *settings,
+                        tick_rate=self.tick_rate)
+            self._next_id += 1
+            self.rooms[room.room_id] = room
+        print(f"[ROOMS] Created room {room.room_id} ({room.name})  "
+              f"map={settings[0]}x{settings[1]}  max_players={settings[2]}")
+        return room
+
+    def restore_room(self, room_id: int, name: str, state: State) -> Room:
+        """Recreates a replicated room under its old id (promotion)"""
+        with self._lock:
+            room = self.rooms.get(room_id)
+            if room is None:
+                room = Room(room_id, name, self.broadcaster_factory(), state.map_width, state.map_height,
+                            state.max_players, tick_rate=self.tick_rate)
+                self.rooms[room_id] = room
+                self._next_id = max(self._next_id, room_id + 1)
+        room.game_service.state = state
+        room.reconnect_until = time.monotonic() + DISCONNECT_TIMEOUT
+        # In place: the room's CommandController shares this list
+        room.player_slots[:] = [slot in state.players for slot in range(len(room.player_slots))]
+        return room
+
+    def snapshot(self) -> StateSnapshot:
+        """
+        Replication snapshot of every room: the default room's replica, plus
+        the other rooms (with their "room_name") under "rooms" by room id.
+        A new version is built only when some room published a new state.
+        """
+        rooms = [(room, room.game_service.snapshot()) for room in self.all()]
+        key = tuple((room.room_id, snap.version) for room, snap in rooms)
+        with self._lock:
+            if self._snapshot is not None and key == self._snapshot_key:
+                return self._snapshot
+            default = next(snap for room, snap in rooms if room.room_id == DEFAULT_ROOM_ID)
+            replica = dict(default.replica)
+            replica["rooms"] = {str(room.room_id): dict(snap.replica, room_name=room.name)
+                                for room, snap in rooms if room.room_id != DEFAULT_ROOM_ID}
+            self._snapshot = StateSnapshot(
+                version=self._snapshot.version + 1 if self._snapshot else 1,
+                tick=default.tick,
+                view=default.view,
+                replica=replica,
+            )
+            self._snapshot_key = key
+            return self._snapshot
+
+    def get(self, room_id: int) -> Optional[Room]:
+        with self._lock:
+            return self.rooms.get(room_id)
+
+    def all(self) -> List[Room]:
+        with self._lock:
+            return list(self.rooms.values())
+
+    def list_rooms(self) -> List[dict]:
+        return [room.info() for room in self.all()]
+
+    def tick_all(self) -> None:
+        """One simulation tick for every room; a failing room does not stop the others"""
+        for room in self.all():
+            try:
+                room.tick()
+            except Exception as exc:
+                print(f"[ROOMS] [ERROR] Tick of room {room.room_id} failed: {exc!r}")
+
+    def broadcast_all(self) -> None:
+        for room in self.all():
+            try:
+                room.broadcast()
+            except Exception as exc:
+                print(f"[ROOMS] [ERROR] Broadcast of room {room.room_id} failed: {exc!r}")
+
+    def remove_empty_rooms(self) -> None:
+        """Drops rooms nobody is connected to or coming back to (the default room is kept)"""
+        now = time.monotonic()
+        with self._lock:
+            empty = [rid for rid, room in self.rooms.items()
+                     if rid != DEFAULT_ROOM_ID and room.is_empty()
+                     and now - room.created_at > EMPTY_ROOM_GRACE_SECONDS
+                     and not room.awaiting_reconnect()]
+            for rid in empty:
+                del self.rooms[rid]
+        for rid in empty:
+            print(f"[ROOMS] Closed empty room {rid}")
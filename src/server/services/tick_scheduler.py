@@ -0,0 +1,112 @@
+"""
+Fixed-timestep scheduler for the server game loop.
+
+Simulation ticks are due at fixed points of a monotonic clock
+(start + n * period), so the time spent ticking and broadcasting no longer
+stretches the period. When the loop falls behind, missed ticks are run back
+to back, at most `max_catch_up` per step; older ones are skipped and counted.
+Broadcasts follow their own (usually slower) schedule and are never run
+twice in a row to catch up: only the newest state matters to clients.
+"""
+import time
+from collections import deque
+from typing import Callable, Tuple
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(current_dir)
+src_dir = os.path.dirname(server_dir)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from common.constants import SIM_TICK_RATE, BROADCAST_RATE, MAX_CATCH_UP_TICKS, TICK_STATS_WINDOW
+from common.stats import percentile
+
+# Absorbs float error so a tick scheduled exactly at `now` counts as due
+_EPSILON = 1e-9
+
+
+class TickScheduler:
+    """Decides how many simulation ticks and whether a broadcast are due"""
+    def __init__(self, tick_rate: float = SIM_TICK_RATE, broadcast_rate: float = BROADCAST_RATE,
+                 max_catch_up: int = MAX_CATCH_UP_TICKS, window: int = TICK_STATS_WINDOW,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            tick_rate      : simulation ticks per second
+            broadcast_rate : state broadcasts per second (capped at tick_rate)
+            max_catch_up   : most ticks run in one step when behind
+            window         : tick durations kept for percentiles
+            clock          : monotonic time source in seconds
+        """
+        self.tick_rate = tick_rate
+        self.broadcast_rate = min(broadcast_rate, tick_rate)
+        self.tick_period = 1.0 / self.tick_rate
+        self.broadcast_period = 1.0 / self.broadcast_rate
+        self.max_catch_up = max(1, max_catch_up)
+        self._clock = clock
+        self._start = None
+        self._tick_index = 0
+        self._broadcast_index = 0
+        self._durations: deque = deque(maxlen=window)
+
+        self.ticks = 0
+        self.broadcasts = 0
+        self.overruns = 0     # ticks whose work took longer than a period
+        self.caught_up = 0    # ticks run late, back to back
+        self.skipped = 0      # ticks dropped because the loop was too far behind
+
+    def due(self) -> Tuple[int, bool]:
+        """Returns (simulation ticks to run now, whether to broadcast)"""
+        now = self._clock()
+        if self._start is None:
+            self._start = now
+        elapsed = now - self._start
+
+        steps = max(0, int(elapsed / self.tick_period + _EPSILON) + 1 - self._tick_index)
+        self._tick_index += steps
+        if steps > self.max_catch_up:
+            self.skipped += steps - self.max_catch_up
+            steps = self.max_catch_up
+        if steps > 1:
+            self.caught_up += steps - 1
+
+        broadcast_index = int(elapsed / self.broadcast_period + _EPSILON) + 1
+        broadcast = broadcast_index > self._broadcast_index
+        if broadcast:
+            self._broadcast_index = broadcast_index
+            self.broadcasts += 1
+        return steps, broadcast
+
+    def record(self, duration: float) -> None:
+        """Records how long one simulation tick took"""
+        self.ticks += 1
+        self._durations.append(duration)
+        if duration > self.tick_period:
+            self.overruns += 1
+
+    def delay(self) -> float:
+        """Seconds until the next tick or broadcast is due"""
+        if self._start is None:
+            return 0.0
+        next_tick = self._start + self._tick_index * self.tick_period
+        next_broadcast = self._start + self._broadcast_index * self.broadcast_period
+        return max(0.0, min(next_tick, next_broadcast) - self._clock())
+
+    def stats(self) -> dict:
+        """Tick duration percentiles (ms) and drift counters"""
+        ordered = sorted(self._durations)
+        return {
+            "tick_rate": self.tick_rate,
+            "broadcast_rate": self.broadcast_rate,
+            "ticks": self.ticks,
+            "broadcasts": self.broadcasts,
+            "p50_ms": percentile(ordered, 50) * 1000.0,
+            "p95_ms": percentile(ordered, 95) * 1000.0,
+            "p99_ms": percentile(ordered, 99) * 1000.0,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000.0,
+            "overruns": self.overruns,
+            "caught_up": self.caught_up,
+            "skipped": self.skipped,
+        }
@@ -0,0 +1,140 @@
+"""
+Tile map storage for the game core.
+
+New maps are lists of int rows unless the "numpy" backend is selected
+(bomberman-server --map-backend numpy, which needs NumPy installed): then
+they are uint8 ndarrays (height x width), and map generation, block
+counting and the choice of a regenerated block's tile are array operations
+instead of Python loops over every tile. Both are indexed as
+game_map[y][x], so the rest of the core does not care which one a State
+holds; exports always go through to_rows().
+
+pack()/unpack() turn a map into the 2 bit per tile buffer of the binary
+wire protocol (common.binary_protocol.pack_map), used for replication
+checkpoints as well.
+"""
+import random
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from common.binary_protocol import pack_map, unpack_map, MAP_HEADER
+from common.constants import TILE_EMPTY, TILE_WALL, TILE_BLOCK
+
+BACKENDS = ("list", "numpy")
+BLOCK_DENSITY = 0.2
+
+DEFAULT_BACKEND = "list"
+
+_backend = DEFAULT_BACKEND
+
+
+def set_backend(name: str) -> None:
+    """Selects how new maps are stored ("list" or "numpy")"""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown map backend {name!r}")
+    if name == "numpy" and not NUMPY_AVAILABLE:
+        raise ValueError("the numpy map backend needs NumPy installed")
+    _backend = name
+
+
+def backend() -> str:
+    return _backend
+
+
+def is_array(game_map) -> bool:
+    return np is not None and isinstance(game_map, np.ndarray)
+
+
+def has_map(game_map) -> bool:
+    """True once a match map exists (ndarrays have no truth value)"""
+    return len(game_map) > 0
+
+
+def generate(width: int, height: int, safe_zones, density: float = BLOCK_DENSITY):
+    """Border and pillar walls, random blocks outside the safe zones"""
+    if _backend == "numpy":
+        return _generate_array(width, height, safe_zones, density)
+    m = [[TILE_EMPTY for _ in range(width)] for _ in range(height)]
+    for y in range(height):
+        for x in range(width):
+            if x in (0, width-1) or y in (0, height-1):
+                m[y][x] = TILE_WALL
+            elif x % 2 == 0 and y % 2 == 0:
+                m[y][x] = TILE_WALL
+            elif (x, y) not in safe_zones and random.random() < density:
+                m[y][x] = TILE_BLOCK
+    return m
+
+
+def _generate_array(width: int, height: int, safe_zones, density: float):
+    m = np.full((height, width), TILE_EMPTY, dtype=np.uint8)
+    m[0, :] = m[-1, :] = TILE_WALL
+    m[:, 0] = m[:, -1] = TILE_WALL
+    m[::2, ::2] = TILE_WALL
+    # Seeded from `random` so random.seed() still reproduces a match
+    rng = np.random.default_rng(random.getrandbits(64))
+    blocks = (m == TILE_EMPTY) & (rng.random((height, width)) < density)
+    if safe_zones:
+        xs, ys = zip(*safe_zones)
+        blocks[list(ys), list(xs)] = False
+    m[blocks] = TILE_BLOCK
+    return m
+
+
+def count(game_map, tile: int) -> int:
+    if is_array(game_map):
+        return int(np.count_nonzero(game_map == tile))
+    return sum(row.count(tile) for row in game_map)
+
+
+def random_free_tile(game_map, blocked: Iterable[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+    """Uniform pick among the empty tiles not in `blocked` (ndarray maps), None if there is none"""
+    mask = game_map == TILE_EMPTY
+    height, width = mask.shape
+    for x, y in blocked:
+        if 0 <= x < width and 0 <= y < height:
+            mask[y, x] = False
+    candidates = np.flatnonzero(mask)
+    if candidates.size == 0:
+        return None
+    index = int(candidates[random.randrange(candidates.size)])
+    return index % width, index // width
+
+
+def to_rows(game_map) -> List[List[int]]:
+    """The map as lists of int rows (JSON shape)"""
+    return game_map.tolist() if is_array(game_map) else game_map
+
+
+def pack(game_map) -> bytes:
+    """2 bit per tile buffer, same layout as binary_protocol.pack_map"""
+    if np is None:
+        return pack_map(game_map)
+    tiles = np.asarray(game_map, dtype=np.uint8)
+    if tiles.size == 0:
+        return pack_map([])
+    if tiles.max() > 3:
+        raise ValueError(f"tile {int(tiles.max())} does not fit in 2 bits")
+    height, width = tiles.shape
+    flat = np.zeros(-(-tiles.size // 4) * 4, dtype=np.uint8)
+    flat[:tiles.size] = tiles.ravel()
+    quads = flat.reshape(-1, 4)
+    packed = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    return MAP_HEADER.pack(width, height) + packed.astype(np.uint8).tobytes()
+
+
+def unpack(data: bytes) -> List[List[int]]:
+    """Inverse of pack(), as lists of int rows"""
+    if np is None:
+        return unpack_map(data)[0]
+    width, height = MAP_HEADER.unpack_from(data, 0)
+    packed = np.frombuffer(data, dtype=np.uint8, offset=MAP_HEADER.size)
+    tiles = np.stack([(packed >> 6) & 3, (packed >> 4) & 3, (packed >> 2) & 3, packed & 3], axis=1)
+    return tiles.ravel()[:width * height].reshape(height, width).tolist()
@@ -0,0 +1,87 @@
+"""
+Test suite for the asyncio server mode (AsyncServerRunner + AsyncConnectionWriter)
+"""
+import asyncio
+import json
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server.mainServer import BombermanServer
+from server.network.async_server import AsyncServerRunner
+from server.network.broadcast import AsyncConnectionWriter
+
+
+class _FakeStreamWriter:
+    """StreamWriter stand-in whose drain() blocks until released"""
+    def __init__(self):
+        self.written = []
+        self.release = asyncio.Event()
+
+    def get_extra_info(self, name):
+        return ("127.0.0.1", 1234)
+
+    def write(self, data):
+        self.written.append(bytes(data))
+
+    async def drain(self):
+        await self.release.wait()
+
+
+class TestAsyncConnectionWriter(unittest.TestCase):
+    """Test for AsyncConnectionWriter"""
+
+    def test_frames_sent_in_order_and_backlog_dropped(self):
+        """Test ordering, and stale state frames dropped for a slow reader"""
+        async def scenario():
+            conn = _FakeStreamWriter()
+            writer = AsyncConnectionWriter(conn, max_queue=2)
+            writer.push_frame(b"a")
+            await asyncio.sleep(0)
+            writer.push_control(b"join")
+            for frame in (b"b", b"c", b"d"):
+                writer.push_frame(frame)
+            conn.release.set()
+            for _ in range(10):
+                await asyncio.sleep(0)
+            writer.close()
+            return conn.written, writer.frames_dropped
+
+        written, dropped = asyncio.run(scenario())
+        self.assertEqual(written, [b"a", b"join", b"d"])
+        self.assertEqual(dropped, 2)
+
+
+class TestAsyncServerRunner(unittest.TestCase):
+    """Test joins and commands over loopback on one event loop"""
+
+    def test_join_ping_and_state_frames(self):
+        """Test a client gets join_success, PONG and state frames"""
+        server = BombermanServer(host="127.0.0.1", port=0, enable_fault_tolerance=False, use_asyncio=True)
+        runner = AsyncServerRunner(server)
+
+        async def scenario():
+            main = asyncio.create_task(runner.main())
+            while not runner.listeners:
+                await asyncio.sleep(0.01)
+            port = runner.listeners[0].sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"HELLO\n")
+            join = json.loads(await asyncio.wait_for(reader.readline(), 2.0))
+            writer.write(b"PING\n")
+            lines = [await asyncio.wait_for(reader.readline(), 2.0) for _ in range(3)]
+            writer.close()
+            main.cancel()
+            return join, lines
+
+        join, lines = asyncio.run(scenario())
+        self.assertTrue(join["join_success"])
+        self.assertEqual(join["player_id"], 0)
+        self.assertIn(b"PONG\n", lines)
+        self.assertTrue(any(line.startswith(b"{") for line in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+Test suite for the binary wire protocol (common.binary_protocol)
+"""
+import json
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.binary_protocol import (
+    FRAME_TEXT, FRAME_STATE, FRAME_CHAT, FrameDecoder,
+    pack_map, unpack_map, encode_state, decode_state, encode_text, encode_chat,
+)
+from common.state_delta import normalize_state
+from server.network.server_network import StateBroadcaster
+from server.network.broadcast import BroadcastEngine
+from client.network.client_network import NetworkManager
+
+
+def _state(game_state: str = "playing") -> dict:
+    state = {
+        "game_state": game_state,
+        "players": {0: {"x": 1, "y": 1, "name": "Joel", "alive": True, "lives": 3,
+                        "disconnected": False, "disconnect_time": None, "original_client_id": "c0",
+                        "input_seq": 70000},
+                    2: {"x": 13, "y": 11, "name": "Gino", "alive": False, "lives": 0,
+                        "disconnected": True, "disconnect_time": 5.0, "original_client_id": "c2",
+                        "input_seq": 0}},
+        "spectators": {100: {"connected": True, "join_time": 1.0, "name": "Veri"}},
+        "chat_messages": [{"player_id": -1, "message": "hi", "timestamp": 1.0,
+                           "is_system": True, "is_spectator": False}],
+        "current_host_id": 0,
+    }
+    if game_state == "playing":
+        state["map"] = [[(x * y) % 3 for x in range(15)] for y in range(13)]
+        state["bombs"] = [{"x": 3, "y": 4, "timer": 17, "owner": 2}]
+        state["explosions"] = [{"positions": [(5, 5), (5, 6), (6, 5)], "timer": 4}]
+    elif game_state == "lobby":
+        state["can_start"] = True
+        state["can_spectator_join"] = False
+    else:
+        state["winner_id"] = None
+        state["victory_timer"] = 42
+    return state
+
+
+def _json_shape(state: dict) -> dict:
+    """What a JSON-protocol client sees, minus fields binary does not carry"""
+    shaped = normalize_state(state)
+    shaped.pop("chat_messages")
+    for p in shaped["players"].values():
+        p.pop("disconnect_time")
+        p.pop("original_client_id")
+    for s in shaped["spectators"].values():
+        s.pop("join_time")
+    return shaped
+
+
+class TestBinaryProtocol(unittest.TestCase):
+    """Test for the binary codec"""
+
+    def test_map_roundtrip_is_two_bits_per_tile(self):
+        """Test the map packs 4 tiles per byte"""
+        grid = _state()["map"]
+        packed = pack_map(grid)
+        self.assertEqual(len(packed), 2 + (15 * 13 + 3) // 4)
+        self.assertEqual(unpack_map(packed)[0], grid)
+
+    def test_map_rejects_wide_tiles(self):
+        """Test tiles above 3 are refused"""
+        with self.assertRaises(ValueError):
+            pack_map([[4]])
+
+    def test_state_roundtrip_all_screens(self):
+        """Test decode(encode(state)) matches the JSON shape"""
+        for screen in ("lobby", "playing", "victory"):
+            state = _state(screen)
+            frames = FrameDecoder().feed(encode_state(state))
+            self.assertEqual(frames[0][0], FRAME_STATE)
+            self.assertEqual(decode_state(frames[0][1]), _json_shape(state))
+
+    def test_binary_smaller_than_json(self):
+        """Test a playing frame is several times smaller"""
+        state = _state()
+        self.assertLess(len(encode_state(state)) * 4, len(json.dumps(state)))
+
+    def test_many_spectators_and_long_timers(self):
+        """Test more than 255 spectators and timers above 255 ticks fit in a frame"""
+        state = _state()
+        state["spectators"] = {100 + i: {"connected": True, "join_time": 1.0, "name": f"S{i}"}
+                               for i in range(300)}
+        state["bombs"][0]["timer"] = 400
+        state["explosions"][0]["timer"] = 300
+        body = FrameDecoder().feed(encode_state(state))[0][1]
+        self.assertEqual(decode_state(body), _json_shape(state))
+
+    def test_decoder_handles_split_and_garbage(self):
+        """Test frames split over reads and a corrupted prefix"""
+        stream = b"\x00junk" + encode_text(b'{"a": 1}\n') + encode_chat([])
+        decoder = FrameDecoder()
+        frames = []
+        for i in range(0, len(stream), 3):
+            frames += decoder.feed(stream[i:i + 3])
+        self.assertEqual(frames, [(FRAME_TEXT, b'{"a": 1}'), (FRAME_CHAT, b"[]")])
+        self.assertGreater(decoder.resyncs, 0)
+
+
+class TestBinaryNegotiatedConnections(unittest.TestCase):
+    """Test server fan-out and client decoding for binary connections"""
+
+    def test_broadcast_and_client_decode(self):
+        """Test a binary connection gets chat once and state every tick"""
+        conn = Mock()
+        engine = BroadcastEngine()
+        engine.set_binary(conn)
+        broadcaster = StateBroadcaster(engine=engine)
+        engine.send(conn, b'{"join_success": true, "player_id": 0}\n')
+        broadcaster.broadcast([conn], [], _state())
+        broadcaster.broadcast([conn], [], _state())
+        engine.flush()
+        engine.remove(conn)
+        stream = b"".join(bytes(c.args[0]) for c in conn.sendall.call_args_list)
+        types = [t for t, _ in FrameDecoder().feed(stream)]
+        self.assertEqual(types, [FRAME_TEXT, FRAME_CHAT, FRAME_STATE, FRAME_STATE])
+
+        network = NetworkManager(Mock(), binary=True)
+        network.on_join_success = Mock()
+        network.on_state_update = Mock()
+        for frame_type, body in FrameDecoder().feed(stream):
+            network._handle_frame(frame_type, body)
+        network.on_join_success.assert_called_once()
+        state = network.on_state_update.call_args.args[0]
+        self.assertEqual(state["chat_messages"][0]["message"], "hi")
+        self.assertEqual(state["bombs"][0]["owner"], 2)
+
+        # The same backlog through the receive loop: only the newest STATE is decoded
+        sock = Mock()
+        chunks = [stream, b""]
+
+        def recv_into(buffer):
+            data = chunks.pop(0)
+            buffer[:len(data)] = data
+            return len(data)
+        sock.recv_into.side_effect = recv_into
+        network = NetworkManager(sock, binary=True)
+        network.on_state_update = Mock()
+        network._receive_loop()
+        network.on_state_update.assert_called_once()
+        self.assertEqual(network.stale_frames, 1)
+
+
+class TestBinaryEncodeFailure(unittest.TestCase):
+    """Test a frame the binary codec cannot encode"""
+
+    def test_bad_frame_skips_binary_connections_only(self):
+        """Test binary clients miss the frame while JSON clients still get it"""
+        binary, text = Mock(), Mock()
+        engine = BroadcastEngine()
+        engine.set_binary(binary)
+        broadcaster = StateBroadcaster(engine=engine)
+        state = _state()
+        state["bombs"][0]["owner"] = 1000   # does not fit the owner field
+        broadcaster.broadcast([binary, text], [], state)
+        engine.flush()
+        engine.remove(binary)
+        engine.remove(text)
+        self.assertFalse(binary.sendall.called)
+        self.assertEqual(json.loads(bytes(text.sendall.call_args.args[0]))["bombs"][0]["owner"], 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Test suite for the broadcast engine (per-connection writers)
+"""
+import socket
+import threading
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server.network.broadcast import (
+    ConnectionWriter, SelectorConnectionWriter, BroadcastEngine, NONBLOCKING_SEND_AVAILABLE,
+)
+from server.network.latency import LatencyHistogram, LatencyTracker, MAX_OUTSTANDING_PINGS
+
+
+class TestConnectionWriter(unittest.TestCase):
+    """Test for ConnectionWriter"""
+
+    def setUp(self):
+        """Setup a socket whose sendall blocks until released"""
+        self.release = threading.Event()
+        self.conn = Mock()
+        self.conn.sendall.side_effect = lambda data: self.release.wait(2.0)
+        self.writer = ConnectionWriter(self.conn, max_queue=3)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        self.release.set()
+        self.writer.close()
+
+    def test_frames_are_sent_in_order(self):
+        """Test queued frames reach the socket in order"""
+        self.release.set()
+        for frame in (b"a", b"b", b"c"):
+            self.writer.push_frame(frame)
+        self.assertTrue(self.writer.flush())
+        sent = [call.args[0] for call in self.conn.sendall.call_args_list]
+        self.assertEqual(sent, [b"a", b"b", b"c"])
+        self.assertEqual(self.writer.frames_sent, 3)
+
+    def test_slow_reader_drops_backlog(self):
+        """Test a full queue discards stale frames instead of blocking"""
+        for i in range(10):
+            self.writer.push_frame(b"frame%d" % i)
+        self.assertGreater(self.writer.frames_dropped, 0)
+        self.assertLessEqual(self.writer.queue_depth, 3)
+
+    def test_control_messages_are_never_dropped(self):
+        """Test control messages survive a backlog drop"""
+        self.writer.push_frame(b"x")
+        self.writer.push_control(b"PONG\n")
+        for _ in range(5):
+            self.writer.push_frame(b"y")
+        self.writer.drop_backlog()
+        self.release.set()
+        self.writer.flush()
+        sent = [call.args[0] for call in self.conn.sendall.call_args_list]
+        self.assertIn(b"PONG\n", sent)
+
+    def test_send_error_closes_writer(self):
+        """Test a broken socket marks the writer closed"""
+        self.conn.sendall.side_effect = BrokenPipeError()
+        self.writer.push_frame(b"a")
+        self.writer.flush()
+        self.assertTrue(self.writer.closed)
+
+
+@unittest.skipUnless(NONBLOCKING_SEND_AVAILABLE, "needs MSG_DONTWAIT")
+class TestSelectorConnectionWriter(unittest.TestCase):
+    """Test for SelectorConnectionWriter (shared sending thread)"""
+
+    def setUp(self):
+        """Setup socket pairs; the peers are read by the test"""
+        self.pairs = [socket.socketpair() for _ in range(3)]
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        for conn, peer in self.pairs:
+            conn.close()
+            peer.close()
+
+    def _read(self, peer: socket.socket, size: int) -> bytes:
+        peer.settimeout(2.0)
+        data = b""
+        while len(data) < size:
+            data += peer.recv(size - len(data))
+        return data
+
+    def test_frames_are_sent_in_order_without_a_thread_each(self):
+        """Test every writer shares one sending thread and keeps its order"""
+        threads = threading.active_count()
+        writers = [SelectorConnectionWriter(conn, max_queue=3) for conn, _ in self.pairs]
+        SelectorConnectionWriter(socket.socketpair()[0]).close()
+        self.assertLessEqual(threading.active_count(), max(threads, 1) + 1)
+        for writer in writers:
+            for frame in (b"a", b"b", b"c"):
+                writer.push_frame(frame)
+        for writer, (_, peer) in zip(writers, self.pairs):
+            self.assertTrue(writer.flush())
+            self.assertEqual(self._read(peer, 3), b"abc")
+            self.assertEqual(writer.frames_sent, 3)
+            writer.close()
+
+    def test_slow_reader_does_not_block_others(self):
+        """Test a reader that stops reading only fills its own queue"""
+        slow = SelectorConnectionWriter(self.pairs[0][0], max_queue=3)
+        fast = SelectorConnectionWriter(self.pairs[1][0], max_queue=3)
+        big = memoryview(b"x" * (1 << 20))
+        for _ in range(10):
+            slow.push_frame(big)
+        fast.push_frame(b"hello")
+        self.assertTrue(fast.flush())
+        self.assertEqual(self._read(self.pairs[1][1], 5), b"hello")
+        self.assertFalse(slow.flush(timeout=0.2))
+        self.assertGreater(slow.frames_dropped, 0)
+        slow.close()
+        fast.close()
+
+
+class TestBroadcastEngine(unittest.TestCase):
+    """Test for BroadcastEngine"""
+
+    def test_stats_per_connection(self):
+        """Test stats expose queue depth and counters"""
+        engine = BroadcastEngine()
+        conn = Mock()
+        engine.send(conn, b"hello\n")
+        engine.flush()
+        stats = engine.stats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["bytes_sent"], 6)
+        self.assertEqual(stats[0]["queue_depth"], 0)
+        engine.remove(conn)
+        self.assertEqual(engine.totals()["connections"], 0)
+
+    def test_send_after_remove_is_ignored(self):
+        """Test a late reply to a removed connection does not bring a writer back"""
+        engine = BroadcastEngine()
+        conn = Mock()
+        engine.send(conn, b"hello\n")
+        engine.remove(conn)
+        engine.send(conn, b"late\n")
+        self.assertIsNone(engine.writer_for(conn))
+        self.assertEqual(engine.ping_all(0.0), 0)
+        self.assertEqual(engine.stats(), [])
+
+    def test_ping_and_pong_measure_rtt(self):
+        """Test pings are queued per connection and answers feed the connection's RTT"""
+        engine = BroadcastEngine()
+        conn = Mock()
+        engine.writer_for(conn)
+        self.assertEqual(engine.ping_all(100.0), 1)
+        engine.flush()
+        conn.sendall.assert_called_once_with(b'{"ping": 1}\n')
+        engine.record_pong(conn, 1, 100.025)
+        engine.record_pong(conn, 1, 101.0)          # answered twice: ignored
+        stats = engine.stats()[0]
+        self.assertAlmostEqual(stats["rtt_ms"], 25.0)
+        self.assertEqual(stats["rtt_histogram"].samples, 1)
+        self.assertEqual(stats["queue_histogram"].samples, 1)
+        engine.remove(conn)
+
+
+class TestLatencyTracker(unittest.TestCase):
+    """Test for LatencyTracker and LatencyHistogram"""
+
+    def test_rtt_jitter_and_lost_pings(self):
+        """Test smoothed RTT, jitter, and pings that never got an answer"""
+        tracker = LatencyTracker()
+        first = tracker.next_ping(0.0)
+        second = tracker.next_ping(1.0)
+        self.assertAlmostEqual(tracker.pong(first, 0.010), 0.010)
+        self.assertAlmostEqual(tracker.pong(second, 1.050), 0.050)
+        self.assertAlmostEqual(tracker.srtt, 0.010 + 0.040 / 8)
+        self.assertAlmostEqual(tracker.jitter, 0.040 / 16)
+        self.assertIsNone(tracker.pong(99, 2.0))
+        for i in range(MAX_OUTSTANDING_PINGS + 2):
+            tracker.next_ping(3.0 + i)
+        self.assertEqual(tracker.pings_lost, 2)
+
+    def test_histogram_buckets(self):
+        """Test samples land in their bucket and percentiles use bucket bounds"""
+        histogram = LatencyHistogram((10, 100))
+        for seconds in (0.005, 0.010, 0.050, 0.2):
+            histogram.add(seconds)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.percentile(50), 10.0)
+        self.assertEqual(histogram.percentile(100), 200.0)
+        other = histogram.copy()
+        other.merge(histogram)
+        self.assertEqual(other.counts, [4, 2, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
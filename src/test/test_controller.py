@@ -30,6 +30,23 @@ class TestCommandController(unittest.TestCase):
         response = self.controller.handle_command("PING", 0, False, "Player0")
         self.assertEqual(response, {"type": "pong"})
 
+    def test_handle_pong_reply(self):
+        """Test PONG:<n> answers a server ping"""
+        self.assertEqual(self.controller.handle_command("PONG:7", 0, False), {"type": "ping_reply", "ping": 7})
+        self.assertEqual(self.controller.handle_command("PONG:x", 0, False), {})
+
+    def test_handle_room_commands(self):
+        """Test room commands are routed to the server, not the game"""
+        self.assertEqual(self.controller.handle_command("ROOMS", 0, False), {"type": "list_rooms"})
+        self.assertEqual(self.controller.handle_command("CREATE_ROOM:Arena", 0, True),
+                         {"type": "create_room", "name": "Arena"})
+        self.assertEqual(self.controller.handle_command("JOIN_ROOM:2", 0, False),
+                         {"type": "join_room", "room_id": 2})
+        self.assertEqual(self.controller.handle_command("JOIN_ROOM:x", 0, False), {})
+        self.assertEqual(self.controller.handle_command("CREATE_ROOM:Big:101x101:64", 0, False),
+                         {"type": "create_room", "name": "Big", "map_width": 101, "map_height": 101,
+                          "max_players": 64})
+
     def test_handle_empty_command(self):
         """Test empty command"""
         response = self.controller.handle_command("", 0, False, "Player0")
@@ -40,53 +57,47 @@ class TestCommandController(unittest.TestCase):
         commands = ["UP", "DOWN", "LEFT", "RIGHT"]
         for command in commands:
             response = self.controller.handle_command(command, 0, False, "Player0")
-            self.mock_game_service.move_player.assert_called_with(0, command)
+            self.mock_game_service.submit_input.assert_called_with(0, "move", command)
             self.assertEqual(response, {})
+        self.controller.handle_command("LEFT:42", 0, False, "Player0")
+        self.mock_game_service.submit_input.assert_called_with(0, "move", "LEFT", 42)
 
     def test_handle_player_bomb_command(self):
         """Test bomb placement command"""
         response = self.controller.handle_command("BOMB", 0, False, "Player0")
-        self.mock_game_service.place_bomb.assert_called_once_with(0)
-        self.assertEqual(response, {})
-
-    def test_handle_start_game_command_as_host(self):
-        """Test start game command as host"""
-        self.mock_game_service.get_current_host.return_value = 0
-        self.mock_game_service.start_game.return_value = True
-        response = self.controller.handle_command("START_GAME", 0, False, "Player0")
-        self.mock_game_service.start_game.assert_called_once()
+        self.mock_game_service.submit_input.assert_called_once_with(0, "bomb")
         self.assertEqual(response, {})
 
-    def test_handle_start_game_command_not_host(self):
-        """Test start game command when not host"""
-        self.mock_game_service.get_current_host.return_value = 1  # Un altro è host
+    def test_handle_start_game_command(self):
+        """Test start game command is queued (host check happens at the tick)"""
         response = self.controller.handle_command("START_GAME", 0, False, "Player0")
+        self.mock_game_service.submit_input.assert_called_once_with(0, "start", "Player0")
         self.mock_game_service.start_game.assert_not_called()
         self.assertEqual(response, {})
 
     def test_handle_play_again_command(self):
-        """Test play again command"""
+        """Test play again command is queued"""
         self.mock_game_service.state.game_state = "victory"
         response = self.controller.handle_command("PLAY_AGAIN", 0, False, "Player0")
-        self.mock_game_service.return_to_lobby.assert_called_once()
+        self.mock_game_service.submit_input.assert_called_once_with(0, "play_again")
         self.assertEqual(response, {})
 
     def test_handle_chat_command_player(self):
         """Test chat command from player"""
         response = self.controller.handle_command("CHAT:Hello world", 0, False, "Player0")
-        self.mock_game_service.add_chat_message.assert_called_once_with(0, "Hello world")
+        self.mock_game_service.submit_input.assert_called_once_with(0, "chat", "Hello world")
         self.assertEqual(response, {})
 
     def test_handle_chat_command_empty(self):
         """Test chat command with empty message"""
         response = self.controller.handle_command("CHAT:   ", 0, False, "Player0")
-        self.mock_game_service.add_chat_message.assert_not_called()
+        self.mock_game_service.submit_input.assert_not_called()
         self.assertEqual(response, {})
 
     def test_handle_spectator_chat_command(self):
         """Test chat command from spectator"""
         response = self.controller.handle_command("CHAT:Hello from spectator", 100, True, "Spectator100")
-        self.mock_game_service.add_chat_message.assert_called_once_with(100, "Hello from spectator")
+        self.mock_game_service.submit_input.assert_called_once_with(100, "chat", "Hello from spectator")
         self.assertEqual(response, {})
 
     def test_handle_spectator_join_game_success(self):
@@ -118,15 +129,15 @@ class TestCommandController(unittest.TestCase):
     def test_handle_spectator_movement_ignored(self):
         """Test spectator movement commands are ignored"""
         response = self.controller.handle_command("UP", 100, True, "Spectator100")
-        self.mock_game_service.move_player.assert_not_called()
+        self.mock_game_service.submit_input.assert_not_called()
         self.assertEqual(response, {})
 
     def test_handle_command_case_insensitive(self):
         """Test command handling case is insensitive"""
         self.controller.handle_command("bomb", 0, False, "Player0")
-        self.mock_game_service.place_bomb.assert_called_with(0)
+        self.mock_game_service.submit_input.assert_called_with(0, "bomb")
         self.controller.handle_command("BoMb", 1, False, "Player1")
-        self.mock_game_service.place_bomb.assert_called_with(1)
+        self.mock_game_service.submit_input.assert_called_with(1, "bomb")
 
 
 class TestNetworkManager(unittest.TestCase):
@@ -147,7 +158,7 @@ class TestNetworkManager(unittest.TestCase):
     def test_send_command(self):
         """Test send command"""
         self.network.send_command("TEST_COMMAND")
-        self.mock_socket.sendall.assert_called_once_with(b"TEST_COMMAND")
+        self.mock_socket.sendall.assert_called_once_with(b"TEST_COMMAND\n")
 
     def test_send_command_error_handling(self):
         """Test error handling in send command"""
@@ -203,6 +214,14 @@ class TestNetworkManager(unittest.TestCase):
         self.network._handle_message(message)
         mock_callback.assert_called_once_with(state)
 
+    def test_handle_server_ping(self):
+        """Test a server ping is answered and not passed on as a state"""
+        mock_callback = Mock()
+        self.network.on_state_update = mock_callback
+        self.network._handle_message('{"ping": 12}')
+        self.mock_socket.sendall.assert_called_once_with(b"PONG:12\n")
+        mock_callback.assert_not_called()
+
     def test_handle_invalid_json(self):
         """Test handle invalid JSON message"""
         mock_callback = Mock()
@@ -222,29 +241,71 @@ class TestNetworkManager(unittest.TestCase):
         self.network.stop()
         self.assertFalse(self.network.running)
 
+    def _serve_chunks(self, *chunks: bytes) -> None:
+        """Makes the mock socket's recv_into return `chunks`, then EOF"""
+        pending = list(chunks) + [b""]
+
+        def recv_into(buffer):
+            data = pending.pop(0)
+            buffer[:len(data)] = data
+            return len(data)
+        self.mock_socket.recv_into.side_effect = recv_into
+
     def test_receive_loop_connection_closed(self):
         """Test loop reception when connection is closed"""
-        self.mock_socket.recv.return_value = b""
+        self._serve_chunks()
         self.network._receive_loop()
-        self.mock_socket.recv.assert_called()
+        self.mock_socket.recv_into.assert_called()
 
     def test_receive_loop_with_data(self):
         """Test loop reception with data"""
         mock_callback = Mock()
         self.network.on_state_update = mock_callback
         test_data = json.dumps({"game_state": "lobby"}) + "\n"
-        self.mock_socket.recv.side_effect = [
-            test_data.encode(),
-            b""
-        ]
+        self._serve_chunks(test_data.encode())
         self.network._receive_loop()
         mock_callback.assert_called_once()
 
+    def test_receive_loop_split_frames(self):
+        """Test frames cut anywhere (even inside a UTF-8 character) are reassembled"""
+        states = []
+        self.network.on_state_update = states.append
+        data = (json.dumps({"game_state": "lobby", "name": "Caffè"}, ensure_ascii=False) + "\n").encode()
+        cut = data.index("è".encode()) + 1
+        self._serve_chunks(data[:cut], data[cut:])
+        self.network._receive_loop()
+        self.assertEqual(states, [{"game_state": "lobby", "name": "Caffè"}])
+
+    def test_receive_loop_skips_stale_states(self):
+        """Test a backlog of states is collapsed to the newest keyframe; control messages are kept"""
+        states, joins = [], []
+        self.network.on_state_update = states.append
+        self.network.on_join_success = lambda *args: joins.append(args[0])
+        lines = [{"game_state": "lobby", "frame_seq": 1},
+                 {"join_success": True, "player_id": 3},
+                 {"delta": {}, "frame_seq": 2, "base_seq": 1},
+                 {"game_state": "playing", "frame_seq": 3},
+                 {"delta": {}, "frame_seq": 4, "base_seq": 3}]
+        self._serve_chunks("".join(json.dumps(line) + "\n" for line in lines).encode())
+        self.network._receive_loop()
+        self.assertEqual(joins, [3])
+        self.assertEqual([state["frame_seq"] for state in states], [3, 4])
+        self.assertEqual(self.network.stale_frames, 2)
+
+    def test_receive_loop_frame_limit(self):
+        """Test a frame over max_frame_bytes closes the connection instead of buffering forever"""
+        network = NetworkManager(self.mock_socket, max_frame_bytes=1000)
+        network.on_disconnected = Mock()
+        self._serve_chunks(b"x" * 600, b"x" * 600)
+        network._receive_loop()
+        network.on_disconnected.assert_called_once()
+        self.assertEqual(self.mock_socket.recv_into.call_count, 2)
+
     def test_receive_loop_error_handling(self):
         """Test error handling in receive loop"""
-        self.mock_socket.recv.side_effect = ConnectionResetError("Connection reset")
+        self.mock_socket.recv_into.side_effect = ConnectionResetError("Connection reset")
         self.network._receive_loop()
-        self.mock_socket.recv.assert_called()
+        self.mock_socket.recv_into.assert_called()
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
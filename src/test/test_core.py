@@ -208,6 +208,30 @@ class TestCore(unittest.TestCase):
         for x, y in safe_zones:
             self.assertFalse(core.safe_to_place_block(self.state, x, y))
 
+    def test_spawns_for_large_matches(self):
+        """Test spawns are distinct, walkable and spread out on big maps"""
+        state = State(map_width=101, map_height=101, max_players=64)
+        spawns = core.spawn_points(101, 101, 64)
+        self.assertEqual(len(set(spawns)), 64)
+        self.assertEqual(spawns[:4], ((1, 1), (1, 99), (99, 1), (99, 99)))
+        closest = min((ax-bx)**2 + (ay-by)**2 for i, (ax, ay) in enumerate(spawns) for bx, by in spawns[i+1:])
+        self.assertGreaterEqual(closest, 10**2)
+        state.game_map = core.generate_map(101, 101, 64)
+        for pid in range(64):
+            core.add_player(state, pid, f"P{pid}")
+            x, y = state.players[pid].x, state.players[pid].y
+            self.assertEqual(state.game_map[y][x], TILE_EMPTY)
+        for x, y in core.get_safe_zones(state):
+            self.assertEqual(state.game_map[y][x], TILE_EMPTY)
+
+    def test_check_match_config(self):
+        """Test unplayable map sizes and player caps are refused"""
+        core.check_match_config(MAP_WIDTH, MAP_HEIGHT, 4)
+        core.check_match_config(101, 101, 64)
+        for width, height, players in ((14, 13, 4), (5, 5, 2), (15, 13, 1), (15, 13, 65), (7, 7, 10)):
+            with self.assertRaises(ValueError):
+                core.check_match_config(width, height, players)
+
     def test_return_to_lobby(self):
         """Test return to lobby resets state"""
         core.add_player(self.state, 0, "Player0")
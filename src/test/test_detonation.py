@@ -0,0 +1,107 @@
+"""
+Test suite for the detonation queue (bomb fuses, explosion lifetimes, chain reactions)
+"""
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server import core
+from server.models import (
+    State, Bomb, TILE_EMPTY, GAME_STATE_PLAYING,
+    BOMB_TIMER_TICKS, EXPLOSION_TTL_TICKS, state_to_dict, state_from_dict
+)
+
+
+def _open_map(width: int = 15, height: int = 13) -> list:
+    """Border walls only, so blasts are never stopped inside the map"""
+    return [[1 if x in (0, width-1) or y in (0, height-1) else TILE_EMPTY for x in range(width)]
+            for y in range(height)]
+
+
+class TestDetonationQueue(unittest.TestCase):
+    """Test timer ordering and chain reactions"""
+
+    def setUp(self):
+        """Setup a playing state with two players parked out of reach"""
+        self.state = State()
+        core.add_player(self.state, 0, "a")
+        core.add_player(self.state, 1, "b")
+        self.state.game_state = GAME_STATE_PLAYING
+        self.state.game_map = _open_map()
+
+    def _bomb_at(self, pid: int, x: int, y: int) -> Bomb:
+        self.state.players[pid].x, self.state.players[pid].y = x, y
+        core.place_bomb(self.state, pid)
+        return self.state.bombs[-1]
+
+    def test_same_timing_as_countdown(self):
+        """Test a bomb goes off after BOMB_TIMER_TICKS ticks and its fire lasts TTL-1 more"""
+        self._bomb_at(0, 7, 7)
+        self.state.players[0].x = 13
+        for _ in range(BOMB_TIMER_TICKS - 1):
+            core.advance_timers(self.state)
+        self.assertEqual(len(self.state.bombs), 1)
+        core.sync_timers(self.state)
+        self.assertEqual(self.state.bombs[0].timer, 1)
+        core.advance_timers(self.state)
+        self.assertEqual((len(self.state.bombs), len(self.state.explosions)), (0, 1))
+        for _ in range(EXPLOSION_TTL_TICKS - 1):
+            self.assertEqual(len(self.state.explosions), 1)
+            core.advance_timers(self.state)
+        self.assertEqual(len(self.state.explosions), 0)
+
+    def test_chain_reaction_same_tick(self):
+        """Test a blast sets off the bombs it reaches, transitively, in one tick"""
+        first = self._bomb_at(0, 3, 3)
+        self._bomb_at(1, 5, 3)     # reached by the first blast
+        self._bomb_at(1, 7, 3)     # reached by the second one only
+        self._bomb_at(1, 11, 11)   # out of reach
+        self.state.players[0].x, self.state.players[1].x = 13, 13
+        first.timer = 1
+        core.advance_timers(self.state)
+        self.assertEqual([(b.x, b.y) for b in self.state.bombs], [(11, 11)])
+        self.assertEqual(len(self.state.explosions), 3)
+
+    def test_rescheduled_by_timer_assignment(self):
+        """Test setting Bomb.timer moves the bomb in the queue"""
+        bomb = self._bomb_at(0, 3, 3)
+        bomb.timer = 3
+        core.advance_timers(self.state)
+        core.advance_timers(self.state)
+        self.assertEqual(len(self.state.bombs), 1)
+        core.advance_timers(self.state)
+        self.assertEqual(len(self.state.bombs), 0)
+
+    def test_swap_remove_keeps_other_bombs(self):
+        """Test removing from the middle of the list keeps the rest scheduled"""
+        bombs = [self._bomb_at(0, x, 1) for x in (1, 5, 9, 13)]
+        bombs[1].timer = 1
+        self.state.players[0].x, self.state.players[0].y = 7, 11
+        core.advance_timers(self.state)
+        remaining = {(b.x, b.y) for b in self.state.bombs}
+        self.assertNotIn((5, 1), remaining)
+        for bomb in self.state.bombs:
+            bomb.timer = 1
+        core.advance_timers(self.state)
+        self.assertEqual(self.state.bombs, [])
+
+    def test_restored_state_keeps_schedule(self):
+        """Test exported timers rebuild the same schedule after a restore"""
+        self._bomb_at(0, 3, 3)
+        for _ in range(5):
+            core.advance_timers(self.state)
+        core.sync_timers(self.state)
+        restored = state_from_dict(state_to_dict(self.state))
+        self.assertEqual(restored.tick_count, 5)
+        self.assertEqual(restored.bombs[0].timer, BOMB_TIMER_TICKS - 5)
+        for _ in range(BOMB_TIMER_TICKS - 6):
+            core.advance_timers(restored)
+        self.assertEqual(len(restored.bombs), 1)
+        core.advance_timers(restored)
+        self.assertEqual(len(restored.bombs), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Test suite for the client -> server command framing
+"""
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server.network.framing import CommandReader, split_handshake
+from common.binary_protocol import PROTOCOL_LINE
+
+
+class TestCommandReader(unittest.TestCase):
+    """Test for CommandReader"""
+
+    def setUp(self):
+        self.reader = CommandReader(max_line=16)
+
+    def test_batch_in_one_chunk(self):
+        """Test several commands coalesced into one recv"""
+        self.assertEqual(self.reader.feed(b"UP\nUP\r\n\nBOMB\n"), ["UP", "UP", "BOMB"])
+        self.assertFalse(self.reader.has_partial())
+
+    def test_command_split_across_chunks(self):
+        """Test a partial line is kept until its newline arrives"""
+        self.assertEqual(self.reader.feed(b"LEFT\nCH"), ["LEFT"])
+        self.assertTrue(self.reader.has_partial())
+        self.assertEqual(self.reader.feed(b"AT:hi"), [])
+        self.assertEqual(self.reader.feed(b"\nDOWN\n"), ["CHAT:hi", "DOWN"])
+        self.assertEqual(self.reader.commands, 3)
+
+    def test_oversized_line_dropped(self):
+        """Test a line over the limit is discarded, buffered or not, and reading resumes after it"""
+        self.assertEqual(self.reader.feed(b"CHAT:" + b"x" * 40 + b"\nUP\n"), ["UP"])
+        self.assertEqual(self.reader.feed(b"CHAT:" + b"y" * 20), [])
+        self.assertFalse(self.reader._buffer)
+        self.assertEqual(self.reader.feed(b"y" * 30), [])
+        self.assertEqual(self.reader.feed(b"yy\nBOMB\n"), ["BOMB"])
+        self.assertEqual(self.reader.oversized, 2)
+
+    def test_undecodable_line_skipped(self):
+        """Test invalid UTF-8 drops only its own line"""
+        self.assertEqual(self.reader.feed(b"\xff\xfe\nRIGHT\n"), ["RIGHT"])
+
+    def test_split_handshake(self):
+        """Test handshake lines are separated from pipelined commands"""
+        handshake, pending = split_handshake(["RECONNECT:abc", PROTOCOL_LINE, "UP", "BOMB"])
+        self.assertEqual(handshake, f"RECONNECT:abc\n{PROTOCOL_LINE}")
+        self.assertEqual(pending, ["UP", "BOMB"])
+        self.assertEqual(split_handshake(["UP"]), ("", ["UP"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import pygame
 from client.model.game_state import GameState
+from client.model.interpolation import SnapshotBuffer
+from client.view.text_utils import ChatRenderCache
 from client.controller.game_controller import GameController
 
 
@@ -156,6 +158,104 @@ class TestGameState(unittest.TestCase):
         explosions = self.game_state.get_explosions()
         self.assertEqual(explosions, test_explosions)
 
+    def test_move_prediction_and_reconciliation(self):
+        """Test local moves show at once and are replayed on top of the server position"""
+        game_map = [[1] * 5] + [[1, 0, 0, 0, 1] for _ in range(3)] + [[1] * 5]
+        players = {"0": {"x": 1, "y": 1, "alive": True, "input_seq": 0},
+                   "1": {"x": 3, "y": 1, "alive": True, "input_seq": 0}}
+        self.game_state.set_player_info(0, False, "Player0")
+        self.game_state.update({"game_state": "playing", "map": game_map, "players": players})
+        self.assertEqual(self.game_state.predict_move("RIGHT"), 1)
+        self.assertEqual(self.game_state.predict_move("RIGHT"), 2)     # player 1 is in the way
+        self.assertEqual(self.game_state.predict_move("DOWN"), 3)
+        me = self.game_state.get_players()["0"]
+        self.assertEqual((me["x"], me["y"]), (2, 2))
+        self.assertEqual(players["0"]["x"], 1)
+        # Server applied move 1 only, but player 1 moved away meanwhile: moves 2 and 3 are replayed
+        players = {"0": {"x": 2, "y": 1, "alive": True, "input_seq": 1},
+                   "1": {"x": 3, "y": 2, "alive": True, "input_seq": 0}}
+        self.game_state.update({"game_state": "playing", "map": game_map, "players": players})
+        me = self.game_state.get_players()["0"]
+        self.assertEqual((me["x"], me["y"]), (3, 1))
+        players["0"].update(input_seq=3)
+        self.game_state.update({"game_state": "playing", "map": game_map, "players": players})
+        self.assertIsNone(self.game_state.prediction.position)
+        self.assertIs(self.game_state.get_players(), players)
+
+    def test_begin_frame_pins_state(self):
+        """Test a frame keeps reading the state it pinned while newer ones are published"""
+        players = {"0": {"x": 1, "y": 2, "name": "A", "alive": True, "lives": 3}}
+        self.game_state.update({"game_state": "playing", "players": players,
+                                "bombs": [{"x": 4, "y": 5, "timer": 3, "owner": 0}],
+                                "explosions": [{"positions": [[6, 6]], "timer": 2}]})
+        frame = self.game_state.begin_frame()
+        self.game_state.update({"game_state": "lobby", "players": {}})
+        self.assertIs(self.game_state.frame, frame)
+        self.assertEqual(self.game_state.get_game_state(), "playing")
+        player = self.game_state.get_player_views()[0]
+        self.assertEqual((player.pid, player.x, player.y, player.lives), (0, 1, 2, 3))
+        self.assertEqual(self.game_state.get_bomb_views()[0].timer, 3)
+        self.assertEqual(self.game_state.get_explosion_views()[0].positions, ((6, 6),))
+        self.game_state.begin_frame()
+        self.assertEqual(self.game_state.get_game_state(), "lobby")
+        self.assertEqual(self.game_state.get_player_views(), ())
+
+
+class TestSnapshotBuffer(unittest.TestCase):
+    """Test for the client interpolation buffer"""
+
+    @staticmethod
+    def _state(x: int, y: int, bombs=()) -> dict:
+        return {"game_state": "playing", "bombs": [{"x": bx, "y": by} for bx, by in bombs],
+                "players": {"0": {"x": x, "y": y, "alive": True},
+                            "1": {"x": 9, "y": 9, "alive": False}}}
+
+    def test_interpolates_between_snapshots(self):
+        """Test positions are blended between the two states around now - delay"""
+        buffer = SnapshotBuffer(min_delay=0.1, max_delay=0.1)
+        buffer.push(self._state(1, 1, bombs=[(1, 1)]), 10.0)
+        buffer.push(self._state(2, 1, bombs=[(1, 1), (2, 1)]), 10.1)
+        self.assertEqual(buffer.positions(10.1), {"0": (1, 1)})
+        x, y = buffer.positions(10.15)["0"]
+        self.assertAlmostEqual(x, 1.5)
+        self.assertEqual(buffer.positions(10.5), {"0": (2, 1)})
+        self.assertAlmostEqual(buffer.bomb_age(1, 1, 10.5), 0.5)
+        self.assertAlmostEqual(buffer.bomb_age(2, 1, 10.5), 0.4)
+        buffer.push(self._state(9, 9), 10.2)        # respawn: no sliding across the map
+        self.assertEqual(buffer.positions(10.25)["0"], (9, 9))
+
+    def test_delay_adapts_to_jitter(self):
+        """Test irregular arrivals raise the delay, within its bounds"""
+        steady, jittery = SnapshotBuffer(), SnapshotBuffer()
+        for i in range(40):
+            steady.push(self._state(1, 1), i * 0.1)
+            jittery.push(self._state(1, 1), i * 0.1 + (0.08 if i % 2 else 0.0))
+        self.assertAlmostEqual(steady.delay(), 0.1, places=3)
+        self.assertGreater(jittery.delay(), steady.delay() + 0.05)
+        self.assertLessEqual(jittery.delay(), jittery.max_delay)
+        steady.push({"game_state": "lobby"}, 5.0)
+        self.assertEqual(steady.positions(5.0), {})
+
+
+class TestChatRenderCache(unittest.TestCase):
+    """Test for the chat line cache shared by the views"""
+
+    def setUp(self):
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 16)
+
+    def test_reuses_and_evicts_least_recent(self):
+        """Test messages are wrapped and rendered once, and the oldest unused entry goes first"""
+        cache = ChatRenderCache(size=2)
+        first = cache.lines("Player 1: hello there everyone", 10, self.font, (255, 255, 255))
+        self.assertEqual(len(first), 4)
+        self.assertIs(cache.lines("Player 1: hello there everyone", 10, self.font, (255, 255, 255)), first)
+        self.assertIsNot(cache.lines("Player 1: hello there everyone", 20, self.font, (255, 255, 255)), first)
+        cache.lines("Player 1: hello there everyone", 10, self.font, (255, 255, 255))
+        cache.lines("Player 2: hi", 10, self.font, (255, 255, 255))
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.lines("Player 1: hello there everyone", 10, self.font, (255, 255, 255)), first)
+
 
 class TestGameController(unittest.TestCase):
     """Test for GameController of the client"""
@@ -243,6 +343,7 @@ class TestGameController(unittest.TestCase):
         """Test spectator that joins the game"""
         self.game_state.is_spectator = True
         self.game_state.connected_players_count.return_value = 2
+        self.game_state.get_max_players.return_value = 4
         event = Mock()
         event.key = pygame.K_j
         self.controller._handle_lobby_input(event, self.game_state)
@@ -262,19 +363,21 @@ class TestGameController(unittest.TestCase):
         """Test input for player movement"""
         self.game_state.is_spectator = False
         self.game_state.get_game_state.return_value = "playing"
+        self.game_state.predict_move.side_effect = [1, 2, 3, 4]
         event = Mock()
         event.key = pygame.K_UP
         self.controller._handle_game_input(event, self.game_state)
-        self.mock_network.send_command.assert_called_with("UP")
+        self.mock_network.send_command.assert_called_with("UP:1")
         event.key = pygame.K_DOWN
         self.controller._handle_game_input(event, self.game_state)
-        self.mock_network.send_command.assert_called_with("DOWN")
+        self.mock_network.send_command.assert_called_with("DOWN:2")
         event.key = pygame.K_LEFT
         self.controller._handle_game_input(event, self.game_state)
-        self.mock_network.send_command.assert_called_with("LEFT")
+        self.mock_network.send_command.assert_called_with("LEFT:3")
         event.key = pygame.K_RIGHT
         self.controller._handle_game_input(event, self.game_state)
-        self.mock_network.send_command.assert_called_with("RIGHT")
+        self.mock_network.send_command.assert_called_with("RIGHT:4")
+        self.game_state.predict_move.assert_called_with("RIGHT")
 
     def test_handle_game_input_bomb(self):
         """Test bomb placement input"""
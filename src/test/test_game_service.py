@@ -202,6 +202,125 @@ class TestGameService(unittest.TestCase):
         self.game.tick()
         self.assertEqual(self.game.state.game_state, GAME_STATE_LOBBY)
 
+    def test_timers_last_the_same_wall_time_at_any_tick_rate(self):
+        """Test a bomb and its explosion last as many seconds at 10 Hz as at 20 Hz"""
+        durations = []
+        for rate in (10, 20):
+            game = GameService(tick_rate=rate)
+            game.add_player(0, "Player0")
+            game.add_player(1, "Player1")
+            game.start_game()
+            game.place_bomb(0)
+            ticks = 0
+            while game.state.bombs:
+                game.tick()
+                ticks += 1
+            fuse = ticks / rate
+            while game.state.explosions:
+                game.tick()
+                ticks += 1
+            durations.append((fuse, ticks / rate))
+        self.assertEqual(durations[0], durations[1])
+
+    def test_victory_timer_reported_at_nominal_rate(self):
+        """Test clients see the victory countdown in 10 Hz ticks whatever the tick rate"""
+        game = GameService(tick_rate=20)
+        game.add_player(0, "Player0")
+        game.add_player(1, "Player1")
+        game.start_game()
+        game.state.players[1].alive = False
+        game.tick()
+        self.assertEqual(game.state.game_state, GAME_STATE_VICTORY)
+        self.assertEqual(game.state.victory_timer, 100)
+        self.assertEqual(game.get_state()["victory_timer"], 50)
+
+    def test_bomb_timers_reported_at_nominal_rate(self):
+        """Test clients see bomb and explosion timers in 10 Hz ticks, the replica keeps raw ticks"""
+        game = GameService(tick_rate=20)
+        game.add_player(0, "Player0")
+        game.add_player(1, "Player1")
+        game.start_game()
+        game.place_bomb(0)
+        game.tick()
+        snapshot = game.snapshot()
+        self.assertEqual(snapshot.replica["bombs"][0]["timer"], 39)
+        self.assertEqual(snapshot.view["bombs"][0]["timer"], 20)
+        self.assertEqual(game.get_state()["bombs"][0]["timer"], 20)
+        game.state.bombs[0].timer = 1
+        game.tick()
+        self.assertEqual(game.snapshot().view["explosions"][0]["timer"], 4)
+
+    def test_queued_inputs_applied_at_tick(self):
+        """Test queued inputs wait for the tick and are applied in arrival order"""
+        self.game.add_player(0, "Player0")
+        self.game.add_player(1, "Player1")
+        self.game.submit_input(1, "start", "Player1")    # not the host: ignored
+        self.game.tick()
+        self.assertEqual(self.game.state.game_state, GAME_STATE_LOBBY)
+        self.game.submit_input(1, "chat", "second")
+        self.game.submit_input(0, "start", "Player0")
+        self.game.submit_input(0, "bomb")
+        self.assertEqual(self.game.state.game_state, GAME_STATE_LOBBY)
+        self.game.tick()
+        self.assertEqual(self.game.state.game_state, GAME_STATE_PLAYING)
+        self.assertEqual([b.owner for b in self.game.state.bombs], [0])
+        self.assertEqual([m["message"] for m in self.game.state.chat_messages[-2:]],
+                         ["second", "Game started! Good luck!"])
+        stats = self.game.input_stats()
+        self.assertEqual((stats["inputs"], stats["pending"], stats["per_tick_max"]), (4, 0, 3))
+
+    def test_same_tick_inputs_favour_nobody(self):
+        """Test a tile both players step on in the same tick goes to whoever sent first"""
+        self.game.add_player(0, "Player0")
+        self.game.add_player(1, "Player1")
+        self.game.start_game()
+        state = self.game.state
+        state.game_map[1][2] = 0
+        for first in (1, 0, 1):
+            state.players[0].x, state.players[0].y = 1, 1
+            state.players[1].x, state.players[1].y = 3, 1
+            moves = {0: "RIGHT", 1: "LEFT"}
+            self.game.submit_input(first, "move", moves[first])
+            self.game.submit_input(1 - first, "move", moves[1 - first])
+            self.game.tick()
+            winner = [pid for pid, p in state.players.items() if (p.x, p.y) == (2, 1)]
+            self.assertEqual(winner, [first])
+
+    def test_move_sequence_acknowledged(self):
+        """Test the last applied client move number is echoed in the player's state"""
+        self.game.add_player(0, "Player0")
+        self.game.add_player(1, "Player1")
+        self.game.start_game()
+        self.game.submit_input(0, "move", "UP", 7)      # into the border wall: refused but applied
+        self.game.submit_input(0, "move", "LEFT", 8)
+        self.game.tick()
+        player = self.game.state.players[0]
+        self.assertEqual((player.x, player.y, player.input_seq), (1, 1, 8))
+        self.assertEqual(self.game.snapshot().view["players"]["0"]["input_seq"], 8)
+
+    def test_published_snapshots(self):
+        """Test each tick publishes a new version that later ticks leave untouched"""
+        self.game.add_player(0, "Player0")
+        self.game.add_player(1, "Player1")
+        self.game.start_game()
+        self.game.tick()
+        first = self.game.snapshot()
+        self.assertIs(self.game.snapshot(), first)
+        player = self.game.state.players[0]
+        bombs_before = list(first.view["bombs"])
+        self.game.place_bomb(0)
+        player.lives = 1
+        self.game.tick()
+        second = self.game.snapshot()
+        self.assertEqual(second.version, first.version + 1)
+        self.assertEqual(first.view["bombs"], bombs_before)
+        self.assertEqual(first.replica["players"]["0"]["lives"], 3)
+        self.assertEqual(second.replica["players"]["0"]["lives"], 1)
+        self.assertEqual(len(second.view["bombs"]), 1)
+        self.assertIs(second.view["map"], second.replica["game_map"])
+        self.assertTrue(all(a is b for a, b in zip(first.replica["game_map"], second.replica["game_map"])))
+        self.assertEqual(second.replica, self.game.export_snapshot() | {"game_map": second.replica["game_map"]})
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Test suite for the incremental rendering of GameView (dummy SDL video driver)
+"""
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pygame
+from client.model.game_state import GameState
+from client.view.base_view import GLYPH_CACHE_SIZE
+from client.view.game_view import GameView
+from common.constants import MAP_WIDTH, MAP_HEIGHT, TILE_SIZE, TILE_EMPTY, TILE_WALL, TILE_BLOCK
+
+
+def _map() -> list:
+    rows = []
+    for y in range(MAP_HEIGHT):
+        row = []
+        for x in range(MAP_WIDTH):
+            border = x in (0, MAP_WIDTH - 1) or y in (0, MAP_HEIGHT - 1)
+            row.append(TILE_WALL if border or (x % 2 == 0 and y % 2 == 0) else TILE_EMPTY)
+        rows.append(row)
+    return rows
+
+
+def _state(game_map: list, x: int = 1) -> dict:
+    player = {"alive": True, "lives": 3, "disconnected": False}
+    return {
+        "game_state": "playing",
+        "players": {"0": dict(player, x=x, y=1, name="A"), "1": dict(player, x=13, y=11, name="B")},
+        "spectators": {},
+        "chat_messages": [],
+        "current_host_id": 0,
+        "max_players": 4,
+        "map": game_map,
+        "bombs": [],
+        "explosions": [],
+    }
+
+
+class TestGameView(unittest.TestCase):
+    """Test for the cached map layer, dirty rects and text cache of GameView"""
+
+    def setUp(self):
+        """Setup a dummy display and a game with two players"""
+        pygame.init()
+        self.screen = pygame.display.set_mode((MAP_WIDTH * TILE_SIZE + 200, MAP_HEIGHT * TILE_SIZE))
+        self.view = GameView(self.screen)
+        self.model = GameState()
+        self.model.set_player_info(0, False, "A")
+        self.map = _map()
+        self.model.update(_state(self.map))
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        pygame.quit()
+
+    def _render(self):
+        """One frame; returns (flip calls, rects passed to display.update)"""
+        with patch("pygame.display.flip") as flip, patch("pygame.display.update") as update:
+            self.model.begin_frame()
+            self.view.render(self.model)
+        rects = [rect for call in update.call_args_list for rect in call.args[0]]
+        return flip.call_count, rects
+
+    def test_map_layer_redrawn_only_where_tiles_change(self):
+        """Test the map layer is drawn once, then only changed tiles are repainted"""
+        with patch.object(self.view, "_blit_tile", wraps=self.view._blit_tile) as blit:
+            self._render()
+            self.assertEqual(blit.call_count, MAP_WIDTH * MAP_HEIGHT)
+            layer = self.view._map_layer
+            self.model.update(_state([list(row) for row in self.map]))
+            self._render()
+            self.assertEqual(blit.call_count, MAP_WIDTH * MAP_HEIGHT)
+            changed = [list(row) for row in self.map]
+            changed[3][3] = TILE_BLOCK
+            self.model.update(_state(changed))
+            _, rects = self._render()
+            self.assertEqual(blit.call_count, MAP_WIDTH * MAP_HEIGHT + 1)
+            self.assertIs(self.view._map_layer, layer)
+        tile = pygame.Rect(3 * TILE_SIZE, 3 * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        self.assertTrue(any(rect.contains(tile) for rect in rects))
+
+    def test_invalidate_forces_full_repaint(self):
+        """Test only dirty rects are pushed until invalidate() asks for a full frame"""
+        flips, _ = self._render()
+        self.assertEqual(flips, 1)
+        flips, rects = self._render()
+        self.assertEqual(flips, 0)
+        self.assertNotIn(self.screen.get_rect(), rects)
+        self.view.invalidate()
+        flips, _ = self._render()
+        self.assertEqual(flips, 1)
+        self.assertEqual(self._render()[0], 0)
+
+    def test_dirty_rects_cover_moved_player(self):
+        """Test a move repaints the cell the player left and the one it entered"""
+        self._render()
+        self.model.update(_state(self.map, x=3))
+        _, rects = self._render()
+        for x in (1, 3):
+            cell = pygame.Rect(x * TILE_SIZE, TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            self.assertTrue(any(rect.contains(cell) for rect in rects), f"cell ({x}, 1) not repainted")
+
+    def test_text_cache_is_bounded(self):
+        """Test rendered text is reused and the cache never grows past GLYPH_CACHE_SIZE"""
+        color = (255, 255, 255)
+        first = self.view.render_text("0", self.view.small_font, color)
+        self.assertIs(self.view.render_text("0", self.view.small_font, color), first)
+        for i in range(GLYPH_CACHE_SIZE * 2):
+            self.view.render_text(str(i), self.view.small_font, color)
+            self.assertLessEqual(len(self.view._glyphs), GLYPH_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Test suite for the occupancy index used by core lookups
+"""
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server import core
+from server.models import State, Bomb, Explosion, Player, state_to_dict, GAME_STATE_PLAYING
+
+
+class TestOccupancyGrid(unittest.TestCase):
+    """Test that the index follows the state"""
+
+    def setUp(self):
+        """Setup a playing state with two players"""
+        self.state = State()
+        core.add_player(self.state, 0, "a")
+        core.add_player(self.state, 1, "b")
+        self.state.game_state = GAME_STATE_PLAYING
+        self.state.game_map = core.generate_map()
+
+    def test_follows_direct_moves(self):
+        """Test positions assigned outside core are seen by lookups"""
+        grid = core.occupancy(self.state)
+        self.state.players[0].x, self.state.players[0].y = 5, 5
+        self.assertIs(core.occupancy(self.state), grid)
+        self.assertTrue(core.is_player_at(self.state, 5, 5))
+        self.assertFalse(core.is_player_at(self.state, 1, 1))
+        self.assertFalse(core.is_player_at(self.state, 5, 5, exclude_id=0))
+
+    def test_players_sharing_a_tile(self):
+        """Test two players on one tile are both indexed"""
+        self.state.players[1].x, self.state.players[1].y = self.state.players[0].x, self.state.players[0].y
+        self.state.players[0].x = 3
+        self.assertTrue(core.is_player_at(self.state, 1, 1))
+        self.assertTrue(core.is_player_at(self.state, 3, 1))
+
+    def test_bomb_index(self):
+        """Test bombs are indexed on place and dropped on removal"""
+        core.place_bomb(self.state, 0)
+        core.place_bomb(self.state, 0)
+        self.assertEqual(len(self.state.bombs), 1)
+        bomb = self.state.bombs[0]
+        self.assertIs(core.occupancy(self.state).bomb_at(1, 1), bomb)
+        core.remove_bomb(self.state, bomb)
+        self.assertIsNone(core.occupancy(self.state).bomb_at(1, 1))
+        core.place_bomb(self.state, 0)
+        self.assertEqual(len(self.state.bombs), 1)
+
+    def test_fire_blocks_regen(self):
+        """Test burning tiles are not used for block regeneration"""
+        self.state.players[0].x, self.state.players[0].y = 1, 1
+        self.state.players[1].x, self.state.players[1].y = 1, 1
+        self.state.game_map[7][7] = 0
+        self.assertTrue(core.safe_to_place_block(self.state, 7, 7))
+        explosion = Explosion(positions=[(7, 7)], timer=5)
+        self.state.explosions.append(explosion)
+        self.assertFalse(core.safe_to_place_block(self.state, 7, 7))
+        core.remove_explosion(self.state, explosion)
+        self.assertTrue(core.safe_to_place_block(self.state, 7, 7))
+
+    def test_rebuilt_after_external_changes(self):
+        """Test lists changed behind core's back trigger a rebuild"""
+        core.occupancy(self.state)
+        self.state.bombs.append(Bomb(x=3, y=1, timer=5, owner=1))
+        del self.state.players[1]
+        self.assertIsNotNone(core.occupancy(self.state).bomb_at(3, 1))
+        self.assertFalse(core.is_player_at(self.state, *core.spawn_for(1)))
+
+    def test_removed_player_not_found(self):
+        """Test removed players leave the index"""
+        x, y = core.spawn_for(1)
+        core.remove_player(self.state, 1)
+        self.assertFalse(core.is_player_at(self.state, x, y))
+
+    def test_not_serialized(self):
+        """Test the index is invisible to the codec and to vars()"""
+        core.occupancy(self.state)
+        self.assertNotIn("occupancy", state_to_dict(self.state))
+        self.assertNotIn("_occupancy", vars(self.state.players[0]))
+        self.assertEqual(self.state.players[0], Player(x=1, y=1, name="a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,240 @@
+"""
+Test suite for the TCP proxy data path (forwarding engine, session capture, failover)
+"""
+import json
+import socket
+import threading
+import time
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server.fault_tolerance.forwarding import SPLICE_AVAILABLE, DestinationError, Forwarder
+from server.fault_tolerance.proxy_server import ClientSession, TCPProxy
+from server.fault_tolerance.event_proxy import SelectorProxy
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def _listen(port: int) -> socket.socket:
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.bind(("localhost", port))
+    srv.listen(5)
+    srv.settimeout(5.0)
+    return srv
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _join_line(session_id: str) -> bytes:
+    return (json.dumps({"join_success": True, "player_id": 0, "player_name": "a",
+                        "session_id": session_id}) + "\n").encode()
+
+
+class TestForwarder(unittest.TestCase):
+    """Test for the copy and splice forwarding modes"""
+
+    def _roundtrip(self, use_splice: bool) -> None:
+        src_w, src_r = socket.socketpair()
+        dst_w, dst_r = socket.socketpair()
+        forwarder = Forwarder(size=4096, use_splice=use_splice)
+        try:
+            payload = os.urandom(10000)
+            src_w.sendall(payload)
+            src_r.setblocking(False)
+            moved = 0
+            while moved < len(payload):
+                try:
+                    moved += forwarder.forward(src_r, dst_w)
+                except BlockingIOError:
+                    time.sleep(0.001)
+            self.assertEqual(_recv_exactly(dst_r, len(payload)), payload)
+            self.assertEqual(forwarder.bytes_forwarded, len(payload))
+            src_w.close()
+            self.assertEqual(forwarder.forward(src_r, dst_w), 0)
+        finally:
+            forwarder.close()
+            for sock in (src_r, dst_w, dst_r):
+                sock.close()
+
+    def test_copy_mode(self):
+        """Test recv_into forwarding preserves the byte stream"""
+        self._roundtrip(use_splice=False)
+
+    @unittest.skipUnless(SPLICE_AVAILABLE, "os.splice not available")
+    def test_splice_mode(self):
+        """Test splice forwarding preserves the byte stream"""
+        self._roundtrip(use_splice=True)
+
+    def test_destination_failure_is_reported(self):
+        """Test a dead destination raises DestinationError, not a source error"""
+        src_w, src_r = socket.socketpair()
+        dst_w, dst_r = socket.socketpair()
+        dst_r.close()
+        forwarder = Forwarder(use_splice=False)
+        try:
+            src_w.sendall(b"x" * 100)
+            with self.assertRaises(DestinationError):
+                for _ in range(100):
+                    forwarder.forward(src_r, dst_w)
+        finally:
+            forwarder.close()
+            for sock in (src_w, src_r, dst_w):
+                sock.close()
+
+
+class TestSessionInspection(unittest.TestCase):
+    """Test that the proxy stops parsing once the join is seen"""
+
+    def test_join_success_ends_inspection(self):
+        """Test the session is captured and inspection switched off"""
+        proxy = TCPProxy(listen_port=0, backend_port=0)
+        session = ClientSession(("x", 1))
+        proxy._parse_session(b'{"game_state": "lobby"}\n', session)
+        self.assertTrue(session.inspecting)
+        proxy._parse_session(_join_line("abc"), session)
+        self.assertFalse(session.inspecting)
+        self.assertEqual(session.session_id, "abc")
+
+
+class TestProxyForwarding(unittest.TestCase):
+    """End-to-end: client <-> proxy <-> fake backend (thread per client)"""
+
+    proxy_class = TCPProxy
+
+    def setUp(self):
+        """Setup for each test"""
+        self.backend_port = _free_port()
+        self.listen_port = _free_port()
+        self.backend = _listen(self.backend_port)
+
+    def tearDown(self):
+        """Close the fake backend"""
+        self.backend.close()
+
+    def _start_proxy(self, use_splice: bool) -> TCPProxy:
+        proxy = self.proxy_class(listen_port=self.listen_port, backend_port=self.backend_port,
+                                 use_splice=use_splice)
+        threading.Thread(target=proxy.start, daemon=True).start()
+        deadline = time.time() + 3.0
+        while time.time() < deadline:
+            try:
+                socket.create_connection(("localhost", self.listen_port), 0.2).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        self.backend.accept()[0].close()   # the readiness probe above
+        return proxy
+
+    def _stream_through(self, use_splice: bool) -> None:
+        proxy = self._start_proxy(use_splice)
+        client = socket.create_connection(("localhost", self.listen_port), 3.0)
+        try:
+            conn, _ = self.backend.accept()
+            client.sendall(b"JOIN:a\n")
+            self.assertEqual(_recv_exactly(conn, 7), b"JOIN:a\n")
+            payload = os.urandom(1 << 20)
+            conn.sendall(_join_line("s1") + payload)
+            expected = _join_line("s1") + payload
+            self.assertEqual(_recv_exactly(client, len(expected)), expected)
+            conn.close()
+        finally:
+            client.close()
+            proxy.stop()
+
+    def test_copy_forwarding(self):
+        """Test a large stream arrives intact with recv_into forwarding"""
+        self._stream_through(use_splice=False)
+
+    @unittest.skipUnless(SPLICE_AVAILABLE, "os.splice not available")
+    def test_splice_forwarding(self):
+        """Test a large stream arrives intact with splice forwarding"""
+        self._stream_through(use_splice=True)
+
+    def test_failover_sends_reconnect(self):
+        """Test a lost backend is replaced and the session resumed"""
+        proxy = self._start_proxy(use_splice=True)
+        client = socket.create_connection(("localhost", self.listen_port), 3.0)
+        try:
+            conn, _ = self.backend.accept()
+            client.sendall(b"JOIN:a\n")
+            _recv_exactly(conn, 7)
+            conn.sendall(_join_line("s1"))
+            _recv_exactly(client, len(_join_line("s1")))
+            # Primary dies; the promoted backup opens the same port
+            conn.close()
+            self.backend.close()
+            self.backend = _listen(self.backend_port)
+            new_conn, _ = self.backend.accept()
+            self.assertEqual(_recv_exactly(new_conn, len(b"RECONNECT:s1\n")), b"RECONNECT:s1\n")
+            new_conn.sendall(b'{"reconnected": true}\n')
+            self.assertEqual(_recv_exactly(client, 22), b'{"reconnected": true}\n')
+            new_conn.close()
+        finally:
+            client.close()
+            proxy.stop()
+
+
+class TestSelectorProxyForwarding(TestProxyForwarding):
+    """Same scenarios served by the single event-loop proxy"""
+
+    proxy_class = SelectorProxy
+
+    def test_many_clients_one_thread(self):
+        """Test concurrent clients are all relayed without extra threads"""
+        proxy = self._start_proxy(use_splice=True)
+        threads_before = threading.active_count()
+        clients, conns = [], []
+        try:
+            for i in range(50):
+                clients.append(socket.create_connection(("localhost", self.listen_port), 3.0))
+                conns.append(self.backend.accept()[0])
+            for i, conn in enumerate(conns):
+                conn.sendall(_join_line(f"s{i}"))
+            # Backend accept order matches client connect order: one at a time above
+            for i, client in enumerate(clients):
+                line = _join_line(f"s{i}")
+                self.assertEqual(_recv_exactly(client, len(line)), line)
+            self.assertEqual(threading.active_count(), threads_before)
+            self.assertEqual(proxy.connection_count(), 50)
+        finally:
+            for sock in clients + conns:
+                sock.close()
+            proxy.stop()
+
+    def test_commands_buffered_until_backend_is_up(self):
+        """Test a client that connects before the backend gets its bytes delivered"""
+        self.backend.close()
+        proxy = self.proxy_class(listen_port=self.listen_port, backend_port=self.backend_port)
+        threading.Thread(target=proxy.start, daemon=True).start()
+        time.sleep(0.2)
+        client = socket.create_connection(("localhost", self.listen_port), 3.0)
+        try:
+            client.sendall(b"JOIN:a\n")
+            time.sleep(0.3)
+            self.backend = _listen(self.backend_port)
+            conn, _ = self.backend.accept()
+            self.assertEqual(_recv_exactly(conn, 7), b"JOIN:a\n")
+            conn.close()
+        finally:
+            client.close()
+            proxy.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
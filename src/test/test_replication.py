@@ -0,0 +1,303 @@
+"""
+Test suite for incremental primary -> backup replication
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server.fault_tolerance.replication import (
+    RECORD_CHECKPOINT, RECORD_DIFF, ReplicaState, ReplicationLog, ReplicationStats,
+    apply_snapshot_diff, diff_snapshot, encode_reply, parse_header, parse_reply,
+)
+from server.fault_tolerance.primary_server import PrimaryServer
+from server.fault_tolerance.backup_server import BackupServer
+from server.services.game_service import GameService
+from server.services.room_manager import RoomManager
+from server.network.server_network import StateBroadcaster
+from server.models import GAME_STATE_PLAYING
+
+
+def _split(record: bytes) -> tuple:
+    header, payload = record.split(b"\n", 1)
+    kind, seq, base, _, size = parse_header(header)
+    assert size == len(payload)
+    return kind, seq, base, payload
+
+
+def _playing_service() -> GameService:
+    service = GameService()
+    service.add_player(0, "a")
+    service.add_player(1, "b")
+    service.start_game()
+    return service
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class TestSnapshotDiff(unittest.TestCase):
+    """Test for diff_snapshot / apply_snapshot_diff"""
+
+    def setUp(self):
+        """Setup for each test"""
+        self.service = _playing_service()
+        self.prev = self.service.export_snapshot()
+
+    def test_roundtrip_after_ticks(self):
+        """Test the diff rebuilds the exact snapshot, bomb timers included"""
+        self.service.place_bomb(0)
+        for _ in range(3):
+            self.service.tick()
+        curr = self.service.export_snapshot()
+        self.assertEqual(apply_snapshot_diff(self.prev, diff_snapshot(self.prev, curr)), curr)
+
+    def test_tile_and_player_changes_are_small(self):
+        """Test only changed tiles and players are shipped"""
+        curr = self.service.export_snapshot()
+        curr["game_map"][1][2] = 2
+        curr["players"]["1"]["lives"] = 2
+        diff = diff_snapshot(self.prev, curr)
+        self.assertEqual(diff["tiles"], [[2, 1, 2]])
+        self.assertEqual(list(diff["keyed"]["players"]["set"]), ["1"])
+        self.assertNotIn("set", diff)
+
+    def test_removed_player_and_chat(self):
+        """Test removals and appended chat messages"""
+        curr = self.service.export_snapshot()
+        del curr["players"]["1"]
+        curr["chat_messages"].append({"player_id": 0, "message": "hi", "timestamp": 9.0})
+        result = apply_snapshot_diff(self.prev, diff_snapshot(self.prev, curr))
+        self.assertEqual(result, curr)
+
+    def test_apply_does_not_mutate_base(self):
+        """Test the base snapshot is left untouched"""
+        curr = self.service.export_snapshot()
+        curr["game_map"][1][2] = 2
+        apply_snapshot_diff(self.prev, diff_snapshot(self.prev, curr))
+        self.assertNotEqual(self.prev["game_map"][1][2], 2)
+
+
+class TestReplicationLog(unittest.TestCase):
+    """Test for record numbering and the backup-side replica"""
+
+    def _ship(self, log: ReplicationLog, link: dict) -> bytes:
+        """Newest record for a fake link {"seq", "base"}, advancing it like the sender does"""
+        seq, snapshot, record, _ = log.record(link["seq"], link["base"])
+        link["seq"], link["base"] = seq, snapshot
+        return record
+
+    def test_first_record_and_interval_are_checkpoints(self):
+        """Test checkpoints are forced at start and every N records"""
+        log, link = ReplicationLog(checkpoint_interval=3), {"seq": 0, "base": None}
+        kinds = []
+        for _ in range(6):
+            log.append({"version": 1, "n": log.seq})
+            kinds.append(_split(self._ship(log, link))[0])
+        self.assertEqual(kinds, [RECORD_CHECKPOINT, RECORD_DIFF, RECORD_CHECKPOINT,
+                                 RECORD_DIFF, RECORD_DIFF, RECORD_CHECKPOINT])
+
+    def test_replica_follows_the_log(self):
+        """Test a replica applying every record matches the primary"""
+        service = _playing_service()
+        log, replica = ReplicationLog(checkpoint_interval=100), ReplicaState()
+        link = {"seq": 0, "base": None}
+        for _ in range(10):
+            service.tick()
+            log.append(service.export_snapshot())
+            self.assertTrue(replica.apply(*_split(self._ship(log, link))))
+        self.assertEqual(replica.snapshot, service.export_snapshot())
+        self.assertEqual((replica.checkpoints, replica.diffs), (1, 9))
+
+    def test_up_to_date_links_share_the_diff(self):
+        """Test the DIFF is encoded once for every backup that is in sync"""
+        log = ReplicationLog(checkpoint_interval=100)
+        links = [{"seq": 0, "base": None}, {"seq": 0, "base": None}]
+        log.append({"version": 1, "n": 0})
+        for link in links:
+            self._ship(log, link)
+        log.append({"version": 1, "n": 1})
+        first, second = (self._ship(log, link) for link in links)
+        self.assertIs(first, second)
+
+    def test_lagging_link_skips_to_newest(self):
+        """Test a slow backup gets one DIFF from its last snapshot to the newest"""
+        log, replica = ReplicationLog(checkpoint_interval=100), ReplicaState()
+        link = {"seq": 0, "base": None}
+        log.append({"version": 1, "n": 0})
+        replica.apply(*_split(self._ship(log, link)))
+        for n in range(1, 5):
+            log.append({"version": 1, "n": n})
+        kind, seq, base, payload = _split(self._ship(log, link))
+        self.assertEqual((kind, seq, base), (RECORD_DIFF, 5, 1))
+        self.assertTrue(replica.apply(kind, seq, base, payload))
+        self.assertEqual(replica.snapshot, {"version": 1, "n": 4})
+
+    def test_gap_requires_checkpoint(self):
+        """Test a DIFF on an unknown base is refused until a checkpoint arrives"""
+        log, replica = ReplicationLog(checkpoint_interval=100), ReplicaState()
+        log.append({"version": 1, "n": 0})
+        replica.apply(*_split(log.record(0, None)[2]))
+        log.append({"version": 1, "n": 1})
+        log.append({"version": 1, "n": 2})
+        self.assertFalse(replica.apply(*_split(log.record(2, {"version": 1, "n": 1})[2])))
+        self.assertEqual(replica.gaps, 1)
+        self.assertTrue(replica.apply(*_split(log.record(2, None)[2])))
+        self.assertEqual(replica.snapshot, {"version": 1, "n": 2})
+
+    def test_corrupt_record_keeps_replica(self):
+        """Test a malformed record is NACKed and the last good state survives"""
+        backup = BackupServer("localhost", primary_heartbeat_port=_free_port(), state_port=_free_port())
+        service = _playing_service()
+        log, counter = ReplicationLog(checkpoint_interval=100), [0]
+        log.append(service.export_snapshot())
+        self.assertTrue(backup._apply_record(*_split(log.record(0, None)[2]), counter))
+        good = backup.replica.snapshot
+        bad_version = json.dumps(dict(service.export_snapshot(), version=99)).encode()
+        for kind, seq, base, payload in ((RECORD_DIFF, 2, 1, b"{not json"),
+                                         (RECORD_DIFF, 2, 1, b'{"rooms": {"set": {}}}'),
+                                         (RECORD_CHECKPOINT, 2, 0, bad_version)):
+            self.assertFalse(backup._apply_record(kind, seq, base, payload, counter))
+            self.assertEqual(backup.replica.seq, 1)
+            self.assertIs(backup.replica.snapshot, good)
+        self.assertEqual(set(backup.replicated_state.players), {0, 1})
+        service.tick()
+        log.append(service.export_snapshot())
+        self.assertTrue(backup._apply_record(*_split(log.record(1, good)[2]), counter))
+        self.assertEqual(backup.replica.seq, 2)
+
+    def test_rooms_are_diffed_room_by_room(self):
+        """Test only the changed room travels in a DIFF, and checkpoints pack every room's map"""
+        rooms = RoomManager(StateBroadcaster)
+        first, second = rooms.create_room("A"), rooms.create_room("B")
+        for room in (first, second):
+            room.game_service.add_player(0, "a")
+            room.game_service.add_player(1, "b")
+            room.game_service.start_game()
+        log, replica = ReplicationLog(checkpoint_interval=100), ReplicaState()
+        link = {"seq": 0, "base": None}
+        log.append(rooms.snapshot().replica)
+        kind, _, _, payload = _split(self._ship(log, link))
+        self.assertEqual(kind, RECORD_CHECKPOINT)
+        self.assertIn(b'"packed"', payload)
+        self.assertTrue(replica.apply(*_split(log.record(0, None)[2])))
+        second.game_service.move_player(0, "DOWN")
+        second.game_service.tick()
+        log.append(rooms.snapshot().replica)
+        kind, seq, base, payload = _split(self._ship(log, link))
+        self.assertEqual(set(json.loads(payload)["rooms"]["diff"]), {str(second.room_id)})
+        self.assertTrue(replica.apply(kind, seq, base, payload))
+        self.assertEqual(json.loads(json.dumps(replica.snapshot)),
+                         json.loads(json.dumps(rooms.snapshot().replica)))
+
+    def test_replies_and_stats(self):
+        """Test ACK/NACK parsing and the stats summary"""
+        self.assertEqual(parse_reply(encode_reply(True, 7)), (True, 7))
+        self.assertEqual(parse_reply(encode_reply(False, 8)), (False, 8))
+        stats = ReplicationStats()
+        stats.count(100, True)
+        stats.latency(0.004)
+        summary = stats.stats()
+        self.assertEqual((summary["records"], summary["checkpoints"], summary["bytes"]), (1, 1, 100))
+        self.assertAlmostEqual(summary["p50_ms"], 4.0)
+
+
+class TestReplicationStream(unittest.TestCase):
+    """Test for the persistent primary -> backup link"""
+
+    def test_backup_tracks_primary(self):
+        """Test the backup rebuilds the primary state over one connection"""
+        port = _free_port()
+        backup = BackupServer("localhost", primary_heartbeat_port=_free_port(), state_port=port)
+        threading.Thread(target=backup._receive_state_updates, daemon=True).start()
+        service = _playing_service()
+        primary = PrimaryServer(service, [("localhost", port)], heartbeat_port=_free_port(),
+                                replication_interval=0.01)
+        try:
+            threading.Thread(target=primary._periodic_replication, daemon=True).start()
+            deadline = time.time() + 3.0
+            while time.time() < deadline and backup.replica.diffs < 5:
+                service.tick()
+                time.sleep(0.01)
+            self.assertGreaterEqual(backup.replica.diffs, 5)
+            self.assertEqual(backup.replicated_state.game_state, GAME_STATE_PLAYING)
+            self.assertEqual(set(backup.replicated_state.players), {0, 1})
+            self.assertGreater(backup.replication_stats()["records"], 5)
+            deadline = time.time() + 1.0
+            while time.time() < deadline and not primary.replication_stats()[f"localhost:{port}"]["p50_ms"]:
+                time.sleep(0.01)
+            self.assertGreater(primary.replication_stats()[f"localhost:{port}"]["p50_ms"], 0.0)
+        finally:
+            primary.stop()
+            backup.stop()
+
+    def test_every_room_is_replicated(self):
+        """Test rooms created on the primary are replicated and restored under their id"""
+        port = _free_port()
+        backup = BackupServer("localhost", primary_heartbeat_port=_free_port(), state_port=port)
+        threading.Thread(target=backup._receive_state_updates, daemon=True).start()
+        rooms = RoomManager(StateBroadcaster)
+        arena = rooms.create_room("Arena", 21, 21, 8)
+        arena.game_service.add_player(0, "a")
+        arena.game_service.add_player(3, "b")
+        arena.game_service.start_game()
+        primary = PrimaryServer(rooms, [("localhost", port)], heartbeat_port=_free_port(),
+                                replication_interval=0.01)
+        try:
+            threading.Thread(target=primary._periodic_replication, daemon=True).start()
+            deadline = time.time() + 3.0
+            while time.time() < deadline and backup.replica.diffs < 5:
+                rooms.tick_all()
+                time.sleep(0.01)
+            self.assertGreaterEqual(backup.replica.diffs, 5)
+            self.assertEqual(backup.replicated_state.players, {})
+            name, state = backup.replicated_rooms[arena.room_id]
+            self.assertEqual((name, state.map_width, set(state.players)), ("Arena", 21, {0, 3}))
+        finally:
+            primary.stop()
+            backup.stop()
+        promoted = RoomManager(StateBroadcaster)
+        room = promoted.restore_room(arena.room_id, name, state)
+        self.assertIs(promoted.get(arena.room_id), room)
+        self.assertEqual(room.game_service.state.game_state, GAME_STATE_PLAYING)
+        self.assertEqual([pid for pid, taken in enumerate(room.player_slots) if taken], [0, 3])
+        self.assertEqual(promoted.create_room().room_id, arena.room_id + 1)
+
+    def test_backup_tracks_primary_asyncio(self):
+        """Test the same channel between the asyncio variants"""
+        port = _free_port()
+        backup = BackupServer("localhost", primary_heartbeat_port=_free_port(), state_port=port)
+        service = _playing_service()
+        primary = PrimaryServer(service, [("localhost", port)], heartbeat_port=_free_port(),
+                                replication_interval=0.01)
+
+        async def scenario():
+            server = await asyncio.start_server(backup._handle_state_conn_async, "localhost", port)
+            replication = asyncio.get_running_loop().create_task(primary.serve_async())
+            try:
+                for _ in range(300):
+                    if backup.replica.diffs >= 5:
+                        break
+                    service.tick()
+                    await asyncio.sleep(0.01)
+            finally:
+                primary.stop()
+                await asyncio.wait_for(replication, 2.0)
+                server.close()
+
+        asyncio.run(scenario())
+        self.assertGreaterEqual(backup.replica.diffs, 5)
+        self.assertEqual(set(backup.replicated_state.players), {0, 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
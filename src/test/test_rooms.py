@@ -0,0 +1,197 @@
+"""
+Test suite for multi-room hosting (RoomManager + BombermanServer room commands)
+"""
+import json
+import socket
+import time
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server.models import State, DISCONNECT_TIMEOUT
+from server.services.room_manager import RoomManager
+from server.network.server_network import StateBroadcaster
+from server.mainServer import BombermanServer
+
+
+class TestRoomManager(unittest.TestCase):
+    """Test for RoomManager"""
+
+    def setUp(self):
+        """Setup for each test"""
+        self.manager = RoomManager(StateBroadcaster, max_rooms=3)
+
+    def test_default_room_exists(self):
+        """Test room 0 is created up front"""
+        self.assertEqual(self.manager.default_room.room_id, 0)
+        self.assertEqual([r["room_id"] for r in self.manager.list_rooms()], [0])
+
+    def test_rooms_are_independent(self):
+        """Test each room has its own game and slots"""
+        room = self.manager.create_room("Arena")
+        self.assertIsNot(room.game_service, self.manager.default_room.game_service)
+        room.game_service.add_player(0, "A")
+        self.assertEqual(len(self.manager.default_room.game_service.state.players), 0)
+
+    def test_room_limit(self):
+        """Test create_room refuses past max_rooms"""
+        self.manager.create_room()
+        self.manager.create_room()
+        self.assertIsNone(self.manager.create_room())
+
+    def test_room_match_settings(self):
+        """Test rooms get their own map size and player cap"""
+        room = self.manager.create_room("Royale", 101, 101, 64)
+        self.assertEqual(len(room.player_slots), 64)
+        self.assertEqual((room.info()["map_width"], room.info()["max_players"]), (101, 64))
+        for pid in range(64):
+            self.assertEqual(room.free_slot(), pid)
+            room.player_slots[pid] = True
+        self.assertIsNone(room.free_slot())
+        self.assertEqual(len(self.manager.default_room.player_slots), 4)
+        with self.assertRaises(ValueError):
+            self.manager.create_room("Bad", 100, 101, 8)
+
+    def test_failing_room_does_not_stop_the_others(self):
+        """Test an exception in one room's tick or broadcast is contained"""
+        failing, room = self.manager.default_room, self.manager.create_room()
+        failing.tick = failing.broadcast = Mock(side_effect=RuntimeError("boom"))
+        room.tick, room.broadcast = Mock(), Mock()
+        self.manager.tick_all()
+        self.manager.broadcast_all()
+        room.tick.assert_called_once()
+        room.broadcast.assert_called_once()
+
+    def test_empty_rooms_removed_after_grace(self):
+        """Test empty non-default rooms are closed"""
+        room = self.manager.create_room()
+        self.manager.remove_empty_rooms()
+        self.assertIsNotNone(self.manager.get(room.room_id))
+        room.created_at -= 60
+        self.manager.remove_empty_rooms()
+        self.assertIsNone(self.manager.get(room.room_id))
+        self.assertIsNotNone(self.manager.get(0))
+
+    def test_room_kept_while_players_may_reconnect(self):
+        """Test a room whose player dropped mid-game waits DISCONNECT_TIMEOUT before closing"""
+        room = self.manager.create_room()
+        room.created_at -= 60
+        service = room.game_service
+        service.add_player(0, "A")
+        service.add_player(1, "B")
+        service.add_player(2, "C")
+        service.start_game()
+        service.handle_player_disconnect(0)
+        self.manager.remove_empty_rooms()
+        self.assertIsNotNone(self.manager.get(room.room_id))
+        later = time.time() + DISCONNECT_TIMEOUT
+        with patch.object(State, "now", return_value=later):
+            self.manager.remove_empty_rooms()
+        self.assertIsNone(self.manager.get(room.room_id))
+
+    def test_restored_room_kept_for_reconnects(self):
+        """Test a room restored on promotion is not closed before its players come back"""
+        room = self.manager.restore_room(2, "Arena", State())
+        room.created_at -= 60
+        self.manager.remove_empty_rooms()
+        self.assertIsNotNone(self.manager.get(2))
+        room.reconnect_until -= DISCONNECT_TIMEOUT
+        self.manager.remove_empty_rooms()
+        self.assertIsNone(self.manager.get(2))
+
+
+class TestServerRooms(unittest.TestCase):
+    """Test room commands through a ClientHandler"""
+
+    def setUp(self):
+        """Setup a standalone server with one joined player"""
+        self.server = BombermanServer(enable_fault_tolerance=False)
+        self.conn, self.peer = socket.socketpair()
+        self.peer.setblocking(False)
+        self.received = b""
+        self.handler = self.server._admit(self.conn, ("127.0.0.1", 1), "")
+
+    def tearDown(self):
+        """Stop writers and close the sockets"""
+        self.server.broadcast_engine.remove(self.conn)
+        self.conn.close()
+        self.peer.close()
+
+    def _messages(self) -> list:
+        self.assertTrue(self.server.broadcast_engine.flush())
+        try:
+            while True:
+                chunk = self.peer.recv(65536)
+                if not chunk:
+                    break
+                self.received += chunk
+        except BlockingIOError:
+            pass
+        return [json.loads(line) for line in self.received.split(b"\n") if line]
+
+    def test_create_room_moves_client(self):
+        """Test CREATE_ROOM seats the client as player 0 of the new room"""
+        self.handler.process(b"CREATE_ROOM:Arena\n")
+        room = self.server.rooms.get(1)
+        self.assertEqual(self.handler.room_id, 1)
+        self.assertIs(self.handler.controller, room.command_controller)
+        self.assertIn(self.conn, room.clients)
+        self.assertNotIn(self.conn, self.server.clients)
+        self.assertEqual(self.server.game_service.state.players, {})
+        joined = self._messages()[-1]
+        self.assertEqual((joined["room_id"], joined["player_id"]), (1, 0))
+
+    def test_list_and_unknown_room(self):
+        """Test ROOMS lists rooms and JOIN_ROOM reports unknown ids"""
+        self.handler.process(b"ROOMS\n")
+        self.handler.process(b"JOIN_ROOM:42\n")
+        listing, error = self._messages()[-2:]
+        self.assertEqual(listing["rooms"][0]["players"], 1)
+        self.assertIn("room_error", error)
+        self.assertEqual(self.handler.room_id, 0)
+
+    def test_create_room_with_settings(self):
+        """Test CREATE_ROOM settings reach the room and bad ones are refused"""
+        self.handler.process(b"CREATE_ROOM:Tiny:7x7:70\n")
+        self.assertIn("room_error", self._messages()[-1])
+        self.handler.process(b"CREATE_ROOM:Royale:51x51:16\n")
+        room = self.server.rooms.get(self.handler.room_id)
+        self.assertEqual(room.game_service.state.map_width, 51)
+        self.assertEqual(len(room.player_slots), 16)
+
+    def test_scheduler_ticks_every_room(self):
+        """Test one game step broadcasts each room's own state"""
+        self.handler.process(b"CREATE_ROOM:Arena\n")
+        self.server._game_step()
+        state = self._messages()[-1]
+        self.assertIn("0", state["players"])
+        self.assertEqual(len(state["players"]), 1)
+
+    def test_reconnect_to_closed_room_joins_afresh(self):
+        """Test a session whose room is gone is refused instead of reusing its ids elsewhere"""
+        with self.server.reconnect_lock:
+            self.server.reconnect_registry["old"] = {
+                "player_id": 3, "name": "Lost", "is_spectator": False, "room_id": 7,
+            }
+        conn, peer = socket.socketpair()
+        try:
+            handler = self.server._admit(conn, ("127.0.0.1", 2), "RECONNECT:old\n")
+            self.assertNotIn("old", self.server.reconnect_registry)
+            self.assertEqual(handler.room_id, 0)
+            self.assertNotEqual(handler.user_id, 3)
+            self.assertTrue(self.server.broadcast_engine.flush())
+            peer.setblocking(False)
+            error, joined = [json.loads(line) for line in peer.recv(65536).split(b"\n") if line][:2]
+            self.assertEqual(error["reconnect_error"], "room closed")
+            self.assertFalse(joined.get("reconnected"))
+        finally:
+            self.server.broadcast_engine.remove(conn)
+            conn.close()
+            peer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+Test suite for delta-encoded state broadcast (common.state_delta + StateBroadcaster)
+"""
+import json
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.state_delta import normalize_state, diff_state, apply_delta
+from server.network.server_network import StateBroadcaster
+from client.model.game_state import GameState
+
+
+def _playing_state() -> dict:
+    return normalize_state({
+        "game_state": "playing",
+        "players": {0: {"x": 1, "y": 1, "alive": True, "lives": 3},
+                    1: {"x": 13, "y": 11, "alive": True, "lives": 3}},
+        "spectators": {},
+        "chat_messages": [{"player_id": -1, "message": "Game started!", "timestamp": 1.0,
+                           "is_system": True, "is_spectator": False}],
+        "current_host_id": 0,
+        "map": [[0] * 15 for _ in range(13)],
+        "bombs": [],
+        "explosions": [],
+    })
+
+
+class TestStateDelta(unittest.TestCase):
+    """Test for diff_state / apply_delta"""
+
+    def test_normalize_converts_keys_and_tuples(self):
+        """Test normalize produces the JSON shape"""
+        state = normalize_state({"players": {0: {"x": 1}}, "explosions": [{"positions": [(1, 2)]}]})
+        self.assertEqual(state, json.loads(json.dumps(state)))
+        self.assertIn("0", state["players"])
+
+    def test_identical_states_give_empty_delta(self):
+        """Test no changes produce an empty delta"""
+        state = _playing_state()
+        self.assertEqual(diff_state(state, normalize_state(state)), {})
+
+    def test_moved_player_and_tile_change(self):
+        """Test only the moved player and the changed tile are sent"""
+        prev = _playing_state()
+        curr = normalize_state(prev)
+        curr["players"]["0"]["x"] = 2
+        curr["map"][3][4] = 2
+        delta = diff_state(prev, curr)
+        self.assertEqual(list(delta["players"].keys()), ["0"])
+        self.assertEqual(delta["tiles"], [[4, 3, 2]])
+        self.assertEqual(apply_delta(prev, delta), curr)
+
+    def test_new_chat_messages_only(self):
+        """Test chat deltas carry only appended messages"""
+        prev = _playing_state()
+        curr = normalize_state(prev)
+        msg = {"player_id": 0, "message": "hi", "timestamp": 2.0, "is_system": False, "is_spectator": False}
+        curr["chat_messages"].append(msg)
+        delta = diff_state(prev, curr)
+        self.assertEqual(delta["chat"], [msg])
+        self.assertEqual(apply_delta(prev, delta)["chat_messages"], curr["chat_messages"])
+
+    def test_bombs_added_and_removed(self):
+        """Test bombs are matched by position"""
+        prev = _playing_state()
+        prev["bombs"] = [{"x": 3, "y": 3, "timer": 5, "owner": 0}]
+        curr = normalize_state(prev)
+        curr["bombs"] = [{"x": 5, "y": 5, "timer": 20, "owner": 1}]
+        delta = diff_state(prev, curr)
+        self.assertEqual(delta["bombs_removed"], [[3, 3]])
+        self.assertEqual(apply_delta(prev, delta)["bombs"], curr["bombs"])
+
+    def test_game_state_switch_uses_set_and_unset(self):
+        """Test top-level keys appearing/disappearing"""
+        prev = _playing_state()
+        curr = {k: v for k, v in prev.items() if k not in ("map", "bombs", "explosions")}
+        curr["game_state"] = "victory"
+        curr["winner_id"] = 0
+        result = apply_delta(prev, diff_state(prev, curr))
+        self.assertEqual(result, curr)
+
+    def test_apply_does_not_mutate_base(self):
+        """Test the base dict is left untouched"""
+        prev = _playing_state()
+        curr = normalize_state(prev)
+        curr["map"][1][1] = 2
+        apply_delta(prev, diff_state(prev, curr))
+        self.assertEqual(prev["map"][1][1], 0)
+
+
+class TestStateBroadcaster(unittest.TestCase):
+    """Test for the per-client baseline logic"""
+
+    def setUp(self):
+        """Setup for each test"""
+        self.broadcasters = []
+
+    def tearDown(self):
+        """Stop writer threads"""
+        for broadcaster in self.broadcasters:
+            for conn in list(broadcaster._baselines):
+                broadcaster.forget(conn)
+
+    def _make(self, **kwargs) -> StateBroadcaster:
+        broadcaster = StateBroadcaster(**kwargs)
+        self.broadcasters.append(broadcaster)
+        return broadcaster
+
+    def _frames(self, conn) -> list:
+        for broadcaster in self.broadcasters:
+            broadcaster.engine.flush()
+        return [json.loads(bytes(call.args[0])) for call in conn.sendall.call_args_list]
+
+    def test_full_mode_sends_keyframes(self):
+        """Test full mode never sends deltas"""
+        conn = Mock()
+        broadcaster = self._make(delta_mode=False)
+        broadcaster.broadcast([conn], [], _playing_state())
+        broadcaster.broadcast([conn], [], _playing_state())
+        self.assertTrue(all("delta" not in f for f in self._frames(conn)))
+
+    def test_delta_mode_sends_delta_after_keyframe(self):
+        """Test a synced client gets deltas and a new one gets a keyframe"""
+        old, new = Mock(), Mock()
+        broadcaster = self._make(delta_mode=True, keyframe_interval=100)
+        broadcaster.broadcast([old], [], _playing_state())
+        broadcaster.broadcast([old], [new], _playing_state())
+        self.assertIn("delta", self._frames(old)[1])
+        self.assertNotIn("delta", self._frames(new)[0])
+
+    def test_request_keyframe(self):
+        """Test RESYNC forces a keyframe"""
+        conn = Mock()
+        broadcaster = self._make(delta_mode=True, keyframe_interval=100)
+        broadcaster.broadcast([conn], [], _playing_state())
+        broadcaster.request_keyframe(conn)
+        broadcaster.broadcast([conn], [], _playing_state())
+        self.assertNotIn("delta", self._frames(conn)[1])
+
+    def test_client_model_applies_frames(self):
+        """Test GameState rebuilds the state from keyframe + delta"""
+        conn = Mock()
+        model = GameState()
+        broadcaster = self._make(delta_mode=True, keyframe_interval=100)
+        state = _playing_state()
+        broadcaster.broadcast([conn], [], state)
+        state = normalize_state(state)
+        state["players"]["1"]["y"] = 10
+        broadcaster.broadcast([conn], [], state)
+        for frame in self._frames(conn):
+            model.update(frame)
+        self.assertEqual(model.get_players()["1"]["y"], 10)
+        self.assertFalse(model.needs_keyframe)
+
+    def test_client_model_detects_gap(self):
+        """Test a delta with an unknown base asks for a keyframe"""
+        model = GameState()
+        model.update({"delta": {}, "frame_seq": 5, "base_seq": 4})
+        self.assertTrue(model.needs_keyframe)
+        self.assertIsNone(model.state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+Test suite for the shared statistics helpers (common.stats)
+"""
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.stats import percentile
+
+
+class TestPercentile(unittest.TestCase):
+    """Test for percentile"""
+
+    def test_nearest_rank(self):
+        """Test the nearest-rank value is returned and bounds are clamped"""
+        ordered = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.assertEqual(percentile(ordered, 50), 5)
+        self.assertEqual(percentile(ordered, 95), 10)
+        self.assertEqual(percentile(ordered, 0), 1)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_empty(self):
+        """Test an empty sample gives 0"""
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
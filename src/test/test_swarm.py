@@ -0,0 +1,114 @@
+"""
+Test suite for the headless client and the bot swarm metrics
+"""
+import json
+import socket
+import subprocess
+import time
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from client.headless import HeadlessClient, STATE_SILENCE
+from client.swarm import summarize
+
+
+def _listen() -> socket.socket:
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.bind(("localhost", 0))
+    srv.listen(5)
+    srv.settimeout(5.0)
+    return srv
+
+
+def _line(message: dict) -> bytes:
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+class TestHeadlessClient(unittest.TestCase):
+    """Test for HeadlessClient against a scripted server"""
+
+    def setUp(self):
+        self.srv = _listen()
+        self.bot = HeadlessClient("localhost", self.srv.getsockname()[1])
+
+    def tearDown(self):
+        self.bot.drop_connection()
+        self.srv.close()
+
+    def _receive_until(self, condition):
+        deadline = time.monotonic() + 5.0
+        while not condition() and time.monotonic() < deadline:
+            self.assertTrue(self.bot.receive())
+
+    def test_join_states_and_failover(self):
+        """Test join latency, state intervals, byte count and failover gap are recorded"""
+        self.assertTrue(self.bot.connect())
+        conn, _ = self.srv.accept()
+        self.assertEqual(conn.recv(64), b"RESYNC\n")
+        state = _line({"game_state": "lobby", "players": {}, "spectators": {}, "chat_messages": []})
+        join = _line({"join_success": True, "player_id": 0, "is_spectator": False,
+                      "player_name": "Bot", "session_id": "s1"})
+        conn.sendall(join + state)
+        self._receive_until(lambda: self.bot.states == 1)
+        conn.sendall(state)
+        self._receive_until(lambda: self.bot.states == 2)
+        self.assertIsNotNone(self.bot.join_latency)
+        self.assertEqual(len(self.bot.arrivals), 1)
+        self.assertEqual(self.bot.bytes_received, len(join) + 2 * len(state))
+        # Connection lost: the bot comes back with its session and measures the gap
+        conn.close()
+        self.assertFalse(self.bot.receive())
+        self.bot.drop_connection()
+        self.assertTrue(self.bot.connect_due(time.monotonic()))
+        self.assertTrue(self.bot.connect())
+        conn, _ = self.srv.accept()
+        self.assertEqual(conn.recv(64), b"RECONNECT:s1\n")
+        conn.sendall(state)
+        self._receive_until(lambda: self.bot.states == 3)
+        conn.close()
+        self.assertEqual(len(self.bot.failover_gaps), 1)
+        self.assertEqual(len(self.bot.arrivals), 1)
+        stats = summarize([self.bot], 1.0)
+        self.assertEqual((stats["joined"], stats["states"], stats["failovers"]), (1, 3, 1))
+        self.assertEqual(stats["bytes"], len(join) + 3 * len(state))
+
+    def test_proxy_side_failover(self):
+        """Test a backend failover behind the proxy is measured without a socket drop"""
+        self.assertTrue(self.bot.connect())
+        conn, _ = self.srv.accept()
+        self.assertEqual(conn.recv(64), b"RESYNC\n")
+        state = _line({"game_state": "lobby", "players": {}, "spectators": {}, "chat_messages": []})
+        join = {"join_success": True, "player_id": 0, "is_spectator": False,
+                "player_name": "Bot", "session_id": "s1"}
+        conn.sendall(_line(join) + state)
+        self._receive_until(lambda: self.bot.states == 1)
+        # The proxy replays RECONNECT on the new primary and forwards its answer
+        conn.sendall(_line(dict(join, reconnected=True)))
+        self._receive_until(lambda: self.bot._lost_at is not None)
+        conn.sendall(state)
+        self._receive_until(lambda: self.bot.states == 2)
+        self.assertEqual(self.bot.connections, 1)
+        self.assertEqual(len(self.bot.failover_gaps), 1)
+        self.assertEqual(self.bot.arrivals, [])
+        # A stream that stays silent for too long counts as a gap as well
+        self.bot.tick(time.monotonic() + STATE_SILENCE + 0.1)
+        conn.sendall(state)
+        self._receive_until(lambda: self.bot.states == 3)
+        conn.close()
+        self.assertEqual(len(self.bot.failover_gaps), 2)
+        self.assertEqual(summarize([self.bot], 1.0)["failovers"], 2)
+
+    def test_no_pygame_import(self):
+        """Test the swarm runs without pygame"""
+        src = os.path.join(os.path.dirname(__file__), '..')
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, client.swarm; sys.exit('pygame' in sys.modules)"],
+            cwd=src, capture_output=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Test suite for the fixed-timestep TickScheduler
+"""
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server.services.tick_scheduler import TickScheduler
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTickScheduler(unittest.TestCase):
+    """Test for TickScheduler"""
+
+    def setUp(self):
+        """Setup a 20 Hz simulation broadcasting at 10 Hz"""
+        self.clock = FakeClock()
+        self.scheduler = TickScheduler(tick_rate=20, broadcast_rate=10, max_catch_up=4, clock=self.clock)
+
+    def test_first_step_ticks_and_broadcasts(self):
+        """Test the first call runs one tick and one broadcast"""
+        self.assertEqual(self.scheduler.due(), (1, True))
+        self.assertEqual(self.scheduler.due(), (0, False))
+
+    def test_broadcast_every_other_tick(self):
+        """Test simulation and broadcast rates are independent"""
+        self.scheduler.due()
+        results = []
+        for _ in range(4):
+            self.clock.now += 0.05
+            results.append(self.scheduler.due())
+        self.assertEqual(results, [(1, False), (1, True), (1, False), (1, True)])
+
+    def test_delay_is_measured_from_schedule(self):
+        """Test slow work shortens the next sleep instead of drifting"""
+        self.scheduler.due()
+        self.clock.now += 0.03
+        self.assertAlmostEqual(self.scheduler.delay(), 0.02)
+
+    def test_catch_up_and_skip(self):
+        """Test missed ticks are replayed up to max_catch_up, the rest skipped"""
+        self.scheduler.due()
+        self.clock.now += 0.15
+        self.assertEqual(self.scheduler.due(), (3, True))
+        self.assertEqual(self.scheduler.caught_up, 2)
+        self.clock.now += 0.5
+        steps, _ = self.scheduler.due()
+        self.assertEqual(steps, 4)
+        self.assertEqual(self.scheduler.skipped, 6)
+
+    def test_broadcast_rate_capped_at_tick_rate(self):
+        """Test broadcasting faster than simulating is not allowed"""
+        self.assertEqual(TickScheduler(tick_rate=10, broadcast_rate=30).broadcast_rate, 10)
+
+    def test_stats_percentiles_and_overruns(self):
+        """Test duration percentiles and overrun counting"""
+        for ms in range(1, 101):
+            self.scheduler.record(ms / 1000.0)
+        stats = self.scheduler.stats()
+        self.assertAlmostEqual(stats["p50_ms"], 50.0)
+        self.assertAlmostEqual(stats["p99_ms"], 99.0)
+        self.assertAlmostEqual(stats["max_ms"], 100.0)
+        self.assertEqual(stats["overruns"], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
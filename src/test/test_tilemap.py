@@ -0,0 +1,122 @@
+"""
+Test suite for the tile map backends (lists / NumPy arrays)
+"""
+import json
+import random
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server import core, tilemap
+from server.models import State, TILE_EMPTY, TILE_WALL, TILE_BLOCK, state_to_dict
+from server.fault_tolerance.replication import encode_checkpoint, decode_checkpoint
+
+
+class _BackendCase(unittest.TestCase):
+    """Runs each test on BACKEND and restores the default afterwards"""
+    BACKEND = "list"
+
+    def setUp(self):
+        """Setup for each test"""
+        tilemap.set_backend(self.BACKEND)
+        random.seed(7)
+
+    def tearDown(self):
+        """Cleanup after each test"""
+        tilemap.set_backend(tilemap.DEFAULT_BACKEND)
+
+    def _playing_state(self) -> State:
+        state = State(map_width=51, map_height=51, max_players=8)
+        for pid in range(4):
+            core.add_player(state, pid, f"P{pid}")
+        core.start_game(state)
+        return state
+
+    def test_generated_layout(self):
+        """Test walls on border and pillars, no blocks in safe zones"""
+        m = core.generate_map(51, 31, 8)
+        self.assertEqual((len(m), len(m[0])), (31, 51))
+        self.assertTrue(all(m[0][x] == TILE_WALL and m[30][x] == TILE_WALL for x in range(51)))
+        self.assertTrue(all(m[y][0] == TILE_WALL and m[y][50] == TILE_WALL for y in range(31)))
+        self.assertEqual(m[2][4], TILE_WALL)
+        for x, y in core.safe_zones(51, 31, 8):
+            self.assertEqual(m[y][x], TILE_EMPTY)
+        self.assertGreater(tilemap.count(m, TILE_BLOCK), 0)
+
+    def test_regen_respects_safety_rules(self):
+        """Test regenerated blocks land only where safe_to_place_block allows"""
+        state = self._playing_state()
+        for y in range(1, 50):
+            for x in range(1, 50):
+                if state.game_map[y][x] == TILE_BLOCK:
+                    state.game_map[y][x] = TILE_EMPTY
+        for _ in range(30):
+            before = [list(row) for row in tilemap.to_rows(state.game_map)]
+            core.try_regen_block(state)
+            after = tilemap.to_rows(state.game_map)
+            changed = [(x, y) for y in range(51) for x in range(51) if before[y][x] != after[y][x]]
+            self.assertEqual(len(changed), 1)
+            x, y = changed[0]
+            state.game_map[y][x] = TILE_EMPTY
+            self.assertTrue(core.safe_to_place_block(state, x, y))
+            state.game_map[y][x] = TILE_BLOCK
+
+    def test_exports_are_json_rows(self):
+        """Test state exports carry plain int rows"""
+        state = self._playing_state()
+        rows = json.loads(json.dumps(state_to_dict(state)))["game_map"]
+        self.assertEqual(rows, [[int(t) for t in row] for row in state.game_map])
+
+    def test_packed_checkpoint_roundtrip(self):
+        """Test the packed checkpoint map decodes to the same rows and is smaller"""
+        snapshot = state_to_dict(self._playing_state())
+        payload = encode_checkpoint(snapshot)
+        self.assertIsInstance(payload["game_map"], dict)
+        self.assertLess(len(json.dumps(payload)), len(json.dumps(snapshot)))
+        self.assertEqual(decode_checkpoint(json.loads(json.dumps(payload))), snapshot)
+
+    def test_pack_matches_wire_format(self):
+        """Test pack/unpack use the binary protocol's map layout"""
+        from common.binary_protocol import pack_map, unpack_map
+        rows = tilemap.to_rows(core.generate_map(15, 13, 4))
+        self.assertEqual(tilemap.pack(rows), pack_map(rows))
+        self.assertEqual(tilemap.unpack(pack_map(rows)), unpack_map(pack_map(rows))[0])
+
+
+@unittest.skipUnless(tilemap.NUMPY_AVAILABLE, "NumPy not installed")
+class TestArrayBackend(_BackendCase):
+    """Same tests on uint8 ndarray maps"""
+    BACKEND = "numpy"
+
+    def test_maps_are_uint8_arrays(self):
+        """Test new maps are uint8 arrays and lobby maps are empty again"""
+        state = self._playing_state()
+        self.assertTrue(tilemap.is_array(state.game_map))
+        self.assertEqual(str(state.game_map.dtype), "uint8")
+        core.return_to_lobby(state)
+        self.assertFalse(tilemap.has_map(state.game_map))
+
+
+class TestListBackend(_BackendCase):
+    """Tests on list-of-rows maps"""
+    BACKEND = "list"
+
+    def test_list_is_the_default(self):
+        """Test NumPy is only used when asked for"""
+        self.assertEqual(tilemap.DEFAULT_BACKEND, "list")
+
+    def test_unknown_backend_refused(self):
+        """Test unknown or unavailable backends raise ValueError"""
+        with self.assertRaises(ValueError):
+            tilemap.set_backend("bitmap")
+        if not tilemap.NUMPY_AVAILABLE:
+            with self.assertRaises(ValueError):
+                tilemap.set_backend("numpy")
+
+
+del _BackendCase
+
+if __name__ == '__main__':
+    unittest.main()